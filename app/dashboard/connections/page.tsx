@@ -13,7 +13,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Badge } from '@/components/ui/badge'
 import { Database, Plus, Trash2, Edit, CheckCircle, XCircle, Loader2, Settings, CheckCircle2, RefreshCw } from 'lucide-react'
 import { useToast } from '@/hooks/use-toast'
-import { API_ENDPOINTS, API_URL } from '@/lib/config/api'
+import { API_ENDPOINTS, API_URL, fetchAllPages } from '@/lib/config/api'
 import { ConnectionIcon } from '@/components/ui/connection-icons'
 
 
@@ -87,9 +87,7 @@ export default function ConnectionsPage() {
   const loadConnections = async () => {
     try {
       setLoading(true)
-      const response = await fetch(`${API_ENDPOINTS.connections}/`, {
-        credentials: 'include'
-      })
+      const { response, items } = await fetchAllPages<Connection>(`${API_ENDPOINTS.connections}/`)
       
       if (response.status === 401) {
         // Non authentifié - rediriger vers login
@@ -102,9 +100,8 @@ export default function ConnectionsPage() {
         throw new Error(`Erreur ${response.status}`)
       }
       
-      const data = await response.json()
-      console.log('✅ Connexions chargées:', data)
-      setConnections(data)
+      console.log('✅ Connexions chargées:', items)
+      setConnections(items)
     } catch (error: any) {
       console.error('❌ Erreur chargement connexions:', error)
       toast({
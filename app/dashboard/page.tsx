@@ -63,8 +63,8 @@ export default function DashboardPage() {
         })
       }
 
-      // Récupérer recent audits
-      const auditsResponse = await fetch(`${API_URL}/audits`, {
+      // Récupérer recent audits (les plus récents d'abord)
+      const auditsResponse = await fetch(`${API_URL}/audits?limit=4`, {
         credentials: 'include'
       })
 
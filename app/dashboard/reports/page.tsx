@@ -10,7 +10,7 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs'
 import { Download, FileText, Shield, Eye, Calendar, Plus, Loader2, CheckCircle2, XCircle, Clock } from 'lucide-react'
 import { reportService, type Report } from '@/services/reportService'
 import { useToast } from '@/hooks/use-toast'
-import { API_URL } from '@/lib/config/api'
+import { API_URL, fetchAllPages } from '@/lib/config/api'
 
 export default function ReportsPage() {
   const [reports, setReports] = useState<Report[]>([])
@@ -28,8 +28,8 @@ export default function ReportsPage() {
       setLoading(true)
       const [reportsData, auditsData] = await Promise.all([
         reportService.getAll().catch(() => []),
-        fetch(`${API_URL}/audits`, { credentials: 'include' })
-          .then(r => r.ok ? r.json() : [])
+        fetchAllPages<any>(`${API_URL}/audits`)
+          .then(({ response, items }) => response.ok ? items : [])
           .catch(() => [])
       ])
       setReports(reportsData)
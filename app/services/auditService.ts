@@ -21,8 +21,15 @@ export interface CreateAuditRequest {
 
 export const auditService = {
   getAll: async () => {
-    const response = await api.get<Audit[]>('/audits/');
-    return response.data;
+    // Suit le curseur X-Next-Cursor jusqu'à la dernière page
+    const audits: Audit[] = [];
+    let cursor: string | undefined;
+    do {
+      const response = await api.get<Audit[]>('/audits/', { params: { limit: 200, cursor } });
+      audits.push(...response.data);
+      cursor = response.headers['x-next-cursor'] as string | undefined;
+    } while (cursor);
+    return audits;
   },
 
   getById: async (id: number) => {
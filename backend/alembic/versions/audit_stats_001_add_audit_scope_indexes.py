@@ -0,0 +1,30 @@
+"""
+Add (organization_id, created_at) and (user_id, created_at) indexes on audits
+
+Revision ID: audit_stats_001
+Revises: mitigation_runs_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+# revision identifiers
+revision = 'audit_stats_001'
+down_revision = 'mitigation_runs_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Indexes used by the dashboard stats aggregate and the audit lists"""
+
+    op.create_index('ix_audits_organization_id_created_at', 'audits', ['organization_id', 'created_at'], unique=False)
+    op.create_index('ix_audits_user_id_created_at', 'audits', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    """Drop the audit scope indexes"""
+
+    op.drop_index('ix_audits_user_id_created_at', table_name='audits')
+    op.drop_index('ix_audits_organization_id_created_at', table_name='audits')
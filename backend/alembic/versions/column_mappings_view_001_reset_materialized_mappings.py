@@ -0,0 +1,32 @@
+"""
+Reset column_mappings (mappings become a read-time view)
+
+Until now, applying a mapping rewrote the dataset file with the new column
+names, so the stored mappings are already part of the files. The mapping is
+now applied when reading: keeping them would rename the columns twice.
+
+Revision ID: column_mappings_view_001
+Revises: pseudonym_tokens_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+# revision identifiers
+revision = 'column_mappings_view_001'
+down_revision = 'pseudonym_tokens_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Clear the mappings already materialized in the files"""
+
+    op.execute("UPDATE datasets SET column_mappings = NULL")
+
+
+def downgrade():
+    """Mappings cleared by the upgrade cannot be restored (they are in the files)"""
+
+    pass
@@ -0,0 +1,55 @@
+"""
+Add content-addressed dataset blobs shared between datasets
+
+Revision ID: dataset_blobs_001
+Revises: dataset_preview_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'dataset_blobs_001'
+down_revision = 'dataset_preview_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create dataset_blobs and link datasets to their blob (existing datasets keep blob_id NULL)"""
+
+    op.create_table(
+        'dataset_blobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('storage_key', sa.String(), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('mime_type', sa.String(), nullable=False),
+        sa.Column('encoding', sa.String(), nullable=True),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('column_count', sa.Integer(), nullable=False),
+        sa.Column('columns_info', sa.JSON(), nullable=True),
+        sa.Column('preview_data', sa.JSON(), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dataset_blobs_id'), 'dataset_blobs', ['id'], unique=False)
+    op.create_index(op.f('ix_dataset_blobs_sha256'), 'dataset_blobs', ['sha256'], unique=True)
+
+    op.add_column('datasets', sa.Column('blob_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_datasets_blob_id'), 'datasets', ['blob_id'], unique=False)
+    op.create_foreign_key('fk_datasets_blob_id', 'datasets', 'dataset_blobs', ['blob_id'], ['id'])
+
+
+def downgrade():
+    """Drop the blob link and table"""
+
+    op.drop_constraint('fk_datasets_blob_id', 'datasets', type_='foreignkey')
+    op.drop_index(op.f('ix_datasets_blob_id'), table_name='datasets')
+    op.drop_column('datasets', 'blob_id')
+    op.drop_index(op.f('ix_dataset_blobs_sha256'), table_name='dataset_blobs')
+    op.drop_index(op.f('ix_dataset_blobs_id'), table_name='dataset_blobs')
+    op.drop_table('dataset_blobs')
@@ -0,0 +1,29 @@
+"""
+Add the materialized preview rows to datasets
+
+Revision ID: dataset_preview_001
+Revises: list_pagination_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'dataset_preview_001'
+down_revision = 'list_pagination_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """First rows of each dataset, computed at ingestion (filled lazily for existing rows)"""
+
+    op.add_column('datasets', sa.Column('preview_data', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    """Drop the preview column"""
+
+    op.drop_column('datasets', 'preview_data')
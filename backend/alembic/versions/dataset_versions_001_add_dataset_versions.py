@@ -0,0 +1,84 @@
+"""
+Add immutable dataset versions, column overlays and audit version pinning
+
+Revision ID: dataset_versions_001
+Revises: column_mappings_view_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'dataset_versions_001'
+down_revision = 'column_mappings_view_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Create dataset_versions and link datasets and audits to a version
+
+    Existing datasets keep version_id NULL: their first version is recorded
+    from their current content before the next modification (or audit).
+    """
+
+    op.create_table(
+        'dataset_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dataset_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('parent_id', sa.Integer(), nullable=True),
+        sa.Column('operation', sa.String(), nullable=False),
+        sa.Column('recipe', sa.JSON(), nullable=True),
+        sa.Column('blob_id', sa.Integer(), nullable=True),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('file_hash', sa.String(), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('mime_type', sa.String(), nullable=False),
+        sa.Column('encoding', sa.String(), nullable=True),
+        sa.Column('column_overlays', sa.JSON(), nullable=True),
+        sa.Column('column_mappings', sa.JSON(), nullable=True),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('column_count', sa.Integer(), nullable=False),
+        sa.Column('columns_info', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['dataset_id'], ['datasets.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['parent_id'], ['dataset_versions.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['blob_id'], ['dataset_blobs.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dataset_id', 'version', name='uq_dataset_versions_dataset_id_version')
+    )
+    op.create_index(op.f('ix_dataset_versions_id'), 'dataset_versions', ['id'], unique=False)
+    op.create_index(op.f('ix_dataset_versions_dataset_id'), 'dataset_versions', ['dataset_id'], unique=False)
+    op.create_index(op.f('ix_dataset_versions_blob_id'), 'dataset_versions', ['blob_id'], unique=False)
+
+    op.add_column('datasets', sa.Column('column_overlays', sa.JSON(), nullable=True))
+    op.add_column('datasets', sa.Column('version_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_datasets_version_id', 'datasets', 'dataset_versions', ['version_id'], ['id'], ondelete='SET NULL'
+    )
+
+    op.add_column('audits', sa.Column('dataset_version_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_audits_dataset_version_id'), 'audits', ['dataset_version_id'], unique=False)
+    op.create_foreign_key(
+        'fk_audits_dataset_version_id', 'audits', 'dataset_versions', ['dataset_version_id'], ['id'],
+        ondelete='SET NULL'
+    )
+
+
+def downgrade():
+    """Drop the version links and table"""
+
+    op.drop_constraint('fk_audits_dataset_version_id', 'audits', type_='foreignkey')
+    op.drop_index(op.f('ix_audits_dataset_version_id'), table_name='audits')
+    op.drop_column('audits', 'dataset_version_id')
+    op.drop_constraint('fk_datasets_version_id', 'datasets', type_='foreignkey')
+    op.drop_column('datasets', 'version_id')
+    op.drop_column('datasets', 'column_overlays')
+    op.drop_index(op.f('ix_dataset_versions_blob_id'), table_name='dataset_versions')
+    op.drop_index(op.f('ix_dataset_versions_dataset_id'), table_name='dataset_versions')
+    op.drop_index(op.f('ix_dataset_versions_id'), table_name='dataset_versions')
+    op.drop_table('dataset_versions')
@@ -0,0 +1,36 @@
+"""
+Add composite indexes for keyset pagination of audits, datasets and connections
+
+Revision ID: list_pagination_001
+Revises: audit_stats_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+# revision identifiers
+revision = 'list_pagination_001'
+down_revision = 'audit_stats_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Indexes matching the (scope, created_at, id) ordering and the list filters"""
+
+    op.create_index('ix_datasets_organization_id_created_at_id', 'datasets', ['organization_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_datasets_user_id_created_at_id', 'datasets', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_data_connections_user_id_created_at_id', 'data_connections', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_audits_organization_id_status_created_at', 'audits', ['organization_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_audits_organization_id_risk_level_created_at', 'audits', ['organization_id', 'risk_level', 'created_at'], unique=False)
+
+
+def downgrade():
+    """Drop the keyset pagination indexes"""
+
+    op.drop_index('ix_audits_organization_id_risk_level_created_at', table_name='audits')
+    op.drop_index('ix_audits_organization_id_status_created_at', table_name='audits')
+    op.drop_index('ix_data_connections_user_id_created_at_id', table_name='data_connections')
+    op.drop_index('ix_datasets_user_id_created_at_id', table_name='datasets')
+    op.drop_index('ix_datasets_organization_id_created_at_id', table_name='datasets')
@@ -0,0 +1,113 @@
+"""
+Add mitigation_runs table (one row per mitigation run)
+
+Revision ID: mitigation_runs_001
+Revises: fairness_enhancement_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'mitigation_runs_001'
+down_revision = 'fairness_enhancement_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create mitigation_runs and move legacy audits.mitigation_results into it"""
+
+    op.create_table(
+        'mitigation_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('audit_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('strategy_name', sa.String(), nullable=False),
+        sa.Column('strategy_params', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True, server_default='completed'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('metrics_before', sa.JSON(), nullable=True),
+        sa.Column('metrics_after', sa.JSON(), nullable=True),
+        sa.Column('performance_before', sa.JSON(), nullable=True),
+        sa.Column('performance_after', sa.JSON(), nullable=True),
+        sa.Column('improvement', sa.JSON(), nullable=True),
+        sa.Column('mitigation_info', sa.JSON(), nullable=True),
+        sa.Column('improvement_rate', sa.Float(), nullable=True),
+        sa.Column('recommendation', sa.Text(), nullable=True),
+        sa.Column('model_version', sa.Integer(), nullable=True),
+        sa.Column('model_artifact_path', sa.String(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('duration_ms', sa.Integer(), nullable=True),
+        sa.Column('training_duration_ms', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['audit_id'], ['audits.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mitigation_runs_id'), 'mitigation_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_mitigation_runs_audit_id'), 'mitigation_runs', ['audit_id'], unique=False)
+
+    # Reprise des résultats existants : {strategy_name: results} -> une ligne par stratégie
+    bind = op.get_bind()
+    audits = sa.table(
+        'audits',
+        sa.column('id', sa.Integer),
+        sa.column('user_id', sa.Integer),
+        sa.column('mitigation_results', sa.JSON)
+    )
+    mitigation_runs = sa.table(
+        'mitigation_runs',
+        sa.column('audit_id', sa.Integer),
+        sa.column('user_id', sa.Integer),
+        sa.column('strategy_name', sa.String),
+        sa.column('strategy_params', sa.JSON),
+        sa.column('status', sa.String),
+        sa.column('metrics_before', sa.JSON),
+        sa.column('metrics_after', sa.JSON),
+        sa.column('performance_before', sa.JSON),
+        sa.column('performance_after', sa.JSON),
+        sa.column('improvement', sa.JSON),
+        sa.column('mitigation_info', sa.JSON),
+        sa.column('improvement_rate', sa.Float),
+        sa.column('recommendation', sa.Text)
+    )
+
+    rows = bind.execute(
+        sa.select(audits.c.id, audits.c.user_id, audits.c.mitigation_results)
+        .where(audits.c.mitigation_results.isnot(None))
+    )
+
+    legacy_runs = []
+    for audit_id, user_id, results_by_strategy in rows:
+        for strategy_name, results in (results_by_strategy or {}).items():
+            improvement = results.get('improvement') or {}
+            legacy_runs.append({
+                'audit_id': audit_id,
+                'user_id': user_id,
+                'strategy_name': strategy_name,
+                'strategy_params': results.get('strategy_params'),
+                'status': 'completed',
+                'metrics_before': results.get('metrics_before'),
+                'metrics_after': results.get('metrics_after'),
+                'performance_before': results.get('performance_before'),
+                'performance_after': results.get('performance_after'),
+                'improvement': improvement,
+                'mitigation_info': results.get('mitigation_info'),
+                'improvement_rate': improvement.get('summary', {}).get('improvement_rate'),
+                'recommendation': results.get('recommendation')
+            })
+
+    if legacy_runs:
+        op.bulk_insert(mitigation_runs, legacy_runs)
+
+
+def downgrade():
+    """Drop mitigation_runs (legacy audits.mitigation_results is left untouched)"""
+
+    op.drop_index(op.f('ix_mitigation_runs_audit_id'), table_name='mitigation_runs')
+    op.drop_index(op.f('ix_mitigation_runs_id'), table_name='mitigation_runs')
+    op.drop_table('mitigation_runs')
@@ -0,0 +1,38 @@
+"""
+Add pseudonym_tokens (persistent pseudonymization token vault)
+
+Revision ID: pseudonym_tokens_001
+Revises: upload_sessions_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'pseudonym_tokens_001'
+down_revision = 'upload_sessions_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the pseudonym_tokens table"""
+
+    op.create_table(
+        'pseudonym_tokens',
+        sa.Column('namespace', sa.String(length=64), nullable=False),
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('token', sa.String(length=32), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('namespace', 'digest')
+    )
+    op.create_index('ix_pseudonym_tokens_namespace_token', 'pseudonym_tokens', ['namespace', 'token'], unique=True)
+
+
+def downgrade():
+    """Drop the pseudonym_tokens table"""
+
+    op.drop_index('ix_pseudonym_tokens_namespace_token', table_name='pseudonym_tokens')
+    op.drop_table('pseudonym_tokens')
@@ -74,12 +74,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Curseur de pagination des listes
 )
 
 # Include routers for profile management
 from routers import team, profile, auth, settings, upload, connections, mapping, audits, reports, ai_chat, eda, ml, google_auth
 from routers import fairness_enhanced_advanced  # Advanced fairness analysis
 from routers import whatif  # What-If Tool
+from routers import mitigation  # Mitigation & batch scoring
 app.include_router(auth.router)
 app.include_router(team.router)
 app.include_router(profile.router)
@@ -91,11 +93,12 @@ app.include_router(audits.router)
 app.include_router(ml.router)  # ML training and predictions
 app.include_router(fairness_enhanced_advanced.router)  # Advanced analysis
 app.include_router(whatif.router)  # What-If Tool
+app.include_router(mitigation.router)  # Mitigation & batch scoring
 app.include_router(reports.router)
 app.include_router(ai_chat.router)
 app.include_router(eda.router)  # Auto EDA module
 app.include_router(google_auth.router)
-print("[OK] Routers auth, team, profile, settings, upload, connections, mapping, audits, fairness_enhanced_advanced, whatif, reports, ai_chat, eda, google_auth inclus")
+print("[OK] Routers auth, team, profile, settings, upload, connections, mapping, audits, fairness_enhanced_advanced, whatif, mitigation, reports, ai_chat, eda, google_auth inclus")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -124,6 +127,14 @@ async def on_shutdown():
     from services.eda.scheduler import eda_scheduler
     eda_scheduler.stop()
     print("[OK] EDA Scheduler stopped")
+    
+    # Close pooled storage connections
+    from services.storage import storage
+    await storage.close()
+    
+    # Stop the shared imputation worker processes
+    from utils.imputation import shutdown_process_pool
+    shutdown_process_pool()
 
 # ============= ENDPOINTS =============
 
@@ -134,3 +145,13 @@ async def root():
         "version": "1.0.0",
         "status": "operational"
     }
+
+
+@app.get("/metrics/storage")
+async def storage_metrics():
+    """Storage backend counters (read-through cache hits, downloads, evictions)"""
+    from services.storage import storage
+    return {
+        "backend": storage.name,
+        "cache": storage.metrics()
+    }
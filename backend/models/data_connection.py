@@ -1,7 +1,7 @@
 """
 Modèle pour les connexions de données externes (F2.2)
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from db import Base
@@ -11,7 +11,11 @@ class DataConnection(Base):
     F2.2: Connexions aux sources de données
     """
     __tablename__ = "data_connections"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Pagination keyset (created_at, id) par utilisateur
+        Index('ix_data_connections_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
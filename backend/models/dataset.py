@@ -1,15 +1,20 @@
 """
 Modèles de données pour les datasets et audits
 """
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, JSON, Float, ForeignKey, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, JSON, Float, ForeignKey, Index, UniqueConstraint, func, event, inspect, update
+from sqlalchemy.orm import relationship, deferred
 from db import Base
 
 
 class Dataset(Base):
     """Représente un dataset uploadé pour audit"""
     __tablename__ = 'datasets'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Pagination keyset (created_at, id) par périmètre
+        Index('ix_datasets_organization_id_created_at_id', 'organization_id', 'created_at', 'id'),
+        Index('ix_datasets_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        {'extend_existing': True}
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -21,6 +26,12 @@ class Dataset(Base):
     original_filename = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)  # En bytes
     file_hash = Column(String, nullable=False)  # SHA256 pour déduplication
+    # Contenu partagé (stockage adressé par hash) ; NULL pour les datasets antérieurs
+    blob_id = Column(Integer, ForeignKey('dataset_blobs.id'), nullable=True, index=True)
+    # Colonnes écrites par-dessus le fichier de base : {colonne stockée: SHA-256 du blob Parquet}
+    column_overlays = Column(JSON, nullable=True)
+    # Version courante (DatasetVersion) ; NULL tant que le contenu n'a jamais été versionné
+    version_id = Column(Integer, ForeignKey('dataset_versions.id', use_alter=True, ondelete='SET NULL'), nullable=True)
     mime_type = Column(String, nullable=False)
     encoding = Column(String, default='utf-8')  # Encodage détecté
     
@@ -28,6 +39,8 @@ class Dataset(Base):
     row_count = Column(Integer, nullable=False)
     column_count = Column(Integer, nullable=False)
     columns_info = Column(JSON)  # {name: {type, null_count, unique_count, sample_values}}
+    # Premières lignes calculées à l'ingestion (page détail sans accès au stockage)
+    preview_data = deferred(Column(JSON, nullable=True), group='dataset_preview')
     
     # Status traitement
     status = Column(String, default='uploaded')  # uploaded, processing, ready, error
@@ -67,15 +80,164 @@ class Dataset(Base):
     organization = relationship("Organization", back_populates="datasets")
     data_connection = relationship("DataConnection", back_populates="datasets")
     audits = relationship("Audit", back_populates="dataset", cascade="all, delete-orphan")
+    versions = relationship(
+        "DatasetVersion",
+        back_populates="dataset",
+        foreign_keys="DatasetVersion.dataset_id",
+        cascade="all, delete-orphan"
+    )
+
+
+class DatasetBlob(Base):
+    """
+    Contenu d'un fichier de dataset, stocké une seule fois par hash SHA-256
+
+    Plusieurs datasets peuvent référencer le même blob (ré-uploads du même
+    fichier) : le profil et l'aperçu calculés à la première ingestion sont
+    réutilisés. Une colonne écrite seule (DatasetVersion.column_overlays) est
+    aussi un blob, au format Parquet. ref_count compte les datasets et les
+    versions qui le référencent et est maintenu par les événements ci-dessous ;
+    un blob sans référence est supprimé par DatasetService.release_unreferenced_blobs.
+    """
+    __tablename__ = 'dataset_blobs'
+    __table_args__ = {'extend_existing': True}
+    
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, unique=True, index=True)
+    storage_key = Column(String, nullable=False)  # Nom du fichier dans le stockage
+    file_size = Column(Integer, nullable=False)
+    mime_type = Column(String, nullable=False)
+    encoding = Column(String, default='utf-8')
+    
+    # Métadonnées calculées à l'ingestion, copiées dans chaque Dataset
+    row_count = Column(Integer, nullable=False)
+    column_count = Column(Integer, nullable=False)
+    columns_info = Column(JSON)
+    preview_data = Column(JSON, nullable=True)
+    
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class DatasetVersion(Base):
+    """
+    État immuable du contenu d'un dataset
+
+    Chaque modification (traitement des valeurs manquantes, anonymisation,
+    mapping, prédictions ML) crée une version au lieu d'écraser la
+    précédente : un fichier de base (blob) éventuellement complété de
+    colonnes écrites à part (column_overlays, un blob Parquet par colonne),
+    le mapping de colonnes et le profil au moment de la version. Les champs
+    ont les mêmes noms que ceux du Dataset, si bien que DatasetService lit
+    une version comme un dataset. Les audits épinglent la version analysée.
+    """
+    __tablename__ = 'dataset_versions'
+    __table_args__ = (
+        UniqueConstraint('dataset_id', 'version', name='uq_dataset_versions_dataset_id_version'),
+        {'extend_existing': True}
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    dataset_id = Column(Integer, ForeignKey('datasets.id', ondelete='CASCADE'), nullable=False, index=True)
+    version = Column(Integer, nullable=False)  # 1, 2, ... par dataset
+    parent_id = Column(Integer, ForeignKey('dataset_versions.id', ondelete='SET NULL'), nullable=True)
+    
+    # Transformation qui a produit la version : upload, missing_values, anonymization, mapping, ml_prediction...
+    operation = Column(String, nullable=False)
+    recipe = Column(JSON, nullable=True)  # Paramètres de la transformation
+    
+    # Contenu (mêmes champs que Dataset)
+    blob_id = Column(Integer, ForeignKey('dataset_blobs.id'), nullable=True, index=True)
+    filename = Column(String, nullable=False)
+    file_hash = Column(String, nullable=False)
+    file_size = Column(Integer, nullable=False)
+    mime_type = Column(String, nullable=False)
+    encoding = Column(String, default='utf-8')
+    column_overlays = Column(JSON, nullable=True)
+    column_mappings = Column(JSON, nullable=True)
+    
+    row_count = Column(Integer, nullable=False)
+    column_count = Column(Integer, nullable=False)
+    columns_info = Column(JSON)
+    
+    created_at = Column(DateTime, server_default=func.now())
+    
+    dataset = relationship("Dataset", back_populates="versions", foreign_keys=[dataset_id])
+
+
+def _adjust_blob_refcount(connection, blob_id, delta):
+    connection.execute(
+        update(DatasetBlob.__table__)
+        .where(DatasetBlob.__table__.c.id == blob_id)
+        .values(ref_count=DatasetBlob.__table__.c.ref_count + delta)
+    )
+
+
+def _adjust_version_refcounts(connection, version, delta):
+    # Une version référence son blob de base et le blob de chacune de ses colonnes
+    if version.blob_id:
+        _adjust_blob_refcount(connection, version.blob_id, delta)
+    if version.column_overlays:
+        connection.execute(
+            update(DatasetBlob.__table__)
+            .where(DatasetBlob.__table__.c.sha256.in_(set(version.column_overlays.values())))
+            .values(ref_count=DatasetBlob.__table__.c.ref_count + delta)
+        )
+
+
+@event.listens_for(Dataset, 'after_insert')
+def _dataset_blob_inserted(mapper, connection, target):
+    if target.blob_id:
+        _adjust_blob_refcount(connection, target.blob_id, 1)
+
+
+@event.listens_for(Dataset, 'after_update')
+def _dataset_blob_updated(mapper, connection, target):
+    history = inspect(target).attrs.blob_id.history
+    if not history.has_changes():
+        return
+    for blob_id in history.deleted:
+        if blob_id:
+            _adjust_blob_refcount(connection, blob_id, -1)
+    for blob_id in history.added:
+        if blob_id:
+            _adjust_blob_refcount(connection, blob_id, 1)
+
+
+@event.listens_for(Dataset, 'after_delete')
+def _dataset_blob_deleted(mapper, connection, target):
+    # Couvre aussi les suppressions en cascade (connexion, utilisateur)
+    if target.blob_id:
+        _adjust_blob_refcount(connection, target.blob_id, -1)
+
+
+@event.listens_for(DatasetVersion, 'after_insert')
+def _version_inserted(mapper, connection, target):
+    _adjust_version_refcounts(connection, target, 1)
+
+
+@event.listens_for(DatasetVersion, 'after_delete')
+def _version_deleted(mapper, connection, target):
+    _adjust_version_refcounts(connection, target, -1)
 
 
 class Audit(Base):
     """Représente un audit de fairness sur un dataset"""
     __tablename__ = 'audits'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Listes et statistiques du dashboard : filtre sur le périmètre + tri/fenêtre par date
+        Index('ix_audits_organization_id_created_at', 'organization_id', 'created_at'),
+        Index('ix_audits_user_id_created_at', 'user_id', 'created_at'),
+        # Filtres serveur de la liste paginée
+        Index('ix_audits_organization_id_status_created_at', 'organization_id', 'status', 'created_at'),
+        Index('ix_audits_organization_id_risk_level_created_at', 'organization_id', 'risk_level', 'created_at'),
+        {'extend_existing': True}
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     dataset_id = Column(Integer, ForeignKey('datasets.id'), nullable=False)
+    # Version du contenu analysée (NULL : audits antérieurs aux versions, version courante)
+    dataset_version_id = Column(Integer, ForeignKey('dataset_versions.id', ondelete='SET NULL'), nullable=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=True)
     
@@ -94,13 +256,15 @@ class Audit(Base):
     compliant = Column(Boolean, nullable=True)  # Conforme AI Act
     
     # Métriques calculées
-    metrics_results = Column(JSON, nullable=True)  # Résultats détaillés par métrique
+    # Les colonnes JSON volumineuses sont différées (groupe 'audit_results') :
+    # seules les vues détaillées les chargent via undefer_group('audit_results')
+    metrics_results = deferred(Column(JSON, nullable=True), group='audit_results')  # Résultats détaillés par métrique
     bias_detected = Column(Boolean, default=False)
     critical_bias_count = Column(Integer, default=0)
     
     # Recommandations
-    recommendations = Column(JSON, nullable=True)  # Liste des recommandations générées
-    mitigation_strategies = Column(JSON, nullable=True)  # Stratégies de mitigation proposées
+    recommendations = deferred(Column(JSON, nullable=True), group='audit_results')  # Liste des recommandations générées
+    mitigation_strategies = deferred(Column(JSON, nullable=True), group='audit_results')  # Stratégies de mitigation proposées
     
     # Rapports générés
     report_generated = Column(Boolean, default=False)
@@ -112,12 +276,12 @@ class Audit(Base):
     completed_at = Column(DateTime, nullable=True)
     
     # Enhanced fairness features (new)
-    detailed_metrics = Column(JSON, nullable=True)  # Complete metrics from ComprehensiveFairnessCalculator
-    ai_recommendations = Column(JSON, nullable=True)  # AI-generated recommendations from Gemini
-    mitigation_recommendations = Column(JSON, nullable=True)  # Mitigation strategy recommendations
-    mitigation_results = Column(JSON, nullable=True)  # Results from applied mitigation strategies
-    disaggregated_metrics = Column(JSON, nullable=True)  # MetricFrame results per group
-    group_metrics = Column(JSON, nullable=True)  # Detailed metrics for each group
+    detailed_metrics = deferred(Column(JSON, nullable=True), group='audit_results')  # Complete metrics from ComprehensiveFairnessCalculator
+    ai_recommendations = deferred(Column(JSON, nullable=True), group='audit_results')  # AI-generated recommendations from Gemini
+    mitigation_recommendations = deferred(Column(JSON, nullable=True), group='audit_results')  # Mitigation strategy recommendations
+    mitigation_results = deferred(Column(JSON, nullable=True), group='audit_results')  # Legacy: remplacé par la table mitigation_runs
+    disaggregated_metrics = deferred(Column(JSON, nullable=True), group='audit_results')  # MetricFrame results per group
+    group_metrics = deferred(Column(JSON, nullable=True), group='audit_results')  # Detailed metrics for each group
     
     # Additional configuration
     prediction_column = Column(String, nullable=True)  # Column with model predictions
@@ -128,3 +292,52 @@ class Audit(Base):
     dataset = relationship("Dataset", back_populates="audits")
     user = relationship("User", back_populates="audits")
     organization = relationship("Organization", back_populates="audits")
+    mitigation_runs = relationship(
+        "MitigationRun",
+        back_populates="audit",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+
+class MitigationRun(Base):
+    """Une exécution d'une stratégie de mitigation sur un audit (une ligne par run)"""
+    __tablename__ = 'mitigation_runs'
+    __table_args__ = {'extend_existing': True}
+    
+    id = Column(Integer, primary_key=True, index=True)
+    audit_id = Column(Integer, ForeignKey('audits.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    
+    # Configuration
+    strategy_name = Column(String, nullable=False)  # threshold_optimizer, exponentiated_gradient, ...
+    strategy_params = Column(JSON, nullable=True)
+    status = Column(String, default='completed')  # completed, failed
+    error_message = Column(Text, nullable=True)
+    
+    # Résultats (chargés uniquement pour le détail d'un run)
+    metrics_before = deferred(Column(JSON, nullable=True), group='run_results')
+    metrics_after = deferred(Column(JSON, nullable=True), group='run_results')
+    performance_before = deferred(Column(JSON, nullable=True), group='run_results')
+    performance_after = deferred(Column(JSON, nullable=True), group='run_results')
+    improvement = deferred(Column(JSON, nullable=True), group='run_results')
+    mitigation_info = deferred(Column(JSON, nullable=True), group='run_results')
+    
+    # Résumé (affiché dans la liste des runs)
+    improvement_rate = Column(Float, nullable=True)  # % de métriques améliorées
+    recommendation = Column(Text, nullable=True)
+    
+    # Modèle mitigé persisté (voir services/fairness/model_store.py)
+    model_version = Column(Integer, nullable=True)
+    model_artifact_path = Column(String, nullable=True)
+    
+    # Timings
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, nullable=True)  # Durée totale du run
+    training_duration_ms = Column(Integer, nullable=True)  # Durée d'entraînement du modèle mitigé
+    
+    created_at = Column(DateTime, server_default=func.now())
+    
+    # Relations
+    audit = relationship("Audit", back_populates="mitigation_runs")
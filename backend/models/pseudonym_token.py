@@ -0,0 +1,27 @@
+"""
+Modèle du coffre de jetons de pseudonymisation
+"""
+from sqlalchemy import Column, String, DateTime, Index, func
+from db import Base
+
+
+class PseudonymToken(Base):
+    """
+    Jeton attribué à une valeur pseudonymisée, par espace de noms (organisation)
+
+    La valeur en clair n'est jamais stockée : elle est identifiée par son
+    HMAC-SHA256 (voir utils/anonymization.PseudonymHasher). Le jeton est
+    aléatoire, il ne peut donc pas être recalculé à partir de la valeur sans
+    accès au coffre. Voir services/pseudonymization.py.
+    """
+    __tablename__ = 'pseudonym_tokens'
+    __table_args__ = (
+        # Un jeton ne désigne qu'une valeur dans l'espace de noms
+        Index('ix_pseudonym_tokens_namespace_token', 'namespace', 'token', unique=True),
+        {'extend_existing': True}
+    )
+
+    namespace = Column(String(64), primary_key=True)
+    digest = Column(String(64), primary_key=True)  # HMAC-SHA256 (hex) de la valeur
+    token = Column(String(32), nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,37 @@
+"""
+Modèle pour les uploads reprenables (envoi du fichier en plusieurs parties)
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, func
+from db import Base
+
+
+class UploadSession(Base):
+    """
+    Upload en plusieurs parties : init -> parties (vérifiées par SHA-256) -> complete
+
+    Les parties reçues sont stockées sur disque (voir services/resumable_upload.py) ;
+    la table ne garde que la description de l'upload et son état.
+    """
+    __tablename__ = 'upload_sessions'
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(String(32), primary_key=True)  # Jeton opaque (uuid4 hex)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    
+    # Fichier annoncé à l'initialisation
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    part_size = Column(Integer, nullable=False)
+    total_parts = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=True)  # Hash du fichier complet (optionnel)
+    
+    # Status: pending, assembling, completed, failed, aborted
+    status = Column(String, default='pending', nullable=False)
+    error_message = Column(String, nullable=True)
+    dataset_id = Column(Integer, ForeignKey('datasets.id', ondelete='SET NULL'), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
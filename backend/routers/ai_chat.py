@@ -66,8 +66,11 @@ class ChatResponse(BaseModel):
 async def get_audit_context(audit_id: int, user_id: int, db: AsyncSession) -> str:
     """Retrieve specific audit result for granular context"""
     from sqlalchemy import select
+    from sqlalchemy.orm import undefer
     result = await db.execute(
-        select(Audit).filter(Audit.id == audit_id, Audit.user_id == user_id)
+        select(Audit)
+        .options(undefer(Audit.recommendations))
+        .filter(Audit.id == audit_id, Audit.user_id == user_id)
     )
     audit = result.scalar_one_or_none()
     if not audit:
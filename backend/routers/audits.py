@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from sqlalchemy.orm import undefer_group
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import pandas as pd
@@ -12,9 +13,11 @@ from models.user import User
 from models.dataset import Dataset, Audit
 from auth_middleware import get_current_user
 from services.eda.eda_service import EDAService
+from services.dataset_service import dataset_service
+from services.cache import dashboard_stats_cache, dashboard_stats_key, invalidate_dashboard_stats
+from utils.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, apply_keyset, clamp_page_size, split_page
 
 router = APIRouter(prefix="/api/audits", tags=["audits"])
-UPLOAD_DIR = Path("uploads")
 
 # Pydantic Models
 class AuditCreateRequest(BaseModel):
@@ -36,7 +39,7 @@ async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
-async def run_audit_task(audit_id: int, dataset_path: Path, config: Dict[str, Any]):
+async def run_audit_task(audit_id: int, config: Dict[str, Any]):
     """
     Tâche d'arrière-plan pour exécuter l'audit
     """
@@ -53,12 +56,6 @@ async def run_audit_task(audit_id: int, dataset_path: Path, config: Dict[str, An
             audit.status = "running"
             await db.commit()
             
-            # Charger les données
-            if str(dataset_path).endswith('.csv'):
-                df = pd.read_csv(dataset_path)
-            else:
-                df = pd.read_excel(dataset_path)
-                
             # Récupérer le dataset pour vérifier si prédictions disponibles
             stmt_dataset = select(Dataset).join(Audit).where(Audit.id == audit_id)
             result_dataset = await db.execute(stmt_dataset)
@@ -75,6 +72,14 @@ async def run_audit_task(audit_id: int, dataset_path: Path, config: Dict[str, An
             target_col = config["target_column"]
             sensitive_attrs = config["sensitive_attributes"]
             
+            # Charger uniquement ces colonnes (lecture partielle du stockage)
+            needed_columns = [target_col, dataset.prediction_column, *sensitive_attrs]
+            if dataset.probability_column:
+                needed_columns.append(dataset.probability_column)
+            # Version du contenu épinglée à la création de l'audit
+            source = await dataset_service.get_audit_source(db, audit, dataset)
+            df = await dataset_service.get_dataset_df(source, columns=needed_columns)
+            
             y_true = df[target_col]
             y_pred = df[dataset.prediction_column]
             
@@ -119,12 +124,14 @@ async def run_audit_task(audit_id: int, dataset_path: Path, config: Dict[str, An
             dataset.status = "ready"
             
             await db.commit()
+            invalidate_dashboard_stats(audit.user_id, audit.organization_id)
             
         except Exception as e:
             print(f"Error running audit {audit_id}: {e}")
             if audit:
                 audit.status = "failed"
                 await db.commit()
+                invalidate_dashboard_stats(audit.user_id, audit.organization_id)
 
 @router.post("/create", response_model=AuditResponse)
 async def create_audit(
@@ -151,9 +158,10 @@ async def create_audit(
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found or access denied")
         
-    # Créer l'audit en base
+    # Créer l'audit en base, épinglé sur la version courante du contenu
     new_audit = Audit(
         dataset_id=dataset.id,
+        dataset_version_id=await dataset_service.ensure_version(db, dataset),
         user_id=current_user.id,
         organization_id=current_user.organization_id,
         audit_name=request.name,
@@ -167,16 +175,16 @@ async def create_audit(
     db.add(new_audit)
     await db.commit()
     await db.refresh(new_audit)
+    invalidate_dashboard_stats(current_user.id, current_user.organization_id)
     
     # Lancer le calcul en arrière-plan
-    file_path = UPLOAD_DIR / dataset.filename
     config = {
         "target_column": request.target_column,
         "sensitive_attributes": request.sensitive_attributes,
         "fairness_metrics": request.metrics
     }
     
-    background_tasks.add_task(run_audit_task, new_audit.id, file_path, config)
+    background_tasks.add_task(run_audit_task, new_audit.id, config)
     
     return AuditResponse(
         id=new_audit.id,
@@ -192,23 +200,42 @@ async def get_dashboard_stats(
 ):
     """
     Get dashboard statistics for the current user
+
+    Computed in a single aggregate query and cached briefly per
+    organization (invalidated when an audit is created or completes).
     """
     from datetime import datetime, timedelta
     
+    cache_key = dashboard_stats_key(current_user.id, current_user.organization_id)
+    cached = dashboard_stats_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        # Get all audits for the user or their organization
+        now = datetime.utcnow()
+        first_day_of_month = datetime(now.year, now.month, 1)
+        seven_days_ago = now - timedelta(days=7)
+        
+        # Seuils alignés : critique < 60, conforme >= 80
+        stmt = select(
+            func.count(Audit.id).label("total_audits"),
+            func.avg(Audit.overall_score).label("avg_score"),
+            func.count(Audit.id).filter(Audit.overall_score < 60).label("critical_biases"),
+            func.count(Audit.id).filter(Audit.overall_score >= 80).label("compliant_audits"),
+            func.count(Audit.id).filter(Audit.created_at >= first_day_of_month).label("audits_this_month"),
+            func.count(Audit.id).filter(Audit.created_at >= seven_days_ago).label("recent_audits")
+        )
+        # Scope on the user or their organization (covered by the (scope, created_at) indexes)
         if current_user.organization_id:
-            stmt = select(Audit).where(Audit.organization_id == current_user.organization_id)
+            stmt = stmt.where(Audit.organization_id == current_user.organization_id)
         else:
-            stmt = select(Audit).where(Audit.user_id == current_user.id)
+            stmt = stmt.where(Audit.user_id == current_user.id)
             
-        result = await db.execute(stmt)
-        audits = result.scalars().all()
-        
-        total_audits = len(audits)
+        row = (await db.execute(stmt)).one()
+        total_audits = row.total_audits or 0
         
         if total_audits == 0:
-            return {
+            stats = {
                 "total_audits": 0,
                 "avg_fairness_score": 0,
                 "critical_biases": 0,
@@ -216,41 +243,18 @@ async def get_dashboard_stats(
                 "recent_audits_count": 0,
                 "audits_this_month": 0
             }
+        else:
+            stats = {
+                "total_audits": total_audits,
+                "avg_fairness_score": round(float(row.avg_score or 0), 1),
+                "critical_biases": row.critical_biases,
+                "compliance_rate": round(row.compliant_audits / total_audits * 100, 1),
+                "recent_audits_count": row.recent_audits,
+                "audits_this_month": row.audits_this_month
+            }
         
-        # Calculate average fairness score
-        scores = [audit.overall_score for audit in audits if audit.overall_score is not None]
-        avg_score = sum(scores) / len(scores) if scores else 0
-        
-        # Count critical biases (score < 60) - Aligné sur les nouveaux seuils
-        critical_biases = sum(1 for audit in audits if audit.overall_score is not None and audit.overall_score < 60)
-        
-        # Calculate compliance rate (score >= 80)
-        compliant_audits = sum(1 for audit in audits if audit.overall_score is not None and audit.overall_score >= 80)
-        compliance_rate = (compliant_audits / total_audits * 100) if total_audits > 0 else 0
-        
-        # Count audits this month
-        now = datetime.utcnow()
-        first_day_of_month = datetime(now.year, now.month, 1)
-        audits_this_month = sum(
-            1 for audit in audits 
-            if audit.created_at and audit.created_at >= first_day_of_month
-        )
-        
-        # Recent audits (last 7 days)
-        seven_days_ago = now - timedelta(days=7)
-        recent_audits = sum(
-            1 for audit in audits 
-            if audit.created_at and audit.created_at >= seven_days_ago
-        )
-        
-        return {
-            "total_audits": total_audits,
-            "avg_fairness_score": round(avg_score, 1),
-            "critical_biases": critical_biases,
-            "compliance_rate": round(compliance_rate, 1),
-            "recent_audits_count": recent_audits,
-            "audits_this_month": audits_this_month
-        }
+        dashboard_stats_cache.set(cache_key, stats)
+        return stats
         
     except Exception as e:
         print(f"Error calculating dashboard stats: {e}")
@@ -263,12 +267,13 @@ async def get_audit(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    # Seule la vue détaillée charge les colonnes JSON différées
     if current_user.organization_id:
         stmt = select(Audit).where(Audit.id == audit_id, Audit.organization_id == current_user.organization_id)
     else:
         stmt = select(Audit).where(Audit.id == audit_id, Audit.user_id == current_user.id)
         
-    result = await db.execute(stmt)
+    result = await db.execute(stmt.options(undefer_group('audit_results')))
     audit = result.scalar_one_or_none()
     
     if not audit:
@@ -290,21 +295,59 @@ async def get_audit(
         "target_column": audit.target_column,
         "sensitive_attributes": audit.sensitive_attributes,
         "prediction_column": audit.prediction_column,
+        "dataset_version_id": audit.dataset_version_id,
         "created_at": audit.created_at
     }
 
 @router.get("/")
 async def list_audits(
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    use_case: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    """
+    Liste paginée des audits (les plus récents d'abord)
+
+    Le curseur de la page suivante est renvoyé dans l'en-tête X-Next-Cursor.
+    """
+    limit = clamp_page_size(limit)
+    
+    stmt = select(
+        Audit.id,
+        Audit.audit_name,
+        Audit.status,
+        Audit.overall_score,
+        Audit.use_case,
+        Audit.risk_level,
+        Audit.critical_bias_count,
+        Audit.created_at
+    )
     if current_user.organization_id:
-        stmt = select(Audit).where(Audit.organization_id == current_user.organization_id).order_by(Audit.created_at.desc())
+        stmt = stmt.where(Audit.organization_id == current_user.organization_id)
     else:
-        stmt = select(Audit).where(Audit.user_id == current_user.id).order_by(Audit.created_at.desc())
+        stmt = stmt.where(Audit.user_id == current_user.id)
+    
+    if status:
+        stmt = stmt.where(Audit.status == status)
+    if risk_level:
+        stmt = stmt.where(Audit.risk_level == risk_level)
+    if use_case:
+        stmt = stmt.where(Audit.use_case == use_case)
+    
+    try:
+        stmt = apply_keyset(stmt, Audit.created_at, Audit.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
         
     result = await db.execute(stmt)
-    audits = result.scalars().all()
+    audits, next_cursor = split_page(result.all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return [
         {
@@ -349,24 +392,23 @@ async def get_audit_eda(
     
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    # Contenu épinglé à la création de l'audit
+    dataset = await dataset_service.get_audit_source(db, audit, dataset)
         
     # 2. Charger les données (CSV ou Excel)
-    dataset_path = UPLOAD_DIR / dataset.filename
-    if not dataset_path.exists():
+    try:
+        df = await dataset_service.get_dataset_df(dataset)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Dataset file not found")
         
     try:
-        if str(dataset_path).endswith('.csv'):
-            df = pd.read_csv(dataset_path)
-        else:
-            df = pd.read_excel(dataset_path)
-            
         # 3. Générer le rapport EDA
         eda_service = EDAService()
         eda_report = eda_service.generate_eda_report(
             df, 
             target_column=audit.target_column,
-            sensitive_attributes=audit.sensitive_attributes
+            sensitive_attributes=audit.sensitive_attributes,
+            profile_columns=dataset_service.get_profile_columns(dataset)
         )
         
         return eda_report
@@ -2,7 +2,7 @@
 Routeur pour la gestion des connexions de données externes
 F2.2.1 à F2.2.4
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from pydantic import BaseModel
@@ -31,6 +31,7 @@ import json
 import os
 import io
 from services.dataset_service import dataset_service
+from utils.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, apply_keyset, clamp_page_size, split_page
 
 router = APIRouter(prefix="/api/connections", tags=["connections"])
 
@@ -298,18 +299,43 @@ async def create_connection(
 
 @router.get("/", response_model=List[ConnectionResponse])
 async def list_connections(
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    is_active: Optional[bool] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Liste toutes les connexions de l'utilisateur
+    Liste paginée des connexions de l'utilisateur
+
+    status filtre sur le statut de la dernière synchronisation ;
+    le curseur de la page suivante est renvoyé dans l'en-tête X-Next-Cursor.
     """
+    limit = clamp_page_size(limit)
+    
     stmt = select(DataConnection).where(
         DataConnection.user_id == current_user.id
-    ).order_by(DataConnection.created_at.desc())
+    )
+    
+    if status_filter:
+        stmt = stmt.where(DataConnection.last_sync_status == status_filter)
+    if is_active is not None:
+        stmt = stmt.where(DataConnection.is_active == is_active)
+    
+    try:
+        stmt = apply_keyset(stmt, DataConnection.created_at, DataConnection.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
     
     result = await db.execute(stmt)
-    connections = result.scalars().all()
+    connections, next_cursor = split_page(result.scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return [
         ConnectionResponse(
@@ -444,6 +470,8 @@ async def delete_connection(
     
     await db.delete(connection)
     await db.commit()
+    # Datasets supprimés en cascade : libérer les fichiers qui ne sont plus partagés
+    await dataset_service.release_unreferenced_blobs(db)
     
     return {"message": "Connexion supprimée"}
 
@@ -11,6 +11,7 @@ Provides endpoints for:
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import undefer
 from typing import List, Optional
 import pandas as pd
 import numpy as np
@@ -20,6 +21,8 @@ from models.user import User
 from models.dataset import Dataset, Audit
 from auth_middleware import get_current_user
 from services.fairness import EnhancedFairnessService
+from services.dataset_service import dataset_service
+from services.cache import analysis_flights
 from services.fairness.analysis import AdvancedFairnessAnalyzer
 
 router = APIRouter(prefix="/api/audits/enhanced", tags=["fairness-advanced"])
@@ -68,10 +71,15 @@ async def get_intersectional_analysis(
     
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    # Content pinned when the audit was created
+    dataset = await dataset_service.get_audit_source(db, audit, dataset)
     
-    # Load data
+    # Load data (shared with concurrent identical requests)
     service = EnhancedFairnessService()
-    df, y_true, y_pred, y_prob, sensitive_attrs = service._load_and_prepare_data(dataset, audit)
+    try:
+        df, y_true, y_pred, y_prob, sensitive_attrs = await service.load_audit_data(dataset, audit)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
     
     if df is None:
         raise HTTPException(status_code=400, detail="Failed to load dataset")
@@ -79,8 +87,12 @@ async def get_intersectional_analysis(
     # Perform intersectional analysis
     analyzer = AdvancedFairnessAnalyzer(audit.sensitive_attributes)
     
+    key = service.analysis_key(dataset, audit, "intersectional", max_combination_size=max_combination_size)
+    
     try:
-        intersectional_result = analyzer.analyze_intersectionality(
+        intersectional_result = await analysis_flights.do(
+            key,
+            analyzer.analyze_intersectionality,
             y_true=y_true,
             y_pred=y_pred,
             sensitive_attrs=sensitive_attrs,
@@ -131,10 +143,15 @@ async def discover_vulnerable_subgroups(
     
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    # Content pinned when the audit was created
+    dataset = await dataset_service.get_audit_source(db, audit, dataset)
     
-    # Load data
+    # Load data (shared with concurrent identical requests)
     service = EnhancedFairnessService()
-    df, y_true, y_pred, y_prob, sensitive_attrs = service._load_and_prepare_data(dataset, audit)
+    try:
+        df, y_true, y_pred, y_prob, sensitive_attrs = await service.load_audit_data(dataset, audit)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
     
     if df is None:
         raise HTTPException(status_code=400, detail="Failed to load dataset")
@@ -142,8 +159,12 @@ async def discover_vulnerable_subgroups(
     # Discover vulnerable subgroups
     analyzer = AdvancedFairnessAnalyzer(audit.sensitive_attributes)
     
+    key = service.analysis_key(dataset, audit, "subgroups", min_group_size=min_group_size)
+    
     try:
-        subgroup_discovery = analyzer.discover_vulnerable_subgroups(
+        subgroup_discovery = await analysis_flights.do(
+            key,
+            analyzer.discover_vulnerable_subgroups,
             y_true=y_true,
             y_pred=y_pred,
             sensitive_attrs=sensitive_attrs,
@@ -255,7 +276,11 @@ async def compare_models(
     models_results = []
     
     for aid in all_audit_ids:
-        stmt = select(Audit).where(Audit.id == aid, Audit.user_id == current_user.id)
+        stmt = (
+            select(Audit)
+            .options(undefer(Audit.detailed_metrics))
+            .where(Audit.id == aid, Audit.user_id == current_user.id)
+        )
         result = await db.execute(stmt)
         audit = result.scalar_one_or_none()
         
@@ -13,11 +13,9 @@ from models.user import User
 from models.mapping_template import MappingTemplate
 from models.dataset import Dataset
 from auth_middleware import get_current_user
-import pandas as pd
-from pathlib import Path
+from services.dataset_service import dataset_service
 
 router = APIRouter(prefix="/api/mapping", tags=["mapping"])
-UPLOAD_DIR = Path("uploads")
 
 
 async def get_db():
@@ -305,60 +303,39 @@ async def apply_mapping_to_dataset(
             detail="Aucun mapping fourni"
         )
     
-    # Charger le fichier
-    file_path = UPLOAD_DIR / dataset.filename
-    if not file_path.exists():
+    # Le mapping est une vue appliquée à la lecture (DatasetService) : le
+    # fichier, le profil, l'aperçu et la copie Parquet ne sont pas réécrits.
+    # Les clés du mapping demandé sont les noms actuels des colonnes.
+    stored_columns = dataset_service.get_stored_column_names(dataset)
+    current = dataset_service.get_column_mapping(dataset)
+    current_names = [current.get(col, col) for col in stored_columns]
+    rename_dict = {
+        k: v for k, v in mappings.items() if k in current_names and v and v != k
+    }
+    
+    # Composition avec le mapping existant : {colonne stockée: nouveau nom}
+    new_names = [rename_dict.get(name, name) for name in current_names]
+    if len(set(new_names)) != len(new_names):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Fichier dataset introuvable"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le mapping produit des noms de colonnes en double"
         )
     
-    try:
-        # Lire le fichier
-        if dataset.mime_type == 'text/csv':
-            df = pd.read_csv(file_path, encoding=dataset.encoding)
-        else:
-            df = pd.read_excel(file_path)
-        
-        # Appliquer les mappings
-        rename_dict = {
-            k: v for k, v in mappings.items() if k in df.columns
-        }
-        df_mapped = df.rename(columns=rename_dict)
-        
-        # Sauvegarder le fichier mappé
-        if dataset.mime_type == 'text/csv':
-            df_mapped.to_csv(file_path, index=False, encoding=dataset.encoding)
-        else:
-            df_mapped.to_excel(file_path, index=False)
-        
-        # Mettre à jour les métadonnées
-        dataset.column_mappings = mappings
-        dataset.columns_info['columns'] = [
-            {
-                'name': rename_dict.get(col['name'], col['name']),
-                'type': col['type'],
-                'null_count': col['null_count'],
-                'null_percentage': col['null_percentage'],
-                'unique_count': col['unique_count']
-            }
-            for col in dataset.columns_info.get('columns', [])
-        ]
-        dataset.updated_at = datetime.utcnow()
-        
-        await db.commit()
-        await db.refresh(dataset)
-        
-        return {
-            "message": "Mapping appliqué avec succès",
-            "dataset_id": dataset_id,
-            "mappings_applied": rename_dict,
-            "columns_renamed": len(rename_dict),
-            "new_columns": list(df_mapped.columns)
-        }
+    # Nouvelle version sans écriture de données : seul le mapping change
+    await dataset_service.ensure_version(db, dataset)
+    dataset.column_mappings = {
+        stored: name for stored, name in zip(stored_columns, new_names) if name != stored
+    } or None
+    dataset.updated_at = datetime.utcnow()
+    await dataset_service.record_version(db, dataset, 'mapping', recipe={'renamed': rename_dict})
     
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur lors de l'application du mapping : {str(e)}"
-        )
+    await db.commit()
+    await db.refresh(dataset)
+    
+    return {
+        "message": "Mapping appliqué avec succès",
+        "dataset_id": dataset_id,
+        "mappings_applied": rename_dict,
+        "columns_renamed": len(rename_dict),
+        "new_columns": new_names
+    }
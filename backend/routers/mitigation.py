@@ -0,0 +1,318 @@
+"""
+Bias Mitigation API Endpoints
+
+Provides endpoints for:
+- Applying a mitigation strategy to an audit
+- Browsing mitigation runs (paginated)
+- Listing persisted mitigated model versions
+- Batch scoring new data with a mitigated model
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.orm import undefer_group
+from pydantic import BaseModel
+from typing import Optional
+from pathlib import Path
+import asyncio
+import os
+import tempfile
+
+from db import AsyncSessionLocal
+from models.user import User
+from models.dataset import Dataset, Audit, MitigationRun
+from auth_middleware import get_current_user
+from services.fairness import EnhancedFairnessService
+from services.fairness.model_store import model_store, score_file_in_chunks
+from services.dataset_service import dataset_service
+from utils.dataset_processing import detect_file_encoding
+
+router = APIRouter(prefix="/api/audits/enhanced", tags=["mitigation"])
+
+PREDICTION_COLUMN = "mitigated_prediction"
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+MAX_RUNS_PAGE_SIZE = 100
+
+
+# ==================== Pydantic Models ====================
+
+class MitigationApplyRequest(BaseModel):
+    """Request for applying a mitigation strategy"""
+    strategy_name: str  # 'threshold_optimizer', 'exponentiated_gradient', 'correlation_remover'
+    constraint: str = "demographic_parity"
+    alpha: float = 1.0  # CorrelationRemover only
+
+
+# ==================== Helper Functions ====================
+
+async def get_db():
+    """Database session dependency"""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def _get_user_audit(audit_id: int, current_user: User, db: AsyncSession) -> Audit:
+    stmt = select(Audit).where(Audit.id == audit_id, Audit.user_id == current_user.id)
+    result = await db.execute(stmt)
+    audit = result.scalar_one_or_none()
+
+    if not audit:
+        raise HTTPException(status_code=404, detail="Audit not found")
+
+    return audit
+
+
+def _run_summary(run: MitigationRun) -> dict:
+    return {
+        "id": run.id,
+        "audit_id": run.audit_id,
+        "strategy_name": run.strategy_name,
+        "strategy_params": run.strategy_params,
+        "status": run.status,
+        "error_message": run.error_message,
+        "improvement_rate": run.improvement_rate,
+        "recommendation": run.recommendation,
+        "model_version": run.model_version,
+        "started_at": run.started_at,
+        "completed_at": run.completed_at,
+        "duration_ms": run.duration_ms,
+        "training_duration_ms": run.training_duration_ms,
+        "created_at": run.created_at
+    }
+
+
+# ==================== Endpoints ====================
+
+@router.post("/{audit_id}/mitigation/apply")
+async def apply_mitigation(
+    audit_id: int,
+    request: MitigationApplyRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply a mitigation strategy and persist the resulting model
+
+    Returns:
+        Before/after comparison and the stored model version
+    """
+    audit = await _get_user_audit(audit_id, current_user, db)
+
+    stmt = select(Dataset).where(Dataset.id == audit.dataset_id)
+    result = await db.execute(stmt)
+    dataset = result.scalar_one_or_none()
+
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    # Contenu épinglé à la création de l'audit
+    dataset = await dataset_service.get_audit_source(db, audit, dataset)
+
+    service = EnhancedFairnessService()
+
+    try:
+        return await service.apply_mitigation_strategy(
+            audit=audit,
+            dataset=dataset,
+            strategy_name=request.strategy_name,
+            strategy_params={"constraint": request.constraint, "alpha": request.alpha},
+            db=db
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Mitigation failed: {str(e)}")
+
+
+@router.get("/{audit_id}/mitigation/runs")
+async def list_mitigation_runs(
+    audit_id: int,
+    limit: int = 20,
+    offset: int = 0,
+    strategy_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List the mitigation runs of an audit (most recent first)
+
+    Args:
+        limit: Page size (max 100)
+        offset: Number of runs to skip
+        strategy_name: Optional filter on the strategy
+
+    Returns:
+        Page of run summaries (metrics are available on the run detail)
+    """
+    await _get_user_audit(audit_id, current_user, db)
+
+    limit = max(1, min(limit, MAX_RUNS_PAGE_SIZE))
+    offset = max(0, offset)
+
+    filters = [MitigationRun.audit_id == audit_id]
+    if strategy_name:
+        filters.append(MitigationRun.strategy_name == strategy_name)
+
+    total = await db.scalar(select(func.count(MitigationRun.id)).where(*filters))
+
+    stmt = (
+        select(MitigationRun)
+        .where(*filters)
+        .order_by(MitigationRun.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    result = await db.execute(stmt)
+    runs = result.scalars().all()
+
+    return {
+        "audit_id": audit_id,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "runs": [_run_summary(run) for run in runs]
+    }
+
+
+@router.get("/{audit_id}/mitigation/runs/{run_id}")
+async def get_mitigation_run(
+    audit_id: int,
+    run_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a mitigation run with its before/after metrics
+    """
+    await _get_user_audit(audit_id, current_user, db)
+
+    stmt = (
+        select(MitigationRun)
+        .options(undefer_group('run_results'))
+        .where(MitigationRun.id == run_id, MitigationRun.audit_id == audit_id)
+    )
+    result = await db.execute(stmt)
+    run = result.scalar_one_or_none()
+
+    if not run:
+        raise HTTPException(status_code=404, detail="Mitigation run not found")
+
+    return {
+        **_run_summary(run),
+        "metrics_before": run.metrics_before,
+        "metrics_after": run.metrics_after,
+        "performance_before": run.performance_before,
+        "performance_after": run.performance_after,
+        "improvement": run.improvement,
+        "mitigation_info": run.mitigation_info
+    }
+
+
+@router.get("/{audit_id}/mitigation/models")
+async def list_mitigated_models(
+    audit_id: int,
+    strategy_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List the persisted mitigated model versions of an audit
+    """
+    await _get_user_audit(audit_id, current_user, db)
+
+    versions = await model_store.list_versions(audit_id, strategy_name)
+
+    return {
+        "audit_id": audit_id,
+        "models": [artifact.to_dict() for artifact in versions]
+    }
+
+
+@router.post("/{audit_id}/mitigation/models/{version}/score")
+async def batch_score(
+    audit_id: int,
+    version: int,
+    file: UploadFile = File(...),
+    chunk_size: int = 50_000,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Score a new CSV/Parquet file with a mitigated model
+
+    The file is streamed through the model in chunks and the scored rows
+    are saved as a new dataset (predictions in 'mitigated_prediction').
+
+    Args:
+        version: Model version (see /mitigation/models)
+        chunk_size: Number of rows scored per chunk
+
+    Returns:
+        The created dataset
+    """
+    await _get_user_audit(audit_id, current_user, db)
+
+    artifact = await model_store.get(audit_id, version)
+    if not artifact:
+        raise HTTPException(status_code=404, detail=f"Model version {version} not found")
+
+    suffix = Path(file.filename or "").suffix.lower()
+    if suffix not in (".csv", ".parquet"):
+        raise HTTPException(status_code=400, detail="Only CSV and Parquet files can be scored")
+
+    if chunk_size <= 0:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive")
+
+    try:
+        model = await model_store.load(artifact)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Model version {version} not found in storage")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Copier l'upload sur disque par blocs (pas de lecture complète en mémoire),
+        # écritures dans le pool de threads
+        input_path = os.path.join(tmp_dir, f"input{suffix}")
+        with open(input_path, "wb") as out:
+            while chunk := await file.read(READ_CHUNK_SIZE):
+                await asyncio.to_thread(out.write, chunk)
+
+        encoding = "utf-8"
+        if suffix == ".csv":
+            encoding = await asyncio.to_thread(detect_file_encoding, input_path)
+
+        output_path = os.path.join(tmp_dir, "scored.csv")
+
+        try:
+            rows_scored = await asyncio.to_thread(
+                score_file_in_chunks,
+                model, artifact, input_path, output_path,
+                chunk_size, encoding, PREDICTION_COLUMN
+            )
+        except (ValueError, KeyError) as e:
+            raise HTTPException(status_code=400, detail=f"Scoring failed: {str(e)}")
+
+        dataset = await dataset_service.create_dataset_from_file(
+            db=db,
+            file_path=output_path,
+            user_id=current_user.id,
+            organization_id=current_user.organization_id,
+            original_filename=f"{Path(file.filename).stem}_scored.csv",
+            mime_type="text/csv",
+            has_predictions=True,
+            prediction_column=PREDICTION_COLUMN,
+            model_type="mitigated",
+            model_algorithm=artifact.strategy_name,
+            model_metrics={
+                "source": "mitigated_model",
+                "audit_id": audit_id,
+                "model_version": artifact.version
+            }
+        )
+
+    return {
+        "message": "Batch scoring completed",
+        "dataset_id": dataset.id,
+        "rows_scored": rows_scored,
+        "prediction_column": PREDICTION_COLUMN,
+        "model": artifact.to_dict()
+    }
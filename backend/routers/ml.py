@@ -12,6 +12,7 @@ from models.dataset import Dataset
 from auth_middleware import get_current_user
 from services.ml_training import train_model_on_dataset
 from services.dataset_service import dataset_service
+from utils.dataset_processing import detect_encoding
 
 router = APIRouter(prefix="/api/ml", tags=["ml"])
 
@@ -54,8 +55,16 @@ async def train_model_background_task(dataset_id: int, config: dict):
                 use_case=config.get('use_case')
             )
             
-            # Sauvegarder les données mises à jour via le service
-            await dataset_service.save_dataset_df(dataset, df_with_predictions)
+            # Nouvelle version : seules les colonnes de prédiction sont écrites
+            prediction_columns = [
+                col for col in ('ml_prediction', 'ml_probability') if col in df_with_predictions.columns
+            ]
+            await dataset_service.add_dataset_columns(
+                dataset,
+                df_with_predictions[prediction_columns],
+                operation='ml_prediction',
+                recipe={'source': 'auto_train', **config, 'algorithm': metrics['algorithm']}
+            )
             
             # Mettre à jour les métadonnées du dataset
             dataset.has_predictions = True
@@ -66,6 +75,7 @@ async def train_model_background_task(dataset_id: int, config: dict):
             dataset.model_metrics = metrics
             
             await db.commit()
+            await dataset_service.release_unreferenced_blobs(db)
             print(f"✓ Model trained successfully for dataset {dataset_id}")
             
         except Exception as e:
@@ -138,8 +148,6 @@ async def get_training_status(
         "probability_column": dataset.probability_column
     }
 
-import chardet
-
 @router.post("/datasets/{dataset_id}/upload-predictions")
 async def upload_predictions(
     dataset_id: int,
@@ -160,8 +168,7 @@ async def upload_predictions(
     
     # Lire le contenu pour détecter l'encodage
     content = await predictions_file.read()
-    detection = chardet.detect(content)
-    encoding = detection['encoding'] or 'utf-8'
+    encoding = detect_encoding(content)
     
     try:
         pred_df = pd.read_csv(io.BytesIO(content), encoding=encoding)
@@ -172,12 +179,11 @@ async def upload_predictions(
     if 'prediction' not in pred_df.columns:
         raise HTTPException(status_code=400, detail="Predictions file must contain 'prediction' column")
     
-    # 2. Validation du nombre de lignes
-    original_df = await dataset_service.get_dataset_df(dataset)
-    if len(pred_df) != len(original_df):
+    # 2. Validation du nombre de lignes (profil stocké : le dataset n'est pas chargé)
+    if len(pred_df) != dataset.row_count:
         raise HTTPException(
             status_code=400,
-            detail=f"Predictions file must have same number of rows as dataset ({len(original_df)} rows, got {len(pred_df)})"
+            detail=f"Predictions file must have same number of rows as dataset ({dataset.row_count} rows, got {len(pred_df)})"
         )
     
     # 3. Validation de la qualité des données (pas de NaN dans prediction)
@@ -196,13 +202,17 @@ async def upload_predictions(
         except ValueError:
             raise HTTPException(status_code=400, detail="Probability column must contain numeric values.")
     
-    # 5. Intégration dans le dataset original
-    original_df['ml_prediction'] = pred_df['prediction']
+    # 5. Nouvelle version du dataset : seules les colonnes de prédiction sont écrites
+    prediction_df = pd.DataFrame({'ml_prediction': pred_df['prediction']})
     if has_prob:
-        original_df['ml_probability'] = pred_df['probability']
+        prediction_df['ml_probability'] = pred_df['probability']
     
-    # Sauvegarder via le service
-    await dataset_service.save_dataset_df(dataset, original_df)
+    await dataset_service.add_dataset_columns(
+        dataset,
+        prediction_df,
+        operation='ml_prediction',
+        recipe={'source': 'upload', 'filename': predictions_file.filename, 'has_probability': has_prob}
+    )
     
     # Mettre à jour métadonnées
     dataset.has_predictions = True
@@ -218,6 +228,7 @@ async def upload_predictions(
     }
     
     await db.commit()
+    await dataset_service.release_unreferenced_blobs(db)
     
     return {
         "message": "Predictions uploaded successfully",
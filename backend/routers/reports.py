@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import undefer_group
 from pathlib import Path
+import asyncio
 import os
+import tempfile
 
 from db import AsyncSessionLocal
 from models.user import User
 from models.dataset import Audit
 from auth_middleware import get_current_user
 from services.reporting import generate_audit_report
+from services.storage import storage, StorageError
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 REPORTS_DIR = Path("reports")
@@ -28,7 +32,11 @@ async def generate_report(
     """
     Génère un rapport PDF pour un audit terminé
     """
-    stmt = select(Audit).where(Audit.id == audit_id, Audit.user_id == current_user.id)
+    stmt = (
+        select(Audit)
+        .options(undefer_group('audit_results'))
+        .where(Audit.id == audit_id, Audit.user_id == current_user.id)
+    )
     result = await db.execute(stmt)
     audit = result.scalar_one_or_none()
     
@@ -50,16 +58,20 @@ async def generate_report(
         "ai_recommendations": audit.ai_recommendations
     }
     
-    # Générer le PDF
-    filename = f"audit_report_{audit.id}.pdf"
-    file_path = REPORTS_DIR / filename
+    # Générer le PDF (fichier temporaire, hors boucle d'événements) puis le stocker
+    report_key = f"reports/audit_report_{audit.id}.pdf"
+    fd, tmp_path = tempfile.mkstemp(prefix=".report_", suffix=".pdf", dir=REPORTS_DIR)
+    os.close(fd)
+    report_path = Path(tmp_path)
     
     try:
-        generate_audit_report(audit_data, file_path)
+        # Sans reportlab, le rapport est écrit en .txt à côté du fichier demandé
+        report_path = await asyncio.to_thread(generate_audit_report, audit_data, Path(tmp_path))
+        await storage.put_file(report_key, str(report_path), "application/pdf")
         
-        # Mettre à jour l'audit avec l'URL du rapport
+        # Mettre à jour l'audit avec la clé du rapport dans le stockage
         audit.report_generated = True
-        audit.report_url = str(file_path)
+        audit.report_url = report_key
         audit.report_format = "pdf"
         await db.commit()
         
@@ -67,6 +79,10 @@ async def generate_report(
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    finally:
+        for path in {Path(tmp_path), Path(report_path)}:
+            if path.exists():
+                path.unlink()
 
 @router.get("/{audit_id}/download")
 async def download_report(
@@ -87,12 +103,27 @@ async def download_report(
     if not audit.report_generated or not audit.report_url:
         raise HTTPException(status_code=404, detail="Report not generated")
         
+    filename = f"Audit_Report_{audit.audit_name}.pdf"
+    
+    # Rapports générés avant la couche de stockage : chemin local
     file_path = Path(audit.report_url)
-    if not file_path.exists():
+    if file_path.exists():
+        return FileResponse(
+            path=file_path,
+            filename=filename,
+            media_type='application/pdf'
+        )
+    
+    try:
+        size = await storage.size(audit.report_url)
+    except (FileNotFoundError, StorageError):
         raise HTTPException(status_code=404, detail="Report file missing")
-        
-    return FileResponse(
-        path=file_path,
-        filename=f"Audit_Report_{audit.audit_name}.pdf",
-        media_type='application/pdf'
+    
+    return StreamingResponse(
+        storage.stream(audit.report_url),
+        media_type='application/pdf',
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(size)
+        }
     )
@@ -1,38 +1,56 @@
 """
 Routeur pour l'upload et la gestion des datasets
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import undefer_group
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 import pandas as pd
-import chardet
+import asyncio
 import hashlib
 import io
 import os
+import uuid
 from pathlib import Path
 from utils.proxy_detection import (
+    NMI_BINS,
+    NMI_PERMUTATIONS,
     detect_proxy_variables,
+    mutual_information_scores,
     format_proxy_report,
     get_proxy_explanation
 )
 from utils.dataset_processing import detect_encoding, get_column_info, detect_column_types
-from utils.anonymization import apply_anonymization, get_anonymization_methods
-from utils.missing_values import analyze_missing_values, handle_missing_values, get_all_strategies_info
-from services.supabase_storage import storage_service
-from services.dataset_service import dataset_service
+from utils.anonymization import apply_anonymization, get_anonymization_methods, pseudonymization_available
+from utils.privacy_risk import compute_privacy_risk, search_generalization
+from utils.missing_values import (
+    analyze_missing_values, analyze_missing_values_from_profile, handle_missing_values, get_all_strategies_info
+)
+from utils.imputation import imputation_group_report
+from utils.leakage_detection import LEAKAGE_TIME_BUDGET, detect_leakage
+from utils.profiling import profile_dataframe, profile_file
+from services.storage import storage, StorageError
+from services.dataset_service import dataset_service, PREVIEW_ROWS
+from services.ingestion import spool_upload, assemble_parts, RowLimitExceeded, SpooledUpload
+from services.resumable_upload import (
+    DEFAULT_PART_SIZE, MAX_PART_SIZE, MAX_PARTS, MIN_PART_SIZE, PART_CHECKSUM_HEADER, SESSION_TTL_HOURS,
+    InvalidPart, count_parts, expected_part_size, list_parts, part_paths, remove_session_files, write_part
+)
+from services.cache import analysis_flights, flight_key, invalidate_dashboard_stats, leakage_cache
+from services.pseudonymization import PSEUDONYM_VAULT_ENABLED, pseudonymize, token_vault
+from utils.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, apply_keyset, clamp_page_size, split_page
 from models.user import User
-from models.dataset import Dataset, Audit
+from models.dataset import Dataset, DatasetVersion, Audit
+from models.upload_session import UploadSession
 from db import AsyncSessionLocal
 from auth_middleware import get_current_user
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
 # Configuration
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
 MAX_FILE_SIZE = {
     'freemium': 10_000,  # 10k lignes
     'pro': 100_000,      # 100k lignes
@@ -64,6 +82,15 @@ class DatasetConfigRequest(BaseModel):
     missing_values_strategy: Optional[Dict[str, str]] = {}  # {column: strategy}
 
 
+class PrivacyRiskRequest(BaseModel):
+    """Analyse du risque de ré-identification (k-anonymat / l-diversité)"""
+    quasi_identifiers: List[str]  # ex. ['age', 'code_postal', 'date_embauche']
+    sensitive_column: Optional[str] = None  # Attribut sensible pour la l-diversité
+    target_k: int = 5
+    column_types: Optional[Dict[str, str]] = None  # Remplace les types détectés (numeric, postal, date)
+    search_generalization: bool = True  # Proposer des niveaux de généralisation si k < target_k
+
+
 class MissingValuesRequest(BaseModel):
     """Options de traitement des valeurs manquantes"""
     strategy: Dict[str, str]  # {column_name: 'drop'|'mean'|'median'|'mode'|'forward_fill'|'constant'}
@@ -82,6 +109,15 @@ class DatasetPreview(BaseModel):
     detected_types: Dict[str, str]
 
 
+class UploadSessionRequest(BaseModel):
+    """Initialisation d'un upload reprenable"""
+    filename: str
+    content_type: str
+    total_size: int  # En bytes
+    part_size: Optional[int] = None  # 8 MB par défaut
+    sha256: Optional[str] = None  # Hash du fichier complet, vérifié à l'assemblage
+
+
 class DatasetInfo(BaseModel):
     id: int
     filename: str
@@ -109,74 +145,140 @@ async def upload_file(
     
     print(f"📤 UPLOAD: filename={file.filename}, content_type={file.content_type}")
     
-    # F2.1.2: Validation du type MIME
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Type de fichier non autorisé. Formats acceptés: CSV, Excel. Reçu: {file.content_type}"
-        )
+    # F2.1.2: Validation du type MIME et de l'extension
+    _validate_upload_type(file.filename, file.content_type)
     
-    # Lire le contenu du fichier
-    content = await file.read()
-    file_size = len(content)
-    
-    # F2.1.4: Détection automatique de l'encodage
-    encoding = detect_encoding(content)
-    
-    # Calcul du hash SHA256 pour identification
-    file_hash = calculate_file_hash(content)
+    # F2.1.3: Limite de lignes selon le plan (garde-fou pendant la réception,
+    # compte exact vérifié au parsing)
+    user_plan = current_user.plan or 'freemium'
+    max_rows = MAX_FILE_SIZE.get(user_plan, 10_000)
     
-    # Lire le fichier avec pandas
+    # Réception par blocs sur disque : hash SHA256 incrémental et
+    # F2.1.4: détection de l'encodage sur un préfixe borné
     try:
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(content), encoding=encoding, nrows=None)
-        elif file.filename.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(io.BytesIO(content), nrows=None)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Format de fichier non supporté"
-            )
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ ERREUR LECTURE FICHIER: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        spooled = await spool_upload(file, max_rows=max_rows)
+    except RowLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Limite dépassée. Votre plan {user_plan} autorise {max_rows:,} lignes maximum. "
+                   f"Ce fichier dépasse largement cette limite ({e.lines_seen:,} lignes lues)."
+        )
+    
+    return await _ingest_spooled(db, current_user, spooled, file.filename, file.content_type)
+
+
+def _validate_upload_type(filename: str, content_type: str):
+    if content_type not in ALLOWED_MIME_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Erreur lors de la lecture du fichier: {str(e)}"
+            detail=f"Type de fichier non autorisé. Formats acceptés: CSV, Excel. Reçu: {content_type}"
         )
     
-    # F2.1.3: Vérifier la limite de lignes selon le plan
+    if not filename.endswith(('.csv', '.xls', '.xlsx')):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format de fichier non supporté"
+        )
+
+
+async def _ingest_spooled(
+    db: AsyncSession,
+    current_user: User,
+    spooled: SpooledUpload,
+    filename: str,
+    content_type: str
+) -> DatasetPreview:
+    """
+    Crée le dataset à partir d'un fichier reçu sur disque (upload direct ou
+    parties assemblées) ; le fichier temporaire est supprimé dans tous les cas
+    """
     user_plan = current_user.plan or 'freemium'
     max_rows = MAX_FILE_SIZE.get(user_plan, 10_000)
     
-    if len(df) > max_rows:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"Limite dépassée. Votre plan {user_plan} autorise {max_rows:,} lignes maximum. "
-                   f"Ce fichier contient {len(df):,} lignes."
+    try:
+        encoding = spooled.encoding
+        
+        # Fichier déjà connu (même contenu) : profil et aperçu réutilisés, pas de parsing
+        blob = await dataset_service.get_blob(db, spooled.file_hash)
+        if blob is not None:
+            if blob.row_count > max_rows:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"Limite dépassée. Votre plan {user_plan} autorise {max_rows:,} lignes maximum. "
+                           f"Ce fichier contient {blob.row_count:,} lignes."
+                )
+            dataset = await dataset_service.create_dataset_from_file(
+                db=db,
+                file_path=spooled.path,
+                user_id=current_user.id,
+                organization_id=current_user.organization_id,
+                original_filename=filename,
+                mime_type=content_type,
+                encoding=encoding,
+                file_hash=spooled.file_hash
+            )
+            return _dataset_preview_response(dataset, blob.preview_data)
+        
+        # Profil calculé par blocs (CSV) : le fichier n'est jamais chargé en entier,
+        # l'aperçu est lu sur les premières lignes seulement
+        df = None
+        try:
+            if filename.endswith('.csv'):
+                profile = await asyncio.to_thread(profile_file, spooled.path, encoding=encoding)
+                head = await asyncio.to_thread(pd.read_csv, spooled.path, encoding=encoding, nrows=PREVIEW_ROWS)
+            else:
+                # Pas de lecture par blocs pour Excel : le classeur est chargé en entier
+                df = await asyncio.to_thread(pd.read_excel, spooled.path)
+                profile = await asyncio.to_thread(profile_dataframe, df)
+                head = df
+        except Exception as e:
+            print(f"❌ ERREUR LECTURE FICHIER: {type(e).__name__}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Erreur lors de la lecture du fichier: {str(e)}"
+            )
+        
+        # Limite du plan sur le compte exact (la réception n'applique qu'un garde-fou)
+        if profile['row_count'] > max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Limite dépassée. Votre plan {user_plan} autorise {max_rows:,} lignes maximum. "
+                       f"Ce fichier contient {profile['row_count']:,} lignes."
+            )
+        
+        # F2.1.5: Prévisualisation des 50 premières lignes (identique à l'aperçu stocké)
+        preview_data = dataset_service.build_preview(head)
+        
+        # Les octets d'origine sont stockés tels quels (pas de ré-encodage) ;
+        # la copie Parquet d'un CSV est écrite à la première lecture partielle
+        dataset = await dataset_service.create_dataset_from_file(
+            db=db,
+            file_path=spooled.path,
+            user_id=current_user.id,
+            organization_id=current_user.organization_id,
+            original_filename=filename,
+            mime_type=content_type,
+            encoding=encoding,
+            df=df,
+            file_hash=spooled.file_hash,
+            profile=profile,
+            preview=preview_data
         )
+        del df, head
+    finally:
+        spooled.cleanup()
     
-    # F2.1.7: Gestion des valeurs manquantes
-    missing_values = {col: int(df[col].isnull().sum()) for col in df.columns}
-    
-    # F2.1.5: Prévisualisation des 50 premières lignes
-    preview_data = df.head(50).fillna('').to_dict('records')
-    
-    dataset = await dataset_service.create_dataset_from_df(
-        db=db,
-        df=df,
-        user_id=current_user.id,
-        organization_id=current_user.organization_id,
-        original_filename=file.filename,
-        mime_type=file.content_type,
-        encoding=encoding
-    )
+    return _dataset_preview_response(dataset, preview_data)
+
+
+def _dataset_preview_response(dataset: Dataset, preview_data: List[Dict[str, Any]]) -> DatasetPreview:
+    # Extraire les infos de colonnes depuis le dataset créé (noms du mapping)
+    columns_info = dataset_service.get_column_list(dataset)
     
-    # Extraire les infos de colonnes depuis le dataset créé
-    columns_info = dataset.columns_info.get('columns', []) if isinstance(dataset.columns_info, dict) else dataset.columns_info
+    # F2.1.7: Gestion des valeurs manquantes (comptes issus du profil)
+    missing_values = {col['name']: col['null_count'] for col in columns_info}
 
     return DatasetPreview(
         dataset_id=dataset.id,
@@ -184,31 +286,327 @@ async def upload_file(
         row_count=dataset.row_count,
         column_count=dataset.column_count,
         columns_info=columns_info,
-        preview_data=preview_data,
+        preview_data=dataset_service.get_preview(dataset, preview_data),
         encoding=dataset.encoding,
         file_size=dataset.file_size,
         missing_values=missing_values,
-        detected_types=column_types
+        detected_types={col['name']: col['type'] for col in columns_info}
     )
 
+# --- Upload reprenable (init -> parties -> complete) ---
+
+async def _get_upload_session(db: AsyncSession, upload_id: str, current_user: User) -> UploadSession:
+    result = await db.execute(
+        select(UploadSession).where(
+            UploadSession.id == upload_id,
+            UploadSession.user_id == current_user.id
+        )
+    )
+    session = result.scalar_one_or_none()
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session d'upload introuvable"
+        )
+    return session
+
+
+def _ensure_session_open(session: UploadSession):
+    if session.status != 'pending':
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Session d'upload non modifiable (statut : {session.status})"
+        )
+    if session.expires_at < datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Session d'upload expirée"
+        )
+
+
+def _upload_session_status(session: UploadSession) -> Dict[str, Any]:
+    parts = list_parts(session.id) if session.status == 'pending' else {}
+    return {
+        'upload_id': session.id,
+        'filename': session.filename,
+        'status': session.status,
+        'total_size': session.total_size,
+        'part_size': session.part_size,
+        'total_parts': session.total_parts,
+        'received_parts': [
+            {'part_number': p.part_number, 'size': p.size, 'sha256': p.sha256}
+            for p in sorted(parts.values(), key=lambda p: p.part_number)
+        ],
+        'missing_parts': [n for n in range(1, session.total_parts + 1) if n not in parts],
+        'dataset_id': session.dataset_id,
+        'error_message': session.error_message,
+        'expires_at': session.expires_at
+    }
+
+
+@router.post("/sessions", status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    request: UploadSessionRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Initialise un upload reprenable : le fichier est ensuite envoyé par parties
+    (PUT .../parts/{n} avec l'en-tête X-Part-SHA256) puis assemblé par .../complete
+    """
+    _validate_upload_type(request.filename, request.content_type)
+    
+    part_size = request.part_size or DEFAULT_PART_SIZE
+    if not MIN_PART_SIZE <= part_size <= MAX_PART_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Taille de partie invalide (entre {MIN_PART_SIZE} et {MAX_PART_SIZE} octets)"
+        )
+    if request.total_size <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Taille de fichier invalide"
+        )
+    total_parts = count_parts(request.total_size, part_size)
+    if total_parts > MAX_PARTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Trop de parties ({total_parts} > {MAX_PARTS}) : augmentez part_size"
+        )
+    
+    # Nettoyer les sessions expirées de l'utilisateur
+    expired = await db.execute(
+        select(UploadSession).where(
+            UploadSession.user_id == current_user.id,
+            UploadSession.status == 'pending',
+            UploadSession.expires_at < datetime.utcnow()
+        )
+    )
+    for old_session in expired.scalars().all():
+        remove_session_files(old_session.id)
+        old_session.status = 'aborted'
+    
+    session = UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=current_user.id,
+        filename=request.filename,
+        content_type=request.content_type,
+        total_size=request.total_size,
+        part_size=part_size,
+        total_parts=total_parts,
+        sha256=request.sha256.lower() if request.sha256 else None,
+        status='pending',
+        expires_at=datetime.utcnow() + timedelta(hours=SESSION_TTL_HOURS)
+    )
+    db.add(session)
+    await db.commit()
+    
+    return _upload_session_status(session)
+
+
+@router.get("/sessions/{upload_id}")
+async def get_upload_session(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """État d'un upload reprenable : parties reçues et parties à (r)envoyer"""
+    session = await _get_upload_session(db, upload_id, current_user)
+    return _upload_session_status(session)
+
+
+@router.put("/sessions/{upload_id}/parts/{part_number}")
+async def upload_part(
+    upload_id: str,
+    part_number: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Reçoit une partie (corps brut). L'en-tête X-Part-SHA256 est obligatoire ;
+    une partie déjà reçue peut être renvoyée (elle est remplacée).
+    """
+    session = await _get_upload_session(db, upload_id, current_user)
+    _ensure_session_open(session)
+    
+    if not 1 <= part_number <= session.total_parts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Numéro de partie invalide (1 à {session.total_parts})"
+        )
+    checksum = request.headers.get(PART_CHECKSUM_HEADER)
+    if not checksum:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"En-tête {PART_CHECKSUM_HEADER} manquant"
+        )
+    
+    try:
+        part = await write_part(
+            upload_id,
+            part_number,
+            request.stream(),
+            checksum,
+            expected_part_size(part_number, session.total_size, session.part_size, session.total_parts)
+        )
+    except InvalidPart as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Partie rejetée : {str(e)}"
+        )
+    
+    return {'part_number': part.part_number, 'size': part.size, 'sha256': part.sha256}
+
+
+@router.post("/sessions/{upload_id}/complete", response_model=DatasetPreview)
+async def complete_upload_session(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Assemble les parties et lance l'ingestion (mêmes contrôles que /file).
+    Rappeler complete sur une session terminée renvoie le même dataset.
+    """
+    session = await _get_upload_session(db, upload_id, current_user)
+    
+    if session.status == 'completed' and session.dataset_id:
+        dataset = (await db.execute(
+            select(Dataset).where(Dataset.id == session.dataset_id).options(undefer_group('dataset_preview'))
+        )).scalar_one_or_none()
+        if dataset:
+            return _dataset_preview_response(dataset, dataset.preview_data or [])
+    _ensure_session_open(session)
+    
+    missing = [n for n in range(1, session.total_parts + 1) if n not in list_parts(upload_id)]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Parties manquantes : {missing[:20]}"
+        )
+    
+    # Verrou : une seule finalisation à la fois pour cette session
+    claimed = await db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_id, UploadSession.status == 'pending')
+        .values(status='assembling')
+    )
+    await db.commit()
+    if not claimed.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Finalisation déjà en cours"
+        )
+    
+    user_plan = current_user.plan or 'freemium'
+    max_rows = MAX_FILE_SIZE.get(user_plan, 10_000)
+    
+    try:
+        try:
+            spooled = await assemble_parts(part_paths(upload_id, session.total_parts), session.filename, max_rows=max_rows)
+        except RowLimitExceeded as e:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Limite dépassée. Votre plan {user_plan} autorise {max_rows:,} lignes maximum. "
+                       f"Ce fichier dépasse largement cette limite ({e.lines_seen:,} lignes lues)."
+            )
+        
+        if session.sha256 and spooled.file_hash != session.sha256:
+            spooled.cleanup()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Le hash du fichier assemblé ne correspond pas au hash annoncé"
+            )
+        
+        preview = await _ingest_spooled(db, current_user, spooled, session.filename, session.content_type)
+    except HTTPException as e:
+        # Erreur définitive (fichier invalide, limite) : la session est close
+        if e.status_code < 500:
+            session.status = 'failed'
+            session.error_message = str(e.detail)
+            remove_session_files(upload_id)
+        else:
+            session.status = 'pending'
+        await db.commit()
+        raise
+    except BaseException:
+        # Erreur transitoire : les parties sont conservées, complete peut être rappelé
+        session.status = 'pending'
+        await db.commit()
+        raise
+    
+    session.status = 'completed'
+    session.dataset_id = preview.dataset_id
+    session.completed_at = datetime.utcnow()
+    await db.commit()
+    remove_session_files(upload_id)
+    
+    return preview
+
+
+@router.delete("/sessions/{upload_id}")
+async def abort_upload_session(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Abandonne un upload reprenable et supprime les parties reçues"""
+    session = await _get_upload_session(db, upload_id, current_user)
+    _ensure_session_open(session)
+    
+    session.status = 'aborted'
+    await db.commit()
+    remove_session_files(upload_id)
+    
+    return {"message": "Upload annulé"}
+
+
 
 @router.get("/datasets", response_model=List[DatasetInfo])
 async def list_datasets(
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    use_case: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Liste tous les datasets de l'utilisateur ou de son organisation"""
+    """
+    Liste paginée des datasets de l'utilisateur ou de son organisation
+
+    Le curseur de la page suivante est renvoyé dans l'en-tête X-Next-Cursor.
+    """
+    limit = clamp_page_size(limit)
+    
     if current_user.organization_id:
         stmt = select(Dataset).where(
             Dataset.organization_id == current_user.organization_id
-        ).order_by(Dataset.created_at.desc())
+        )
     else:
         stmt = select(Dataset).where(
             Dataset.user_id == current_user.id
-        ).order_by(Dataset.created_at.desc())
+        )
+    
+    if status_filter:
+        stmt = stmt.where(Dataset.status == status_filter)
+    if use_case:
+        stmt = stmt.where(Dataset.use_case == use_case)
+    
+    try:
+        stmt = apply_keyset(stmt, Dataset.created_at, Dataset.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
     
     result = await db.execute(stmt)
-    datasets = result.scalars().all()
+    datasets, next_cursor = split_page(result.scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return [
         DatasetInfo(
@@ -245,6 +643,7 @@ async def get_dataset_details(
             Dataset.id == dataset_id,
             Dataset.user_id == current_user.id
         )
+    stmt = stmt.options(undefer_group('dataset_preview'))
     result = await db.execute(stmt)
     dataset = result.scalar_one_or_none()
     
@@ -254,31 +653,18 @@ async def get_dataset_details(
             detail="Dataset introuvable"
         )
     
-    # Charger le fichier pour obtenir preview_data
-    preview_data = []
-    content = None
-    
-    # Tenter de charger depuis Supabase d'abord
-    if storage_service.is_available():
-        content = await storage_service.download_file(dataset.filename)
-    
-    # Sinon charger depuis le disque local
-    if content is None:
-        file_path = UPLOAD_DIR / dataset.filename
-        if file_path.exists():
-            with open(file_path, 'rb') as f:
-                content = f.read()
+    # Aperçu calculé à l'ingestion : pas d'accès au stockage
+    preview_data = dataset.preview_data
     
-    if content:
+    if preview_data is None:
+        # Dataset antérieur à l'aperçu stocké : calcul unique puis sauvegarde
+        preview_data = []
         try:
-            # Lire le contenu
-            if dataset.mime_type == 'text/csv' or dataset.filename.endswith('.csv'):
-                df = pd.read_csv(io.BytesIO(content), encoding=dataset.encoding)
-            else:
-                df = pd.read_excel(io.BytesIO(content))
-            
-            # Prévisualisation des 50 premières lignes
-            preview_data = df.head(50).fillna('').to_dict('records')
+            df = await dataset_service.get_dataset_df(dataset, max_rows=PREVIEW_ROWS)
+            # Stocké avec les noms du fichier, comme le profil
+            preview_data = dataset_service.build_preview(dataset_service.to_stored_columns(dataset, df))
+            dataset.preview_data = preview_data
+            await db.commit()
         except Exception as e:
             print(f"Erreur lors du chargement du fichier: {e}")
     
@@ -288,9 +674,10 @@ async def get_dataset_details(
         'file_size': dataset.file_size,
         'row_count': dataset.row_count,
         'column_count': dataset.column_count,
-        'columns_info': dataset.columns_info,
-        'preview_data': preview_data,  # Ajouté pour le refresh
+        'columns_info': dataset_service.get_columns_info(dataset),
+        'preview_data': dataset_service.get_preview(dataset, preview_data),  # Ajouté pour le refresh
         'status': dataset.status,
+        'version_id': dataset.version_id,
         'encoding': dataset.encoding,
         'use_case': dataset.use_case,
         'target_column': dataset.target_column,
@@ -330,22 +717,97 @@ async def delete_dataset(
             detail="Dataset introuvable"
         )
     
-    # Supprimer du stockage Supabase
-    if storage_service.is_available():
-        await storage_service.delete_file(dataset.filename)
-    
-    # Supprimer le fichier physique local (si existant)
-    file_path = UPLOAD_DIR / dataset.filename
-    if file_path.exists():
-        file_path.unlink()
+    # Dataset antérieur aux blobs : fichier propre (gardé par ses versions), supprimé directement
+    for filename in await dataset_service.legacy_files(db, dataset):
+        try:
+            await storage.delete(filename)
+        except StorageError as e:
+            print(f"⚠️ Fichier {filename} non supprimé du stockage : {e}")
     
     # Supprimer de la base de données
+    owner_id, organization_id = dataset.user_id, dataset.organization_id
     await db.delete(dataset)
     await db.commit()
+    # Les audits du dataset sont supprimés en cascade
+    invalidate_dashboard_stats(owner_id, organization_id)
+    
+    # Le fichier n'est supprimé que s'il n'est plus partagé par un autre dataset
+    await dataset_service.release_unreferenced_blobs(db)
     
     return {"message": "Dataset supprimé avec succès"}
 
 
+@router.get("/datasets/{dataset_id}/versions")
+async def list_dataset_versions(
+    dataset_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Historique des versions du contenu d'un dataset (la plus récente d'abord)
+    
+    Chaque version indique la transformation qui l'a produite, les colonnes
+    écrites par-dessus le fichier de base et le nombre d'audits qui l'épinglent.
+    """
+    if current_user.organization_id:
+        stmt = select(Dataset).where(
+            Dataset.id == dataset_id,
+            Dataset.organization_id == current_user.organization_id
+        )
+    else:
+        stmt = select(Dataset).where(
+            Dataset.id == dataset_id,
+            Dataset.user_id == current_user.id
+        )
+    result = await db.execute(stmt)
+    dataset = result.scalar_one_or_none()
+    
+    if not dataset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset introuvable"
+        )
+    
+    audit_counts = (
+        select(Audit.dataset_version_id, func.count(Audit.id).label('audit_count'))
+        .where(Audit.dataset_id == dataset_id)
+        .group_by(Audit.dataset_version_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            DatasetVersion.id, DatasetVersion.version, DatasetVersion.parent_id,
+            DatasetVersion.operation, DatasetVersion.recipe, DatasetVersion.file_hash,
+            DatasetVersion.column_overlays, DatasetVersion.row_count, DatasetVersion.column_count,
+            DatasetVersion.created_at, func.coalesce(audit_counts.c.audit_count, 0)
+        )
+        .outerjoin(audit_counts, audit_counts.c.dataset_version_id == DatasetVersion.id)
+        .where(DatasetVersion.dataset_id == dataset_id)
+        .order_by(DatasetVersion.version.desc())
+    )
+    
+    return [
+        {
+            'id': version_id,
+            'version': number,
+            'parent_id': parent_id,
+            'operation': operation,
+            'recipe': recipe,
+            'file_hash': file_hash,
+            'overlay_columns': list(overlays or {}),
+            'row_count': row_count,
+            'column_count': column_count,
+            'created_at': created_at,
+            'audit_count': audit_count,
+            'current': version_id == dataset.version_id
+        }
+        for (
+            version_id, number, parent_id, operation, recipe, file_hash,
+            overlays, row_count, column_count, created_at, audit_count
+        ) in result.all()
+    ]
+
+
 @router.put("/datasets/{dataset_id}/configure")
 async def configure_dataset(
     dataset_id: int,
@@ -373,8 +835,8 @@ async def configure_dataset(
             detail="Dataset introuvable"
         )
     
-    # Extraire la liste des colonnes depuis columns_info
-    columns_list = dataset.columns_info.get('columns', []) if isinstance(dataset.columns_info, dict) else dataset.columns_info
+    # Extraire la liste des colonnes depuis columns_info (noms du mapping)
+    columns_list = dataset_service.get_column_list(dataset)
     
     # Validation de la variable cible
     if config.target_column not in [col['name'] for col in columns_list]:
@@ -399,42 +861,54 @@ async def configure_dataset(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Méthode d'anonymisation invalide. Méthodes supportées : {valid_methods}"
             )
+        if config.anonymization_method == 'pseudonym' and not pseudonymization_available():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Pseudonymisation indisponible : PSEUDONYMIZATION_KEY n'est pas configurée sur le serveur"
+            )
     
     # Appliquer l'anonymisation si demandée
     if config.anonymization_method and config.sensitive_attributes:
         try:
-            # Charger le fichier original (filename contient déjà le chemin complet)
-            file_path = Path(dataset.filename)
-            if file_path.exists():
-                # Déterminer le type de fichier et charger
-                if dataset.mime_type == 'text/csv':
-                    df = pd.read_csv(file_path, encoding=dataset.encoding)
-                else:
-                    df = pd.read_excel(file_path)
-                
-                # Appliquer l'anonymisation
+            # Charger le fichier original depuis le stockage
+            try:
+                df = await dataset_service.get_dataset_df(dataset)
+            except FileNotFoundError:
+                df = None
+            
+            if df is not None:
+                # Appliquer l'anonymisation (hors boucle d'événements)
                 column_types = {col['name']: col['type'] for col in columns_list}
-                df_anonymized = apply_anonymization(
-                    df,
-                    config.sensitive_attributes,
-                    config.anonymization_method,
-                    column_types
-                )
-                
-                # Sauvegarder le fichier anonymisé (remplace l'original)
-                if dataset.mime_type == 'text/csv' or dataset.filename.endswith('.csv'):
-                    new_content = df_anonymized.to_csv(index=False, encoding=dataset.encoding).encode(dataset.encoding)
+                if config.anonymization_method == 'pseudonym':
+                    # Pseudonymes cohérents entre les datasets de l'organisation (ou de l'utilisateur)
+                    namespace = (
+                        f"org:{current_user.organization_id}" if current_user.organization_id
+                        else f"user:{current_user.id}"
+                    )
+                    df_anonymized = await pseudonymize(
+                        df,
+                        config.sensitive_attributes,
+                        namespace,
+                        vault=token_vault if PSEUDONYM_VAULT_ENABLED else None
+                    )
                 else:
-                    output = io.BytesIO()
-                    df_anonymized.to_excel(output, index=False)
-                    new_content = output.getvalue()
+                    df_anonymized = await asyncio.to_thread(
+                        apply_anonymization,
+                        df,
+                        config.sensitive_attributes,
+                        config.anonymization_method,
+                        column_types
+                    )
                 
-                if storage_service.is_available():
-                    await storage_service.upload_file(dataset.filename, new_content, dataset.mime_type)
-                else:
-                    file_path = UPLOAD_DIR / dataset.filename
-                    with open(file_path, 'wb') as f:
-                        f.write(new_content)
+                # Nouvelle version du dataset : seules les colonnes anonymisées sont
+                # écrites (profil et aperçu mis à jour), l'original reste dans la version précédente
+                await dataset_service.save_dataset_df(
+                    dataset,
+                    df_anonymized,
+                    operation='anonymization',
+                    recipe={'method': config.anonymization_method, 'columns': config.sensitive_attributes},
+                    changed_columns=config.sensitive_attributes
+                )
                 
                 # Marquer comme anonymisé
                 dataset.anonymized = True
@@ -456,6 +930,7 @@ async def configure_dataset(
     
     await db.commit()
     await db.refresh(dataset)
+    await dataset_service.release_unreferenced_blobs(db)
     
     return {
         "message": "Configuration enregistrée avec succès",
@@ -479,15 +954,20 @@ async def get_anonymization_methods_endpoint():
     return get_anonymization_methods()
 
 
-@router.get("/datasets/{dataset_id}/missing-values")
-async def get_missing_values_analysis(
+@router.post("/datasets/{dataset_id}/privacy-risk")
+async def analyze_privacy_risk(
     dataset_id: int,
+    request: PrivacyRiskRequest,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    F2.1.7: Analyse détaillée des valeurs manquantes d'un dataset
-    Retourne les statistiques et recommandations de traitement
+    Risque de ré-identification sur les quasi-identifiants choisis
+    
+    Retourne k (taille de la plus petite classe d'équivalence), l (nombre
+    minimal de valeurs sensibles distinctes par classe) et les lignes à
+    risque ; si k < target_k, propose les niveaux de généralisation (tranches
+    d'âge, préfixes de code postal, mois/année) qui atteignent target_k.
     """
     stmt = select(Dataset).where(
         Dataset.id == dataset_id,
@@ -502,31 +982,101 @@ async def get_missing_values_analysis(
             detail="Dataset introuvable"
         )
     
-    # Récupérer le contenu du fichier
-    content = None
-    if storage_service.is_available():
-        content = await storage_service.download_file(dataset.filename)
-    
-    if content is None:
-        file_path = UPLOAD_DIR / dataset.filename
-        if file_path.exists():
-            with open(file_path, 'rb') as f:
-                content = f.read()
+    columns_list = dataset_service.get_column_list(dataset)
+    column_types = {col['name']: col['type'] for col in columns_list}
+    unknown = [col for col in request.quasi_identifiers if col not in column_types]
+    if not request.quasi_identifiers or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Quasi-identifiants invalides : {unknown or 'aucun'}"
+        )
+    if request.target_k < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="target_k doit être au moins 2"
+        )
+    column_types.update(request.column_types or {})
     
-    if content is None:
+    # Seules les colonnes analysées sont lues
+    columns = request.quasi_identifiers + ([request.sensitive_column] if request.sensitive_column else [])
+    try:
+        df = await dataset_service.get_dataset_df(dataset, columns=columns)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Fichier dataset introuvable"
         )
     
-    # Lire le fichier
-    if dataset.mime_type == 'text/csv' or dataset.filename.endswith('.csv'):
-        df = pd.read_csv(io.BytesIO(content), encoding=dataset.encoding)
-    else:
-        df = pd.read_excel(io.BytesIO(content))
+    risk = await asyncio.to_thread(
+        compute_privacy_risk,
+        df,
+        request.quasi_identifiers,
+        request.sensitive_column,
+        request.target_k,
+        column_types
+    )
+    generalization = None
+    if request.search_generalization and risk['k'] < request.target_k:
+        generalization = await asyncio.to_thread(
+            search_generalization,
+            df,
+            request.quasi_identifiers,
+            request.target_k,
+            request.sensitive_column,
+            column_types
+        )
     
-    # Analyser les valeurs manquantes
-    missing_analysis = analyze_missing_values(df)
+    return {
+        "dataset_id": dataset_id,
+        "total_rows": len(df),
+        "sensitive_column": request.sensitive_column,
+        "risk": risk,
+        "is_k_anonymous": risk['k'] >= request.target_k,
+        "generalization": generalization
+    }
+
+
+@router.get("/datasets/{dataset_id}/missing-values")
+async def get_missing_values_analysis(
+    dataset_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    F2.1.7: Analyse détaillée des valeurs manquantes d'un dataset
+    Retourne les statistiques et recommandations de traitement
+    """
+    stmt = select(Dataset).where(
+        Dataset.id == dataset_id,
+        Dataset.user_id == current_user.id
+    )
+    result = await db.execute(stmt)
+    dataset = result.scalar_one_or_none()
+    
+    if not dataset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset introuvable"
+        )
+    
+    # Profil à jour : analyse sans relire le fichier
+    profile_columns = dataset_service.get_profile_columns(dataset)
+    if profile_columns is not None:
+        total_rows, total_columns = dataset.row_count, dataset.column_count
+        missing_analysis = analyze_missing_values_from_profile(profile_columns, total_rows)
+    else:
+        # Charger le dataset
+        try:
+            df = await dataset_service.get_dataset_df(dataset)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Fichier dataset introuvable"
+            )
+        
+        # Analyser les valeurs manquantes
+        total_rows, total_columns = len(df), len(df.columns)
+        missing_analysis = await asyncio.to_thread(analyze_missing_values, df)
     
     # Récupérer toutes les stratégies disponibles
     strategies_info = get_all_strategies_info()
@@ -534,8 +1084,8 @@ async def get_missing_values_analysis(
     return {
         "dataset_id": dataset_id,
         "filename": dataset.original_filename,
-        "total_rows": len(df),
-        "total_columns": len(df.columns),
+        "total_rows": total_rows,
+        "total_columns": total_columns,
         "missing_analysis": missing_analysis,
         "has_missing_values": len(missing_analysis) > 0,
         "columns_with_missing": list(missing_analysis.keys()),
@@ -566,49 +1116,49 @@ async def apply_missing_values_treatment(
             detail="Dataset introuvable"
         )
     
-    # Charger le fichier
-    file_path = UPLOAD_DIR / dataset.filename
-    if not file_path.exists():
+    # Charger le dataset
+    try:
+        df = await dataset_service.get_dataset_df(dataset)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Fichier dataset introuvable"
         )
     
     try:
-        # Lire le fichier
-        if dataset.mime_type == 'text/csv':
-            df = pd.read_csv(file_path, encoding=dataset.encoding)
-        else:
-            df = pd.read_excel(file_path)
-        
-        # Appliquer le traitement
-        df_clean = handle_missing_values(df, request.strategy)
-        
-        # Sauvegarder le fichier nettoyé (Supabase ou Local)
-        if dataset.mime_type == 'text/csv' or dataset.filename.endswith('.csv'):
-            new_content = df_clean.to_csv(index=False, encoding=dataset.encoding).encode(dataset.encoding)
-        else:
-            output = io.BytesIO()
-            df_clean.to_excel(output, index=False)
-            new_content = output.getvalue()
+        # Appliquer le traitement (hors boucle d'événements)
+        df_clean = await asyncio.to_thread(handle_missing_values, df, request.strategy)
         
-        if storage_service.is_available():
-            await storage_service.upload_file(dataset.filename, new_content, dataset.mime_type)
-        else:
-            file_path = UPLOAD_DIR / dataset.filename
-            with open(file_path, 'wb') as f:
-                f.write(new_content)
+        # Effet des imputations sur la distribution par groupe sensible
+        filled_columns = [
+            col for col, strat in request.strategy.items()
+            if strat not in ('drop_rows', 'drop_column') and col in df_clean.columns
+        ]
+        imputation_effects = await asyncio.to_thread(
+            imputation_group_report, df, df_clean, filled_columns, dataset.sensitive_attributes or []
+        )
         
-        # Mettre à jour les statistiques
-        dataset.row_count = len(df_clean)
-        dataset.column_count = len(df_clean.columns)
+        # Nouvelle version du dataset (profil, row_count, column_count mis à jour) :
+        # sans suppression de lignes, seules les colonnes imputées sont écrites
+        await dataset_service.save_dataset_df(
+            dataset,
+            df_clean,
+            operation='missing_values',
+            recipe={'strategy': request.strategy},
+            changed_columns=filled_columns
+        )
         dataset.updated_at = datetime.utcnow()
         
         await db.commit()
         await db.refresh(dataset)
+        await dataset_service.release_unreferenced_blobs(db)
         
-        # Re-analyser
-        missing_analysis = analyze_missing_values(df_clean)
+        # Re-analyser (profil recalculé par save_dataset_df)
+        profile_columns = dataset_service.get_profile_columns(dataset)
+        if profile_columns is not None:
+            missing_analysis = analyze_missing_values_from_profile(profile_columns, len(df_clean))
+        else:
+            missing_analysis = await asyncio.to_thread(analyze_missing_values, df_clean)
         
         return {
             "message": "Traitement des valeurs manquantes appliqué avec succès",
@@ -619,7 +1169,8 @@ async def apply_missing_values_treatment(
             "columns_before": len(df.columns),
             "columns_after": len(df_clean.columns),
             "remaining_missing": missing_analysis,
-            "strategies_applied": request.strategy
+            "strategies_applied": request.strategy,
+            "imputation_effects": imputation_effects
         }
     
     except Exception as e:
@@ -672,32 +1223,19 @@ async def detect_proxy_variables_endpoint(
             detail="Aucun attribut sensible configuré."
         )
     
-    # Charger le contenu du fichier
-    content = None
-    if storage_service.is_available():
-        content = await storage_service.download_file(dataset.filename)
-    
-    if content is None:
-        file_path = UPLOAD_DIR / dataset.filename
-        if file_path.exists():
-            with open(file_path, 'rb') as f:
-                content = f.read()
-    
-    if content is None:
+    # Charger le dataset
+    try:
+        df = await dataset_service.get_dataset_df(dataset)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Fichier dataset introuvable"
         )
     
     try:
-        # Lire le fichier
-        if dataset.mime_type == 'text/csv' or dataset.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(content), encoding=dataset.encoding)
-        else:
-            df = pd.read_excel(io.BytesIO(content))
-        
-        # Détecter les variables proxy
-        proxy_results = detect_proxy_variables(
+        # Détecter les variables proxy (calcul CPU : hors de la boucle d'événements)
+        proxy_results = await asyncio.to_thread(
+            detect_proxy_variables,
             df,
             dataset.sensitive_attributes,
             correlation_threshold=0.7
@@ -735,3 +1273,149 @@ async def detect_proxy_variables_endpoint(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la détection : {str(e)}"
         )
+
+
+@router.get("/datasets/{dataset_id}/proxy-scores")
+async def proxy_mutual_information_endpoint(
+    dataset_id: int,
+    bins: int = Query(NMI_BINS, ge=2, le=100),
+    permutations: int = Query(NMI_PERMUTATIONS, ge=0, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    F2.3.3: Score d'information mutuelle normalisée (NMI) entre chaque colonne
+    et chaque attribut sensible
+    
+    Contrairement à detect-proxies (Pearson, V de Cramér, eta selon les
+    types), tous les scores sont sur la même échelle, avec une p-valeur
+    issue d'un test de permutation. Toutes les colonnes sont classées.
+    """
+    stmt = select(Dataset).where(
+        Dataset.id == dataset_id,
+        Dataset.user_id == current_user.id
+    )
+    result = await db.execute(stmt)
+    dataset = result.scalar_one_or_none()
+    
+    if not dataset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset introuvable"
+        )
+    
+    if not dataset.sensitive_attributes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Aucun attribut sensible configuré."
+        )
+    
+    try:
+        df = await dataset_service.get_dataset_df(dataset)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Fichier dataset introuvable"
+        )
+    
+    try:
+        scores = await asyncio.to_thread(
+            mutual_information_scores, df, dataset.sensitive_attributes,
+            bins=bins, permutations=permutations
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors du calcul : {str(e)}"
+        )
+    
+    return {
+        "message": "Scores d'information mutuelle calculés",
+        "dataset_id": dataset_id,
+        "sensitive_attributes": dataset.sensitive_attributes,
+        "method": "mutual_information",
+        "explanation": get_proxy_explanation("mutual_information"),
+        "bins": bins,
+        "permutations": permutations,
+        "scores": scores
+    }
+
+
+@router.get("/datasets/{dataset_id}/detect-leakage")
+async def detect_leakage_endpoint(
+    dataset_id: int,
+    time_budget: float = Query(LEAKAGE_TIME_BUDGET, gt=0, le=300),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    F2.3.3: Détecte les attributs sensibles prédictibles à partir des autres
+    colonnes prises ensemble (proxies multivariés, type redlining)
+    
+    Retourne pour chaque attribut sensible :
+    - AUC des modèles (gradient boosting, logistique L1) et niveau de risque
+      ('unknown' si l'attribut n'a pas pu être évalué, budget épuisé compris)
+    - Contribution des colonnes (importance par permutation, poids L1)
+    
+    Le résultat est mis en cache pour la version du dataset (hash du contenu).
+    """
+    stmt = select(Dataset).where(
+        Dataset.id == dataset_id,
+        Dataset.user_id == current_user.id
+    )
+    result = await db.execute(stmt)
+    dataset = result.scalar_one_or_none()
+    
+    if not dataset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset introuvable"
+        )
+    
+    if not dataset.sensitive_attributes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Aucun attribut sensible configuré."
+        )
+    
+    # La cible et les prédictions ne sont pas des variables explicatives
+    exclude_columns = [col for col in (dataset.target_column, dataset.prediction_column) if col]
+    key = flight_key(
+        dataset_service.view_version(dataset),
+        "leakage",
+        sensitive_attributes=dataset.sensitive_attributes,
+        exclude_columns=exclude_columns,
+        time_budget=time_budget
+    )
+    report = leakage_cache.get(key)
+    cached = report is not None
+    
+    if report is None:
+        try:
+            df = await dataset_service.get_dataset_df(dataset)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Fichier dataset introuvable"
+            )
+        
+        try:
+            # Calcul partagé avec les requêtes identiques simultanées (pool de threads)
+            report = await analysis_flights.do(
+                key, detect_leakage, df, dataset.sensitive_attributes,
+                exclude_columns=exclude_columns, time_budget=time_budget
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erreur lors de la détection : {str(e)}"
+            )
+        leakage_cache.set(key, report)
+    
+    return {
+        "message": "Détection de fuite des attributs sensibles terminée",
+        "dataset_id": dataset_id,
+        "sensitive_attributes": dataset.sensitive_attributes,
+        "cached": cached,
+        **report
+    }
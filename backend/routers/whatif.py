@@ -17,6 +17,8 @@ from models.user import User
 from models.dataset import Dataset, Audit
 from auth_middleware import get_current_user
 from services.fairness import EnhancedFairnessService
+from services.dataset_service import dataset_service
+from services.cache import analysis_flights
 from services.fairness.whatif import WhatIfAnalyzer
 
 router = APIRouter(prefix="/api/audits/enhanced", tags=["what-if-tool"])
@@ -52,6 +54,21 @@ async def get_db():
         yield session
 
 
+def _fit_whatif_model(X: pd.DataFrame, y: np.ndarray):
+    """Logistic regression used by the counterfactual and exploration endpoints"""
+    from sklearn.linear_model import LogisticRegression
+    model = LogisticRegression(max_iter=1000)
+    model.fit(X, y)
+    return model
+
+
+def _compute_feature_importance(X_sample: pd.DataFrame, y_sample: np.ndarray, method: str):
+    """Train the model on the sample and compute its feature importance"""
+    model = _fit_whatif_model(X_sample, y_sample)
+    analyzer = WhatIfAnalyzer(model, X_sample.columns.tolist())
+    return analyzer.calculate_feature_importance(X=X_sample.values, method=method)
+
+
 # ==================== Endpoints ====================
 
 @router.post("/{audit_id}/whatif/counterfactual")
@@ -89,10 +106,15 @@ async def generate_counterfactual(
     
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    # Content pinned when the audit was created
+    dataset = await dataset_service.get_audit_source(db, audit, dataset)
     
-    # Load data
+    # Load data (shared with concurrent identical requests)
     service = EnhancedFairnessService()
-    df, y_true, y_pred, y_prob, sensitive_attrs = service._load_and_prepare_data(dataset, audit)
+    try:
+        df, y_true, y_pred, y_prob, sensitive_attrs = await service.load_audit_data(dataset, audit)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
     
     if df is None:
         raise HTTPException(status_code=400, detail="Failed to load dataset")
@@ -111,10 +133,10 @@ async def generate_counterfactual(
     
     instance = X.iloc[request.instance_index].values
     
-    # Train a simple model if needed
-    from sklearn.linear_model import LogisticRegression
-    model = LogisticRegression(max_iter=1000)
-    model.fit(X, y_true)
+    # Train a simple model if needed (shared with concurrent requests on this audit)
+    model = await analysis_flights.do(
+        service.analysis_key(dataset, audit, "whatif_model"), _fit_whatif_model, X, y_true
+    )
     
     # Create What-If analyzer
     analyzer = WhatIfAnalyzer(model, X.columns.tolist())
@@ -182,10 +204,15 @@ async def calculate_feature_importance(
     
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    # Content pinned when the audit was created
+    dataset = await dataset_service.get_audit_source(db, audit, dataset)
     
-    # Load data
+    # Load data (shared with concurrent identical requests)
     service = EnhancedFairnessService()
-    df, y_true, y_pred, y_prob, sensitive_attrs = service._load_and_prepare_data(dataset, audit)
+    try:
+        df, y_true, y_pred, y_prob, sensitive_attrs = await service.load_audit_data(dataset, audit)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
     
     if df is None:
         raise HTTPException(status_code=400, detail="Failed to load dataset")
@@ -206,19 +233,14 @@ async def calculate_feature_importance(
         X_sample = X
         y_sample = y_true
     
-    # Train model
-    from sklearn.linear_model import LogisticRegression
-    model = LogisticRegression(max_iter=1000)
-    model.fit(X_sample, y_sample)
-    
-    # Create What-If analyzer
-    analyzer = WhatIfAnalyzer(model, X.columns.tolist())
+    key = service.analysis_key(
+        dataset, audit, "feature_importance", method=request.method, sample_size=request.sample_size
+    )
     
     try:
-        # Calculate feature importance
-        importance_result = analyzer.calculate_feature_importance(
-            X=X_sample.values,
-            method=request.method
+        # Train model and calculate feature importance (shared with concurrent identical requests)
+        importance_result = await analysis_flights.do(
+            key, _compute_feature_importance, X_sample, y_sample, request.method
         )
         
         return {
@@ -266,10 +288,15 @@ async def explore_prediction(
     
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    # Content pinned when the audit was created
+    dataset = await dataset_service.get_audit_source(db, audit, dataset)
     
-    # Load data
+    # Load data (shared with concurrent identical requests)
     service = EnhancedFairnessService()
-    df, y_true, y_pred, y_prob, sensitive_attrs = service._load_and_prepare_data(dataset, audit)
+    try:
+        df, y_true, y_pred, y_prob, sensitive_attrs = await service.load_audit_data(dataset, audit)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
     
     if df is None:
         raise HTTPException(status_code=400, detail="Failed to load dataset")
@@ -295,10 +322,10 @@ async def explore_prediction(
             k: tuple(v) for k, v in request.feature_ranges.items()
         }
     
-    # Train model
-    from sklearn.linear_model import LogisticRegression
-    model = LogisticRegression(max_iter=1000)
-    model.fit(X, y_true)
+    # Train model (shared with concurrent requests on this audit)
+    model = await analysis_flights.do(
+        service.analysis_key(dataset, audit, "whatif_model"), _fit_whatif_model, X, y_true
+    )
     
     # Create What-If analyzer
     analyzer = WhatIfAnalyzer(model, X.columns.tolist())
@@ -352,10 +379,15 @@ async def get_instances_for_exploration(
     
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    # Content pinned when the audit was created
+    dataset = await dataset_service.get_audit_source(db, audit, dataset)
     
-    # Load data
+    # Load data (shared with concurrent identical requests)
     service = EnhancedFairnessService()
-    df, y_true, y_pred, y_prob, sensitive_attrs = service._load_and_prepare_data(dataset, audit)
+    try:
+        df, y_true, y_pred, y_prob, sensitive_attrs = await service.load_audit_data(dataset, audit)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
     
     if df is None:
         raise HTTPException(status_code=400, detail="Failed to load dataset")
@@ -0,0 +1,147 @@
+"""
+Cache mémoire à durée de vie limitée (TTL) et regroupement des calculs concurrents
+
+TTLCache est utilisé pour les résultats courts et très sollicités (statistiques
+du dashboard) ; les entrées sont invalidées explicitement lorsqu'un événement
+métier rend la valeur obsolète. SingleFlight évite de lancer plusieurs fois le
+même calcul coûteux (chargement d'un dataset, entraînement d'un modèle) quand
+des requêtes identiques arrivent en même temps.
+"""
+import asyncio
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Cache clé -> valeur dont les entrées expirent après ttl_seconds.
+    Thread-safe (les tâches d'arrière-plan peuvent invalider en parallèle).
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retourne la valeur si elle est présente et non expirée, sinon None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._purge_expired()
+                if len(self._entries) >= self.max_entries:
+                    # Supprimer l'entrée qui expire le plus tôt
+                    oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                    del self._entries[oldest]
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def invalidate(self, *keys: Hashable):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+
+
+class SingleFlight:
+    """
+    Regroupe les appels concurrents de même clé
+
+    Tant qu'un calcul est en cours pour une clé, les appels suivants
+    attendent son résultat (ou son exception) au lieu de le relancer.
+    Rien n'est conservé une fois le calcul terminé. À utiliser depuis la
+    boucle d'événements (un regroupement par processus).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"executions": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Résultat de fn(*args, **kwargs), partagé avec les appels concurrents de même clé
+
+        fn peut être une fonction coroutine, ou une fonction synchrone (exécutée
+        dans le pool de threads).
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["shared"] += 1
+            return await asyncio.shield(future)
+
+        if inspect.iscoroutinefunction(fn):
+            awaitable: Awaitable = fn(*args, **kwargs)
+        else:
+            awaitable = asyncio.to_thread(fn, *args, **kwargs)
+        task = asyncio.ensure_future(awaitable)
+        self._inflight[key] = task
+        self.stats["executions"] += 1
+
+        def _done(finished: asyncio.Future):
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            # Exception déjà transmise aux appelants ; évite l'avertissement si tous ont été annulés
+            if not finished.cancelled():
+                finished.exception()
+
+        task.add_done_callback(_done)
+        # shield : l'annulation d'un appelant (client déconnecté) n'interrompt pas les autres
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+
+def flight_key(content_hash: str, operation: str, **params: Any) -> Tuple[str, str, str]:
+    """Clé (hash du dataset, opération, paramètres) ; les paramètres sont normalisés en JSON"""
+    return (content_hash, operation, json.dumps(params, sort_keys=True, default=str))
+
+
+# Calculs d'analyse sur un dataset (chargement, modèles, SHAP...)
+analysis_flights = SingleFlight()
+
+
+# Résultats de détection de fuite (modèles prédisant les attributs sensibles), par version
+# de dataset : la clé contient le hash du contenu, une modification crée une nouvelle entrée
+leakage_cache = TTLCache(ttl_seconds=float(os.getenv("LEAKAGE_CACHE_TTL", "86400")), max_entries=256)
+
+
+# Statistiques du dashboard (/api/audits/stats), par organisation ou par utilisateur
+dashboard_stats_cache = TTLCache(ttl_seconds=float(os.getenv("DASHBOARD_STATS_TTL", "30")))
+
+
+def dashboard_stats_key(user_id: int, organization_id: Optional[int]) -> Tuple[str, int]:
+    """Clé de cache : les stats sont partagées par toute l'organisation"""
+    if organization_id:
+        return ("org", organization_id)
+    return ("user", user_id)
+
+
+def invalidate_dashboard_stats(user_id: int, organization_id: Optional[int]):
+    """À appeler quand un audit est créé, terminé ou supprimé"""
+    keys = [("user", user_id)]
+    if organization_id:
+        keys.append(("org", organization_id))
+    dashboard_stats_cache.invalidate(*keys)
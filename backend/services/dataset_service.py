@@ -1,16 +1,47 @@
 from datetime import datetime, timedelta
 import pandas as pd
+import asyncio
+import hashlib
 import io
+import json
 import os
-from sqlalchemy.ext.asyncio import AsyncSession
-from models.dataset import Dataset
-from services.supabase_storage import storage_service
-from utils.dataset_processing import calculate_file_hash, get_column_info
-from typing import Optional, Dict, Any
+from pathlib import Path
+from sqlalchemy import select, delete, func, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_object_session
+from models.dataset import Audit, Dataset, DatasetBlob, DatasetVersion
+from services.storage import storage, StorageError
+from services.storage.parquet import dataframe_to_parquet, read_parquet
+from utils.dataset_processing import calculate_file_hash, calculate_path_hash
+from utils.profiling import PROFILE_VERSION, profile_dataframe, profile_file
+from typing import Optional, Dict, Any, List, Union
+
+# Nombre de lignes de l'aperçu stocké avec le dataset
+PREVIEW_ROWS = 50
+
+# Colonnes écrites seules (DatasetVersion.column_overlays) : un blob Parquet par colonne
+OVERLAY_MIME_TYPE = "application/vnd.apache.parquet"
+
 
 class DatasetService:
     """
     Service centralisé pour la création et la gestion des datasets.
+    
+    Les fichiers sont stockés par contenu (DatasetBlob, clé = SHA-256) : un
+    ré-upload du même fichier ne réécrit rien dans le stockage et réutilise le
+    profil et l'aperçu déjà calculés. Un blob pouvant être partagé, une
+    modification du contenu d'un dataset crée un nouveau blob (copy-on-write).
+    
+    Le mapping de colonnes (Dataset.column_mappings, {colonne stockée: nom
+    affiché}) est une vue appliquée à la lecture : le fichier, le profil,
+    l'aperçu et la copie Parquet gardent les noms stockés et ne sont pas
+    réécrits quand le mapping change.
+    
+    Chaque modification crée une version immuable (DatasetVersion) que les
+    audits épinglent. Quand les lignes ne changent pas, seules les colonnes
+    modifiées ou ajoutées sont écrites (column_overlays) par-dessus le
+    fichier de base, qui reste partagé. Les fonctions de lecture acceptent
+    indifféremment un Dataset (version courante) ou une DatasetVersion.
     """
     
     @staticmethod
@@ -29,129 +60,762 @@ class DatasetService:
         Gère le stockage, le calcul des métadonnées et l'enregistrement en DB.
         """
         
-        # 1. Calculer les statistiques et infos de colonnes
-        row_count = len(df)
-        column_count = len(df.columns)
-        columns_info = get_column_info(df)
-        
-        # 2. Préparer le contenu pour le stockage
-        if mime_type == "text/csv" or original_filename.endswith(".csv"):
-            content = df.to_csv(index=False, encoding=encoding).encode(encoding)
-        else:
-            output = io.BytesIO()
-            df.to_excel(output, index=False)
-            content = output.getvalue()
-            
-        file_size = len(content)
+        # 1. Préparer le contenu pour le stockage
+        content = DatasetService._serialize_df(df, mime_type, original_filename, encoding)
         file_hash = calculate_file_hash(content)
         
-        # 3. Sauvegarder dans le stockage (Supabase ou Local fallback)
-        safe_filename = f"{user_id}_{datetime.utcnow().timestamp()}_{original_filename}"
+        # 2. Blob existant (même contenu) ou nouveau blob profilé et stocké
+        blob = await DatasetService.get_blob(db, file_hash)
+        if blob is None:
+            blob = await DatasetService._store_blob(
+                db,
+                file_hash=file_hash,
+                original_filename=original_filename,
+                mime_type=mime_type,
+                encoding=encoding,
+                content=content,
+                profile=profile_dataframe(df),
+                preview=DatasetService.build_preview(df)
+            )
+        
+        # 3. Créer l'entrée en base de données
+        dataset = DatasetService._dataset_from_blob(
+            blob,
+            user_id=user_id,
+            organization_id=organization_id,
+            connection_id=connection_id,
+            original_filename=original_filename,
+            mime_type=mime_type,
+            encoding=encoding
+        )
+        
+        db.add(dataset)
+        await DatasetService.record_version(db, dataset, 'upload')
+        await db.commit()
+        await db.refresh(dataset)
+        
+        return dataset
+
+    @staticmethod
+    async def create_dataset_from_file(
+        db: AsyncSession,
+        file_path: str,
+        user_id: int,
+        original_filename: str,
+        mime_type: str = "text/csv",
+        encoding: str = "utf-8",
+        organization_id: Optional[int] = None,
+        connection_id: Optional[int] = None,
+        df: Optional[pd.DataFrame] = None,
+        file_hash: Optional[str] = None,
+        profile: Optional[Dict[str, Any]] = None,
+        preview: Optional[List[Dict[str, Any]]] = None,
+        **extra_fields: Any
+    ) -> Dataset:
+        """
+        Crée un dataset à partir d'un fichier déjà écrit sur disque.
+        Le fichier est stocké tel quel (pas de re-sérialisation du DataFrame).
         
-        storage_success = False
-        if storage_service.is_available():
-            storage_path = await storage_service.upload_file(safe_filename, content, mime_type)
-            if storage_path:
-                storage_success = True
+        df: DataFrame déjà parsé du fichier (évite une seconde lecture)
+        file_hash: SHA-256 déjà calculé (ex: pendant l'upload en streaming)
+        profile, preview: profil et aperçu déjà calculés (ex: contrôle de la limite de lignes à l'upload)
+        extra_fields: attributs supplémentaires du Dataset (ex: has_predictions)
+        """
+        if file_hash is None:
+            file_hash = calculate_path_hash(file_path)
         
-        if not storage_success:
-            # Fallback local
-            upload_dir = os.path.join("uploads")
-            if not os.path.exists(upload_dir):
-                os.makedirs(upload_dir)
+        # 1. Blob existant : ni profilage ni écriture dans le stockage
+        blob = await DatasetService.get_blob(db, file_hash)
+        if blob is None:
+            # Profil des colonnes et aperçu (le fichier est lu par blocs s'il n'est pas déjà parsé)
+            if profile is None or preview is None:
+                if df is None and (mime_type == "text/csv" or original_filename.endswith(".csv")):
+                    profile = profile_file(file_path, encoding=encoding)
+                    preview = DatasetService.build_preview(
+                        pd.read_csv(file_path, encoding=encoding, nrows=PREVIEW_ROWS)
+                    )
+                else:
+                    if df is None:
+                        df = pd.read_excel(file_path)
+                    profile = profile_dataframe(df)
+                    preview = DatasetService.build_preview(df)
             
-            local_path = os.path.join(upload_dir, safe_filename)
-            with open(local_path, "wb") as f:
-                f.write(content)
+            blob = await DatasetService._store_blob(
+                db,
+                file_hash=file_hash,
+                original_filename=original_filename,
+                mime_type=mime_type,
+                encoding=encoding,
+                file_path=file_path,
+                profile=profile,
+                preview=preview,
+                df=df
+            )
         
-        # 4. Créer l'entrée en base de données
-        dataset = Dataset(
+        # 2. Créer l'entrée en base de données
+        dataset = DatasetService._dataset_from_blob(
+            blob,
             user_id=user_id,
             organization_id=organization_id,
             connection_id=connection_id,
-            filename=safe_filename,
             original_filename=original_filename,
-            file_size=file_size,
-            file_hash=file_hash,
             mime_type=mime_type,
             encoding=encoding,
-            row_count=row_count,
-            column_count=column_count,
-            columns_info={'columns': columns_info},
-            status='ready',
-            retention_date=datetime.utcnow() + timedelta(days=30)
+            **extra_fields
         )
         
         db.add(dataset)
+        await DatasetService.record_version(db, dataset, 'upload')
         await db.commit()
         await db.refresh(dataset)
         
         return dataset
 
     @staticmethod
-    async def get_dataset_df(dataset: Dataset) -> pd.DataFrame:
-        """
-        Charge un dataset depuis le stockage (Supabase ou Local) et retourne un DataFrame.
+    async def get_blob(db: AsyncSession, file_hash: str) -> Optional[DatasetBlob]:
+        """Blob déjà stocké pour ce contenu, ou None"""
+        result = await db.execute(select(DatasetBlob).where(DatasetBlob.sha256 == file_hash))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def blob_storage_key(file_hash: str, original_filename: str) -> str:
+        """Nom du fichier dans le stockage, dérivé du contenu uniquement"""
+        extension = Path(original_filename).suffix.lower() or ".csv"
+        return f"blob_{file_hash}{extension}"
+
+    @staticmethod
+    def columnar_storage_key(file_hash: str) -> str:
+        """Copie Parquet du blob (lectures partielles par colonnes / row groups)"""
+        return f"blob_{file_hash}.parquet"
+
+    @staticmethod
+    async def _store_blob(
+        db: AsyncSession,
+        file_hash: str,
+        original_filename: str,
+        mime_type: str,
+        encoding: str,
+        profile: Dict[str, Any],
+        preview: List[Dict[str, Any]],
+        content: Optional[bytes] = None,
+        file_path: Optional[str] = None,
+        df: Optional[pd.DataFrame] = None
+    ) -> DatasetBlob:
         """
-        content = None
+        Écrit le contenu dans le stockage et enregistre le blob
         
-        # 1. Tenter le téléchargement depuis Supabase
-        if storage_service.is_available():
-            content = await storage_service.download_file(dataset.filename)
+        L'écriture est idempotente (la clé ne dépend que du contenu) : si un
+        autre upload du même fichier a créé le blob entre-temps, c'est ce
+        blob qui est retourné.
         
-        # 2. Fallback local si nécessaire
-        if content is None:
-            upload_dir = os.path.join("uploads")
-            local_path = os.path.join(upload_dir, dataset.filename)
-            if os.path.exists(local_path):
-                with open(local_path, "rb") as f:
-                    content = f.read()
+        df: DataFrame parsé du fichier ; sa copie Parquet est écrite tout de
+        suite (sinon elle l'est à la première lecture partielle)
+        """
+        storage_key = DatasetService.blob_storage_key(file_hash, original_filename)
+        await DatasetService._write_storage(storage_key, mime_type, content=content, file_path=file_path)
+        if df is not None:
+            await DatasetService._write_columnar(file_hash, df)
         
-        if content is None:
-            raise FileNotFoundError(f"Dataset file {dataset.filename} not found in storage or local.")
-            
-        # 3. Charger en DataFrame
-        if dataset.mime_type == 'text/csv' or dataset.filename.endswith('.csv'):
-            return pd.read_csv(io.BytesIO(content), encoding=dataset.encoding)
+        blob = DatasetBlob(
+            sha256=file_hash,
+            storage_key=storage_key,
+            file_size=len(content) if content is not None else os.path.getsize(file_path),
+            mime_type=mime_type,
+            encoding=encoding,
+            row_count=profile['row_count'],
+            column_count=profile['column_count'],
+            columns_info=DatasetService.build_columns_info(profile),
+            preview_data=preview,
+            ref_count=0
+        )
+        try:
+            async with db.begin_nested():
+                db.add(blob)
+        except IntegrityError:
+            return await DatasetService.get_blob(db, file_hash)
+        return blob
+
+    @staticmethod
+    async def _write_storage(
+        storage_key: str,
+        mime_type: str,
+        content: Optional[bytes] = None,
+        file_path: Optional[str] = None
+    ):
+        """Écrit le contenu d'un blob (rien à faire s'il est déjà stocké : la clé ne dépend que du contenu)"""
+        if await storage.exists(storage_key):
+            return
+        if content is not None:
+            await storage.put(storage_key, content, mime_type)
         else:
-            return pd.read_excel(io.BytesIO(content))
+            await storage.put_file(storage_key, file_path, mime_type)
+
+    @staticmethod
+    async def _write_columnar(file_hash: str, df: pd.DataFrame):
+        """Écrit la copie Parquet d'un blob (optionnelle : un échec est seulement signalé)"""
+        try:
+            content = await asyncio.to_thread(dataframe_to_parquet, df)
+            await storage.put(DatasetService.columnar_storage_key(file_hash), content, "application/vnd.apache.parquet")
+        except Exception as e:
+            print(f"⚠️ Parquet copy of blob {file_hash} not written: {e}")
+
+    @staticmethod
+    def _dataset_from_blob(blob: DatasetBlob, **fields: Any) -> Dataset:
+        """Nouveau Dataset pointant sur un blob, avec ses métadonnées pré-calculées"""
+        fields.setdefault('status', 'ready')
+        fields.setdefault('retention_date', datetime.utcnow() + timedelta(days=30))
+        return Dataset(
+            blob_id=blob.id,
+            filename=blob.storage_key,
+            file_size=blob.file_size,
+            file_hash=blob.sha256,
+            row_count=blob.row_count,
+            column_count=blob.column_count,
+            columns_info=blob.columns_info,
+            preview_data=blob.preview_data,
+            **fields
+        )
 
     @staticmethod
-    async def save_dataset_df(dataset: Dataset, df: pd.DataFrame) -> bool:
+    async def release_unreferenced_blobs(db: AsyncSession) -> int:
         """
-        Sauvegarde un DataFrame mis à jour dans le stockage d'origine.
+        Supprime les blobs qui ne sont plus référencés par aucun dataset ni aucune version
+        (à appeler après le commit qui a retiré la dernière référence).
+        
+        Returns:
+            Nombre de blobs supprimés
         """
-        # 1. Convertir le DataFrame en bytes
-        if dataset.mime_type == 'text/csv' or dataset.filename.endswith('.csv'):
-            content = df.to_csv(index=False, encoding=dataset.encoding).encode(dataset.encoding)
+        result = await db.execute(
+            select(DatasetBlob.id, DatasetBlob.sha256, DatasetBlob.storage_key).where(DatasetBlob.ref_count <= 0)
+        )
+        released = 0
+        for blob_id, file_hash, storage_key in result.all():
+            # Condition re-vérifiée : le blob a pu être réutilisé entre-temps
+            deleted = await db.execute(
+                delete(DatasetBlob).where(DatasetBlob.id == blob_id, DatasetBlob.ref_count <= 0)
+            )
+            await db.commit()
+            if not deleted.rowcount:
+                continue
+            
+            for key in (storage_key, DatasetService.columnar_storage_key(file_hash)):
+                try:
+                    await storage.delete(key)
+                except StorageError as e:
+                    print(f"⚠️ Blob {key} not deleted from storage: {e}")
+            released += 1
+        
+        return released
+
+    @staticmethod
+    async def legacy_files(db: AsyncSession, dataset: Dataset) -> List[str]:
+        """Fichiers propres au dataset (antérieurs aux blobs), courant ou gardés par ses versions"""
+        result = await db.execute(
+            select(DatasetVersion.filename).where(
+                DatasetVersion.dataset_id == dataset.id, DatasetVersion.blob_id.is_(None)
+            )
+        )
+        files = set(result.scalars())
+        if dataset.blob_id is None:
+            files.add(dataset.filename)
+        return sorted(files)
+
+    @staticmethod
+    async def record_version(
+        db: AsyncSession,
+        dataset: Dataset,
+        operation: str,
+        recipe: Optional[Dict[str, Any]] = None
+    ) -> DatasetVersion:
+        """
+        Enregistre le contenu courant du dataset comme nouvelle version et en
+        fait la version courante (flush ; commit à la charge de l'appelant)
+        
+        operation / recipe: transformation qui a produit ce contenu et ses paramètres
+        """
+        if dataset.id is None:
+            await db.flush()
+        result = await db.execute(
+            select(func.max(DatasetVersion.version)).where(DatasetVersion.dataset_id == dataset.id)
+        )
+        version = DatasetVersion(
+            dataset_id=dataset.id,
+            version=(result.scalar() or 0) + 1,
+            parent_id=dataset.version_id,
+            operation=operation,
+            recipe=recipe,
+            blob_id=dataset.blob_id,
+            filename=dataset.filename,
+            file_hash=dataset.file_hash,
+            file_size=dataset.file_size,
+            mime_type=dataset.mime_type,
+            encoding=dataset.encoding,
+            column_overlays=dataset.column_overlays,
+            column_mappings=dataset.column_mappings,
+            row_count=dataset.row_count,
+            column_count=dataset.column_count,
+            columns_info=dataset.columns_info
+        )
+        db.add(version)
+        await db.flush()
+        dataset.version_id = version.id
+        return version
+
+    @staticmethod
+    async def ensure_version(db: AsyncSession, dataset: Dataset) -> int:
+        """
+        Identifiant de la version courante ; les datasets antérieurs aux versions
+        reçoivent d'abord une version de leur contenu actuel (qui est ainsi conservé)
+        """
+        if dataset.version_id is None:
+            await DatasetService.record_version(db, dataset, 'upload')
+        return dataset.version_id
+
+    @staticmethod
+    async def get_audit_source(db: AsyncSession, audit: Audit, dataset: Dataset) -> Union[Dataset, DatasetVersion]:
+        """
+        Contenu analysé par un audit : la version épinglée à sa création, ou le
+        dataset (version courante) pour les audits antérieurs aux versions
+        """
+        if audit.dataset_version_id is None:
+            return dataset
+        version = await db.get(DatasetVersion, audit.dataset_version_id)
+        return version if version is not None else dataset
+
+    @staticmethod
+    def build_columns_info(profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Contenu de Dataset.columns_info à partir d'un profil (utils.profiling)"""
+        return {'columns': profile['columns'], 'profile_version': profile['version']}
+
+    @staticmethod
+    def build_preview(df: pd.DataFrame, rows: int = PREVIEW_ROWS) -> List[Dict[str, Any]]:
+        """
+        Premières lignes sérialisables en JSON (valeurs manquantes -> '')
+        """
+        records = json.loads(
+            df.head(rows).to_json(
+                orient='records', date_format='iso', double_precision=15, default_handler=str
+            )
+        )
+        return [
+            {key: ('' if value is None else value) for key, value in record.items()}
+            for record in records
+        ]
+
+    @staticmethod
+    def get_column_mapping(dataset: Dataset) -> Dict[str, str]:
+        """Renommages actifs {colonne stockée: nom affiché}"""
+        return {
+            stored: mapped for stored, mapped in (dataset.column_mappings or {}).items()
+            if mapped and mapped != stored
+        }
+
+    @staticmethod
+    def apply_column_mapping(dataset: Dataset, df: pd.DataFrame) -> pd.DataFrame:
+        """Vue du DataFrame stocké avec les noms du mapping (renommage sans copie des données)"""
+        mapping = DatasetService.get_column_mapping(dataset)
+        return df.rename(columns=mapping) if mapping else df
+
+    @staticmethod
+    def _stored_names(dataset: Dataset, columns: List[str]) -> List[str]:
+        """Colonnes stockées correspondant à des noms affichés (noms masqués par le mapping ignorés)"""
+        mapping = DatasetService.get_column_mapping(dataset)
+        if not mapping:
+            return list(columns)
+        inverse = {mapped: stored for stored, mapped in mapping.items()}
+        return [inverse.get(col, col) for col in columns if col in inverse or col not in mapping]
+
+    @staticmethod
+    def view_version(dataset: Dataset) -> str:
+        """Version du contenu tel que vu par les analyses : hash du fichier, des colonnes écrites à part et du mapping"""
+        mapping = DatasetService.get_column_mapping(dataset)
+        overlays = dataset.column_overlays or {}
+        if not mapping and not overlays:
+            return dataset.file_hash
+        state = {'mapping': mapping, 'overlays': overlays} if overlays else mapping
+        digest = hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()[:16]
+        return f"{dataset.file_hash}:{digest}"
+
+    @staticmethod
+    def get_stored_column_names(dataset: Dataset) -> List[str]:
+        """Noms des colonnes dans le fichier stocké (profil, sans le mapping)"""
+        info = dataset.columns_info
+        columns = info.get('columns', []) if isinstance(info, dict) else (info or [])
+        return [col['name'] for col in columns]
+
+    @staticmethod
+    def _mapped_columns(dataset: Dataset, columns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        mapping = DatasetService.get_column_mapping(dataset)
+        if not mapping:
+            return columns
+        return [{**col, 'name': mapping.get(col['name'], col['name'])} for col in columns]
+
+    @staticmethod
+    def get_columns_info(dataset: Dataset) -> Any:
+        """Dataset.columns_info (format stocké conservé) avec les noms du mapping"""
+        info = dataset.columns_info
+        if isinstance(info, dict):
+            return {**info, 'columns': DatasetService._mapped_columns(dataset, info.get('columns', []))}
+        return DatasetService._mapped_columns(dataset, info or [])
+
+    @staticmethod
+    def get_column_list(dataset: Dataset) -> List[Dict[str, Any]]:
+        """Colonnes du profil stocké, quel que soit son format, avec les noms du mapping"""
+        info = DatasetService.get_columns_info(dataset)
+        return info.get('columns', []) if isinstance(info, dict) else info
+
+    @staticmethod
+    def get_preview(dataset: Dataset, preview_data: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Aperçu stocké (ou fourni) avec les noms du mapping"""
+        preview_data = dataset.preview_data if preview_data is None else preview_data
+        mapping = DatasetService.get_column_mapping(dataset)
+        if not mapping or not preview_data:
+            return preview_data or []
+        return [{mapping.get(key, key): value for key, value in row.items()} for row in preview_data]
+
+    @staticmethod
+    def get_profile_columns(dataset: Dataset) -> Optional[List[Dict[str, Any]]]:
+        """
+        Profil stocké des colonnes (noms du mapping), ou None s'il est absent ou
+        d'un format antérieur (les appelants recalculent alors à partir du DataFrame).
+        """
+        info = dataset.columns_info
+        if isinstance(info, dict) and info.get('profile_version') == PROFILE_VERSION:
+            return DatasetService._mapped_columns(dataset, info.get('columns') or [])
+        return None
+
+    @staticmethod
+    def refresh_profile(dataset: Dataset, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Recalcule le profil et l'aperçu après une modification du contenu
+        (commit à la charge de l'appelant)
+        """
+        profile = profile_dataframe(df)
+        dataset.columns_info = DatasetService.build_columns_info(profile)
+        dataset.preview_data = DatasetService.build_preview(df)
+        dataset.row_count = profile['row_count']
+        dataset.column_count = profile['column_count']
+        return profile
+
+    @staticmethod
+    def to_stored_columns(dataset: Dataset, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        DataFrame nommé selon le mapping -> noms stockés
+        
+        Si une colonne porte un nom stocké masqué par le mapping (il serait
+        renommé à la lecture), le mapping est intégré au contenu : df est gardé
+        tel quel et le mapping du dataset est effacé.
+        """
+        mapping = DatasetService.get_column_mapping(dataset)
+        if not mapping:
+            return df
+        inverse = {mapped: name for name, mapped in mapping.items()}
+        if any(col in mapping and col not in inverse for col in df.columns):
+            dataset.column_mappings = None
+            return df
+        return df.rename(columns=inverse)
+
+    @staticmethod
+    def _serialize_df(df: pd.DataFrame, mime_type: str, filename: str, encoding: str) -> bytes:
+        if mime_type == 'text/csv' or filename.endswith('.csv'):
+            return df.to_csv(index=False, encoding=encoding).encode(encoding)
+        output = io.BytesIO()
+        df.to_excel(output, index=False)
+        return output.getvalue()
+
+    @staticmethod
+    async def get_dataset_df(
+        dataset: Union[Dataset, DatasetVersion],
+        columns: Optional[List[str]] = None,
+        max_rows: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Charge un dataset (ou une version) depuis le stockage et retourne un DataFrame.
+        Le parsing est exécuté dans le pool de threads.
+        
+        columns / max_rows: lecture partielle (colonnes absentes ignorées). Pour un
+        dataset adossé à un blob, seuls les colonnes et row groups utiles de la
+        copie Parquet sont téléchargés ; la copie est créée à la première lecture
+        partielle si elle n'existe pas encore. Les colonnes écrites à part
+        (column_overlays) ne sont lues que si elles sont demandées.
+        
+        Les colonnes sont nommées selon le mapping du dataset (columns aussi).
+        """
+        stored_columns = None if columns is None else DatasetService._stored_names(dataset, columns)
+        overlays = dataset.column_overlays or {}
+        if not overlays:
+            df = await DatasetService._read_base(dataset, stored_columns, max_rows)
+            return DatasetService.apply_column_mapping(dataset, df)
+        
+        base_columns = None if stored_columns is None else [col for col in stored_columns if col not in overlays]
+        overlay_df = await DatasetService.read_overlays(dataset, stored_columns, max_rows)
+        if base_columns == []:
+            df = pd.DataFrame(index=overlay_df.index)
         else:
-            output = io.BytesIO()
-            df.to_excel(output, index=False)
-            content = output.getvalue()
+            df = await DatasetService._read_base(dataset, base_columns, max_rows)
+        return DatasetService.compose_view(dataset, df, overlay_df)
+
+    @staticmethod
+    async def _read_base(
+        dataset: Union[Dataset, DatasetVersion],
+        columns: Optional[List[str]],
+        max_rows: Optional[int]
+    ) -> pd.DataFrame:
+        """Fichier de base, noms stockés (columns : noms stockés)"""
+        partial = columns is not None or max_rows is not None
+        if partial and dataset.blob_id is not None:
+            columnar_key = DatasetService.columnar_storage_key(dataset.file_hash)
+            try:
+                return await read_parquet(storage, columnar_key, columns=columns, max_rows=max_rows)
+            except FileNotFoundError:
+                pass
+            except StorageError as e:
+                print(f"⚠️ Parquet copy {columnar_key} unreadable, loading the full file: {e}")
             
-        # 2. Sauvegarder dans le stockage (Supabase et Local pour synchro)
-        upload_success = False
-        
-        # Supabase
-        if storage_service.is_available():
-            path = await storage_service.upload_file(dataset.filename, content, dataset.mime_type)
-            if path:
-                upload_success = True
-                
-        # Local (toujours garder une copie locale si possible)
-        upload_dir = os.path.join("uploads")
-        if not os.path.exists(upload_dir):
-            os.makedirs(upload_dir)
-        
-        local_path = os.path.join(upload_dir, dataset.filename)
+            df = await DatasetService._load_df(dataset)
+            await DatasetService._write_columnar(dataset.file_hash, df)
+            return DatasetService._project(df, columns, max_rows)
+        
+        df = await DatasetService._load_df(dataset)
+        return DatasetService._project(df, columns, max_rows) if partial else df
+
+    @staticmethod
+    async def read_overlays(
+        dataset: Union[Dataset, DatasetVersion],
+        columns: Optional[List[str]] = None,
+        max_rows: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Colonnes écrites à part (column_overlays), noms stockés
+        
+        columns: noms stockés voulus (None : toutes) ; les autres ne sont pas lues
+        """
+        overlays = dataset.column_overlays or {}
+        wanted = [col for col in overlays if columns is None or col in columns]
+        parts = await asyncio.gather(*(
+            read_parquet(storage, DatasetService.columnar_storage_key(overlays[col]), max_rows=max_rows)
+            for col in wanted
+        ))
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat([part.iloc[:, 0].rename(col) for col, part in zip(wanted, parts)], axis=1)
+
+    @staticmethod
+    def compose_view(
+        dataset: Union[Dataset, DatasetVersion],
+        base: pd.DataFrame,
+        overlays: Optional[pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        Contenu vu par les analyses : fichier de base, colonnes écrites à part
+        par-dessus, colonnes du profil de la version (ordre compris), mapping
+        
+        base / overlays: noms stockés, mêmes lignes dans le même ordre
+        """
+        if dataset.column_overlays and overlays is not None and len(overlays.columns):
+            base = base.assign(**{col: overlays[col].array for col in overlays.columns})
+        if dataset.column_overlays:
+            # Colonnes du fichier de base retirées depuis (drop_column, suppression)
+            order = DatasetService.get_stored_column_names(dataset)
+            if order:
+                base = base[[col for col in order if col in base.columns]]
+        return DatasetService.apply_column_mapping(dataset, base)
+
+    @staticmethod
+    async def get_local_path(dataset: Dataset) -> str:
+        """
+        Chemin local du fichier du dataset : le dossier uploads/ ou, pour un
+        stockage distant, le cache disque (un seul téléchargement par version)
+        """
         try:
-            with open(local_path, "wb") as f:
-                f.write(content)
-            if not storage_service.is_available():
-                upload_success = True # Succès local si Supabase off
-        except Exception as e:
-            print(f"❌ Local Save Error: {e}")
-            
-        return upload_success
+            return str(await storage.local_path(dataset.filename, dataset.file_hash))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Dataset file {dataset.filename} not found in storage.")
+
+    @staticmethod
+    async def _load_df(dataset: Dataset) -> pd.DataFrame:
+        path = await DatasetService.get_local_path(dataset)
+        return await asyncio.to_thread(DatasetService._read_df, path, dataset)
+
+    @staticmethod
+    def _project(df: pd.DataFrame, columns: Optional[List[str]], max_rows: Optional[int]) -> pd.DataFrame:
+        if columns is not None:
+            wanted = set(columns)
+            df = df[[col for col in df.columns if col in wanted]]
+        return df.head(max_rows) if max_rows is not None else df
+
+    @staticmethod
+    def _read_df(path: str, dataset: Dataset) -> pd.DataFrame:
+        if dataset.mime_type == 'text/csv' or dataset.filename.endswith('.csv'):
+            return pd.read_csv(path, encoding=dataset.encoding)
+        else:
+            return pd.read_excel(path)
+
+    @staticmethod
+    async def save_dataset_df(
+        dataset: Dataset,
+        df: pd.DataFrame,
+        operation: str = 'edit',
+        recipe: Optional[Dict[str, Any]] = None,
+        changed_columns: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Enregistre un DataFrame mis à jour comme nouvelle version du dataset.
+        Le profil des colonnes est recalculé (commit à la charge de l'appelant).
+        
+        La version courante n'est pas modifiée (copy-on-write) :
+        - changed_columns : colonnes modifiées ou ajoutées, les lignes et les
+          autres colonnes étant inchangées (même ordre) ; seules ces colonnes
+          sont écrites et profilées, le fichier de base reste partagé ;
+        - sinon, ou si les lignes ont changé, le contenu complet est écrit
+          dans le blob du nouveau contenu.
+        Les blobs qui ne sont plus référencés par aucun dataset ni aucune
+        version sont libérés par release_unreferenced_blobs après le commit.
+        
+        df porte les noms du mapping : ils sont ramenés aux noms stockés pour
+        que le mapping reste valable.
+        
+        operation / recipe: transformation enregistrée avec la version
+        """
+        db = async_object_session(dataset)
+        await DatasetService.ensure_version(db, dataset)
+        df = DatasetService.to_stored_columns(dataset, df)
+        
+        written = False
+        if changed_columns is not None:
+            inverse = {mapped: name for name, mapped in DatasetService.get_column_mapping(dataset).items()}
+            changed = [inverse.get(col, col) for col in dict.fromkeys(changed_columns)]
+            changed = [col for col in changed if col in df.columns]
+            if changed and len(df) == dataset.row_count:
+                written = await DatasetService._write_overlays(
+                    db, dataset, df[changed], list(df.columns), DatasetService.build_preview(df)
+                )
+        
+        if not written:
+            profile = DatasetService.refresh_profile(dataset, df)
+            content = DatasetService._serialize_df(df, dataset.mime_type, dataset.filename, dataset.encoding)
+            file_hash = calculate_file_hash(content)
+            blob = await DatasetService.get_blob(db, file_hash)
+            if blob is None:
+                blob = await DatasetService._store_blob(
+                    db,
+                    file_hash=file_hash,
+                    original_filename=dataset.filename,
+                    mime_type=dataset.mime_type,
+                    encoding=dataset.encoding,
+                    content=content,
+                    profile=profile,
+                    preview=dataset.preview_data
+                )
+            # Les datasets antérieurs aux blobs passent aussi par un blob : leur
+            # fichier reste celui de leurs versions précédentes
+            dataset.blob_id = blob.id
+            dataset.filename = blob.storage_key
+            dataset.file_hash = blob.sha256
+            dataset.file_size = blob.file_size
+            dataset.column_overlays = None
+        
+        await DatasetService.record_version(db, dataset, operation, recipe)
+        return True
+
+    @staticmethod
+    async def add_dataset_columns(
+        dataset: Dataset,
+        columns: pd.DataFrame,
+        operation: str,
+        recipe: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Ajoute (ou remplace) des colonnes dans une nouvelle version du dataset,
+        sans lire ni réécrire le reste du contenu (commit à la charge de l'appelant)
+        
+        columns: une ligne par ligne du dataset, dans le même ordre ; noms du mapping
+        
+        Raises:
+            ValueError: nombre de lignes différent de celui du dataset
+        """
+        if len(columns) != dataset.row_count:
+            raise ValueError(f"Expected {dataset.row_count} rows, got {len(columns)}")
+        db = async_object_session(dataset)
+        await DatasetService.ensure_version(db, dataset)
+        
+        inverse = {mapped: name for name, mapped in DatasetService.get_column_mapping(dataset).items()}
+        values = columns.rename(columns=inverse).reset_index(drop=True)
+        stored = DatasetService.get_stored_column_names(dataset)
+        order = stored + [col for col in values.columns if col not in stored]
+        
+        if 'preview_data' in inspect(dataset).unloaded:
+            await db.refresh(dataset, attribute_names=['preview_data'])
+        added = DatasetService.build_preview(values)
+        preview = [
+            {**row, **new_values}
+            for row, new_values in zip(dataset.preview_data or [{} for _ in added], added)
+        ]
+        
+        if not await DatasetService._write_overlays(db, dataset, values, order, preview):
+            # Profil absent ou d'un format antérieur : contenu complet réécrit
+            df = await DatasetService.get_dataset_df(dataset)
+            df = df.assign(**{col: columns[col].array for col in columns.columns})
+            return await DatasetService.save_dataset_df(dataset, df, operation, recipe)
+        
+        await DatasetService.record_version(db, dataset, operation, recipe)
+        return True
+
+    @staticmethod
+    async def _write_overlays(
+        db: AsyncSession,
+        dataset: Dataset,
+        values: pd.DataFrame,
+        order: List[str],
+        preview: List[Dict[str, Any]]
+    ) -> bool:
+        """
+        Écrit les colonnes de values (noms stockés) en blobs Parquet d'une
+        colonne et met à jour le dataset : colonnes écrites à part, profil
+        (seules ces colonnes sont profilées), aperçu, nombre de colonnes.
+        
+        order: colonnes stockées du nouveau contenu, dans l'ordre
+        
+        Returns:
+            False (rien n'est écrit) si le profil stocké ne couvre pas les autres colonnes
+        """
+        info = dataset.columns_info
+        if not isinstance(info, dict) or info.get('profile_version') != PROFILE_VERSION:
+            return False
+        profiles = {col['name']: col for col in info.get('columns') or []}
+        if any(col not in profiles for col in order if col not in values.columns):
+            return False
+        
+        overlays = dict(dataset.column_overlays or {})
+        for col in values.columns:
+            blob = await DatasetService._store_column(db, values[[col]].reset_index(drop=True))
+            overlays[col] = blob.sha256
+            profiles[col] = blob.columns_info['columns'][0]
+        
+        dataset.column_overlays = {col: digest for col, digest in overlays.items() if col in order}
+        dataset.columns_info = {'columns': [profiles[col] for col in order], 'profile_version': PROFILE_VERSION}
+        dataset.preview_data = [{col: row[col] for col in order if col in row} for row in preview]
+        dataset.column_count = len(order)
+        return True
+
+    @staticmethod
+    async def _store_column(db: AsyncSession, column: pd.DataFrame) -> DatasetBlob:
+        """Blob Parquet d'une colonne (réutilisé si le même contenu est déjà stocké)"""
+        content = await asyncio.to_thread(dataframe_to_parquet, column)
+        file_hash = calculate_file_hash(content)
+        blob = await DatasetService.get_blob(db, file_hash)
+        if blob is None:
+            # La clé du blob est aussi celle de sa « copie Parquet » : les lectures partielles le lisent directement
+            blob = await DatasetService._store_blob(
+                db,
+                file_hash=file_hash,
+                original_filename=DatasetService.columnar_storage_key(file_hash),
+                mime_type=OVERLAY_MIME_TYPE,
+                encoding='utf-8',
+                content=content,
+                profile=profile_dataframe(column),
+                preview=None
+            )
+        return blob
 
 dataset_service = DatasetService()
@@ -3,6 +3,8 @@ import numpy as np
 from typing import Dict, Any, List, Optional
 import logging
 
+from utils.profiling import profile_dataframe
+
 logger = logging.getLogger(__name__)
 
 class EDAService:
@@ -11,17 +13,29 @@ class EDAService:
     Fournit des statistiques descriptives, des analyses de corrélation et des distributions.
     """
 
-    def generate_eda_report(self, df: pd.DataFrame, target_column: Optional[str] = None, sensitive_attributes: Optional[List[str]] = None) -> Dict[str, Any]:
+    def generate_eda_report(
+        self,
+        df: pd.DataFrame,
+        target_column: Optional[str] = None,
+        sensitive_attributes: Optional[List[str]] = None,
+        profile_columns: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Génère un rapport EDA complet pour le dataset.
+
+        profile_columns: profil stocké du dataset (utils.profiling) ; s'il est
+        absent, il est calculé en une passe sur df.
         """
         logger.info("Starting EDA report generation")
         
+        if profile_columns is None:
+            profile_columns = profile_dataframe(df)['columns']
+        
         # 1. Statistiques descriptives
-        descriptive_stats = self._get_descriptive_stats(df)
+        descriptive_stats = self._get_descriptive_stats(profile_columns)
         
         # 2. Qualité des données (Valeurs manquantes, doublons, etc.)
-        data_quality = self._get_data_quality(df)
+        data_quality = self._get_data_quality(df, profile_columns)
         
         # 3. Matrice de corrélation (uniquement numérique)
         correlation_matrix = self._get_correlation_matrix(df)
@@ -44,53 +58,43 @@ class EDAService:
         logger.info("EDA report generation completed")
         return report
 
-    def _get_descriptive_stats(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Calcule les stats descriptives par colonne"""
+    def _get_descriptive_stats(self, profile_columns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Stats descriptives par colonne, lues dans le profil (aucun recalcul)"""
         stats_list = []
         
-        # Séparer colonnes numériques et catégorielles
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        categorical_cols = df.select_dtypes(exclude=[np.number]).columns
-        
-        for col in df.columns:
-            col_data = df[col]
+        for col in profile_columns:
             stat = {
-                "name": col,
-                "type": str(col_data.dtype),
-                "count": int(col_data.count()),
-                "missing_count": int(col_data.isna().sum()),
-                "missing_pct": float(col_data.isna().mean() * 100),
-                "unique_count": int(col_data.nunique())
+                "name": col["name"],
+                "type": col["dtype"],
+                "count": col["count"],
+                "missing_count": col["null_count"],
+                "missing_pct": col["null_percentage"],
+                "unique_count": col["unique_count"]
             }
             
-            if col in numeric_cols:
+            if col["type"] in ("numeric_integer", "numeric_float"):
                 stat.update({
-                    "mean": float(col_data.mean()) if not col_data.empty else 0,
-                    "std": float(col_data.std()) if not col_data.empty else 0,
-                    "min": float(col_data.min()) if not col_data.empty else 0,
-                    "q25": float(col_data.quantile(0.25)) if not col_data.empty else 0,
-                    "median": float(col_data.median()) if not col_data.empty else 0,
-                    "q75": float(col_data.quantile(0.75)) if not col_data.empty else 0,
-                    "max": float(col_data.max()) if not col_data.empty else 0,
+                    key: col.get(key) if col.get(key) is not None else 0
+                    for key in ("mean", "std", "min", "q25", "median", "q75", "max")
                 })
             else:
-                top_val = col_data.value_counts().idxmax() if not col_data.empty else "N/A"
+                top = col["top_values"][0] if col.get("top_values") else None
                 stat.update({
-                    "top": str(top_val),
-                    "top_freq": int(col_data.value_counts().max()) if not col_data.empty else 0
+                    "top": str(top["value"]) if top else "N/A",
+                    "top_freq": top["count"] if top else 0
                 })
             
             stats_list.append(stat)
             
         return stats_list
 
-    def _get_data_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _get_data_quality(self, df: pd.DataFrame, profile_columns: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyse la qualité globale du dataset"""
         return {
-            "total_missing": int(df.isna().sum().sum()),
+            "total_missing": int(sum(col["null_count"] for col in profile_columns)),
             "duplicate_rows": int(df.duplicated().sum()),
-            "columns_with_missing": [col for col in df.columns if df[col].isna().any()],
-            "constant_columns": [col for col in df.columns if df[col].nunique() <= 1]
+            "columns_with_missing": [col["name"] for col in profile_columns if col["null_count"] > 0],
+            "constant_columns": [col["name"] for col in profile_columns if col["unique_count"] <= 1]
         }
 
     def _get_correlation_matrix(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -0,0 +1,249 @@
+"""
+Mitigated Model Store
+
+Persists the fitted models produced by mitigation strategies
+(ThresholdOptimizer, ExponentiatedGradient, CorrelationRemover pipelines)
+so they can be reused for batch scoring without retraining.
+
+Models are written through the storage layer (services/storage), so they
+survive redeploys and are shared by every instance. Keys:
+    models/audit_{audit_id}/manifest.json
+    models/audit_{audit_id}/v{version}_{strategy_name}.pkl
+
+Version numbering is serialized per process only: two instances saving a
+model for the same audit at the same time may race on the manifest.
+"""
+
+import asyncio
+import json
+import pickle
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterator
+
+import numpy as np
+import pandas as pd
+
+from services.storage import StorageBackend, storage
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+MODEL_STORE_PREFIX = "models"
+
+
+@dataclass
+class ModelArtifact:
+    """Metadata of a persisted mitigated model version"""
+    audit_id: int
+    version: int
+    strategy_name: str
+    path: str  # storage key of the pickle
+    feature_columns: List[str]
+    sensitive_attributes: List[str]
+    strategy_params: Dict[str, Any] = field(default_factory=dict)
+    requires_sensitive_features: bool = False  # ThresholdOptimizer.predict needs them
+    created_at: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class MitigatedModelStore:
+    """
+    Versioned store for mitigated models
+
+    Versions are numbered per audit (1, 2, 3, ...) across all strategies,
+    the manifest keeps the metadata needed to rebuild the feature matrix.
+    Serialization runs in the thread pool.
+    """
+
+    def __init__(self, backend: Optional[StorageBackend] = None, prefix: str = MODEL_STORE_PREFIX):
+        self.backend = backend or storage
+        self.prefix = prefix
+        self._lock = asyncio.Lock()
+
+    def _audit_key(self, audit_id: int) -> str:
+        return f"{self.prefix}/audit_{audit_id}"
+
+    async def _read_manifest(self, audit_id: int) -> List[Dict[str, Any]]:
+        try:
+            content = await self.backend.get(f"{self._audit_key(audit_id)}/manifest.json")
+        except FileNotFoundError:
+            return []
+        return json.loads(content)
+
+    async def _write_manifest(self, audit_id: int, entries: List[Dict[str, Any]]):
+        await self.backend.put(
+            f"{self._audit_key(audit_id)}/manifest.json",
+            json.dumps(entries, indent=2).encode("utf-8"),
+            "application/json"
+        )
+
+    async def save(
+        self,
+        audit_id: int,
+        strategy_name: str,
+        model: Any,
+        feature_columns: List[str],
+        sensitive_attributes: List[str],
+        strategy_params: Optional[Dict[str, Any]] = None,
+        requires_sensitive_features: bool = False
+    ) -> ModelArtifact:
+        """
+        Serialize a fitted mitigated model as a new version
+
+        The pickle is written before the manifest entry: a listed version
+        always has its model.
+
+        Returns:
+            Metadata of the stored version
+        """
+        content = await asyncio.to_thread(pickle.dumps, model, pickle.HIGHEST_PROTOCOL)
+
+        async with self._lock:
+            entries = await self._read_manifest(audit_id)
+            version = max((e["version"] for e in entries), default=0) + 1
+            key = f"{self._audit_key(audit_id)}/v{version}_{strategy_name}.pkl"
+            await self.backend.put(key, content)
+
+            artifact = ModelArtifact(
+                audit_id=audit_id,
+                version=version,
+                strategy_name=strategy_name,
+                path=key,
+                feature_columns=list(feature_columns),
+                sensitive_attributes=list(sensitive_attributes),
+                strategy_params=strategy_params or {},
+                requires_sensitive_features=requires_sensitive_features,
+                created_at=datetime.utcnow().isoformat()
+            )
+
+            entries.append(asdict(artifact))
+            await self._write_manifest(audit_id, entries)
+
+        return artifact
+
+    async def delete(self, artifact: ModelArtifact):
+        """Remove a stored version (manifest entry and pickle)"""
+        async with self._lock:
+            entries = await self._read_manifest(artifact.audit_id)
+            remaining = [e for e in entries if e["version"] != artifact.version]
+            if len(remaining) != len(entries):
+                await self._write_manifest(artifact.audit_id, remaining)
+            await self.backend.delete(artifact.path)
+
+    async def list_versions(self, audit_id: int, strategy_name: Optional[str] = None) -> List[ModelArtifact]:
+        """List stored versions for an audit (most recent first)"""
+        artifacts = [ModelArtifact(**e) for e in await self._read_manifest(audit_id)]
+        if strategy_name:
+            artifacts = [a for a in artifacts if a.strategy_name == strategy_name]
+        return sorted(artifacts, key=lambda a: a.version, reverse=True)
+
+    async def get(self, audit_id: int, version: Optional[int] = None) -> Optional[ModelArtifact]:
+        """Get a specific version, or the latest one if version is None"""
+        artifacts = await self.list_versions(audit_id)
+        if not artifacts:
+            return None
+        if version is None:
+            return artifacts[0]
+        return next((a for a in artifacts if a.version == version), None)
+
+    async def load(self, artifact: ModelArtifact) -> Any:
+        """Deserialize the model of a stored version"""
+        content = await self.backend.get(artifact.path)
+        return await asyncio.to_thread(pickle.loads, content)
+
+
+def prepare_features(df: pd.DataFrame, feature_columns: List[str]) -> pd.DataFrame:
+    """
+    Rebuild the numeric feature matrix used at training time
+
+    Mirrors the training preparation (numeric columns, NaN -> 0).
+    """
+    missing = [col for col in feature_columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {missing}")
+
+    X = df[feature_columns].apply(pd.to_numeric, errors="coerce")
+    return X.fillna(0)
+
+
+def predict_with_artifact(model: Any, artifact: ModelArtifact, df: pd.DataFrame) -> np.ndarray:
+    """
+    Score a chunk of data with a stored mitigated model
+
+    Args:
+        model: Deserialized model (see MitigatedModelStore.load)
+        artifact: Metadata of the stored version
+        df: Chunk containing the feature (and sensitive) columns
+
+    Returns:
+        Array of predictions
+    """
+    X = prepare_features(df, artifact.feature_columns)
+
+    if artifact.requires_sensitive_features:
+        missing = [a for a in artifact.sensitive_attributes if a not in df.columns]
+        if missing:
+            raise ValueError(f"Missing sensitive attribute columns: {missing}")
+        return np.asarray(model.predict(
+            X,
+            sensitive_features=df[artifact.sensitive_attributes],
+            random_state=42
+        ))
+
+    # CorrelationRemover : (transformer, model)
+    if isinstance(model, tuple):
+        transformer, estimator = model
+        if transformer is not None:
+            X = transformer.transform(X)
+        return np.asarray(estimator.predict(X))
+
+    return np.asarray(model.predict(X))
+
+
+def iter_file_chunks(file_path: str, chunk_size: int, encoding: str = "utf-8") -> Iterator[pd.DataFrame]:
+    """Itère sur un fichier CSV ou Parquet par blocs de chunk_size lignes"""
+    if file_path.endswith(".parquet"):
+        if not PYARROW_AVAILABLE:
+            raise ValueError("Parquet support requires pyarrow")
+        parquet_file = pq.ParquetFile(file_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, chunksize=chunk_size, encoding=encoding)
+
+
+def score_file_in_chunks(
+    model: Any,
+    artifact: ModelArtifact,
+    input_path: str,
+    output_path: str,
+    chunk_size: int = 50_000,
+    encoding: str = "utf-8",
+    prediction_column: str = "mitigated_prediction"
+) -> int:
+    """
+    Stream a CSV/Parquet file through a mitigated model
+
+    Each chunk is scored and appended to a CSV at output_path, so memory
+    stays bounded by chunk_size whatever the input size.
+
+    Returns:
+        Number of rows scored
+    """
+    rows_scored = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as out:
+        for i, chunk in enumerate(iter_file_chunks(input_path, chunk_size, encoding)):
+            chunk[prediction_column] = predict_with_artifact(model, artifact, chunk)
+            chunk.to_csv(out, index=False, header=(i == 0))
+            rows_scored += len(chunk)
+    return rows_scored
+
+
+# Singleton instance
+model_store = MitigatedModelStore()
@@ -12,21 +12,40 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional
 from sqlalchemy.orm import Session
-from models.dataset import Dataset, Audit
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.dataset import Dataset, Audit, MitigationRun
+from datetime import datetime
 import json
 import os
 import asyncio
+import time
 
 # Import our new fairness modules
 from services.fairness.metrics import ComprehensiveFairnessCalculator, FairnessMetricsResult
 from services.fairness.ai_recommendations import get_recommendation_engine
 from services.fairness.mitigation import BiasMitigationEngine
+from services.fairness.model_store import model_store
+from services.dataset_service import dataset_service
+from services.cache import analysis_flights, flight_key
 
 # Scikit-learn
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 
 
+def _to_json_safe(value: Any) -> Any:
+    """Convert numpy scalars/arrays nested in results to JSON-serializable types"""
+    if isinstance(value, dict):
+        return {str(k): _to_json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_safe(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
 class EnhancedFairnessService:
     """
     Main service for comprehensive fairness auditing
@@ -147,20 +166,67 @@ class EnhancedFairnessService:
             }
         }
     
+    async def load_audit_data(self, dataset: Dataset, audit: Audit) -> tuple:
+        """
+        Load and prepare the audit data, shared with concurrent identical requests
+        
+        Concurrent calls for the same dataset content and audit configuration
+        await a single load (and baseline model training, if any), executed in
+        the thread pool. The returned objects are shared: do not modify them in place.
+        
+        Args:
+            dataset: Dataset, or the version pinned by the audit (DatasetService.get_audit_source)
+        
+        Raises:
+            FileNotFoundError: dataset file missing from storage
+        
+        Returns:
+            (df, y_true, y_pred, y_prob, sensitive_attrs)
+        """
+        file_path = await dataset_service.get_local_path(dataset)
+        key = self.analysis_key(dataset, audit, "prepare_data")
+        return await analysis_flights.do(key, self._load_with_overlays, dataset, audit, file_path)
+    
+    async def _load_with_overlays(self, dataset: Dataset, audit: Audit, file_path: str) -> tuple:
+        # Columns written on top of the base file (e.g. ml_prediction) are read from their own blobs
+        overlays = await dataset_service.read_overlays(dataset) if dataset.column_overlays else None
+        return await asyncio.to_thread(self._load_and_prepare_data, dataset, audit, file_path, overlays)
+    
+    @staticmethod
+    def analysis_key(dataset: Dataset, audit: Audit, operation: str, **params) -> tuple:
+        """Single-flight key: dataset content and column mapping, audit configuration, operation and its parameters"""
+        return flight_key(
+            dataset_service.view_version(dataset),
+            operation,
+            target_column=audit.target_column,
+            sensitive_attributes=audit.sensitive_attributes,
+            prediction_column=getattr(audit, 'prediction_column', None),
+            probability_column=getattr(audit, 'probability_column', None),
+            **params
+        )
+    
     def _load_and_prepare_data(
         self,
         dataset: Dataset,
-        audit: Audit
+        audit: Audit,
+        file_path: Optional[str] = None,
+        overlays: Optional[pd.DataFrame] = None
     ) -> tuple:
         """
         Load dataset and prepare for analysis
         
+        Args:
+            dataset: Dataset (current version) or the DatasetVersion pinned by the audit
+            file_path: Local copy of the dataset (DatasetService.get_local_path);
+                defaults to the file in uploads/
+            overlays: Columns stored apart from the base file (DatasetService.read_overlays)
+        
         Returns:
             (df, y_true, y_pred, y_prob, sensitive_attrs)
         """
         try:
             # Load dataset
-            file_path = dataset.filename
+            file_path = file_path or dataset.filename
             
             if not os.path.exists(file_path):
                 potential_path = f"uploads/{file_path}"
@@ -171,7 +237,7 @@ class EnhancedFairnessService:
                 print(f"File not found: {file_path}")
                 return None, None, None, None, None
             
-            df = pd.read_csv(file_path)
+            df = dataset_service.compose_view(dataset, pd.read_csv(file_path), overlays)
             
             # Extract target column
             if audit.target_column not in df.columns:
@@ -240,7 +306,7 @@ class EnhancedFairnessService:
         dataset: Dataset,
         strategy_name: str,
         strategy_params: Dict[str, Any],
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """
         Apply a specific mitigation strategy
@@ -255,11 +321,14 @@ class EnhancedFairnessService:
         Returns:
             Mitigation results with before/after comparison
         """
+        started_at = datetime.utcnow()
+        start_time = time.perf_counter()
+        audit_id, user_id = audit.id, audit.user_id
+        artifact = None
+        
         try:
             # Load data
-            df, y_true, y_pred, y_prob, sensitive_attrs = self._load_and_prepare_data(
-                dataset, audit
-            )
+            df, y_true, y_pred, y_prob, sensitive_attrs = await self.load_audit_data(dataset, audit)
             
             if df is None:
                 raise ValueError("Failed to load data")
@@ -287,6 +356,8 @@ class EnhancedFairnessService:
             )
             
             # Apply mitigation strategy
+            training_start = time.perf_counter()
+            
             if strategy_name == "threshold_optimizer":
                 # Train baseline model
                 base_model = LogisticRegression(max_iter=1000)
@@ -300,8 +371,13 @@ class EnhancedFairnessService:
                     constraint=strategy_params.get("constraint", "demographic_parity")
                 )
                 
-                # Get predictions
-                y_pred_mitigated = mitigated_model.predict(X_test)
+                # Get predictions (ThresholdOptimizer a besoin des attributs sensibles)
+                if info.get("method") == "threshold_optimizer":
+                    y_pred_mitigated = mitigated_model.predict(
+                        X_test, sensitive_features=sens_test, random_state=42
+                    )
+                else:
+                    y_pred_mitigated = mitigated_model.predict(X_test)
                 
             elif strategy_name == "exponentiated_gradient":
                 mitigated_model, info = self.mitigation_engine.apply_exponentiated_gradient(
@@ -334,6 +410,8 @@ class EnhancedFairnessService:
             else:
                 raise ValueError(f"Unknown strategy: {strategy_name}")
             
+            training_duration_ms = int((time.perf_counter() - training_start) * 1000)
+            
             # Calculate metrics after mitigation
             calc_after = ComprehensiveFairnessCalculator(audit.sensitive_attributes)
             metrics_after = calc_after.calculate_all_metrics(
@@ -349,6 +427,18 @@ class EnhancedFairnessService:
                 metrics_after.fairness_scores
             )
             
+            # Persist the fitted model so it can be reused for batch scoring
+            # (only once evaluated: a failed run must not leave a usable version)
+            artifact = await model_store.save(
+                audit_id=audit.id,
+                strategy_name=strategy_name,
+                model=mitigated_model,
+                feature_columns=X.columns.tolist(),
+                sensitive_attributes=audit.sensitive_attributes,
+                strategy_params=strategy_params,
+                requires_sensitive_features=info.get("method") == "threshold_optimizer"
+            )
+            
             results = {
                 "strategy_name": strategy_name,
                 "strategy_params": strategy_params,
@@ -358,22 +448,61 @@ class EnhancedFairnessService:
                 "performance_after": metrics_after.overall_metrics,
                 "improvement": improvement,
                 "mitigation_info": info,
+                "model_artifact": artifact.to_dict(),
                 "recommendation": self._get_mitigation_recommendation(improvement)
             }
             
-            # Store results
-            if hasattr(audit, 'mitigation_results'):
-                if audit.mitigation_results is None:
-                    audit.mitigation_results = {}
-                audit.mitigation_results[strategy_name] = results
-                db.commit()
+            # Store results (une ligne par run, hors de la colonne JSON de l'audit)
+            results = _to_json_safe(results)
+            run = MitigationRun(
+                audit_id=audit_id,
+                user_id=user_id,
+                strategy_name=strategy_name,
+                strategy_params=results["strategy_params"],
+                status="completed",
+                metrics_before=results["metrics_before"],
+                metrics_after=results["metrics_after"],
+                performance_before=results["performance_before"],
+                performance_after=results["performance_after"],
+                improvement=results["improvement"],
+                mitigation_info=results["mitigation_info"],
+                improvement_rate=results["improvement"]["summary"]["improvement_rate"],
+                recommendation=results["recommendation"],
+                model_version=artifact.version,
+                model_artifact_path=artifact.path,
+                started_at=started_at,
+                completed_at=datetime.utcnow(),
+                duration_ms=int((time.perf_counter() - start_time) * 1000),
+                training_duration_ms=training_duration_ms
+            )
+            db.add(run)
+            await db.commit()
             
+            results["run_id"] = run.id
             return results
             
         except Exception as e:
             print(f"Error applying mitigation: {e}")
             import traceback
             traceback.print_exc()
+            
+            # The run is recorded as failed: its model is not kept for scoring
+            if artifact is not None:
+                await model_store.delete(artifact)
+            
+            await db.rollback()
+            db.add(MitigationRun(
+                audit_id=audit_id,
+                user_id=user_id,
+                strategy_name=strategy_name,
+                strategy_params=strategy_params,
+                status="failed",
+                error_message=str(e),
+                started_at=started_at,
+                completed_at=datetime.utcnow(),
+                duration_ms=int((time.perf_counter() - start_time) * 1000)
+            ))
+            await db.commit()
             raise e
     
     def _calculate_improvement(
@@ -0,0 +1,195 @@
+"""
+Ingestion en streaming des fichiers uploadés
+
+L'upload est copié par blocs dans un fichier temporaire : le hash SHA-256
+est calculé au fil de l'eau et un garde-fou sur le nombre de lignes
+physiques rejette pendant la copie un fichier très au-delà de la limite du
+plan, sans jamais le parser en entier. La limite elle-même est vérifiée sur
+le nombre exact de lignes obtenu au parsing. L'encodage est ensuite détecté
+sans charger le fichier en mémoire (voir detect_file_encoding).
+
+Les uploads reprenables passent par les mêmes contrôles : leurs parties
+sont concaténées par assemble_parts (voir services/resumable_upload.py).
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import UploadFile
+
+from utils.dataset_processing import detect_file_encoding
+
+UPLOAD_TMP_DIR = Path(os.getenv("UPLOAD_TMP_DIR", tempfile.gettempdir()))
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+# Garde-fou : lignes physiques tolérées par ligne autorisée (un champ entre
+# guillemets peut contenir des sauts de ligne)
+ROW_LIMIT_LINE_FACTOR = int(os.getenv("ROW_LIMIT_LINE_FACTOR", "4"))
+
+
+class RowLimitExceeded(Exception):
+    """Le fichier dépasse largement la limite de lignes du plan (garde-fou de la copie)"""
+
+    def __init__(self, max_rows: int, lines_seen: int):
+        self.max_rows = max_rows
+        self.lines_seen = lines_seen
+        super().__init__(f"Far more than {max_rows} rows ({lines_seen} lines seen before aborting)")
+
+
+@dataclass
+class SpooledUpload:
+    """Fichier uploadé écrit sur disque, avec ses métadonnées calculées en streaming"""
+    path: str
+    file_size: int
+    file_hash: str
+    encoding: str
+    line_count: Optional[int] = None  # CSV uniquement : lignes physiques, en-tête inclus
+
+    def cleanup(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _SpoolWriter:
+    """
+    Écrit un flux de blocs dans un fichier temporaire en calculant au fil de
+    l'eau le hash SHA-256, la taille et (CSV) le nombre de lignes
+    """
+
+    def __init__(self, filename: str, max_rows: Optional[int], tmp_dir: Path):
+        suffix = Path(filename or "").suffix.lower()
+        self.is_csv = suffix in (".csv", ".txt")
+        self.max_rows = max_rows
+
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=tmp_dir)
+        self._out = os.fdopen(fd, "wb")
+
+        self._sha256 = hashlib.sha256()
+        self.file_size = 0
+        self._newlines = 0
+        self._last_byte = b""
+
+    def write(self, chunk: bytes):
+        self._out.write(chunk)
+        self._sha256.update(chunk)
+        self.file_size += len(chunk)
+
+        if self.is_csv and chunk:
+            self._newlines += chunk.count(b"\n")
+            self._last_byte = chunk[-1:]
+            # Lignes physiques hors en-tête : majorant du nombre de lignes de
+            # données, comparé à un multiple de la limite seulement
+            if self.max_rows is not None and self._newlines - 1 > self.max_rows * ROW_LIMIT_LINE_FACTOR:
+                raise RowLimitExceeded(self.max_rows, self._newlines - 1)
+
+    def close(self):
+        self._out.close()
+
+    def discard(self):
+        self._out.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @property
+    def file_hash(self) -> str:
+        return self._sha256.hexdigest()
+
+    @property
+    def line_count(self) -> Optional[int]:
+        if not self.is_csv:
+            return None
+        # Dernière ligne sans saut de ligne final
+        return self._newlines + (1 if self.file_size and self._last_byte != b"\n" else 0)
+
+
+async def _finish_spool(writer: _SpoolWriter) -> SpooledUpload:
+    """Ferme le fichier et détecte l'encodage (CSV)"""
+    writer.close()
+    file_hash = writer.file_hash
+    encoding = "utf-8"
+    if writer.is_csv:
+        try:
+            encoding = await asyncio.to_thread(detect_file_encoding, writer.path, file_hash)
+        except BaseException:
+            writer.discard()
+            raise
+
+    return SpooledUpload(
+        path=writer.path,
+        file_size=writer.file_size,
+        file_hash=file_hash,
+        encoding=encoding,
+        line_count=writer.line_count
+    )
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_rows: Optional[int] = None,
+    chunk_size: int = READ_CHUNK_SIZE,
+    tmp_dir: Path = UPLOAD_TMP_DIR
+) -> SpooledUpload:
+    """
+    Copie un UploadFile sur disque par blocs
+
+    Pour un CSV, les sauts de ligne sont comptés pendant la copie. Ce
+    comptage est un majorant (un champ entre guillemets peut contenir un saut
+    de ligne) : la copie n'est interrompue (RowLimitExceeded) qu'au-delà de
+    ROW_LIMIT_LINE_FACTOR fois max_rows. La limite elle-même est vérifiée par
+    l'appelant sur le compte exact obtenu au parsing. L'écriture et le hash
+    de chaque bloc sont faits dans le pool de threads.
+
+    Returns:
+        SpooledUpload (le fichier temporaire est à la charge de l'appelant)
+
+    Raises:
+        RowLimitExceeded: si le garde-fou de lignes est dépassé
+    """
+    writer = _SpoolWriter(file.filename, max_rows, tmp_dir)
+    try:
+        while chunk := await file.read(chunk_size):
+            await asyncio.to_thread(writer.write, chunk)
+    except BaseException:
+        writer.discard()
+        raise
+
+    return await _finish_spool(writer)
+
+
+def _copy_parts(writer: _SpoolWriter, part_paths: List[str], chunk_size: int):
+    for part_path in part_paths:
+        with open(part_path, "rb") as part:
+            for chunk in iter(lambda: part.read(chunk_size), b""):
+                writer.write(chunk)
+
+
+async def assemble_parts(
+    part_paths: List[str],
+    filename: str,
+    max_rows: Optional[int] = None,
+    chunk_size: int = READ_CHUNK_SIZE,
+    tmp_dir: Path = UPLOAD_TMP_DIR
+) -> SpooledUpload:
+    """
+    Concatène les parties d'un upload reprenable (dans l'ordre) en un seul
+    fichier, avec les mêmes contrôles que spool_upload
+
+    Raises:
+        RowLimitExceeded: si le garde-fou de lignes est dépassé
+    """
+    writer = _SpoolWriter(filename, max_rows, tmp_dir)
+    try:
+        await asyncio.to_thread(_copy_parts, writer, part_paths, chunk_size)
+    except BaseException:
+        writer.discard()
+        raise
+
+    return await _finish_spool(writer)
@@ -0,0 +1,217 @@
+"""
+Pseudonymisation avec coffre de jetons persistant
+
+Sans coffre, un pseudonyme est dérivé du HMAC de la valeur
+(utils/anonymization.py). Avec le coffre (PSEUDONYM_VAULT=true), chaque
+valeur reçoit à sa première rencontre un jeton aléatoire enregistré dans
+la table pseudonym_tokens, indexée par (espace de noms, HMAC de la valeur) :
+les pseudonymes restent cohérents entre les datasets d'une organisation,
+mais ne peuvent pas être recalculés à partir des valeurs sans le coffre.
+
+Les valeurs distinctes sont recherchées puis insérées par lots de
+VAULT_BATCH_SIZE, et les jetons récemment utilisés sont gardés en mémoire
+(cache LRU).
+"""
+import asyncio
+import os
+import secrets
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import AsyncSessionLocal
+from models.pseudonym_token import PseudonymToken
+from utils.anonymization import PSEUDONYM_TOKEN_LENGTH, PseudonymHasher, apply_anonymization, pseudonym_template
+
+PSEUDONYM_VAULT_ENABLED = os.getenv("PSEUDONYM_VAULT", "false").lower() in ("1", "true", "yes")
+TOKEN_CACHE_SIZE = int(os.getenv("PSEUDONYM_CACHE_SIZE", "250000"))
+# Nombre de valeurs par requête (IN (...) puis INSERT multi-lignes)
+VAULT_BATCH_SIZE = 5000
+
+# Requêtes sur la table (Core) : pas de matérialisation d'objets ORM pour des millions de lignes
+_tokens_table = PseudonymToken.__table__
+# Dialectes avec INSERT ... ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+async def _insert_ignoring_conflicts(db: AsyncSession, rows: List[Dict[str, str]]) -> Dict[str, str]:
+    """
+    Insère les lignes en ignorant celles en conflit
+
+    INSERT ... ON CONFLICT DO NOTHING multi-lignes si le dialecte le permet ;
+    sinon une ligne par point de sauvegarde, un conflit n'annulant que sa ligne.
+
+    Returns:
+        {empreinte: jeton} des lignes insérées
+    """
+    dialect_insert = _UPSERT_INSERTS.get(db.bind.dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(_tokens_table).on_conflict_do_nothing().returning(
+            _tokens_table.c.digest, _tokens_table.c.token
+        ).execution_options(insertmanyvalues_page_size=VAULT_BATCH_SIZE)
+        return dict((await db.execute(stmt, rows)).all())
+
+    inserted: Dict[str, str] = {}
+    for row in rows:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(_tokens_table).values(**row))
+        except IntegrityError:
+            continue
+        inserted[row["digest"]] = row["token"]
+    return inserted
+
+
+class TokenVault:
+    """Jetons de pseudonymisation persistants, par espace de noms"""
+
+    def __init__(self, session_factory=None, cache_size: int = TOKEN_CACHE_SIZE):
+        self._session_factory = session_factory or AsyncSessionLocal
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._stats = {"cache_hits": 0, "lookups": 0, "inserted": 0}
+
+    def _cached(self, namespace: str, digest: str) -> Optional[str]:
+        token = self._cache.get((namespace, digest))
+        if token is not None:
+            self._cache.move_to_end((namespace, digest))
+        return token
+
+    def _remember(self, namespace: str, tokens: Dict[str, str]):
+        for digest, token in tokens.items():
+            self._cache[(namespace, digest)] = token
+            self._cache.move_to_end((namespace, digest))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def metrics(self) -> Dict[str, int]:
+        return {**self._stats, "cached": len(self._cache)}
+
+    async def tokens(self, namespace: str, digests: Iterable[str]) -> Dict[str, str]:
+        """
+        Jeton de chaque empreinte (HMAC) ; les empreintes inconnues reçoivent un nouveau jeton
+
+        Les insertions sont validées dans une session propre au coffre : un
+        jeton attribué reste valable même si la transaction de l'appelant échoue.
+        """
+        result: Dict[str, str] = {}
+        missing: List[str] = []
+        for digest in dict.fromkeys(digests):
+            token = self._cached(namespace, digest)
+            if token is None:
+                missing.append(digest)
+            else:
+                result[digest] = token
+        self._stats["cache_hits"] += len(result)
+        if not missing:
+            return result
+
+        resolved: Dict[str, str] = {}
+        async with self._session_factory() as db:
+            for start in range(0, len(missing), VAULT_BATCH_SIZE):
+                batch = missing[start:start + VAULT_BATCH_SIZE]
+                found = await self._lookup(db, namespace, batch)
+                unknown = [digest for digest in batch if digest not in found]
+                if unknown:
+                    found.update(await self._insert(db, namespace, unknown))
+                resolved.update(found)
+            await db.commit()
+        
+        # Mis en cache seulement une fois les nouveaux jetons validés
+        self._remember(namespace, resolved)
+        result.update(resolved)
+        return result
+
+    async def _lookup(self, db: AsyncSession, namespace: str, digests: List[str]) -> Dict[str, str]:
+        self._stats["lookups"] += len(digests)
+        rows = await db.execute(
+            select(_tokens_table.c.digest, _tokens_table.c.token).where(
+                _tokens_table.c.namespace == namespace,
+                _tokens_table.c.digest.in_(digests)
+            )
+        )
+        return dict(rows.all())
+
+    async def _insert(self, db: AsyncSession, namespace: str, digests: List[str]) -> Dict[str, str]:
+        """
+        Attribue des jetons aléatoires aux empreintes
+
+        Une ligne ignorée (conflit) a été insérée par un autre processus entre
+        la recherche et l'insertion (on relit son jeton), ou son jeton est
+        déjà pris (on en tire un autre).
+        """
+        assigned: Dict[str, str] = {}
+        pending = digests
+        while pending:
+            # Octets aléatoires tirés en un seul appel puis découpés en jetons
+            random_hex = secrets.token_hex(len(pending) * PSEUDONYM_TOKEN_LENGTH // 2)
+            rows = [
+                {"namespace": namespace, "digest": digest, "token": random_hex[i:i + PSEUDONYM_TOKEN_LENGTH]}
+                for digest, i in zip(pending, range(0, len(random_hex), PSEUDONYM_TOKEN_LENGTH))
+            ]
+            inserted = await _insert_ignoring_conflicts(db, rows)
+            self._stats["inserted"] += len(inserted)
+            assigned.update(inserted)
+
+            conflicts = [digest for digest in pending if digest not in inserted]
+            if not conflicts:
+                break
+            existing = await self._lookup(db, namespace, conflicts)
+            assigned.update(existing)
+            pending = [digest for digest in conflicts if digest not in existing]
+        return assigned
+
+
+async def pseudonymize(
+    df: pd.DataFrame,
+    columns: List[str],
+    namespace: str = '',
+    vault: Optional[TokenVault] = None
+) -> pd.DataFrame:
+    """
+    Pseudonymise les colonnes d'un DataFrame (copie)
+
+    Sans coffre, les pseudonymes sont dérivés du HMAC (apply_anonymization) ;
+    avec, les empreintes distinctes de toutes les colonnes sont résolues par
+    le coffre en une seule série de lots.
+    """
+    if vault is None:
+        return await asyncio.to_thread(apply_anonymization, df, columns, 'pseudonym', namespace=namespace)
+
+    columns = [col for col in dict.fromkeys(columns) if col in df.columns]
+
+    def digest_columns():
+        hasher = PseudonymHasher(namespace=namespace)
+        digested = {}
+        for col in columns:
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+            digested[col] = (codes, hasher.digests(uniques))
+        return digested
+
+    digested = await asyncio.to_thread(digest_columns)
+    tokens = await vault.tokens(
+        namespace,
+        (digest for _, digests in digested.values() for digest in digests if digest is not None)
+    )
+
+    def build():
+        result = df.copy(deep=False)
+        for col, (codes, digests) in digested.items():
+            template = pseudonym_template(str(col))
+            values = np.empty(len(digests) + 1, dtype=object)
+            values[:-1] = ['' if digest is None else template.format(tokens[digest]) for digest in digests]
+            values[-1] = ''  # code -1 : valeur manquante
+            result[col] = pd.Series(values[codes], index=df.index, name=col)
+        return result
+
+    return await asyncio.to_thread(build)
+
+
+token_vault = TokenVault()
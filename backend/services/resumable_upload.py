@@ -0,0 +1,140 @@
+"""
+Stockage des parties d'un upload reprenable
+
+Chaque partie est écrite dans un fichier temporaire, son SHA-256 est
+calculé au fil de l'eau et comparé à celui annoncé par le client avant que
+la partie ne soit rendue visible (renommage atomique). Une partie peut donc
+être renvoyée autant de fois que nécessaire ; seules les parties complètes
+et vérifiées sont prises en compte à l'assemblage (voir assemble_parts).
+"""
+import asyncio
+import hashlib
+import math
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, List
+
+from services.ingestion import UPLOAD_TMP_DIR
+
+RESUMABLE_UPLOAD_DIR = UPLOAD_TMP_DIR / "resumable"
+PART_CHECKSUM_HEADER = "X-Part-SHA256"
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024  # 8 MB
+MIN_PART_SIZE = 64 * 1024
+MAX_PART_SIZE = 64 * 1024 * 1024
+MAX_PARTS = 10_000
+SESSION_TTL_HOURS = 24
+
+
+class InvalidPart(Exception):
+    """Partie rejetée (numéro, taille ou checksum invalide)"""
+
+
+@dataclass
+class PartInfo:
+    part_number: int
+    size: int
+    sha256: str
+
+
+def count_parts(total_size: int, part_size: int) -> int:
+    return max(1, math.ceil(total_size / part_size))
+
+
+def expected_part_size(part_number: int, total_size: int, part_size: int, total_parts: int) -> int:
+    """Toutes les parties font part_size octets, sauf la dernière"""
+    if part_number < total_parts:
+        return part_size
+    return total_size - part_size * (total_parts - 1)
+
+
+def session_dir(upload_id: str) -> Path:
+    return RESUMABLE_UPLOAD_DIR / upload_id
+
+
+def _part_path(upload_id: str, part_number: int) -> Path:
+    return session_dir(upload_id) / f"part_{part_number:05d}"
+
+
+def _write_chunk(out, sha256, chunk: bytes):
+    out.write(chunk)
+    sha256.update(chunk)
+
+
+async def write_part(
+    upload_id: str,
+    part_number: int,
+    chunks: AsyncIterator[bytes],
+    checksum: str,
+    expected_size: int
+) -> PartInfo:
+    """
+    Reçoit une partie et la rend visible si sa taille et son SHA-256 sont corrects
+    (écriture et hash de chaque bloc dans le pool de threads)
+
+    Raises:
+        InvalidPart: taille ou checksum différents de ceux attendus
+    """
+    directory = session_dir(upload_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".part_", dir=directory)
+
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > expected_size:
+                    raise InvalidPart(f"Part {part_number} is larger than {expected_size} bytes")
+                await asyncio.to_thread(_write_chunk, out, sha256, chunk)
+
+        if size != expected_size:
+            raise InvalidPart(f"Part {part_number} has {size} bytes, expected {expected_size}")
+
+        digest = sha256.hexdigest()
+        if digest != checksum.strip().lower():
+            raise InvalidPart(f"Checksum mismatch for part {part_number}")
+
+        part_path = _part_path(upload_id, part_number)
+        os.replace(tmp_path, part_path)
+        part_path.with_suffix(".sha256").write_text(digest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return PartInfo(part_number=part_number, size=size, sha256=digest)
+
+
+def list_parts(upload_id: str) -> Dict[int, PartInfo]:
+    """Parties reçues et vérifiées, par numéro"""
+    directory = session_dir(upload_id)
+    if not directory.exists():
+        return {}
+
+    parts = {}
+    for path in directory.glob("part_*"):
+        if path.suffix:
+            continue
+        checksum_path = path.with_suffix(".sha256")
+        if not checksum_path.exists():
+            continue
+        part_number = int(path.name.split("_")[1])
+        parts[part_number] = PartInfo(
+            part_number=part_number,
+            size=path.stat().st_size,
+            sha256=checksum_path.read_text()
+        )
+    return parts
+
+
+def part_paths(upload_id: str, total_parts: int) -> List[str]:
+    return [str(_part_path(upload_id, n)) for n in range(1, total_parts + 1)]
+
+
+def remove_session_files(upload_id: str):
+    shutil.rmtree(session_dir(upload_id), ignore_errors=True)
@@ -0,0 +1,67 @@
+"""
+Couche de stockage des fichiers (datasets, rapports)
+
+Le backend est choisi par STORAGE_BACKEND :
+- local    : dossier STORAGE_LOCAL_ROOT (uploads/ par défaut)
+- supabase : bucket Supabase (défaut si SUPABASE_URL/SUPABASE_SERVICE_KEY sont définis)
+- s3       : bucket S3 compatible (S3_BUCKET, S3_ENDPOINT_URL pour MinIO, ...)
+
+Les backends distants sont précédés d'un cache disque en lecture
+(STORAGE_CACHE_DIR, borné à STORAGE_CACHE_MAX_BYTES ; 0 pour le désactiver)
+et doublés du dossier local : les fichiers écrits localement avant la
+migration (ou pendant une indisponibilité) restent lisibles.
+"""
+import os
+
+from .base import STREAM_CHUNK_SIZE, FallbackStorageBackend, StorageBackend, StorageError
+from .cache import DEFAULT_CACHE_MAX_BYTES, CachedStorageBackend
+from .local import LocalStorageBackend
+from services.supabase_storage import storage_service
+
+LOCAL_STORAGE_ROOT = os.getenv("STORAGE_LOCAL_ROOT", "uploads")
+STORAGE_CACHE_DIR = os.getenv("STORAGE_CACHE_DIR", "storage_cache")
+STORAGE_CACHE_MAX_BYTES = int(os.getenv("STORAGE_CACHE_MAX_BYTES", str(DEFAULT_CACHE_MAX_BYTES)))
+
+
+def create_storage_backend() -> StorageBackend:
+    backend_name = os.getenv("STORAGE_BACKEND") or ("supabase" if storage_service.is_available() else "local")
+    local = LocalStorageBackend(LOCAL_STORAGE_ROOT)
+
+    if backend_name == "local":
+        return local
+
+    if backend_name == "supabase":
+        from .supabase import SupabaseStorageBackend
+        primary = SupabaseStorageBackend(storage_service)
+    elif backend_name == "s3":
+        from .s3 import S3StorageBackend
+        primary = S3StorageBackend(
+            bucket=os.getenv("S3_BUCKET", "datasets"),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL"),
+            region_name=os.getenv("S3_REGION"),
+            access_key_id=os.getenv("S3_ACCESS_KEY_ID") or os.getenv("AWS_ACCESS_KEY_ID"),
+            secret_access_key=os.getenv("S3_SECRET_ACCESS_KEY") or os.getenv("AWS_SECRET_ACCESS_KEY"),
+            prefix=os.getenv("S3_PREFIX", ""),
+            max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "20"))
+        )
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND: {backend_name}")
+
+    if STORAGE_CACHE_MAX_BYTES > 0:
+        primary = CachedStorageBackend(primary, STORAGE_CACHE_DIR, STORAGE_CACHE_MAX_BYTES)
+    return FallbackStorageBackend(primary, local)
+
+
+# Singleton instance
+storage = create_storage_backend()
+
+__all__ = [
+    "STREAM_CHUNK_SIZE",
+    "StorageBackend",
+    "StorageError",
+    "LocalStorageBackend",
+    "CachedStorageBackend",
+    "FallbackStorageBackend",
+    "create_storage_backend",
+    "storage",
+]
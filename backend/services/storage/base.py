@@ -0,0 +1,184 @@
+"""
+Interface commune des backends de stockage de fichiers (datasets, rapports)
+
+Toutes les opérations sont asynchrones et ne bloquent pas la boucle
+d'événements : les drivers synchrones (disque, client supabase) passent
+par le pool de threads. Une clé absente lève FileNotFoundError ; les
+autres échecs lèvent StorageError.
+"""
+import asyncio
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class StorageError(Exception):
+    """Échec d'une opération de stockage (hors clé absente)"""
+
+
+class StorageBackend(ABC):
+    """Stockage objet adressé par clé (chemin relatif, '/' comme séparateur)"""
+
+    name = "abstract"
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        """Écrit (ou remplace) l'objet"""
+
+    async def put_file(self, key: str, path: str, content_type: str = "application/octet-stream") -> None:
+        """Écrit l'objet à partir d'un fichier local"""
+        data = await asyncio.to_thread(_read_file, path)
+        await self.put(key, data, content_type)
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """Contenu complet de l'objet"""
+
+    @abstractmethod
+    async def get_range(self, key: str, start: int, length: int) -> bytes:
+        """length octets à partir de start (moins en fin d'objet)"""
+
+    @abstractmethod
+    def stream(self, key: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Contenu de l'objet par blocs, sans le charger en mémoire"""
+
+    @abstractmethod
+    async def size(self, key: str) -> int:
+        """Taille de l'objet en octets"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Supprime l'objet (sans erreur s'il est absent)"""
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await self.size(key)
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def download_to(self, key: str, path: str) -> None:
+        """
+        Copie l'objet dans un fichier local, en streaming
+        (fichier temporaire puis renommage atomique)
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".download_", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                async for chunk in self.stream(key):
+                    await asyncio.to_thread(out.write, chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    async def local_path(self, key: str, content_hash: Optional[str] = None) -> Path:
+        """
+        Chemin d'une copie locale de l'objet (lecture directe par pandas)
+
+        content_hash: hash du contenu attendu, pour ne pas servir une copie périmée
+        """
+        raise StorageError(f"Storage {self.name} has no local copy of {key}")
+
+    def metrics(self) -> Dict[str, int]:
+        """Compteurs du driver (cache, ...)"""
+        return {}
+
+    async def close(self) -> None:
+        """Libère les connexions du driver"""
+
+
+class FallbackStorageBackend(StorageBackend):
+    """
+    Backend principal doublé d'un backend local
+
+    Reprend le comportement historique : les lectures retombent sur la
+    copie locale (fichiers écrits quand le stockage distant était
+    indisponible) et une écriture distante en échec est faite en local.
+    """
+
+    def __init__(self, primary: StorageBackend, fallback: StorageBackend):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+
+    async def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        try:
+            await self.primary.put(key, data, content_type)
+        except StorageError as e:
+            print(f"⚠️ Storage {self.primary.name} unavailable ({e}), writing {key} locally")
+            await self.fallback.put(key, data, content_type)
+
+    async def put_file(self, key: str, path: str, content_type: str = "application/octet-stream") -> None:
+        try:
+            await self.primary.put_file(key, path, content_type)
+        except StorageError as e:
+            print(f"⚠️ Storage {self.primary.name} unavailable ({e}), writing {key} locally")
+            await self.fallback.put_file(key, path, content_type)
+
+    async def get(self, key: str) -> bytes:
+        try:
+            return await self.primary.get(key)
+        except (FileNotFoundError, StorageError):
+            return await self.fallback.get(key)
+
+    async def get_range(self, key: str, start: int, length: int) -> bytes:
+        try:
+            return await self.primary.get_range(key, start, length)
+        except (FileNotFoundError, StorageError):
+            return await self.fallback.get_range(key, start, length)
+
+    async def stream(self, key: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        backend = self.primary if await self._in_primary(key) else self.fallback
+        async for chunk in backend.stream(key, chunk_size):
+            yield chunk
+
+    async def size(self, key: str) -> int:
+        try:
+            return await self.primary.size(key)
+        except (FileNotFoundError, StorageError):
+            return await self.fallback.size(key)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.primary.delete(key)
+        finally:
+            await self.fallback.delete(key)
+
+    async def local_path(self, key: str, content_hash: Optional[str] = None) -> Path:
+        try:
+            return await self.primary.local_path(key, content_hash)
+        except (FileNotFoundError, StorageError):
+            return await self.fallback.local_path(key, content_hash)
+
+    def metrics(self) -> Dict[str, int]:
+        return self.primary.metrics()
+
+    async def close(self) -> None:
+        await self.primary.close()
+        await self.fallback.close()
+
+    async def _in_primary(self, key: str) -> bool:
+        try:
+            return await self.primary.exists(key)
+        except StorageError:
+            return False
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def parse_content_range_size(header: Optional[str]) -> Optional[int]:
+    """Taille totale annoncée par un en-tête Content-Range ('bytes 0-99/1234')"""
+    if not header or "/" not in header:
+        return None
+    total = header.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
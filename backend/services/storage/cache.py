@@ -0,0 +1,236 @@
+"""
+Cache disque en lecture devant un backend de stockage distant
+
+Les objets lus sont copiés dans cache_dir (téléchargement dans un fichier
+temporaire puis renommage atomique) et servis depuis le disque aux lectures
+suivantes. Une entrée est identifiée par la clé de stockage et, si fourni,
+le hash du contenu : un fichier réécrit sous la même clé n'est pas servi
+périmé. Taille totale bornée par max_bytes (éviction LRU) ; les
+téléchargements simultanés d'un même objet sont regroupés en un seul.
+"""
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from .base import STREAM_CHUNK_SIZE, StorageBackend
+from .local import LocalStorageBackend
+
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+_ANY_VERSION = "any"
+
+
+@dataclass
+class _Entry:
+    path: Path
+    content_hash: Optional[str]
+    size: int
+
+
+class CachedStorageBackend(StorageBackend):
+    """Backend distant précédé d'un cache disque LRU borné en taille"""
+
+    def __init__(self, backend: StorageBackend, cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.backend = backend
+        self.name = f"{backend.name}(cached)"
+        self.cache_dir = Path(cache_dir).resolve()
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._size = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "downloads": 0,
+            "download_errors": 0,
+            "bytes_downloaded": 0,
+            "evictions": 0,
+            "bytes_evicted": 0
+        }
+        self._load_index()
+
+    # ----- Index -----
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        """Reprend les entrées déjà sur disque (ordre LRU d'après la date de dernier accès)"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        found = []
+        for path in self.cache_dir.iterdir():
+            if path.name.startswith(".") or not path.is_file():
+                continue
+            digest, _, version = path.name.partition(".")
+            stat = path.stat()
+            found.append((stat.st_mtime, digest, path, version, stat.st_size))
+
+        for _, digest, path, version, size in sorted(found):
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self._remove_file(previous)
+            content_hash = None if version == _ANY_VERSION else version
+            self._entries[digest] = _Entry(path, content_hash, size)
+            self._size += size
+
+    def _lookup(self, key: str, content_hash: Optional[str] = None) -> Optional[_Entry]:
+        entry = self._entries.get(self._digest(key))
+        if entry is None or (content_hash is not None and entry.content_hash != content_hash):
+            return None
+        if not entry.path.exists():
+            # Supprimé par un autre processus partageant le dossier
+            self._drop(self._digest(key))
+            return None
+        return entry
+
+    def _touch(self, key: str, entry: _Entry):
+        self._entries.move_to_end(self._digest(key))
+        try:
+            os.utime(entry.path)
+        except OSError:
+            pass
+
+    def _drop(self, digest: str):
+        entry = self._entries.pop(digest, None)
+        if entry is not None:
+            self._size -= entry.size
+            self._remove_file(entry)
+
+    @staticmethod
+    def _remove_file(entry: _Entry):
+        try:
+            entry.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep: str):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes"""
+        for digest in list(self._entries):
+            if self._size <= self.max_bytes:
+                break
+            if digest == keep or digest in self._inflight:
+                continue
+            self._stats["evictions"] += 1
+            self._stats["bytes_evicted"] += self._entries[digest].size
+            self._drop(digest)
+
+    def invalidate(self, key: str):
+        self._drop(self._digest(key))
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes
+        }
+
+    # ----- Téléchargement -----
+
+    async def local_path(self, key: str, content_hash: Optional[str] = None) -> Path:
+        """
+        Chemin d'une copie locale de l'objet, téléchargée si besoin
+
+        Les appels concurrents pour la même clé attendent le même
+        téléchargement.
+        """
+        while True:
+            entry = self._lookup(key, content_hash)
+            if entry is not None:
+                self._stats["hits"] += 1
+                self._touch(key, entry)
+                return entry.path
+
+            digest = self._digest(key)
+            inflight = self._inflight.get(digest)
+            if inflight is None:
+                break
+            self._stats["coalesced"] += 1
+            # Le téléchargement en cours peut concerner une autre version : on re-vérifie
+            await asyncio.shield(inflight)
+
+        self._stats["misses"] += 1
+        task = asyncio.ensure_future(self._download(key, digest, content_hash))
+        self._inflight[digest] = task
+        task.add_done_callback(lambda _: self._inflight.pop(digest, None))
+        return await asyncio.shield(task)
+
+    async def _download(self, key: str, digest: str, content_hash: Optional[str]) -> Path:
+        target = self.cache_dir / f"{digest}.{content_hash or _ANY_VERSION}"
+        try:
+            await self.backend.download_to(key, str(target))
+        except BaseException:
+            self._stats["download_errors"] += 1
+            raise
+
+        size = target.stat().st_size
+        previous = self._entries.pop(digest, None)
+        if previous is not None:
+            self._size -= previous.size
+            if previous.path != target:
+                self._remove_file(previous)
+        self._entries[digest] = _Entry(target, content_hash, size)
+        self._size += size
+        self._stats["downloads"] += 1
+        self._stats["bytes_downloaded"] += size
+        self._evict(keep=digest)
+        return target
+
+    # ----- StorageBackend -----
+
+    async def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        self.invalidate(key)
+        await self.backend.put(key, data, content_type)
+
+    async def put_file(self, key: str, path: str, content_type: str = "application/octet-stream") -> None:
+        self.invalidate(key)
+        await self.backend.put_file(key, path, content_type)
+
+    async def get(self, key: str) -> bytes:
+        path = await self.local_path(key)
+        return await asyncio.to_thread(path.read_bytes)
+
+    async def get_range(self, key: str, start: int, length: int) -> bytes:
+        # Lecture partielle : servie par le cache si l'objet y est déjà, sans le télécharger sinon
+        entry = self._lookup(key)
+        if entry is None:
+            return await self.backend.get_range(key, start, length)
+        self._stats["hits"] += 1
+        self._touch(key, entry)
+        return await asyncio.to_thread(LocalStorageBackend._read_range, entry.path, start, length)
+
+    async def stream(self, key: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        entry = self._lookup(key)
+        if entry is None:
+            async for chunk in self.backend.stream(key, chunk_size):
+                yield chunk
+            return
+        self._stats["hits"] += 1
+        self._touch(key, entry)
+        f = await asyncio.to_thread(open, entry.path, "rb")
+        try:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                yield chunk
+        finally:
+            f.close()
+
+    async def size(self, key: str) -> int:
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry.size
+        return await self.backend.size(key)
+
+    async def delete(self, key: str) -> None:
+        self.invalidate(key)
+        await self.backend.delete(key)
+
+    async def download_to(self, key: str, path: str) -> None:
+        await self.backend.download_to(key, path)
+
+    async def close(self) -> None:
+        await self.backend.close()
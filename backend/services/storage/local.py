@@ -0,0 +1,96 @@
+"""
+Backend de stockage sur disque local (dossier uploads/ par défaut)
+
+Les entrées/sorties sont exécutées dans le pool de threads ; les écritures
+passent par un fichier temporaire renommé atomiquement, un lecteur ne voit
+donc jamais un fichier partiellement écrit.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from .base import STREAM_CHUNK_SIZE, StorageBackend, StorageError
+
+
+class LocalStorageBackend(StorageBackend):
+    """Objets stockés sous root/<clé>"""
+
+    name = "local"
+
+    def __init__(self, root: str = "uploads"):
+        self.root = Path(root).resolve()
+
+    def path_for(self, key: str) -> Path:
+        """Chemin local d'une clé (les clés sortant de root sont refusées)"""
+        path = (self.root / key).resolve()
+        if self.root != path and self.root not in path.parents:
+            raise StorageError(f"Invalid storage key: {key}")
+        return path
+
+    async def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        await asyncio.to_thread(self._atomic_write, self.path_for(key), data=data)
+
+    async def put_file(self, key: str, path: str, content_type: str = "application/octet-stream") -> None:
+        await asyncio.to_thread(self._atomic_write, self.path_for(key), source=path)
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.path_for(key).read_bytes)
+
+    async def get_range(self, key: str, start: int, length: int) -> bytes:
+        return await asyncio.to_thread(self._read_range, self.path_for(key), start, length)
+
+    async def stream(self, key: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self.path_for(key), "rb")
+        try:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                yield chunk
+        finally:
+            f.close()
+
+    async def size(self, key: str) -> int:
+        return await asyncio.to_thread(os.path.getsize, self.path_for(key))
+
+    async def delete(self, key: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+    async def local_path(self, key: str, content_hash: Optional[str] = None) -> Path:
+        path = self.path_for(key)
+        if not await asyncio.to_thread(path.is_file):
+            raise FileNotFoundError(key)
+        return path
+
+    async def download_to(self, key: str, path: str) -> None:
+        # Copie disque à disque, sans passer par la boucle d'événements
+        source = self.path_for(key)
+        if not source.exists():
+            raise FileNotFoundError(key)
+        await asyncio.to_thread(self._atomic_write, Path(path), source=str(source))
+
+    @staticmethod
+    def _atomic_write(target: Path, data: bytes = None, source: str = None):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=target.parent)
+        try:
+            if data is not None:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+            else:
+                os.close(fd)
+                shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _read_range(path: Path, start: int, length: int) -> bytes:
+        with open(path, "rb") as f:
+            f.seek(start)
+            return f.read(length)
@@ -0,0 +1,198 @@
+"""
+Lectures Parquet partielles depuis le stockage
+
+Le footer Parquet décrit, pour chaque row group, la position et la taille
+de chaque colonne dans le fichier. On lit donc d'abord la fin de l'objet
+(footer), puis uniquement les plages d'octets des colonnes et row groups
+demandés (requêtes Range, en parallèle). Pour un dataset large dont un
+audit n'utilise que quelques colonnes, seule une fraction de l'objet
+transite par le réseau.
+"""
+import asyncio
+import bisect
+import io
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .base import StorageBackend, StorageError
+
+PARQUET_MAGIC = b"PAR1"
+FOOTER_READ_SIZE = 64 * 1024
+ROW_GROUP_ROWS = 64 * 1024
+# Plages séparées de moins de COALESCE_GAP octets : une seule requête
+COALESCE_GAP = 64 * 1024
+MAX_CONCURRENT_RANGES = 8
+
+
+def dataframe_to_parquet(df: pd.DataFrame) -> bytes:
+    """Sérialise un DataFrame en Parquet (row groups de ROW_GROUP_ROWS lignes)"""
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, row_group_size=ROW_GROUP_ROWS)
+    return buffer.getvalue()
+
+
+class _RangeFile(io.RawIOBase):
+    """
+    Fichier en lecture seule dont seules certaines plages sont en mémoire
+
+    Sert les lectures de pyarrow à partir des plages téléchargées ; lire
+    en dehors lève OSError (plage non prévue par le plan de lecture).
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._starts: List[int] = []
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def add(self, start: int, data: bytes):
+        i = bisect.bisect_left(self._starts, start)
+        self._starts.insert(i, start)
+        self._chunks.insert(i, data)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self._size + offset
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._pos
+        end = min(self._pos + size, self._size)
+        if end <= self._pos:
+            return b""
+        i = bisect.bisect_right(self._starts, self._pos) - 1
+        if i >= 0:
+            start, chunk = self._starts[i], self._chunks[i]
+            if end <= start + len(chunk):
+                data = chunk[self._pos - start:end - start]
+                self._pos = end
+                return data
+        raise OSError(f"Range {self._pos}-{end} was not fetched")
+
+
+def _coalesce(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Fusionne les plages (start, end) qui se chevauchent ou sont proches"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start - merged[-1][1] <= COALESCE_GAP:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+async def _fetch_ranges(storage: StorageBackend, key: str, ranges: List[Tuple[int, int]], target: _RangeFile):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_RANGES)
+
+    async def fetch(start: int, end: int):
+        async with semaphore:
+            target.add(start, await storage.get_range(key, start, end - start))
+
+    await asyncio.gather(*(fetch(start, end) for start, end in ranges))
+
+
+async def read_parquet_metadata(storage: StorageBackend, key: str) -> Tuple[pq.FileMetaData, _RangeFile]:
+    """
+    Métadonnées (footer) d'un objet Parquet, lues par plage en fin d'objet
+
+    Retourne aussi le fichier partiel contenant le footer, complété ensuite
+    par les plages de colonnes.
+    """
+    size = await storage.size(key)
+    if size < 12:
+        raise StorageError(f"{key} is not a Parquet file")
+
+    tail_start = max(0, size - FOOTER_READ_SIZE)
+    tail = await storage.get_range(key, tail_start, size - tail_start)
+    if tail[-4:] != PARQUET_MAGIC:
+        raise StorageError(f"{key} is not a Parquet file")
+
+    # Footer plus grand que la lecture initiale (très nombreuses colonnes)
+    footer_length = int.from_bytes(tail[-8:-4], "little")
+    if footer_length + 8 > len(tail):
+        tail_start = max(0, size - footer_length - 8)
+        tail = await storage.get_range(key, tail_start, size - tail_start)
+
+    source = _RangeFile(size)
+    source.add(tail_start, tail)
+    return pq.read_metadata(source), source
+
+
+def _select_row_groups(metadata: pq.FileMetaData, row_groups: Optional[Sequence[int]], max_rows: Optional[int]) -> List[int]:
+    selected = list(range(metadata.num_row_groups)) if row_groups is None else list(row_groups)
+    if max_rows is None:
+        return selected
+
+    kept, rows = [], 0
+    for index in selected:
+        if rows >= max_rows:
+            break
+        kept.append(index)
+        rows += metadata.row_group(index).num_rows
+    return kept
+
+
+def _column_ranges(metadata: pq.FileMetaData, row_groups: List[int], columns: List[str]) -> List[Tuple[int, int]]:
+    wanted = set(columns)
+    ranges = []
+    for index in row_groups:
+        row_group = metadata.row_group(index)
+        for j in range(row_group.num_columns):
+            chunk = row_group.column(j)
+            if chunk.path_in_schema.split(".")[0] not in wanted:
+                continue
+            # Certains writers laissent dictionary_page_offset à 0 sans page dictionnaire
+            if chunk.has_dictionary_page and chunk.dictionary_page_offset:
+                start = min(chunk.dictionary_page_offset, chunk.data_page_offset)
+            else:
+                start = chunk.data_page_offset
+            ranges.append((start, start + chunk.total_compressed_size))
+    return ranges
+
+
+async def read_parquet(
+    storage: StorageBackend,
+    key: str,
+    columns: Optional[Sequence[str]] = None,
+    row_groups: Optional[Sequence[int]] = None,
+    max_rows: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Lit un objet Parquet en ne téléchargeant que les colonnes et row groups utiles
+
+    columns: colonnes à lire (None = toutes ; les colonnes absentes du fichier sont ignorées)
+    row_groups: indices des row groups à lire (None = tous)
+    max_rows: nombre de lignes maximum (seuls les premiers row groups sont lus)
+    """
+    metadata, source = await read_parquet_metadata(storage, key)
+
+    names = metadata.schema.to_arrow_schema().names
+    selected_columns = names if columns is None else [c for c in names if c in set(columns)]
+    selected_groups = _select_row_groups(metadata, row_groups, max_rows)
+
+    ranges = _coalesce(_column_ranges(metadata, selected_groups, selected_columns))
+    await _fetch_ranges(storage, key, ranges, source)
+
+    def decode() -> pd.DataFrame:
+        parquet_file = pq.ParquetFile(source, metadata=metadata, pre_buffer=False)
+        table = parquet_file.read_row_groups(selected_groups, columns=selected_columns)
+        df = table.to_pandas()
+        return df.head(max_rows) if max_rows is not None else df
+
+    return await asyncio.to_thread(decode)
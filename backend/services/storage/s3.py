@@ -0,0 +1,174 @@
+"""
+Backend S3 compatible (AWS S3, MinIO, ...) via aiobotocore
+
+Un seul client est créé par processus et réutilisé (pool de connexions
+HTTP de taille max_pool_connections). Les fichiers volumineux sont envoyés
+en multipart upload par parties de MULTIPART_PART_SIZE octets, lues depuis
+le disque dans le pool de threads.
+"""
+import asyncio
+import contextlib
+import os
+from typing import AsyncIterator, Optional
+
+from .base import STREAM_CHUNK_SIZE, StorageBackend, StorageError
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import get_session
+    from botocore.exceptions import BotoCoreError, ClientError
+    AIOBOTOCORE_AVAILABLE = True
+except ImportError:
+    AIOBOTOCORE_AVAILABLE = False
+
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+MAX_POOL_CONNECTIONS = 20
+
+_NOT_FOUND_CODES = {"404", "NoSuchKey", "NotFound"}
+
+
+class S3StorageBackend(StorageBackend):
+    """Objets stockés dans un bucket S3 (endpoint_url pour MinIO ou autre compatible)"""
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        prefix: str = "",
+        max_pool_connections: int = MAX_POOL_CONNECTIONS
+    ):
+        if not AIOBOTOCORE_AVAILABLE:
+            raise StorageError("aiobotocore is required for the S3 storage backend")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._client_kwargs = {
+            "endpoint_url": endpoint_url,
+            "region_name": region_name,
+            "aws_access_key_id": access_key_id,
+            "aws_secret_access_key": secret_access_key,
+            "config": AioConfig(max_pool_connections=max_pool_connections)
+        }
+        self._client = None
+        self._exit_stack: Optional[contextlib.AsyncExitStack] = None
+        self._client_lock = asyncio.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    async def _get_client(self):
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    exit_stack = contextlib.AsyncExitStack()
+                    self._client = await exit_stack.enter_async_context(
+                        get_session().create_client("s3", **self._client_kwargs)
+                    )
+                    self._exit_stack = exit_stack
+        return self._client
+
+    async def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        client = await self._get_client()
+        with _translate_errors(key):
+            await client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data, ContentType=content_type)
+
+    async def put_file(self, key: str, path: str, content_type: str = "application/octet-stream") -> None:
+        size = await asyncio.to_thread(os.path.getsize, path)
+        if size < MULTIPART_THRESHOLD:
+            return await super().put_file(key, path, content_type)
+
+        client = await self._get_client()
+        with _translate_errors(key):
+            upload = await client.create_multipart_upload(
+                Bucket=self.bucket, Key=self._key(key), ContentType=content_type
+            )
+            upload_id = upload["UploadId"]
+            try:
+                parts = []
+                with open(path, "rb") as f:
+                    part_number = 1
+                    while chunk := await asyncio.to_thread(f.read, MULTIPART_PART_SIZE):
+                        response = await client.upload_part(
+                            Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                            PartNumber=part_number, Body=chunk
+                        )
+                        parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+                        part_number += 1
+                await client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                    MultipartUpload={"Parts": parts}
+                )
+            except BaseException:
+                await client.abort_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id)
+                raise
+
+    async def get(self, key: str) -> bytes:
+        client = await self._get_client()
+        with _translate_errors(key):
+            response = await client.get_object(Bucket=self.bucket, Key=self._key(key))
+            async with response["Body"] as body:
+                return await body.read()
+
+    async def get_range(self, key: str, start: int, length: int) -> bytes:
+        if length <= 0:
+            return b""
+        client = await self._get_client()
+        try:
+            with _translate_errors(key):
+                response = await client.get_object(
+                    Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{start + length - 1}"
+                )
+                async with response["Body"] as body:
+                    return await body.read()
+        except StorageError as e:
+            # Plage au-delà de la fin de l'objet
+            if isinstance(e.__cause__, ClientError) and _error_code(e.__cause__) == "InvalidRange":
+                return b""
+            raise
+
+    async def stream(self, key: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        client = await self._get_client()
+        with _translate_errors(key):
+            response = await client.get_object(Bucket=self.bucket, Key=self._key(key))
+        async with response["Body"] as body:
+            async for chunk in body.iter_chunks(chunk_size):
+                yield chunk
+
+    async def size(self, key: str) -> int:
+        client = await self._get_client()
+        with _translate_errors(key):
+            response = await client.head_object(Bucket=self.bucket, Key=self._key(key))
+        return response["ContentLength"]
+
+    async def delete(self, key: str) -> None:
+        client = await self._get_client()
+        with _translate_errors(key):
+            await client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    async def close(self) -> None:
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._client = None
+
+
+def _error_code(error: "ClientError") -> str:
+    return str(error.response.get("Error", {}).get("Code", ""))
+
+
+@contextlib.contextmanager
+def _translate_errors(key: str):
+    """Erreurs botocore -> FileNotFoundError / StorageError"""
+    try:
+        yield
+    except ClientError as e:
+        if _error_code(e) in _NOT_FOUND_CODES:
+            raise FileNotFoundError(key) from e
+        raise StorageError(f"S3 error for {key}: {e}") from e
+    except BotoCoreError as e:
+        raise StorageError(f"S3 error for {key}: {e}") from e
@@ -0,0 +1,135 @@
+"""
+Backend Supabase Storage
+
+Les écritures en mémoire et les suppressions passent par le client
+supabase-py (exécuté dans le pool de threads, voir
+services/supabase_storage.py). Les lectures et l'envoi de fichiers
+utilisent directement l'API HTTP du stockage avec un client httpx
+asynchrone partagé (pool de connexions), ce qui permet les lectures par
+plage (en-tête Range) et les transferts en streaming, sans charger le
+fichier en mémoire.
+"""
+import asyncio
+import os
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+
+import httpx
+
+from .base import STREAM_CHUNK_SIZE, StorageBackend, StorageError, parse_content_range_size
+from services.supabase_storage import SupabaseStorageService
+
+HTTP_TIMEOUT_SECONDS = 60.0
+MAX_CONNECTIONS = 20
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """Objets stockés dans le bucket Supabase configuré"""
+
+    name = "supabase"
+
+    def __init__(self, service: SupabaseStorageService, max_connections: int = MAX_CONNECTIONS):
+        if not service.is_available():
+            raise StorageError("Supabase credentials missing (SUPABASE_URL/SUPABASE_SERVICE_KEY)")
+        self.service = service
+        self._max_connections = max_connections
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=f"{self.service.url.rstrip('/')}/storage/v1/object/",
+                headers={
+                    "Authorization": f"Bearer {self.service.key}",
+                    "apikey": self.service.key
+                },
+                timeout=HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=self._max_connections)
+            )
+        return self._http
+
+    def _object_url(self, key: str) -> str:
+        return f"{self.service.bucket_name}/{quote(key)}"
+
+    async def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        if await self.service.upload_file(key, data, content_type) is None:
+            raise StorageError(f"Supabase upload failed for {key}")
+
+    async def put_file(self, key: str, path: str, content_type: str = "application/octet-stream") -> None:
+        size = await asyncio.to_thread(os.path.getsize, path)
+        try:
+            # Content-Length explicite : envoi par blocs sans Transfer-Encoding chunked
+            response = await self.http.post(
+                self._object_url(key),
+                content=_read_chunks(path),
+                headers={"Content-Type": content_type, "Content-Length": str(size), "x-upsert": "true"}
+            )
+        except httpx.HTTPError as e:
+            raise StorageError(f"Supabase upload failed for {key}: {e}") from e
+        if response.status_code >= 400:
+            raise StorageError(f"Supabase upload failed for {key}: {response.status_code}")
+
+    async def get(self, key: str) -> bytes:
+        response = await self._request(key)
+        return response.content
+
+    async def get_range(self, key: str, start: int, length: int) -> bytes:
+        if length <= 0:
+            return b""
+        response = await self._request(key, headers={"Range": f"bytes={start}-{start + length - 1}"})
+        if response.status_code == 416:
+            return b""
+        # Un serveur qui ignore Range renvoie l'objet complet
+        if response.status_code == 200:
+            return response.content[start:start + length]
+        return response.content
+
+    async def stream(self, key: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        async with self.http.stream("GET", self._object_url(key)) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                self._raise_for_status(key, response)
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+
+    async def size(self, key: str) -> int:
+        response = await self._request(key, headers={"Range": "bytes=0-0"})
+        total = parse_content_range_size(response.headers.get("Content-Range"))
+        if total is not None:
+            return total
+        return len(response.content)
+
+    async def delete(self, key: str) -> None:
+        if not await self.service.delete_file(key):
+            raise StorageError(f"Supabase delete failed for {key}")
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _request(self, key: str, headers: Optional[dict] = None) -> httpx.Response:
+        try:
+            response = await self.http.get(self._object_url(key), headers=headers)
+        except httpx.HTTPError as e:
+            raise StorageError(f"Supabase download failed for {key}: {e}") from e
+        if response.status_code != 416:
+            self._raise_for_status(key, response)
+        return response
+
+    @staticmethod
+    def _raise_for_status(key: str, response: httpx.Response):
+        # Supabase peut renvoyer 400 avec une erreur "not_found" pour un objet absent
+        body = response.content.lower().replace(b"_", b" ")
+        if response.status_code == 404 or (response.status_code == 400 and b"not found" in body):
+            raise FileNotFoundError(key)
+        if response.status_code >= 400:
+            raise StorageError(f"Supabase storage error {response.status_code} for {key}")
+
+
+async def _read_chunks(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Contenu du fichier par blocs, lus dans le pool de threads"""
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, chunk_size):
+            yield chunk
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from supabase import create_client, Client
 from typing import Optional, List
@@ -10,6 +11,9 @@ class SupabaseStorageService:
     """
     Service pour gérer le stockage des datasets sur Supabase Storage.
     Nécessite SUPABASE_URL et SUPABASE_SERVICE_KEY dans les variables d'environnement.
+    
+    Le client supabase-py est synchrone : les appels réseau sont exécutés dans
+    le pool de threads pour ne pas bloquer la boucle d'événements.
     """
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL")
@@ -32,7 +36,8 @@ class SupabaseStorageService:
         
         try:
             # Note: supabase-py standard upload
-            response = self.client.storage.from_(self.bucket_name).upload(
+            await asyncio.to_thread(
+                self.client.storage.from_(self.bucket_name).upload,
                 path=file_path,
                 file=content,
                 file_options={"content-type": content_type, "x-upsert": "true"}
@@ -48,8 +53,9 @@ class SupabaseStorageService:
             return None
         
         try:
-            response = self.client.storage.from_(self.bucket_name).download(file_path)
-            return response
+            return await asyncio.to_thread(
+                self.client.storage.from_(self.bucket_name).download, file_path
+            )
         except Exception as e:
             print(f"❌ Supabase Download Error: {e}")
             return None
@@ -60,7 +66,7 @@ class SupabaseStorageService:
             return False
             
         try:
-            self.client.storage.from_(self.bucket_name).remove([file_path])
+            await asyncio.to_thread(self.client.storage.from_(self.bucket_name).remove, [file_path])
             return True
         except Exception as e:
             print(f"❌ Supabase Delete Error: {e}")
@@ -0,0 +1,106 @@
+"""
+Unit Tests for deferred audit result columns
+
+Tests that the heavy JSON result columns of Audit stay unloaded on plain
+queries, are loaded by the detail endpoint through undefer_group, and are
+never selected by the list and dashboard statistics endpoints
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker, undefer_group
+
+import models.data_connection  # noqa: F401
+import models.mapping_template  # noqa: F401
+import models.organization  # noqa: F401
+import models.user  # noqa: F401
+from db import Base
+from models.dataset import Audit, Dataset
+from routers.audits import get_audit, get_dashboard_stats, list_audits
+from services.cache import dashboard_stats_cache
+
+RESULT_COLUMNS = [
+    "metrics_results", "recommendations", "mitigation_strategies", "detailed_metrics", "ai_recommendations",
+    "mitigation_recommendations", "mitigation_results", "disaggregated_metrics", "group_metrics"
+]
+
+
+async def _engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'audits.db'}")
+    tables = [Base.metadata.tables[name] for name in ("dataset_blobs", "datasets", "dataset_versions", "audits")]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    return engine
+
+
+async def _audit(db):
+    dataset = Dataset(
+        user_id=1, filename="d.csv", original_filename="d.csv", file_size=1, file_hash="h",
+        mime_type="text/csv", row_count=1, column_count=1
+    )
+    db.add(dataset)
+    await db.flush()
+    audit = Audit(
+        dataset_id=dataset.id, user_id=1, audit_name="audit", use_case="other", target_column="target",
+        sensitive_attributes=["gender"], status="completed", overall_score=75.0,
+        **{col: {"payload": col} for col in RESULT_COLUMNS}
+    )
+    db.add(audit)
+    await db.commit()
+    return audit
+
+
+class TestDeferredResults:
+    """Test suite for the 'audit_results' deferred group"""
+
+    @pytest.mark.asyncio
+    async def test_results_loaded_only_by_detail(self, tmp_path):
+        """Plain loads leave the result columns unloaded; undefer_group and the detail endpoint load them"""
+        engine = await _engine(tmp_path)
+        sessions = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+        async with sessions() as db:
+            audit_id = (await _audit(db)).id
+
+        async with sessions() as db:
+            audit = (await db.execute(select(Audit).where(Audit.id == audit_id))).scalar_one()
+            assert set(RESULT_COLUMNS) <= inspect(audit).unloaded
+
+        async with sessions() as db:
+            audit = (await db.execute(
+                select(Audit).options(undefer_group("audit_results")).where(Audit.id == audit_id)
+            )).scalar_one()
+            assert not set(RESULT_COLUMNS) & inspect(audit).unloaded
+
+        async with sessions() as db:
+            detail = await get_audit(audit_id, current_user=SimpleNamespace(id=1, organization_id=None), db=db)
+            assert detail["detailed_metrics"] == {"payload": "detailed_metrics"}
+            assert detail["group_metrics"] == {"payload": "group_metrics"}
+
+    @pytest.mark.asyncio
+    async def test_list_and_stats_skip_result_columns(self, tmp_path):
+        """The list and stats queries never select a result column"""
+        engine = await _engine(tmp_path)
+        sessions = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+        async with sessions() as db:
+            await _audit(db)
+
+        statements = []
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        dashboard_stats_cache.clear()
+        user = SimpleNamespace(id=1, organization_id=None)
+        async with sessions() as db:
+            listed = await list_audits(Response(), current_user=user, db=db)
+            stats = await get_dashboard_stats(db=db, current_user=user)
+        dashboard_stats_cache.clear()
+
+        assert [audit["name"] for audit in listed] == ["audit"] and stats["total_audits"] == 1
+        assert statements
+        assert not [col for col in RESULT_COLUMNS for statement in statements if col in statement]
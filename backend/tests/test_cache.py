@@ -0,0 +1,80 @@
+"""
+Unit Tests for the single-flight layer
+
+Tests that concurrent identical computations run once and share
+their result or exception
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from services.cache import SingleFlight, flight_key
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Ten identical concurrent calls run the computation once"""
+        flights = SingleFlight()
+        calls = []
+
+        async def compute(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return {"value": value}
+
+        key = flight_key("abc", "intersectional", max_combination_size=2)
+        results = await asyncio.gather(*(flights.do(key, compute, 1) for _ in range(10)))
+
+        assert calls == [1]
+        assert all(result is results[0] for result in results)
+        assert flights.stats == {"executions": 1, "shared": 9}
+        assert flights.in_flight() == 0
+
+        # Nothing is kept once the computation is over
+        await flights.do(key, compute, 2)
+        assert calls == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_sync_functions_run_in_thread_pool(self):
+        """Synchronous functions run off the event loop, distinct keys run separately"""
+        flights = SingleFlight()
+        threads = set()
+
+        def train(n):
+            threads.add(threading.get_ident())
+            return n * 2
+
+        results = await asyncio.gather(
+            flights.do(flight_key("abc", "model", n=1), train, 1),
+            flights.do(flight_key("abc", "model", n=2), train, 2)
+        )
+
+        assert results == [2, 4]
+        assert threading.get_ident() not in threads
+        assert flights.stats["executions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_exception_is_shared(self):
+        """Every waiting caller receives the exception of the shared computation"""
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flights.do("key", fail) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flights.stats["executions"] == 1
+
+    def test_flight_key_normalizes_params(self):
+        """Parameter order does not change the key"""
+        assert flight_key("h", "op", a=1, b=[1, 2]) == flight_key("h", "op", b=[1, 2], a=1)
+        assert flight_key("h", "op", a=1) != flight_key("h", "op", a=2)
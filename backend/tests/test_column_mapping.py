@@ -0,0 +1,78 @@
+"""
+Unit Tests for column mapping as a read-time view
+
+Tests that the mapping renames columns of the loaded DataFrame, the stored
+profile and preview without touching the file, that partial reads translate
+names, and that saved DataFrames go back to the stored names
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from services.dataset_service import DatasetService
+
+
+def _dataset(mapping=None):
+    return SimpleNamespace(
+        id=1, blob_id=None, file_hash="abc", filename="d.csv", mime_type="text/csv", encoding="utf-8",
+        column_mappings=mapping, column_overlays=None,
+        columns_info={"columns": [{"name": "a", "type": "int"}, {"name": "b", "type": "str"}]},
+        preview_data=[{"a": 1, "b": "x"}]
+    )
+
+
+class TestColumnMapping:
+    """Test suite for the DatasetService mapping view"""
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"], "c": [0.1, 0.2, 0.3]})
+
+    def test_metadata_is_renamed(self):
+        """Profile, preview and version reflect the mapping; identity entries are ignored"""
+        dataset = _dataset({"a": "age", "b": "b"})
+
+        assert DatasetService.get_column_mapping(dataset) == {"a": "age"}
+        assert [col["name"] for col in DatasetService.get_column_list(dataset)] == ["age", "b"]
+        assert dataset.columns_info["columns"][0]["name"] == "a"
+        assert DatasetService.get_preview(dataset) == [{"age": 1, "b": "x"}]
+        assert DatasetService.get_stored_column_names(dataset) == ["a", "b"]
+
+        version = DatasetService.view_version(dataset)
+        assert version.startswith("abc:") and DatasetService.view_version(_dataset({"b": "b"})) == "abc"
+        assert version != DatasetService.view_version(_dataset({"a": "years"}))
+
+    @pytest.mark.asyncio
+    async def test_reads_apply_mapping(self, df, monkeypatch):
+        """Full and partial reads return mapped names; hidden stored names are not selectable"""
+        async def load(dataset):
+            return df
+        monkeypatch.setattr(DatasetService, "_load_df", staticmethod(load))
+        dataset = _dataset({"a": "age", "c": "a"})
+
+        full = await DatasetService.get_dataset_df(dataset)
+        assert full.columns.tolist() == ["age", "b", "a"]
+        assert full["a"].tolist() == df["c"].tolist()
+
+        partial = await DatasetService.get_dataset_df(dataset, columns=["age", "a"], max_rows=2)
+        assert partial.columns.tolist() == ["age", "a"] and len(partial) == 2
+        assert DatasetService._stored_names(dataset, ["age", "a", "c", "b"]) == ["a", "c", "b"]
+
+    def test_to_stored_columns_round_trip(self, df):
+        """Mapped DataFrames are saved under the stored names"""
+        dataset = _dataset({"a": "age", "b": "label"})
+
+        mapped = DatasetService.apply_column_mapping(dataset, df)
+        pd.testing.assert_frame_equal(DatasetService.to_stored_columns(dataset, mapped), df)
+        assert dataset.column_mappings == {"a": "age", "b": "label"}
+
+    def test_conflicting_columns_clear_mapping(self, df):
+        """A new column named like a hidden stored column folds the mapping into the content"""
+        dataset = _dataset({"a": "age"})
+        mapped = DatasetService.apply_column_mapping(dataset, df).assign(a=0)
+
+        stored = DatasetService.to_stored_columns(dataset, mapped)
+        assert stored.columns.tolist() == ["age", "b", "c", "a"]
+        assert dataset.column_mappings is None
@@ -0,0 +1,102 @@
+"""
+Unit Tests for content-addressed dataset blobs
+
+Tests that re-uploading the same content reuses the stored blob (no storage
+write, no profiling), that ref_count follows the datasets and versions
+pointing at it, and that the blob is released with its last reference only
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.data_connection  # noqa: F401
+import models.mapping_template  # noqa: F401
+import models.organization  # noqa: F401
+import models.user  # noqa: F401
+from db import Base
+from models.dataset import DatasetBlob
+from services import dataset_service as dataset_module
+from services.dataset_service import DatasetService
+from services.storage import LocalStorageBackend
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    backend = LocalStorageBackend(str(tmp_path / "uploads"))
+    monkeypatch.setattr(dataset_module, "storage", backend)
+    return backend
+
+
+async def _sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dedup.db'}")
+    tables = [Base.metadata.tables[name] for name in ("dataset_blobs", "datasets", "dataset_versions", "audits")]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    return sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    rng = np.random.default_rng(0)
+    path = tmp_path / "candidat.csv"
+    pd.DataFrame({"age": rng.integers(20, 60, 300), "gender": rng.choice(["F", "M"], 300)}).to_csv(path, index=False)
+    return str(path)
+
+
+async def _ref_count(db, blob_id):
+    return await db.scalar(select(DatasetBlob.ref_count).where(DatasetBlob.id == blob_id))
+
+
+class TestBlobDeduplication:
+    """Test suite for DatasetBlob sharing and reference counting"""
+
+    @pytest.mark.asyncio
+    async def test_reupload_reuses_blob(self, tmp_path, storage, csv_path, monkeypatch):
+        """The second upload of the same bytes skips storage and profiling and shares the blob"""
+        writes = []
+        put_file = storage.put_file
+
+        async def counting_put_file(key, path, content_type="application/octet-stream"):
+            writes.append(key)
+            await put_file(key, path, content_type)
+        monkeypatch.setattr(storage, "put_file", counting_put_file)
+
+        async with (await _sessions(tmp_path))() as db:
+            first = await DatasetService.create_dataset_from_file(db, csv_path, user_id=1, original_filename="candidat.csv")
+
+            def no_profiling(*args, **kwargs):
+                raise AssertionError("a known blob must not be profiled again")
+            monkeypatch.setattr(dataset_module, "profile_file", no_profiling)
+            second = await DatasetService.create_dataset_from_file(db, csv_path, user_id=2, original_filename="copy.csv")
+
+            assert second.blob_id == first.blob_id and second.filename == first.filename
+            assert second.row_count == 300 and second.columns_info == first.columns_info
+            assert writes == [first.filename]
+            assert await db.scalar(select(func.count(DatasetBlob.id))) == 1
+            # Each dataset and its upload version hold a reference
+            assert await _ref_count(db, first.blob_id) == 4
+
+    @pytest.mark.asyncio
+    async def test_blob_released_with_last_reference(self, tmp_path, storage, csv_path):
+        """Deleting one of two datasets keeps the blob; deleting the last one releases it"""
+        async with (await _sessions(tmp_path))() as db:
+            first = await DatasetService.create_dataset_from_file(db, csv_path, user_id=1, original_filename="candidat.csv")
+            second = await DatasetService.create_dataset_from_file(db, csv_path, user_id=2, original_filename="copy.csv")
+            blob_id = first.blob_id
+
+            await db.delete(first)
+            await db.commit()
+            assert await _ref_count(db, blob_id) == 2
+            assert await DatasetService.release_unreferenced_blobs(db) == 0
+            assert await storage.exists(second.filename)
+
+            await db.delete(second)
+            await db.commit()
+            assert await _ref_count(db, blob_id) == 0
+            assert await DatasetService.release_unreferenced_blobs(db) == 1
+            assert not await storage.exists(second.filename)
+            assert await db.scalar(select(func.count(DatasetBlob.id))) == 0
@@ -0,0 +1,100 @@
+"""
+Unit Tests for the preview stored at ingestion
+
+Tests that ingestion stores the first rows and the column profile on the
+dataset, that the detail endpoint serves them without reading the file,
+and that datasets created before the stored preview get it computed once
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.data_connection  # noqa: F401
+import models.mapping_template  # noqa: F401
+import models.organization  # noqa: F401
+import models.user  # noqa: F401
+from db import Base
+from models.dataset import Dataset
+from routers.upload import get_dataset_details
+from services import dataset_service as dataset_module
+from services.dataset_service import PREVIEW_ROWS, DatasetService
+from services.storage import LocalStorageBackend
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    backend = LocalStorageBackend(str(tmp_path / "uploads"))
+    monkeypatch.setattr(dataset_module, "storage", backend)
+    return backend
+
+
+async def _sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'preview.db'}")
+    tables = [Base.metadata.tables[name] for name in ("dataset_blobs", "datasets", "dataset_versions")]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    return sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+@pytest.fixture
+def df():
+    n = 500
+    return pd.DataFrame({
+        "age": np.where(np.arange(n) % 7 == 0, np.nan, np.arange(n) % 50 + 20),
+        "gender": np.where(np.arange(n) % 2 == 0, "F", "M"),
+    })
+
+
+def _user():
+    return SimpleNamespace(id=1, organization_id=None)
+
+
+class TestStoredPreview:
+    """Test suite for Dataset.preview_data"""
+
+    @pytest.mark.asyncio
+    async def test_details_served_without_storage(self, tmp_path, storage, df, monkeypatch):
+        """The detail endpoint returns the ingestion preview and profile without reading the file"""
+        sessions = await _sessions(tmp_path)
+        async with sessions() as db:
+            dataset = await DatasetService.create_dataset_from_df(db, df, user_id=1, original_filename="d.csv")
+            await db.commit()
+
+        async def unreachable(*args, **kwargs):
+            raise AssertionError("the stored preview must not read the file")
+        monkeypatch.setattr(DatasetService, "get_dataset_df", staticmethod(unreachable))
+        monkeypatch.setattr(storage, "get", unreachable)
+
+        async with sessions() as db:
+            details = await get_dataset_details(dataset.id, db=db, current_user=_user())
+
+        assert len(details["preview_data"]) == PREVIEW_ROWS
+        assert details["preview_data"][:2] == [{"age": "", "gender": "F"}, {"age": 21.0, "gender": "M"}]
+        assert [col["name"] for col in details["columns_info"]["columns"]] == ["age", "gender"]
+        assert details["row_count"] == len(df)
+
+    @pytest.mark.asyncio
+    async def test_missing_preview_computed_once(self, tmp_path, storage, df, monkeypatch):
+        """A dataset without stored preview gets it from the file once, then from the row"""
+        sessions = await _sessions(tmp_path)
+        async with sessions() as db:
+            dataset = await DatasetService.create_dataset_from_df(db, df, user_id=1, original_filename="d.csv")
+            await db.execute(update(Dataset).where(Dataset.id == dataset.id).values(preview_data=None))
+            await db.commit()
+
+        expected = DatasetService.build_preview(df)
+        async with sessions() as db:
+            details = await get_dataset_details(dataset.id, db=db, current_user=_user())
+        assert details["preview_data"] == expected
+
+        async def unreachable(*args, **kwargs):
+            raise AssertionError("the saved preview must not read the file again")
+        monkeypatch.setattr(DatasetService, "get_dataset_df", staticmethod(unreachable))
+        async with sessions() as db:
+            assert (await get_dataset_details(dataset.id, db=db, current_user=_user()))["preview_data"] == expected
@@ -0,0 +1,57 @@
+"""
+Unit Tests for dataset processing utilities
+
+Tests encoding detection on in-memory content and files on disk
+"""
+
+import codecs
+
+import pytest
+
+from utils import dataset_processing
+from utils.dataset_processing import detect_encoding, detect_file_encoding
+
+
+class TestEncodingDetection:
+    """Test suite for the bounded encoding detector"""
+
+    @pytest.fixture
+    def csv_text(self):
+        return "nom,ville\n" + "".join(f"Zoé{i},Orléans\n" for i in range(20000))
+
+    def test_utf8_fast_path(self, csv_text):
+        """Valid UTF-8 is recognized without statistical detection"""
+        assert detect_encoding(csv_text.encode("utf-8")) == "utf-8"
+
+    def test_truncated_prefix_is_still_utf8(self):
+        """A prefix cut inside a multi-byte character is still UTF-8"""
+        content = "é".encode("utf-8") * 10
+        assert detect_encoding(content[:-1]) == "utf-8"
+
+    def test_bom_sniffing(self):
+        """BOMs take precedence over content analysis"""
+        assert detect_encoding(codecs.BOM_UTF8 + b"a,b\n1,2\n") == "utf-8-sig"
+        assert detect_encoding("a,b\n1,2\n".encode("utf-16")) == "utf-16"
+
+    def test_latin1_file_uses_sampled_fallback(self, tmp_path, csv_text):
+        """Non UTF-8 files fall back to a decodable single-byte encoding"""
+        path = tmp_path / "latin1.csv"
+        path.write_bytes(csv_text.encode("latin-1"))
+
+        encoding = detect_file_encoding(str(path))
+
+        assert encoding != "utf-8"
+        assert path.read_bytes().decode(encoding).startswith("nom,ville\nZoé0")
+
+    def test_result_cached_by_file_hash(self, tmp_path, monkeypatch):
+        """A known file hash skips detection entirely"""
+        path = tmp_path / "data.csv"
+        path.write_bytes(b"a,b\n1,2\n")
+
+        assert detect_file_encoding(str(path), file_hash="hash-1") == "utf-8"
+
+        def fail(*args, **kwargs):
+            raise AssertionError("detection should be cached")
+
+        monkeypatch.setattr(dataset_processing, "_detect_file_encoding", fail)
+        assert detect_file_encoding(str(path), file_hash="hash-1") == "utf-8"
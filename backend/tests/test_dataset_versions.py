@@ -0,0 +1,132 @@
+"""
+Unit Tests for copy-on-write dataset versions
+
+Tests that modifications create immutable versions, that added or changed
+columns are written alone on top of the shared base file, that earlier
+versions stay readable after a full rewrite, and that blobs are released
+only once no dataset or version references them
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.data_connection  # noqa: F401
+import models.mapping_template  # noqa: F401
+import models.organization  # noqa: F401
+import models.user  # noqa: F401
+from db import Base
+from models.dataset import Audit, Dataset, DatasetBlob, DatasetVersion
+from services import dataset_service as dataset_module
+from services.dataset_service import DatasetService
+from services.storage import LocalStorageBackend
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    backend = LocalStorageBackend(str(tmp_path / "uploads"))
+    monkeypatch.setattr(dataset_module, "storage", backend)
+    return backend
+
+
+async def _sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'versions.db'}")
+    tables = [Base.metadata.tables[name] for name in ("dataset_blobs", "datasets", "dataset_versions", "audits")]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    return sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 1000
+    return pd.DataFrame({
+        "age": np.where(rng.random(n) < 0.1, np.nan, rng.integers(20, 60, n)),
+        "gender": rng.choice(["F", "M"], n),
+        "target": rng.integers(0, 2, n),
+    })
+
+
+async def _versions(db, dataset):
+    result = await db.execute(
+        select(DatasetVersion).where(DatasetVersion.dataset_id == dataset.id).order_by(DatasetVersion.version)
+    )
+    return result.scalars().all()
+
+
+class TestDatasetVersions:
+    """Test suite for DatasetVersion and column overlays"""
+
+    @pytest.mark.asyncio
+    async def test_added_columns_are_written_alone(self, tmp_path, storage, df):
+        """Predictions are stored as one Parquet blob per column; the base file is shared"""
+        async with (await _sessions(tmp_path))() as db:
+            dataset = await DatasetService.create_dataset_from_df(db, df, user_id=1, original_filename="d.csv")
+            base_hash = dataset.file_hash
+            predictions = pd.DataFrame({"ml_prediction": np.arange(len(df)) % 2})
+
+            await DatasetService.add_dataset_columns(dataset, predictions, "ml_prediction", {"source": "upload"})
+            await db.commit()
+
+            assert dataset.file_hash == base_hash
+            assert list(dataset.column_overlays) == ["ml_prediction"]
+            assert dataset.column_count == 4 and dataset.preview_data[0]["ml_prediction"] == 0
+            assert DatasetService.get_stored_column_names(dataset)[-1] == "ml_prediction"
+            assert [(v.version, v.operation) for v in await _versions(db, dataset)] == [(1, "upload"), (2, "ml_prediction")]
+
+            full = await DatasetService.get_dataset_df(dataset)
+            pd.testing.assert_frame_equal(full[df.columns], df, check_dtype=False)
+            assert full["ml_prediction"].tolist() == predictions["ml_prediction"].tolist()
+
+            partial = await DatasetService.get_dataset_df(dataset, columns=["ml_prediction", "gender"], max_rows=5)
+            assert partial.columns.tolist() == ["gender", "ml_prediction"] and len(partial) == 5
+
+            with pytest.raises(ValueError):
+                await DatasetService.add_dataset_columns(dataset, predictions.head(3), "ml_prediction")
+
+    @pytest.mark.asyncio
+    async def test_pinned_version_survives_rewrite(self, tmp_path, storage, df):
+        """A full rewrite creates a new base; the pinned version and its blobs are kept"""
+        async with (await _sessions(tmp_path))() as db:
+            dataset = await DatasetService.create_dataset_from_df(db, df, user_id=1, original_filename="d.csv")
+            filled = df.assign(age=df["age"].fillna(df["age"].median()))
+            await DatasetService.save_dataset_df(dataset, filled, "missing_values", changed_columns=["age"])
+            await db.commit()
+            assert list(dataset.column_overlays) == ["age"]
+
+            audit = Audit(
+                dataset_id=dataset.id, dataset_version_id=dataset.version_id, user_id=1, audit_name="a",
+                use_case="other", target_column="target", sensitive_attributes=["gender"]
+            )
+            db.add(audit)
+            await DatasetService.save_dataset_df(dataset, filled.head(500).drop(columns="target"), "missing_values")
+            await db.commit()
+            await DatasetService.release_unreferenced_blobs(db)
+
+            assert dataset.column_overlays is None and dataset.row_count == 500
+            pinned = await DatasetService.get_audit_source(db, audit, dataset)
+            assert pinned.version == 2
+            pd.testing.assert_frame_equal(await DatasetService.get_dataset_df(pinned), filled, check_dtype=False)
+            assert DatasetService.view_version(pinned) != DatasetService.view_version(dataset)
+
+    @pytest.mark.asyncio
+    async def test_blobs_released_with_last_reference(self, tmp_path, storage, df):
+        """Blobs referenced by versions are released once the dataset is deleted"""
+        async with (await _sessions(tmp_path))() as db:
+            dataset = await DatasetService.create_dataset_from_df(db, df, user_id=1, original_filename="d.csv")
+            await DatasetService.add_dataset_columns(dataset, pd.DataFrame({"p": np.zeros(len(df))}), "ml_prediction")
+            await db.commit()
+
+            counts = dict((await db.execute(select(DatasetBlob.storage_key, DatasetBlob.ref_count))).all())
+            assert counts[dataset.filename] == 3  # dataset + 2 versions
+            assert sorted(counts.values()) == [1, 3]
+
+            await db.delete(dataset)
+            await db.commit()
+            assert await DatasetService.release_unreferenced_blobs(db) == 2
+            for key in counts:
+                assert not await storage.exists(key)
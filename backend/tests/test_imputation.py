@@ -0,0 +1,77 @@
+"""
+Unit Tests for model-based imputation
+
+Tests KNN and iterative imputation fitted on a sample and applied in
+batches, their use through handle_missing_values, and the group-wise
+report of distribution changes
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import imputation
+from utils.imputation import impute_columns, imputation_group_report, shutdown_process_pool
+from utils.missing_values import get_available_strategies, handle_missing_values
+
+
+class TestImputation:
+    """Test suite for utils.imputation"""
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(0)
+        n = 4000
+        x = rng.normal(0, 1, n)
+        return pd.DataFrame({
+            "x": x,
+            "y": np.where(rng.random(n) < 0.2, np.nan, 3 * x + rng.normal(0, 0.1, n)),
+            "count": rng.integers(0, 10, n),
+            "group": rng.choice(["a", "b"], n),
+        })
+
+    @pytest.mark.parametrize("method", ["knn", "iterative"])
+    def test_imputes_from_related_columns(self, df, method):
+        """Missing values are predicted from the other numeric columns"""
+        missing = df["y"].isna()
+        result = impute_columns(df, ["y", "group"], method=method, sample_size=1000, batch_size=300, max_workers=1)
+
+        assert list(result.columns) == ["y"] and result.index.equals(df.index)
+        assert result["y"].notna().all()
+        pd.testing.assert_series_equal(result["y"][~missing], df["y"][~missing])
+        assert np.abs(result["y"][missing] - 3 * df["x"][missing]).mean() < 0.5
+
+    def test_process_pool_is_shared(self, df):
+        """KNN batches go to one process pool reused across calls until shutdown"""
+        kwargs = dict(sample_size=1000, batch_size=300)
+        try:
+            first = impute_columns(df, ["y"], max_workers=2, **kwargs)
+            pool = imputation._process_pool
+            second = impute_columns(df, ["y"], max_workers=2, **kwargs)
+
+            assert pool is not None and imputation._process_pool is pool
+            pd.testing.assert_frame_equal(first, second)
+            pd.testing.assert_frame_equal(first, impute_columns(df, ["y"], max_workers=1, **kwargs))
+        finally:
+            shutdown_process_pool()
+        assert imputation._process_pool is None
+
+    def test_handle_missing_values_strategies(self, df):
+        """knn / iterative are offered for numeric columns and fill through handle_missing_values"""
+        assert "knn" in get_available_strategies(df["y"])
+        assert "iterative" not in get_available_strategies(df["group"])
+
+        result = handle_missing_values(df, {"y": "iterative", "group": "knn"})
+        assert result["y"].isna().sum() == 0 and df["y"].isna().sum() > 0
+        pd.testing.assert_series_equal(result["group"], df["group"])
+
+    def test_group_report(self):
+        """The report compares observed and treated group means"""
+        before = pd.DataFrame({"v": [1.0, 3.0, None, 10.0, None], "g": ["a", "a", "a", "b", "b"]})
+        after = pd.DataFrame({"v": [1.0, 3.0, 2.0, 10.0, 2.0]}, index=before.index)
+        report = imputation_group_report(before, after, ["v"], ["g", "missing"])["g"]["v"]
+
+        assert report["groups"]["a"]["imputed"] == 1 and report["groups"]["b"]["imputed"] == 1
+        assert report["groups"]["b"]["mean_before"] == 10.0 and report["groups"]["b"]["mean_after"] == 6.0
+        assert report["gap_before"] == 8.0 and report["gap_after"] == 4.0
+        assert report["flagged_groups"] == ["b"]
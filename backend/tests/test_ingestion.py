@@ -0,0 +1,49 @@
+"""
+Unit Tests for streaming upload ingestion
+
+Tests that the physical line count only acts as a safety bound while the
+upload is copied, so that multi-line quoted fields do not reject a file
+whose exact row count is within the plan limit
+"""
+
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from services.ingestion import ROW_LIMIT_LINE_FACTOR, RowLimitExceeded, spool_upload
+from utils.profiling import profile_file
+
+
+def _upload(content, filename="data.csv"):
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+class TestSpoolUpload:
+    """Test suite for spool_upload"""
+
+    @pytest.mark.asyncio
+    async def test_multiline_fields_within_limit(self, tmp_path):
+        """Quoted newlines push the line count over max_rows without rejecting the file"""
+        content = ("id,comment\n" + "".join(f'{i},"line one\nline two"\n' for i in range(10))).encode()
+
+        spooled = await spool_upload(_upload(content), max_rows=10, chunk_size=16, tmp_dir=tmp_path)
+        try:
+            assert spooled.line_count == 21
+            assert spooled.file_hash == hashlib.sha256(content).hexdigest()
+            assert profile_file(spooled.path)["row_count"] == 10
+        finally:
+            spooled.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_far_over_limit_aborts(self, tmp_path):
+        """The copy stops once the line count exceeds the safety bound; no file is left behind"""
+        rows = 10 * ROW_LIMIT_LINE_FACTOR + 1
+        content = ("a,b\n" + "".join(f"{i},{i}\n" for i in range(rows))).encode()
+
+        with pytest.raises(RowLimitExceeded) as exc:
+            await spool_upload(_upload(content), max_rows=10, chunk_size=16, tmp_dir=tmp_path)
+
+        assert exc.value.max_rows == 10
+        assert list(tmp_path.iterdir()) == []
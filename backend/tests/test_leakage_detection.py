@@ -0,0 +1,87 @@
+"""
+Unit Tests for multivariate leakage detection
+
+Tests that a sensitive attribute encoded jointly by two columns, invisible
+to pairwise metrics, is detected with its contributing columns, and that
+sampling and the time budget are respected
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.leakage_detection import _stratified_sample, detect_leakage
+from utils.proxy_detection import detect_proxy_variables
+
+
+class TestLeakageDetection:
+    """Test suite for utils.leakage_detection"""
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(0)
+        n = 6000
+        zip_code = rng.integers(0, 40, n)
+        contract = rng.choice(["cdi", "cdd"], n)
+        # Origine encodée par la combinaison code postal x contrat (XOR), bruitée
+        group = (zip_code % 2 == 1) ^ (contract == "cdi")
+        origin = np.where(rng.random(n) < 0.9, np.where(group, "A", "B"), rng.choice(["A", "B"], n))
+        return pd.DataFrame({
+            "zip": (75000 + zip_code).astype(str),
+            "contract": contract,
+            "salary": rng.normal(30_000, 5_000, n),
+            "age": rng.integers(18, 70, n),
+            "origin": origin,
+            "target": rng.integers(0, 2, n),
+        })
+
+    def test_detects_joint_proxy(self, df):
+        """The combination is found although no single column is a pairwise proxy"""
+        assert detect_proxy_variables(df, ["origin"], correlation_threshold=0.3) == {"origin": []}
+
+        report = detect_leakage(df, ["origin", "age"], exclude_columns=["target"], sample_size=4000)
+        origin = report["attributes"]["origin"]
+        assert origin["risk_level"] == "high" and origin["models"]["hist_gradient_boosting"]["auc"] > 0.85
+        assert {f["column"] for f in origin["features"][:2]} == {"zip", "contract"}
+        assert origin["sample_size"] == 4000 and not origin["budget_exhausted"]
+
+        age = report["attributes"]["age"]
+        assert age["target_encoding"] == "quantiles" and len(age["classes"]) == 4
+        assert age["risk_level"] == "low"
+
+    def test_l1_selects_columns(self):
+        """The logistic model is L1: columns unrelated to the attribute get a zero weight"""
+        rng = np.random.default_rng(0)
+        n = 6000
+        signal = rng.normal(size=n)
+        df = pd.DataFrame({
+            "signal": signal,
+            **{f"noise_{i}": rng.normal(size=n) for i in range(4)},
+            "team": rng.choice(["a", "b", "c"], n),
+            "origin": np.where(signal > 0, "A", "B"),
+        })
+        features = detect_leakage(df, ["origin"])["attributes"]["origin"]["features"]
+        weights = {f["column"]: f["l1_weight"] for f in features}
+
+        assert weights["signal"] > 0
+        assert all(weights.get(col, 0.0) == 0.0 for col in ["noise_0", "noise_1", "noise_2", "noise_3", "team"])
+
+    def test_time_budget(self, df):
+        """Once the budget is spent the remaining attributes are skipped and flagged"""
+        report = detect_leakage(df, ["origin", "age"], time_budget=1e-9)
+        assert all(result["budget_exhausted"] for result in report["attributes"].values())
+        assert report["attributes"]["age"]["leakage_auc"] is None
+        assert {result["risk_level"] for result in report["attributes"].values()} == {"unknown"}
+
+    def test_unevaluated_attribute_is_unknown(self, df):
+        """An attribute with a single class is reported as unknown, not low risk"""
+        report = detect_leakage(df.assign(constant="x"), ["constant"], exclude_columns=["target"])
+        constant = report["attributes"]["constant"]
+        assert constant["leakage_auc"] is None and constant["risk_level"] == "unknown"
+
+    def test_stratified_sample(self):
+        """The sample keeps class proportions and skips missing values"""
+        codes = np.repeat([0, 1, 2, -1], [9000, 900, 3, 100])
+        sample = _stratified_sample(codes, 1000, np.random.default_rng(0))
+        assert len(np.unique(sample)) == len(sample)
+        assert np.bincount(codes[sample]).tolist() == [909, 91, 2]
@@ -0,0 +1,70 @@
+"""
+Unit Tests for missing-value analysis and treatment
+
+Tests that the analysis from the stored profile matches the analysis of
+the DataFrame, and that all strategies are applied in one pass without
+modifying the input
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.missing_values import analyze_missing_values, analyze_missing_values_from_profile, handle_missing_values
+from utils.profiling import profile_dataframe
+
+
+class TestMissingValues:
+    """Test suite for utils.missing_values"""
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        return pd.DataFrame({
+            "salary": np.where(rng.random(n) < 0.1, np.nan, rng.normal(40_000, 5_000, n)),
+            "bonus": np.where(rng.random(n) < 0.3, np.nan, rng.exponential(1_000, n)),
+            "city": rng.choice(["Paris", "Lyon", None], n),
+            "manager": np.where(rng.random(n) < 0.6, np.nan, 1.0),
+            "remote": np.where(rng.random(n) < 0.02, np.nan, rng.integers(0, 2, n)),
+            "level": np.where(rng.random(n) < 0.2, np.nan, rng.integers(0, 2, n)),
+            "complete": rng.random(n),
+        })
+
+    def test_profile_analysis_matches_dataframe(self, df):
+        """The stored profile yields the same analysis as the DataFrame"""
+        analysis = analyze_missing_values(df)
+        from_profile = analyze_missing_values_from_profile(profile_dataframe(df)["columns"], len(df))
+
+        assert from_profile == analysis
+        assert "complete" not in analysis
+        assert analysis["manager"]["recommended_strategy"] == "drop_column"
+        assert analysis["remote"]["recommended_strategy"] == "drop_rows"
+        assert analysis["level"]["recommended_strategy"] == "mode"
+        assert analysis["salary"]["recommended_strategy"] == "mean"
+        assert analysis["bonus"]["recommended_strategy"] == "median"
+
+    def test_treatment_applies_all_strategies(self, df):
+        """Rows are dropped once, then every column is filled from the remaining rows"""
+        before = df.copy()
+        strategy = {
+            "salary": "mean", "bonus": "median", "city": "mode", "manager": "drop_column",
+            "remote": "drop_rows", "level": "forward_fill", "unknown": "mean"
+        }
+        result = handle_missing_values(df, strategy)
+
+        pd.testing.assert_frame_equal(df, before)
+        kept = df.dropna(subset=["remote"])
+        assert len(result) == len(kept) and "manager" not in result.columns
+        assert result[["salary", "bonus", "city", "level"]].isna().sum().sum() == 0
+        assert result["salary"][kept["salary"].isna()].unique() == pytest.approx([kept["salary"].mean()])
+        assert (result["bonus"][kept["bonus"].isna()] == kept["bonus"].median()).all()
+        pd.testing.assert_series_equal(result["level"], kept["level"].ffill().bfill())
+        pd.testing.assert_series_equal(result["complete"], kept["complete"])
+
+    def test_constant_fill_by_type(self):
+        """Constant fills use 0 for numbers and 'Unknown' otherwise"""
+        df = pd.DataFrame({"n": [1.0, None], "s": ["a", None]})
+        result = handle_missing_values(df, {"n": "constant", "s": "constant"})
+        assert result["n"].tolist() == [1.0, 0.0]
+        assert result["s"].tolist() == ["a", "Unknown"]
@@ -0,0 +1,111 @@
+"""
+Unit Tests for mitigation run persistence
+
+Tests that each mitigation run, completed or failed, is stored as its own
+mitigation_runs row (metrics loaded only on the run detail) and that the
+audit's legacy JSON column is left untouched
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker, undefer_group
+
+import models.data_connection  # noqa: F401
+import models.mapping_template  # noqa: F401
+import models.organization  # noqa: F401
+import models.user  # noqa: F401
+from db import Base
+from models.dataset import Audit, Dataset, MitigationRun
+from routers.mitigation import get_mitigation_run, list_mitigation_runs
+from services.fairness import service as service_module
+from services.fairness.model_store import MitigatedModelStore
+from services.fairness.service import EnhancedFairnessService
+from services.storage import LocalStorageBackend
+
+
+async def _sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'runs.db'}")
+    tables = [
+        Base.metadata.tables[name]
+        for name in ("dataset_blobs", "datasets", "dataset_versions", "audits", "mitigation_runs")
+    ]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    return sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def _audit(db):
+    dataset = Dataset(
+        user_id=1, filename="d.csv", original_filename="d.csv", file_size=1, file_hash="h",
+        mime_type="text/csv", row_count=1, column_count=1
+    )
+    db.add(dataset)
+    await db.flush()
+    audit = Audit(
+        dataset_id=dataset.id, user_id=1, audit_name="audit", use_case="other", target_column="target",
+        prediction_column="prediction", sensitive_attributes=["gender"]
+    )
+    db.add(audit)
+    await db.commit()
+    return audit
+
+
+class TestMitigationRuns:
+    """Test suite for MitigationRun rows written by apply_mitigation_strategy"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        rng = np.random.default_rng(0)
+        n = 400
+        df = pd.DataFrame({
+            "feature1": rng.normal(size=n),
+            "feature2": rng.normal(size=n),
+            "gender": rng.choice(["M", "F"], n),
+        })
+        y = pd.Series((df["feature1"] + rng.normal(size=n) * 0.5 > 0).astype(int))
+        df = df.assign(target=y, prediction=y)
+
+        monkeypatch.setattr(
+            service_module, "model_store", MitigatedModelStore(LocalStorageBackend(str(tmp_path / "storage")))
+        )
+        service = EnhancedFairnessService()
+
+        async def load_audit_data(dataset, audit):
+            return df, y, y.to_numpy(), None, df[["gender"]]
+        monkeypatch.setattr(service, "load_audit_data", load_audit_data)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_completed_and_failed_runs(self, tmp_path, service):
+        """A completed and a failed run each get a row; metrics stay deferred until the detail"""
+        sessions = await _sessions(tmp_path)
+        async with sessions() as db:
+            audit = await _audit(db)
+            results = await service.apply_mitigation_strategy(audit, None, "threshold_optimizer", {}, db)
+            with pytest.raises(ValueError):
+                await service.apply_mitigation_strategy(audit, None, "unknown_strategy", {"alpha": 1.0}, db)
+
+        async with sessions() as db:
+            runs = (await db.execute(select(MitigationRun).order_by(MitigationRun.id))).scalars().all()
+            completed, failed = runs
+            assert completed.id == results["run_id"] and completed.status == "completed"
+            assert completed.model_version == 1 and completed.training_duration_ms is not None
+            assert "metrics_after" in inspect(completed).unloaded
+            assert failed.status == "failed" and "unknown_strategy" in failed.error_message
+            assert failed.strategy_params == {"alpha": 1.0} and failed.model_version is None
+
+            user = SimpleNamespace(id=1)
+            listing = await list_mitigation_runs(audit.id, db=db, current_user=user)
+            assert [run["status"] for run in listing["runs"]] == ["failed", "completed"]
+            detail = await get_mitigation_run(audit.id, completed.id, db=db, current_user=user)
+            assert detail["metrics_after"] == results["metrics_after"]
+
+            stored = (await db.execute(
+                select(Audit).options(undefer_group("audit_results")).where(Audit.id == audit.id)
+            )).scalar_one()
+            assert stored.mitigation_results is None
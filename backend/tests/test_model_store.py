@@ -0,0 +1,175 @@
+"""
+Unit Tests for the Mitigated Model Store
+
+Tests versioned persistence through the storage layer, cleanup of failed runs and chunked batch scoring
+"""
+
+from types import SimpleNamespace
+
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from fairlearn.postprocessing import ThresholdOptimizer
+
+import models.data_connection  # noqa: F401
+import models.mapping_template  # noqa: F401
+import models.organization  # noqa: F401
+import models.user  # noqa: F401
+from services.fairness import service as service_module
+from services.fairness.model_store import MitigatedModelStore, score_file_in_chunks
+from services.fairness.service import EnhancedFairnessService
+from services.storage import LocalStorageBackend
+
+
+class _Session:
+    """Records added rows in place of an AsyncSession"""
+
+    def __init__(self):
+        self.added = []
+
+    def add(self, row):
+        self.added.append(row)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        self.added.clear()
+
+
+class TestMitigatedModelStore:
+    """Test suite for the mitigated model store"""
+
+    @pytest.fixture
+    def sample_data(self):
+        """Create sample data with a sensitive attribute"""
+        np.random.seed(42)
+        n_samples = 300
+
+        df = pd.DataFrame({
+            'feature1': np.random.randn(n_samples),
+            'feature2': np.random.randn(n_samples),
+            'gender': np.random.choice(['M', 'F'], n_samples)
+        })
+        y = (df['feature1'] + np.random.randn(n_samples) * 0.5 > 0).astype(int)
+
+        return df, y
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return MitigatedModelStore(LocalStorageBackend(str(tmp_path / "storage")))
+
+    @pytest.mark.asyncio
+    async def test_versions_increment(self, store, sample_data):
+        """Each save creates a new version, visible to any store over the same storage"""
+        df, y = sample_data
+        model = LogisticRegression().fit(df[['feature1', 'feature2']], y)
+
+        first = await store.save(1, 'exponentiated_gradient', model, ['feature1', 'feature2'], ['gender'])
+        second = await store.save(1, 'exponentiated_gradient', model, ['feature1', 'feature2'], ['gender'])
+
+        assert first.version == 1
+        assert second.version == 2
+        assert [a.version for a in await store.list_versions(1)] == [2, 1]
+        assert (await store.get(1)).version == 2
+        assert (await store.get(1, version=1)).version == 1
+        assert await store.get(2) is None
+        assert (await MitigatedModelStore(store.backend).get(1)).path == second.path
+
+    @pytest.mark.asyncio
+    async def test_delete_version(self, store, sample_data):
+        """A deleted version leaves the manifest and the storage"""
+        df, y = sample_data
+        model = LogisticRegression().fit(df[['feature1', 'feature2']], y)
+        await store.save(1, 'exponentiated_gradient', model, ['feature1', 'feature2'], ['gender'])
+        second = await store.save(1, 'exponentiated_gradient', model, ['feature1', 'feature2'], ['gender'])
+
+        await store.delete(second)
+
+        assert [a.version for a in await store.list_versions(1)] == [1]
+        assert (await store.get(1)).version == 1
+        assert not await store.backend.exists(second.path)
+
+    @pytest.mark.asyncio
+    async def test_failed_run_keeps_no_version(self, store, sample_data, monkeypatch):
+        """A mitigation run failing after training records no usable model"""
+        df, y = sample_data
+        df = df.assign(target=y, prediction=y)
+        monkeypatch.setattr(service_module, "model_store", store)
+        service = EnhancedFairnessService()
+
+        async def load_audit_data(dataset, audit):
+            return df, y, y.to_numpy(), None, df[['gender']]
+        monkeypatch.setattr(service, "load_audit_data", load_audit_data)
+
+        def failing_json(value):
+            raise TypeError("not serializable")
+        monkeypatch.setattr(service_module, "_to_json_safe", failing_json)
+
+        db = _Session()
+        audit = SimpleNamespace(
+            id=1, user_id=1, target_column='target', prediction_column='prediction', sensitive_attributes=['gender']
+        )
+        with pytest.raises(TypeError):
+            await service.apply_mitigation_strategy(audit, None, 'threshold_optimizer', {}, db)
+
+        assert await store.list_versions(1) == []
+        assert [run.status for run in db.added] == ["failed"]
+
+    @pytest.mark.asyncio
+    async def test_load_roundtrip(self, store, sample_data):
+        """A loaded model predicts like the original one"""
+        df, y = sample_data
+        X = df[['feature1', 'feature2']]
+        model = LogisticRegression().fit(X, y)
+
+        artifact = await store.save(1, 'exponentiated_gradient', model, X.columns.tolist(), ['gender'])
+        loaded = await store.load(artifact)
+
+        np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+    @pytest.mark.asyncio
+    async def test_score_file_in_chunks(self, store, sample_data, tmp_path):
+        """Threshold optimizer scoring uses the sensitive features per chunk"""
+        df, y = sample_data
+        X = df[['feature1', 'feature2']]
+
+        optimizer = ThresholdOptimizer(
+            estimator=LogisticRegression().fit(X, y),
+            constraints='demographic_parity',
+            predict_method='predict_proba',
+            prefit=True
+        )
+        optimizer.fit(X, y, sensitive_features=df['gender'])
+
+        artifact = await store.save(
+            1, 'threshold_optimizer', optimizer, X.columns.tolist(), ['gender'],
+            requires_sensitive_features=True
+        )
+
+        input_path = tmp_path / "input.csv"
+        output_path = tmp_path / "scored.csv"
+        df.to_csv(input_path, index=False)
+
+        rows = score_file_in_chunks(
+            await store.load(artifact), artifact, str(input_path), str(output_path), chunk_size=70
+        )
+
+        scored = pd.read_csv(output_path)
+        assert rows == len(df)
+        assert len(scored) == len(df)
+        assert set(scored['mitigated_prediction'].unique()).issubset({0, 1})
+
+    @pytest.mark.asyncio
+    async def test_missing_feature_column(self, store, sample_data, tmp_path):
+        """Scoring a file without the training features fails clearly"""
+        df, y = sample_data
+        model = LogisticRegression().fit(df[['feature1', 'feature2']], y)
+        artifact = await store.save(1, 'exponentiated_gradient', model, ['feature1', 'feature2'], ['gender'])
+
+        input_path = tmp_path / "input.csv"
+        df[['feature1']].to_csv(input_path, index=False)
+
+        with pytest.raises(ValueError):
+            score_file_in_chunks(model, artifact, str(input_path), str(tmp_path / "out.csv"))
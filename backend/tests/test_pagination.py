@@ -0,0 +1,221 @@
+"""
+Unit Tests for list pagination and dashboard statistics
+
+Tests keyset pagination across several pages (including rows without a
+creation date), the paginated audit and mitigation run listings, and the
+single-query dashboard aggregate on SQLite with its per-organization cache
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import null, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.data_connection  # noqa: F401
+import models.mapping_template  # noqa: F401
+import models.organization  # noqa: F401
+import models.user  # noqa: F401
+from db import Base
+from models.dataset import Audit, Dataset, MitigationRun
+from routers import audits as audits_module
+from routers.audits import get_dashboard_stats, list_audits, run_audit_task
+from routers.mitigation import list_mitigation_runs
+from routers.upload import list_datasets
+from services.cache import dashboard_stats_cache, dashboard_stats_key
+from utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, encode_cursor, split_page
+
+
+async def _sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pagination.db'}")
+    tables = [
+        Base.metadata.tables[name]
+        for name in ("dataset_blobs", "datasets", "dataset_versions", "audits", "mitigation_runs")
+    ]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    return sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def _audits(db, created_ats, user_id=1, **fields):
+    dataset = Dataset(
+        user_id=user_id, filename="d.csv", original_filename="d.csv", file_size=1, file_hash="h",
+        mime_type="text/csv", row_count=1, column_count=1
+    )
+    db.add(dataset)
+    await db.flush()
+    audits = [
+        Audit(
+            dataset_id=dataset.id, user_id=user_id, audit_name=f"audit {i}", use_case="other",
+            target_column="target", sensitive_attributes=["gender"],
+            # Explicit NULL (None would apply the server default)
+            created_at=created_at if created_at is not None else null(), **fields
+        )
+        for i, created_at in enumerate(created_ats)
+    ]
+    db.add_all(audits)
+    await db.commit()
+    return audits
+
+
+def _user(user_id=1):
+    return SimpleNamespace(id=user_id, organization_id=None)
+
+
+class TestKeysetPagination:
+    """Test suite for apply_keyset / split_page"""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_every_row_once(self, tmp_path):
+        """Pages follow (created_at DESC NULLS FIRST, id DESC) without gaps or duplicates"""
+        now = datetime(2026, 1, 1)
+        created_ats = [None, now, now, None, now - timedelta(days=1), now + timedelta(days=1), None, now]
+        async with (await _sessions(tmp_path))() as db:
+            audits = await _audits(db, created_ats)
+
+            pages, cursor = [], None
+            for _ in range(len(created_ats)):
+                stmt = apply_keyset(select(Audit.id, Audit.created_at), Audit.created_at, Audit.id, cursor, 3)
+                page, cursor = split_page((await db.execute(stmt)).all(), 3)
+                pages.append([row.id for row in page])
+                if cursor is None:
+                    break
+
+            expected = sorted(
+                zip(created_ats, [a.id for a in audits]),
+                key=lambda row: (row[0] is not None, -(row[0] or now).timestamp(), -row[1])
+            )
+            assert [len(page) for page in pages] == [3, 3, 2]
+            assert sum(pages, []) == [row_id for _, row_id in expected]
+
+    @pytest.mark.asyncio
+    async def test_null_cursor_reaches_dated_rows(self, tmp_path):
+        """A cursor on an undated row resumes with the remaining undated rows, then the dated ones"""
+        async with (await _sessions(tmp_path))() as db:
+            audits = await _audits(db, [datetime(2026, 1, 1), None, None])
+
+            stmt = apply_keyset(select(Audit.id), Audit.created_at, Audit.id, encode_cursor(None, audits[2].id), 10)
+            assert (await db.execute(stmt)).scalars().all() == [audits[1].id, audits[0].id]
+
+    @pytest.mark.asyncio
+    async def test_list_audits_sets_next_cursor(self, tmp_path):
+        """The audit list returns one page and the cursor of the next one in X-Next-Cursor"""
+        start = datetime(2026, 1, 1)
+        async with (await _sessions(tmp_path))() as db:
+            await _audits(db, [start + timedelta(hours=i) for i in range(5)], status="completed")
+            await _audits(db, [start], user_id=2)
+
+            response = Response()
+            first = await list_audits(response, limit=2, current_user=_user(), db=db)
+            cursor = response.headers[NEXT_CURSOR_HEADER]
+            response = Response()
+            second = await list_audits(response, limit=10, cursor=cursor, status="completed", current_user=_user(), db=db)
+
+            assert [a["name"] for a in first] == ["audit 4", "audit 3"]
+            assert [a["name"] for a in second] == ["audit 2", "audit 1", "audit 0"]
+            assert NEXT_CURSOR_HEADER not in response.headers
+            with pytest.raises(HTTPException):
+                await list_audits(Response(), cursor="not-a-cursor", current_user=_user(), db=db)
+
+    @pytest.mark.asyncio
+    async def test_mitigation_runs_listing(self, tmp_path):
+        """Runs are listed most recent first with a total, a page window and a strategy filter"""
+        async with (await _sessions(tmp_path))() as db:
+            audit, = await _audits(db, [datetime(2026, 1, 1)])
+            strategies = ["threshold_optimizer", "exponentiated_gradient"] * 3
+            db.add_all([MitigationRun(audit_id=audit.id, user_id=1, strategy_name=name) for name in strategies])
+            await db.commit()
+
+            page = await list_mitigation_runs(audit.id, limit=2, offset=1, db=db, current_user=_user())
+            filtered = await list_mitigation_runs(
+                audit.id, strategy_name="threshold_optimizer", db=db, current_user=_user()
+            )
+
+            assert page["total"] == 6 and [run["id"] for run in page["runs"]] == [5, 4]
+            assert filtered["total"] == 3 and [run["id"] for run in filtered["runs"]] == [5, 3, 1]
+            with pytest.raises(HTTPException):
+                await list_mitigation_runs(audit.id, db=db, current_user=_user(2))
+
+
+    @pytest.mark.asyncio
+    async def test_list_datasets_filters_and_cursor(self, tmp_path):
+        """Datasets are paged by cursor with the status and use case filters applied server-side"""
+        start = datetime(2026, 1, 1)
+        async with (await _sessions(tmp_path))() as db:
+            db.add_all([
+                Dataset(
+                    user_id=1, filename=f"{i}.csv", original_filename=f"{i}.csv", file_size=1, file_hash=f"h{i}",
+                    mime_type="text/csv", row_count=1, column_count=1, created_at=start + timedelta(hours=i),
+                    status="ready" if i % 3 else "processing", use_case="hiring" if i < 6 else "credit"
+                )
+                for i in range(8)
+            ])
+            await db.commit()
+
+            pages, cursor = [], None
+            for _ in range(4):
+                response = Response()
+                page = await list_datasets(
+                    response, limit=2, cursor=cursor, status_filter="ready", use_case="hiring", current_user=_user(), db=db
+                )
+                pages.append([d.filename for d in page])
+                cursor = response.headers.get(NEXT_CURSOR_HEADER)
+                if cursor is None:
+                    break
+
+            assert pages == [["5.csv", "4.csv"], ["2.csv", "1.csv"]]
+
+
+class TestDashboardStats:
+    """Test suite for the dashboard aggregate query"""
+
+    @pytest.mark.asyncio
+    async def test_single_aggregate_with_filters(self, tmp_path):
+        """FILTER aggregates count critical, compliant, monthly and recent audits"""
+        dashboard_stats_cache.clear()
+        now = datetime.utcnow()
+        async with (await _sessions(tmp_path))() as db:
+            recent, old, unscored = await _audits(db, [now - timedelta(days=1), now - timedelta(days=400), now])
+            recent.overall_score, old.overall_score = 50.0, 90.0
+            await _audits(db, [now], user_id=2, overall_score=10.0)
+            await db.commit()
+
+            stats = await get_dashboard_stats(db=db, current_user=_user())
+
+            assert stats["total_audits"] == 3
+            assert stats["avg_fairness_score"] == 70.0
+            assert stats["critical_biases"] == 1
+            assert stats["compliance_rate"] == 33.3
+            assert stats["recent_audits_count"] == 2
+            assert stats["audits_this_month"] == (2 if (now - timedelta(days=1)).month == now.month else 1)
+            assert await get_dashboard_stats(db=db, current_user=_user()) is stats
+        dashboard_stats_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_cache_shared_by_org_and_invalidated(self, tmp_path, monkeypatch):
+        """Stats are cached per organization and recomputed once an audit run finishes"""
+        dashboard_stats_cache.clear()
+        sessions = await _sessions(tmp_path)
+        monkeypatch.setattr(audits_module, "AsyncSessionLocal", sessions)
+        first, colleague = SimpleNamespace(id=1, organization_id=7), SimpleNamespace(id=2, organization_id=7)
+        async with sessions() as db:
+            await _audits(db, [datetime.utcnow()], organization_id=7, overall_score=90.0)
+            stats = await get_dashboard_stats(db=db, current_user=first)
+            assert await get_dashboard_stats(db=db, current_user=colleague) is stats
+
+            # Written behind the cache: served stale until the run invalidates it
+            audit, = await _audits(db, [datetime.utcnow()], organization_id=7, overall_score=30.0)
+            assert (await get_dashboard_stats(db=db, current_user=colleague))["total_audits"] == 1
+
+        # No predictions on the dataset: the run fails, which also ends it
+        await run_audit_task(audit.id, {"target_column": "target", "sensitive_attributes": ["gender"]})
+        assert dashboard_stats_cache.get(dashboard_stats_key(1, 7)) is None
+
+        async with sessions() as db:
+            stats = await get_dashboard_stats(db=db, current_user=first)
+            assert (await db.get(Audit, audit.id)).status == "failed"
+        assert stats["total_audits"] == 2 and stats["critical_biases"] == 1
+        dashboard_stats_cache.clear()
@@ -0,0 +1,66 @@
+"""
+Unit Tests for the re-identification risk module
+
+Tests equivalence-class counting (k-anonymity, l-diversity) against a
+pandas groupby and the greedy generalization search
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.privacy_risk import apply_generalization, compute_privacy_risk, generalize_values, search_generalization
+
+
+class TestPrivacyRisk:
+    """Test suite for k-anonymity / l-diversity"""
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(0)
+        n = 20_000
+        return pd.DataFrame({
+            "age": rng.integers(18, 80, n).astype(float),
+            "code_postal": rng.choice(["75001", "75002", "13008", "69003", None], n),
+            "gender": rng.choice(["F", "M"], n),
+            "hired": pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 3000, n), "D"),
+            "diagnosis": rng.choice(["a", "b", "c", None], n),
+        })
+
+    def test_matches_groupby(self, df):
+        """k, l and records at risk match a pandas groupby"""
+        qis = ["age", "code_postal", "gender"]
+        risk = compute_privacy_risk(df, qis, "diagnosis", target_k=5)
+
+        groups = df.groupby(qis, dropna=False)
+        sizes = groups.size()
+        diversity = groups["diagnosis"].nunique(dropna=False)
+        assert risk["k"] == sizes.min()
+        assert risk["equivalence_classes"] == len(sizes)
+        assert risk["records_at_risk"] == sizes[sizes < 5].sum()
+        assert risk["unique_records"] == (sizes == 1).sum()
+        assert risk["l"] == diversity.min()
+
+    def test_generalization_labels(self):
+        """Hierarchies produce age bands, postal prefixes and date granularities"""
+        ages = pd.Index([23, 47.5, np.nan, -3])
+        assert generalize_values(ages, "numeric", 2).tolist()[:2] == ["20-29", "40-49"]
+        assert pd.isna(generalize_values(ages, "numeric", 2)[2])
+        assert generalize_values(pd.Index(["75001", "13008"]), "postal", 3).tolist() == ["75*", "13*"]
+        dates = pd.DatetimeIndex(["2020-05-03", None])
+        assert generalize_values(dates, "date", 1)[0] == "2020-05"
+        assert generalize_values(dates, "date", 3)[0] == "2020s"
+        assert generalize_values(dates, "date", 4).tolist() == ["*", "*"]
+
+    def test_search_reaches_target_k(self, df):
+        """The greedy search finds levels whose generalized data is k-anonymous"""
+        qis = ["age", "code_postal", "gender", "hired"]
+        result = search_generalization(df, qis, target_k=10, sensitive_column="diagnosis")
+
+        assert result["initial_risk"]["k"] < 10
+        assert result["achieved"] and result["risk"]["k"] >= 10
+        assert result["risk"]["records_at_risk"] == 0 and "l" in result["risk"]
+        assert len(result["steps"]) == sum(level["level"] for level in result["levels"].values())
+
+        generalized = apply_generalization(df, {col: level["level"] for col, level in result["levels"].items()})
+        assert generalized.groupby(qis, dropna=False).size().min() == result["risk"]["k"]
@@ -0,0 +1,87 @@
+"""
+Unit Tests for the single-pass column profiler
+
+Tests mergeable statistics across chunks and sketch accuracy
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.profiling import HyperLogLog, _hash_values, profile_dataframe, profile_file
+
+
+class TestColumnProfiler:
+    """Test suite for utils.profiling"""
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        df = pd.DataFrame({
+            "age": rng.integers(18, 90, n),
+            "income": rng.normal(40000, 8000, n),
+            "gender": rng.choice(["F", "M"], n),
+            "user_id": [f"u{i}" for i in range(n)],
+            "hired_at": pd.date_range("2020-01-01", periods=n, freq="h"),
+        })
+        df.loc[::10, "income"] = np.nan
+        return df
+
+    def test_chunked_matches_whole_frame(self, df):
+        """Statistics merged across chunks equal the single-chunk result"""
+        whole = {c["name"]: c for c in profile_dataframe(df)["columns"]}
+        chunked = {c["name"]: c for c in profile_dataframe(df, chunk_size=333)["columns"]}
+
+        for name in ("age", "income"):
+            for key in ("count", "null_count", "unique_count", "min", "max"):
+                assert whole[name][key] == chunked[name][key]
+            assert whole[name]["mean"] == pytest.approx(chunked[name]["mean"])
+            assert whole[name]["std"] == pytest.approx(chunked[name]["std"])
+
+    def test_exact_statistics(self, df):
+        """Counts and moments match pandas"""
+        profile = profile_dataframe(df, chunk_size=1000)
+        income = next(c for c in profile["columns"] if c["name"] == "income")
+
+        assert profile["row_count"] == len(df)
+        assert income["null_count"] == int(df["income"].isna().sum())
+        assert income["mean"] == pytest.approx(df["income"].mean())
+        assert income["std"] == pytest.approx(df["income"].std())
+        assert income["unique_count_approximate"] is False
+
+    def test_type_inference(self, df):
+        """Column types follow the historical detection rules"""
+        types = {c["name"]: c["type"] for c in profile_dataframe(df)["columns"]}
+
+        assert types == {
+            "age": "numeric_integer",
+            "income": "numeric_float",
+            "gender": "categorical",
+            "user_id": "text",
+            "hired_at": "date",
+        }
+
+    def test_top_values(self, df):
+        """Top values are sorted by frequency"""
+        gender = next(c for c in profile_dataframe(df)["columns"] if c["name"] == "gender")
+        counts = df["gender"].value_counts()
+
+        assert gender["top_values"][0] == {"value": counts.index[0], "count": int(counts.iloc[0])}
+
+    def test_hyperloglog_accuracy(self):
+        """HLL estimate stays within a few percent on high cardinality"""
+        hll = HyperLogLog()
+        hll.add_hashes(_hash_values(pd.Series(np.arange(200_000))))
+
+        assert hll.count() == pytest.approx(200_000, rel=0.03)
+
+    def test_profile_csv_file(self, tmp_path, df):
+        """Files are profiled chunk by chunk"""
+        path = tmp_path / "data.csv"
+        df.to_csv(path, index=False)
+
+        profile = profile_file(str(path), encoding="utf-8", chunk_size=700)
+
+        assert profile["row_count"] == len(df)
+        assert profile["column_count"] == len(df.columns)
@@ -0,0 +1,134 @@
+"""
+Unit Tests for proxy variable detection
+
+Tests the bincount-based Cramér's V and correlation ratio against
+scipy / pandas references, the all-pairs detection on a DataFrame
+with missing values, and the normalized mutual information scores with
+their permutation test
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency
+
+from utils.proxy_detection import (
+    calculate_correlation, correlation_ratio, cramers_v, detect_proxy_variables, mutual_information_scores
+)
+
+
+def reference_cramers_v(x, y):
+    table = pd.crosstab(x, y)
+    return np.sqrt(chi2_contingency(table)[0] / (table.sum().sum() * (min(table.shape) - 1)))
+
+
+class TestProxyDetection:
+    """Test suite for utils.proxy_detection"""
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(0)
+        n = 3000
+        gender = rng.choice(["F", "M", None], n, p=[0.45, 0.45, 0.1])
+        age = rng.integers(18, 70, n).astype(float)
+        age[rng.random(n) < 0.05] = np.nan
+        return pd.DataFrame({
+            "gender": gender,
+            "age": age,
+            "title": np.where(gender == "F", rng.choice(["x", "y"], n, p=[0.95, 0.05]), rng.choice(["x", "y"], n, p=[0.05, 0.95])),
+            "seniority": np.where(rng.random(n) < 0.1, np.nan, age * 2 + rng.normal(0, 1, n) + 1e6),
+            "height": (gender == "M") * 15.0 + rng.normal(165, 3, n),
+            "city": rng.choice([f"c{i}" for i in range(30)], n),
+            "constant": np.ones(n),
+        })
+
+    def test_cramers_v_matches_scipy(self, df):
+        """Cramér's V matches chi2_contingency, including the Yates correction on 2x2 tables"""
+        assert cramers_v(df["gender"], df["title"]) == pytest.approx(reference_cramers_v(df["gender"], df["title"]))
+        assert cramers_v(df["city"], df["title"]) == pytest.approx(reference_cramers_v(df["city"], df["title"]))
+        assert cramers_v(df["city"], pd.Series(["a"] * len(df))) == 0.0
+
+    def test_correlation_ratio_matches_groupby(self, df):
+        """Eta equals the between-group share of the variance"""
+        data = df[["height", "gender"]].dropna()
+        means = data.groupby("gender")["height"].transform("mean")
+        expected = np.sqrt(((means - data["height"].mean()) ** 2).sum() / ((data["height"] - data["height"].mean()) ** 2).sum())
+        assert correlation_ratio(df["height"], df["gender"]) == pytest.approx(expected)
+
+    def test_detection_on_complete_pairs(self, df):
+        """Each pair is measured on the rows where both values are present"""
+        results = detect_proxy_variables(df, ["gender", "age", "missing"], correlation_threshold=0.7)
+
+        assert set(results) == {"gender", "age"}
+        assert [p["column"] for p in results["gender"]] == ["height", "title"]
+        assert results["gender"][0]["method"] == "correlation_ratio"
+        (seniority,) = results["age"]
+        expected = df["age"].corr(df["seniority"])
+        assert seniority["method"] == "pearson" and seniority["correlation"] == round(expected, 3)
+        assert seniority["risk_level"] == "high"
+        value, method = calculate_correlation(df, "age", "constant")
+        assert np.isnan(value) and method == "pearson"
+        assert calculate_correlation(df.head(5), "age", "height") == (None, None)
+
+
+class TestMutualInformation:
+    """Test suite for the normalized mutual information scores"""
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        gender = rng.choice(["F", "M"], n)
+        return pd.DataFrame({
+            "gender": gender,
+            "title": np.where(gender == "F", rng.choice(["x", "y"], n, p=[0.9, 0.1]), rng.choice(["x", "y"], n, p=[0.1, 0.9])),
+            "height": np.where(rng.random(n) < 0.1, np.nan, (gender == "M") * 12.0 + rng.normal(165, 6, n)),
+            "id": np.arange(n).astype(str),
+            "noise": rng.normal(0, 1, n),
+        })
+
+    def test_matches_sklearn(self, df):
+        """NMI equals sklearn's score on the binned codes"""
+        from sklearn.metrics import normalized_mutual_info_score
+        from utils.proxy_detection import _binned_codes
+
+        scores = {s["column"]: s for s in mutual_information_scores(df, ["gender"], permutations=0)["gender"]}
+        gender, _ = _binned_codes(df["gender"], 10)
+        for col in ["title", "height", "noise"]:
+            codes, _ = _binned_codes(df[col], 10)
+            assert scores[col]["nmi"] == pytest.approx(normalized_mutual_info_score(gender, codes), abs=1e-4)
+
+        # Quantile bins, missing values in their own code
+        codes, categories = _binned_codes(df["height"], 10)
+        assert categories == 11 and (codes[df["height"].isna().to_numpy()] == 10).all()
+
+    def test_permutation_null(self, df):
+        """Real proxies are significant; an identifier's high NMI is explained by the null"""
+        scores = mutual_information_scores(df, ["gender"], permutations=30)["gender"]
+        by_column = {s["column"]: s for s in scores}
+
+        assert scores[0]["column"] in ("title", "height")
+        assert by_column["title"]["significant"] and by_column["title"]["risk_level"] == "high"
+        assert by_column["id"]["nmi"] > by_column["noise"]["nmi"]
+        assert not by_column["id"]["significant"] and by_column["id"]["risk_level"] == "low"
+        assert by_column["id"]["null_nmi"] == pytest.approx(by_column["id"]["nmi"], abs=1e-3)
+
+    def test_permuted_tables_match_shuffles(self):
+        """Drawn tables keep both margins and follow the distribution of shuffled codes"""
+        from utils.proxy_detection import _permuted_tables
+
+        rng = np.random.default_rng(0)
+        sensitive = rng.integers(0, 6, 500)
+        feature = rng.choice(4, 500, p=[0.5, 0.3, 0.2, 0.0])
+        sensitive_margins = np.bincount(sensitive, minlength=6)
+        feature_margins = np.bincount(feature, minlength=4)
+
+        tables = _permuted_tables(sensitive_margins, feature_margins, 4000, rng)
+
+        assert (tables.sum(axis=2) == sensitive_margins).all()
+        assert (tables.sum(axis=1) == feature_margins).all()
+        shuffled = np.stack([
+            np.bincount(rng.permutation(sensitive) * 4 + feature, minlength=24).reshape(6, 4) for _ in range(4000)
+        ])
+        np.testing.assert_allclose(tables.mean(axis=0), shuffled.mean(axis=0), atol=0.3)
+        np.testing.assert_allclose(tables.var(axis=0), shuffled.var(axis=0), rtol=0.15, atol=0.3)
@@ -0,0 +1,150 @@
+"""
+Unit Tests for pseudonymization
+
+Tests the keyed HMAC pseudonyms and the persistent token vault (batch
+lookup/insert, in-memory cache, consistency across datasets)
+"""
+
+import hashlib
+import hmac
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.pseudonym_token import PseudonymToken
+from services import pseudonymization
+from services.pseudonymization import TokenVault, pseudonymize
+from utils import anonymization
+from utils.anonymization import PseudonymHasher, anonymize_pseudonym, apply_anonymization, pseudonymization_available
+
+
+@pytest.fixture(autouse=True)
+def pseudonymization_key(monkeypatch):
+    monkeypatch.setattr(anonymization, "PSEUDONYMIZATION_KEY", b"test-key")
+
+
+async def _vault(tmp_path, **kwargs):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'vault.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(PseudonymToken.__table__.create, checkfirst=True)
+    return TokenVault(sessionmaker(engine, expire_on_commit=False, class_=AsyncSession), **kwargs)
+
+
+class TestPseudonymHasher:
+    """Test suite for keyed HMAC pseudonyms"""
+
+    def test_matches_hmac(self):
+        """Digests are HMAC-SHA256 of namespace + NUL + value, long keys included"""
+        for key in (b"k", b"x" * 100):
+            hasher = PseudonymHasher(key, "org:1")
+            expected = hmac.new(key, b"org:1\x00Alice", hashlib.sha256).hexdigest()
+            assert hasher.digest("Alice") == expected
+
+    def test_no_collisions_and_namespaces(self):
+        """100k distinct values get distinct pseudonyms, which depend on the namespace"""
+        df = pd.DataFrame({"employee_id": np.arange(100_000)})
+        first = apply_anonymization(df, ["employee_id"], "pseudonym", namespace="org:1")
+        again = apply_anonymization(df.iloc[::-1], ["employee_id"], "pseudonym", namespace="org:1")
+        other = apply_anonymization(df, ["employee_id"], "pseudonym", namespace="org:2")
+
+        assert first["employee_id"].nunique() == 100_000
+        assert first["employee_id"].iloc[5] == again["employee_id"].loc[5]
+        assert first["employee_id"].iloc[5] == anonymize_pseudonym(5, "employee_id", "org:1")
+        assert first["employee_id"].iloc[5] != other["employee_id"].iloc[5]
+
+    def test_numeric_values_are_canonical(self):
+        """An id read as int64 in one dataset and float64 (with a NaN) in another keeps its pseudonym"""
+        ints = apply_anonymization(pd.DataFrame({"employee_id": [123, 456]}), ["employee_id"], "pseudonym")
+        floats = apply_anonymization(pd.DataFrame({"employee_id": [123.0, np.nan]}), ["employee_id"], "pseudonym")
+        hasher = PseudonymHasher(namespace="org:1")
+
+        assert floats["employee_id"].iloc[0] == ints["employee_id"].iloc[0]
+        assert hasher.digest(np.int64(7)) == hasher.digest(7.0) == hasher.digest("7")
+        assert hasher.digest(0.5) != hasher.digest(5) and hasher.digest(True) != hasher.digest(1)
+
+    def test_refused_without_key(self, monkeypatch):
+        """Without PSEUDONYMIZATION_KEY, pseudonyms are refused instead of using a known default key"""
+        monkeypatch.setattr(anonymization, "PSEUDONYMIZATION_KEY", None)
+
+        assert not pseudonymization_available()
+        with pytest.raises(ValueError):
+            apply_anonymization(pd.DataFrame({"nom": ["Alice"]}), ["nom"], "pseudonym")
+        assert PseudonymHasher(b"explicit", "org:1").digest("Alice")
+
+
+class TestTokenVault:
+    """Test suite for the persistent token vault"""
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            "nom": ["Alice", "Bob", None, "Alice", ""],
+            "email": ["a@x.fr", "b@y.com", "a@x.fr", None, "c@z.org"],
+        })
+
+    @pytest.mark.asyncio
+    async def test_tokens_are_persistent_and_random(self, tmp_path, df):
+        """Vault tokens are stable across datasets and restarts, not derived from the HMAC"""
+        vault = await _vault(tmp_path)
+        result = await pseudonymize(df, ["nom", "email"], "org:1", vault=vault)
+
+        assert result["nom"].tolist()[2:] == ["", result["nom"].iloc[0], ""]
+        assert result["nom"].iloc[0].startswith("User_") and result["nom"].iloc[0] != result["nom"].iloc[1]
+        assert result["nom"].iloc[0] != anonymize_pseudonym("Alice", "nom", "org:1")
+
+        restarted = await _vault(tmp_path)
+        other_dataset = pd.DataFrame({"nom": ["Bob", "Alice", "Chloé"]})
+        again = await pseudonymize(other_dataset, ["nom"], "org:1", vault=restarted)
+        assert again["nom"].tolist()[:2] == [result["nom"].iloc[1], result["nom"].iloc[0]]
+        assert restarted.metrics()["inserted"] == 1
+
+        elsewhere = await pseudonymize(other_dataset, ["nom"], "org:2", vault=restarted)
+        assert elsewhere["nom"].iloc[1] != result["nom"].iloc[0]
+
+    @pytest.mark.asyncio
+    async def test_batches_and_cache(self, tmp_path, monkeypatch):
+        """Lookups and inserts run in batches, repeated values are served from memory"""
+        monkeypatch.setattr(pseudonymization, "VAULT_BATCH_SIZE", 1000)
+        vault = await _vault(tmp_path, cache_size=5000)
+        digests = PseudonymHasher(namespace="org:1").digests(range(12_000))
+
+        tokens = await vault.tokens("org:1", digests)
+        assert len(tokens) == 12_000 and len(set(tokens.values())) == 12_000
+        assert vault.metrics()["inserted"] == 12_000 and vault.metrics()["cached"] == 5000
+
+        again = await vault.tokens("org:1", digests)
+        assert again == tokens
+        metrics = vault.metrics()
+        assert metrics["cache_hits"] == 5000 and metrics["inserted"] == 12_000
+
+    @pytest.mark.asyncio
+    async def test_concurrent_insert_keeps_first_token(self, tmp_path):
+        """A value inserted by another process keeps the token it was given"""
+        first = await _vault(tmp_path)
+        second = await _vault(tmp_path)
+        digest = PseudonymHasher(namespace="org:1").digest("Alice")
+
+        token = (await first.tokens("org:1", [digest]))[digest]
+        # second skipped the lookup: its insert conflicts and reads back the stored token
+        async with second._session_factory() as db:
+            assert await second._insert(db, "org:1", [digest]) == {digest: token}
+
+    @pytest.mark.asyncio
+    async def test_savepoint_fallback_without_upsert(self, tmp_path, monkeypatch):
+        """Dialects without ON CONFLICT insert row by row and still skip conflicting rows"""
+        monkeypatch.setattr(pseudonymization, "_UPSERT_INSERTS", {})
+        first = await _vault(tmp_path)
+        second = await _vault(tmp_path)
+        hasher = PseudonymHasher(namespace="org:1")
+        alice, bob = hasher.digest("Alice"), hasher.digest("Bob")
+
+        token = (await first.tokens("org:1", [alice]))[alice]
+        async with second._session_factory() as db:
+            assigned = await second._insert(db, "org:1", [alice, bob])
+            await db.commit()
+
+        assert assigned[alice] == token and len(assigned) == 2
+        assert await first.tokens("org:1", [bob]) == {bob: assigned[bob]}
@@ -0,0 +1,70 @@
+"""
+Unit Tests for resumable upload parts
+
+Tests per-part checksum verification and assembly of the received parts
+"""
+
+import hashlib
+
+import pytest
+
+from services import resumable_upload
+from services.ingestion import assemble_parts
+from services.resumable_upload import InvalidPart, expected_part_size, list_parts, part_paths, write_part
+
+
+async def _stream(data, chunk_size=1000):
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+class TestResumableUpload:
+    """Test suite for the part store"""
+
+    @pytest.fixture(autouse=True)
+    def upload_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(resumable_upload, "RESUMABLE_UPLOAD_DIR", tmp_path / "resumable")
+        return tmp_path
+
+    @pytest.fixture
+    def content(self):
+        return ("a,b\n" + "".join(f"{i},{i * 2}\n" for i in range(3000))).encode()
+
+    def test_expected_part_size(self):
+        """Every part has part_size bytes except the last one"""
+        assert expected_part_size(1, 250, 100, 3) == 100
+        assert expected_part_size(3, 250, 100, 3) == 50
+
+    @pytest.mark.asyncio
+    async def test_checksum_mismatch_rejects_part(self, content):
+        """A corrupted part is discarded and never listed"""
+        with pytest.raises(InvalidPart):
+            await write_part("s1", 1, _stream(content), "0" * 64, len(content))
+
+        assert list_parts("s1") == {}
+
+    @pytest.mark.asyncio
+    async def test_size_mismatch_rejects_part(self, content):
+        """A truncated part is rejected even with a matching checksum"""
+        truncated = content[:-10]
+        with pytest.raises(InvalidPart):
+            await write_part("s1", 1, _stream(truncated), hashlib.sha256(truncated).hexdigest(), len(content))
+
+    @pytest.mark.asyncio
+    async def test_parts_assemble_to_original(self, upload_dir, content):
+        """Verified parts are concatenated in order, out-of-order uploads included"""
+        part_size = 10_000
+        parts = [content[i:i + part_size] for i in range(0, len(content), part_size)]
+
+        for number in reversed(range(1, len(parts) + 1)):
+            part = parts[number - 1]
+            await write_part("s1", number, _stream(part), hashlib.sha256(part).hexdigest(), len(part))
+
+        assert sorted(list_parts("s1")) == list(range(1, len(parts) + 1))
+
+        spooled = await assemble_parts(part_paths("s1", len(parts)), "data.csv", tmp_dir=upload_dir)
+        try:
+            assert spooled.file_hash == hashlib.sha256(content).hexdigest()
+            assert spooled.line_count == 3001
+        finally:
+            spooled.cleanup()
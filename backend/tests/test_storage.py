@@ -0,0 +1,462 @@
+"""
+Unit Tests for the storage layer
+
+Tests the local backend (ranged reads, streaming, key validation),
+the S3 and Supabase drivers over stubbed clients, the fallback to the
+local copy when the remote backend misses, the read-through disk cache
+and column-projected Parquet reads
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.storage import CachedStorageBackend, FallbackStorageBackend, LocalStorageBackend, StorageError
+from services.storage import parquet
+from services.storage.parquet import dataframe_to_parquet, read_parquet
+from services.storage import s3
+from services.storage.supabase import SupabaseStorageBackend
+
+if s3.AIOBOTOCORE_AVAILABLE:
+    from botocore.exceptions import ClientError
+
+
+class _CountingStorage(LocalStorageBackend):
+    """Local backend that records the bytes served by ranged reads"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.bytes_read = 0
+
+    async def get_range(self, key, start, length):
+        data = await super().get_range(key, start, length)
+        self.bytes_read += len(data)
+        return data
+
+
+class _SlowRemote(LocalStorageBackend):
+    """Local backend standing in for a remote store, counting downloads"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.downloads = 0
+
+    async def download_to(self, key, path):
+        self.downloads += 1
+        await asyncio.sleep(0.01)
+        await super().download_to(key, path)
+
+
+class TestLocalStorage:
+    """Test suite for LocalStorageBackend"""
+
+    @pytest.fixture
+    def storage(self, tmp_path):
+        return LocalStorageBackend(str(tmp_path / "uploads"))
+
+    @pytest.mark.asyncio
+    async def test_put_get_and_ranges(self, storage):
+        """Objects are read back whole, by range and by chunks"""
+        data = bytes(range(256)) * 10
+        await storage.put("blob_a.csv", data)
+
+        assert await storage.get("blob_a.csv") == data
+        assert await storage.size("blob_a.csv") == len(data)
+        assert await storage.get_range("blob_a.csv", 100, 50) == data[100:150]
+        assert await storage.get_range("blob_a.csv", len(data) - 10, 50) == data[-10:]
+        chunks = [chunk async for chunk in storage.stream("blob_a.csv", chunk_size=1000)]
+        assert [len(c) for c in chunks] == [1000, 1000, 560]
+        assert b"".join(chunks) == data
+
+    @pytest.mark.asyncio
+    async def test_missing_and_delete(self, storage):
+        """A missing key raises FileNotFoundError and delete is idempotent"""
+        await storage.put("reports/r.pdf", b"%PDF")
+        assert await storage.exists("reports/r.pdf")
+
+        await storage.delete("reports/r.pdf")
+        await storage.delete("reports/r.pdf")
+        assert not await storage.exists("reports/r.pdf")
+        with pytest.raises(FileNotFoundError):
+            await storage.get("reports/r.pdf")
+
+    @pytest.mark.asyncio
+    async def test_rejects_keys_outside_root(self, storage):
+        """Keys cannot escape the storage root"""
+        with pytest.raises(StorageError):
+            await storage.put("../outside.csv", b"x")
+
+    @pytest.mark.asyncio
+    async def test_fallback_reads_local_copy(self, tmp_path):
+        """Objects only present locally stay readable behind a remote backend"""
+        remote = LocalStorageBackend(str(tmp_path / "remote"))
+        local = LocalStorageBackend(str(tmp_path / "local"))
+        storage = FallbackStorageBackend(remote, local)
+        await local.put("legacy.csv", b"a,b\n1,2\n")
+
+        assert await storage.get("legacy.csv") == b"a,b\n1,2\n"
+        assert await storage.get_range("legacy.csv", 4, 3) == b"1,2"
+        assert b"".join([c async for c in storage.stream("legacy.csv")]) == b"a,b\n1,2\n"
+
+        await storage.delete("legacy.csv")
+        assert not await local.exists("legacy.csv")
+
+
+class _SupabaseObjects:
+    """In-memory Supabase Storage HTTP API (httpx mock transport handler)"""
+
+    def __init__(self):
+        self.objects = {}
+        self.requests = []
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        key = request.url.path.split("/storage/v1/object/datasets/", 1)[1]
+        if request.method == "POST":
+            self.objects[key] = b"".join([chunk async for chunk in request.stream])
+            return httpx.Response(200, json={"Key": key})
+        if key not in self.objects:
+            return httpx.Response(400, json={"statusCode": "404", "error": "not_found"})
+        return httpx.Response(200, content=self.objects[key])
+
+
+def _supabase(handler):
+    service = SimpleNamespace(url="https://x.supabase.co", key="k", bucket_name="datasets", is_available=lambda: True)
+    backend = SupabaseStorageBackend(service)
+    backend._http = httpx.AsyncClient(
+        base_url="https://x.supabase.co/storage/v1/object/", transport=httpx.MockTransport(handler)
+    )
+    return backend
+
+
+class TestSupabaseStorage:
+    """Test suite for SupabaseStorageBackend over a mocked HTTP API"""
+
+    @pytest.mark.asyncio
+    async def test_put_file_streams_from_disk(self, tmp_path):
+        """Files are sent as a streamed body with their length, not read whole into memory"""
+        path = tmp_path / "d.csv"
+        path.write_bytes(b"x" * 2500)
+        api = _SupabaseObjects()
+        backend = _supabase(api)
+
+        await backend.put_file("blob_a.csv", str(path), "text/csv")
+
+        request = api.requests[0]
+        assert api.objects["blob_a.csv"] == b"x" * 2500
+        assert request.headers["Content-Length"] == "2500" and request.headers["x-upsert"] == "true"
+        assert request.headers["Content-Type"] == "text/csv"
+        await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_reads_over_http(self):
+        """Whole, ranged and streamed reads go through the shared httpx client"""
+        data = bytes(range(256)) * 10
+        api = _SupabaseObjects()
+        api.objects["blob_a.csv"] = data
+        backend = _supabase(api)
+
+        assert await backend.get("blob_a.csv") == data
+        # The mock ignores Range: the slice is taken client-side
+        assert await backend.get_range("blob_a.csv", 100, 50) == data[100:150]
+        assert api.requests[-1].headers["Range"] == "bytes=100-149"
+        assert await backend.size("blob_a.csv") == len(data)
+        assert b"".join([chunk async for chunk in backend.stream("blob_a.csv", chunk_size=1000)]) == data
+        await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_ranges_and_missing_objects(self):
+        """Partial responses are used as is; a not_found error raises FileNotFoundError"""
+        async def handler(request):
+            if request.url.path.endswith("/missing.csv"):
+                return httpx.Response(400, json={"error": "not_found", "message": "Object not found"})
+            if request.url.path.endswith("/broken.csv"):
+                return httpx.Response(500, text="boom")
+            if request.headers.get("Range") == "bytes=0-0":
+                return httpx.Response(206, content=b"a", headers={"Content-Range": "bytes 0-0/1234"})
+            return httpx.Response(416)
+
+        backend = _supabase(handler)
+
+        assert await backend.size("blob_a.csv") == 1234
+        assert await backend.get_range("blob_a.csv", 5000, 10) == b""
+        with pytest.raises(FileNotFoundError):
+            await backend.get("missing.csv")
+        with pytest.raises(FileNotFoundError):
+            await anext(backend.stream("missing.csv"))
+        assert not await backend.exists("missing.csv")
+        with pytest.raises(StorageError):
+            await backend.get("broken.csv")
+        await backend.close()
+
+
+class _S3Body:
+    """StreamingBody stand-in (async context manager, read, iter_chunks)"""
+
+    def __init__(self, data):
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return self.data
+
+    async def iter_chunks(self, chunk_size):
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start:start + chunk_size]
+
+
+class _S3Client:
+    """Stubbed aiobotocore S3 client keeping objects in memory"""
+
+    def __init__(self, fail_on_part=None):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+        self.fail_on_part = fail_on_part
+
+    @staticmethod
+    def _error(code, operation):
+        return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+    def _object(self, bucket, key, operation):
+        if (bucket, key) not in self.objects:
+            raise self._error("NoSuchKey" if operation == "GetObject" else "404", operation)
+        return self.objects[(bucket, key)]
+
+    async def put_object(self, Bucket, Key, Body, ContentType):
+        self.calls.append("put_object")
+        self.objects[(Bucket, Key)] = Body
+
+    async def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.calls.append("create_multipart_upload")
+        self.uploads["u1"] = {}
+        return {"UploadId": "u1"}
+
+    async def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append("upload_part")
+        if PartNumber == self.fail_on_part:
+            raise self._error("InternalError", "UploadPart")
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    async def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete_multipart_upload")
+        parts = self.uploads.pop(UploadId)
+        assert [p["ETag"] for p in MultipartUpload["Parts"]] == [f"etag-{n}" for n in sorted(parts)]
+        self.objects[(Bucket, Key)] = b"".join(parts[n] for n in sorted(parts))
+
+    async def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+        self.uploads.pop(UploadId)
+
+    async def get_object(self, Bucket, Key, Range=None):
+        data = self._object(Bucket, Key, "GetObject")
+        if Range is not None:
+            start, end = (int(bound) for bound in Range.removeprefix("bytes=").split("-"))
+            if start >= len(data):
+                raise self._error("InvalidRange", "GetObject")
+            data = data[start:end + 1]
+        return {"Body": _S3Body(data)}
+
+    async def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self._object(Bucket, Key, "HeadObject"))}
+
+    async def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+@pytest.mark.skipif(not s3.AIOBOTOCORE_AVAILABLE, reason="aiobotocore not installed (s3 extra)")
+class TestS3Storage:
+    """Test suite for S3StorageBackend over a stubbed aiobotocore client"""
+
+    @pytest.fixture
+    def client(self):
+        return _S3Client()
+
+    @pytest.fixture
+    def storage(self, client):
+        backend = s3.S3StorageBackend(bucket="datasets", prefix="audits/")
+        backend._client = client
+        return backend
+
+    @pytest.mark.asyncio
+    async def test_put_get_and_ranges(self, storage, client):
+        """Objects are stored under the prefix and read back whole, by range and by chunks"""
+        data = bytes(range(256)) * 10
+        await storage.put("blob_a.csv", data, "text/csv")
+
+        assert ("datasets", "audits/blob_a.csv") in client.objects
+        assert await storage.get("blob_a.csv") == data
+        assert await storage.size("blob_a.csv") == len(data)
+        assert await storage.get_range("blob_a.csv", 100, 50) == data[100:150]
+        assert await storage.get_range("blob_a.csv", len(data) - 10, 50) == data[-10:]
+        assert await storage.get_range("blob_a.csv", len(data) + 10, 50) == b""
+        chunks = [chunk async for chunk in storage.stream("blob_a.csv", chunk_size=1000)]
+        assert [len(c) for c in chunks] == [1000, 1000, 560]
+
+    @pytest.mark.asyncio
+    async def test_missing_key_maps_to_file_not_found(self, storage):
+        """NoSuchKey / 404 client errors raise FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            await storage.get("nope.csv")
+        with pytest.raises(FileNotFoundError):
+            await storage.get_range("nope.csv", 0, 10)
+        with pytest.raises(FileNotFoundError):
+            await anext(storage.stream("nope.csv"))
+        assert not await storage.exists("nope.csv")
+
+        await storage.put("blob_a.csv", b"a")
+        await storage.delete("blob_a.csv")
+        assert not await storage.exists("blob_a.csv")
+
+    @pytest.mark.asyncio
+    async def test_large_files_use_multipart_upload(self, tmp_path, storage, client, monkeypatch):
+        """Files above the threshold are sent part by part; small files in one request"""
+        monkeypatch.setattr(s3, "MULTIPART_THRESHOLD", 1000)
+        monkeypatch.setattr(s3, "MULTIPART_PART_SIZE", 400)
+        data = bytes(range(256)) * 5
+        (tmp_path / "big.csv").write_bytes(data)
+        (tmp_path / "small.csv").write_bytes(data[:500])
+
+        await storage.put_file("big.csv", str(tmp_path / "big.csv"))
+        await storage.put_file("small.csv", str(tmp_path / "small.csv"))
+
+        assert client.calls.count("upload_part") == 4
+        assert client.calls[-2:] == ["complete_multipart_upload", "put_object"]
+        assert await storage.get("big.csv") == data
+        assert await storage.get("small.csv") == data[:500]
+
+    @pytest.mark.asyncio
+    async def test_failed_multipart_upload_is_aborted(self, tmp_path, client, storage, monkeypatch):
+        """A failing part aborts the upload and raises StorageError"""
+        monkeypatch.setattr(s3, "MULTIPART_THRESHOLD", 1000)
+        monkeypatch.setattr(s3, "MULTIPART_PART_SIZE", 400)
+        client.fail_on_part = 2
+        (tmp_path / "big.csv").write_bytes(b"x" * 1280)
+
+        with pytest.raises(StorageError):
+            await storage.put_file("big.csv", str(tmp_path / "big.csv"))
+
+        assert client.calls[-1] == "abort_multipart_upload" and not client.uploads
+        assert not await storage.exists("big.csv")
+
+
+class TestReadThroughCache:
+    """Test suite for CachedStorageBackend"""
+
+    @pytest.fixture
+    def remote(self, tmp_path):
+        return _SlowRemote(str(tmp_path / "remote"))
+
+    @pytest.fixture
+    def cache(self, tmp_path, remote):
+        return CachedStorageBackend(remote, str(tmp_path / "cache"), max_bytes=250)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_one_download(self, cache, remote):
+        """Simultaneous reads of the same object trigger a single download"""
+        await remote.put("blob_a.csv", b"x" * 100)
+
+        paths = await asyncio.gather(*(cache.local_path("blob_a.csv") for _ in range(10)))
+
+        assert remote.downloads == 1
+        assert len(set(paths)) == 1 and paths[0].read_bytes() == b"x" * 100
+        assert await cache.get("blob_a.csv") == b"x" * 100
+        metrics = cache.metrics()
+        assert metrics["downloads"] == 1 and metrics["coalesced"] == 9 and metrics["hits"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self, cache, remote):
+        """The cache stays under max_bytes by dropping the oldest entries"""
+        for name in ("a", "b", "c"):
+            await remote.put(name, name.encode() * 100)
+
+        await cache.get("a")
+        await cache.get("b")
+        await cache.get("a")
+        await cache.get("c")
+
+        metrics = cache.metrics()
+        assert metrics["evictions"] == 1 and metrics["size_bytes"] == 200
+        await cache.get("a")
+        assert remote.downloads == 3
+        await cache.get("b")
+        assert remote.downloads == 4
+
+    @pytest.mark.asyncio
+    async def test_content_hash_and_writes_invalidate(self, tmp_path, cache, remote):
+        """A new content hash or a write through the cache refreshes the entry"""
+        await remote.put("legacy.csv", b"v1")
+        assert (await cache.local_path("legacy.csv", "h1")).read_bytes() == b"v1"
+
+        await remote.put("legacy.csv", b"v2")
+        assert (await cache.local_path("legacy.csv", "h1")).read_bytes() == b"v1"
+        assert (await cache.local_path("legacy.csv", "h2")).read_bytes() == b"v2"
+
+        await cache.put("legacy.csv", b"v3")
+        assert await cache.get("legacy.csv") == b"v3"
+
+        # Entries survive a restart
+        reopened = CachedStorageBackend(remote, str(tmp_path / "cache"), max_bytes=250)
+        assert reopened.metrics()["entries"] == 1
+        assert await reopened.get("legacy.csv") == b"v3"
+        assert remote.downloads == 3
+
+    @pytest.mark.asyncio
+    async def test_missing_object_is_not_cached(self, cache):
+        """A missing object raises FileNotFoundError and leaves no entry"""
+        with pytest.raises(FileNotFoundError):
+            await cache.local_path("nope.csv")
+        assert cache.metrics()["entries"] == 0
+        assert cache.metrics()["download_errors"] == 1
+
+
+class TestParquetReads:
+    """Test suite for ranged Parquet reads"""
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(0)
+        data = {f"feature_{i}": rng.random(5000) for i in range(20)}
+        data["gender"] = rng.choice(["F", "M"], 5000)
+        data["target"] = rng.integers(0, 2, 5000)
+        return pd.DataFrame(data)
+
+    @pytest.fixture
+    def storage(self, tmp_path, df, monkeypatch):
+        monkeypatch.setattr(parquet, "ROW_GROUP_ROWS", 1000)
+        (tmp_path / "blob.parquet").write_bytes(dataframe_to_parquet(df))
+        return _CountingStorage(str(tmp_path))
+
+    @pytest.mark.asyncio
+    async def test_reads_only_requested_columns(self, storage, df):
+        """Projected reads match pandas and fetch a fraction of the object"""
+        result = await read_parquet(storage, "blob.parquet", columns=["target", "gender", "unknown"])
+
+        pd.testing.assert_frame_equal(result, df[["gender", "target"]], check_dtype=False)
+        assert storage.bytes_read < (await storage.size("blob.parquet")) / 4
+
+    @pytest.mark.asyncio
+    async def test_max_rows_reads_leading_row_groups(self, storage, df):
+        """max_rows only fetches the row groups covering those rows"""
+        result = await read_parquet(storage, "blob.parquet", max_rows=1500)
+        pd.testing.assert_frame_equal(result, df.head(1500), check_dtype=False)
+
+        full = await read_parquet(storage, "blob.parquet", columns=["feature_0"], row_groups=[4])
+        np.testing.assert_array_equal(full["feature_0"].values, df["feature_0"].values[4000:])
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_parquet_object(self, storage):
+        """A non-Parquet object raises StorageError"""
+        await storage.put("blob.csv", b"a,b\n1,2\n" * 10)
+        with pytest.raises(StorageError):
+            await read_parquet(storage, "blob.csv", columns=["a"])
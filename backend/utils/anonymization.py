@@ -1,12 +1,47 @@
 """
 Fonctions d'anonymisation RGPD pour les datasets
+
+Les fonctions anonymize_* traitent une valeur. apply_anonymization travaille
+sur les valeurs distinctes de chaque colonne (factorize) : chaque valeur
+distincte n'est transformée qu'une fois puis le résultat est redistribué
+par les codes, et les colonnes sont traitées en parallèle.
+
+Les pseudonymes sont des HMAC-SHA256 à clé (PSEUDONYMIZATION_KEY) tronqués à
+64 bits : reproductibles d'un dataset à l'autre pour une même clé et un même
+espace de noms, sans collision en pratique. Le coffre de jetons persistant
+(services/pseudonymization.py) s'appuie sur les mêmes empreintes.
+
+Les nombres sont hachés sous une forme canonique (_canonical_value) : un
+identifiant lu en int64 dans un dataset et en float64 dans un autre (à
+cause d'une valeur manquante) garde le même pseudonyme.
+
+La clé n'a pas de valeur par défaut : avec une clé connue, les pseudonymes
+seraient recalculables à partir des valeurs d'origine. Sans
+PSEUDONYMIZATION_KEY, la méthode 'pseudonym' est refusée.
 """
 import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
 import string
 import random
 
+# Au-delà, int(valeur) n'est plus représentable en int64 : traitement valeur par valeur
+_MAX_VECTORIZED_AGE = 1e15
+
+PSEUDONYMIZATION_KEY = os.getenv("PSEUDONYMIZATION_KEY", "").encode() or None
+if PSEUDONYMIZATION_KEY is None:
+    print("⚠️ PSEUDONYMIZATION_KEY missing. The 'pseudonym' anonymization method will be disabled.")
+# Caractères hexadécimaux du jeton (16 = 64 bits)
+PSEUDONYM_TOKEN_LENGTH = 16
+
+
+def pseudonymization_available() -> bool:
+    """La méthode 'pseudonym' n'est disponible qu'avec PSEUDONYMIZATION_KEY"""
+    return PSEUDONYMIZATION_KEY is not None
+
 
 def anonymize_hash(value: str) -> str:
     """
@@ -18,27 +53,77 @@ def anonymize_hash(value: str) -> str:
     return hashlib.sha256(str(value).encode()).hexdigest()[:16]
 
 
-def anonymize_pseudonym(value: str, column_name: str) -> str:
+def _canonical_value(value: Any) -> str:
+    """Texte haché pour une valeur : 123, 123.0 et np.int64(123) donnent '123'"""
+    if isinstance(value, (bool, np.bool_)):
+        return str(bool(value))
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if value.is_integer():
+            return str(int(value))
+        return repr(value)
+    return str(value)
+
+
+class PseudonymHasher:
+    """
+    HMAC-SHA256 d'un grand nombre de valeurs avec la même clé et le même espace de noms
+
+    Les états SHA-256 après les blocs ipad/opad (RFC 2104) et le préfixe
+    d'espace de noms sont calculés une fois puis copiés pour chaque valeur ;
+    le résultat est identique à hmac.new(key, namespace + b'\\x00' + valeur)
+    (valeur sous sa forme canonique, voir _canonical_value).
+    """
+
+    def __init__(self, key: Optional[bytes] = None, namespace: str = ''):
+        if key is None:
+            if PSEUDONYMIZATION_KEY is None:
+                raise ValueError("PSEUDONYMIZATION_KEY is not set: pseudonymization is disabled")
+            key = PSEUDONYMIZATION_KEY
+        if len(key) > 64:
+            key = hashlib.sha256(key).digest()
+        block = key.ljust(64, b'\0')
+        self._inner = hashlib.sha256(bytes(b ^ 0x36 for b in block))
+        self._inner.update(namespace.encode() + b'\x00')
+        self._outer = hashlib.sha256(bytes(b ^ 0x5c for b in block))
+
+    def digest(self, value: Any) -> str:
+        inner = self._inner.copy()
+        inner.update(_canonical_value(value).encode())
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return outer.hexdigest()
+
+    def digests(self, values) -> List[Optional[str]]:
+        """Empreinte de chaque valeur, None pour ''"""
+        return [None if value == '' else self.digest(value) for value in values]
+
+
+def pseudonym_template(column_name: str) -> str:
+    """Format du pseudonyme selon le type de colonne ({} = jeton)"""
+    name = column_name.lower()
+    if 'name' in name or 'nom' in name:
+        return "User_{}"
+    elif 'email' in name:
+        return "user{}@example.com"
+    elif 'id' in name:
+        return "ID_{}"
+    return "Anon_{}"
+
+
+def anonymize_pseudonym(value: str, column_name: str, namespace: str = '', key: Optional[bytes] = None) -> str:
     """
     Anonymisation par pseudonyme
-    Génère un pseudonyme cohérent basé sur le hash
+    Pseudonyme cohérent dérivé du HMAC de la valeur (même clé et même
+    espace de noms -> même pseudonyme)
     """
     if pd.isna(value) or value == '':
         return ''
     
-    # Utiliser le hash pour générer un ID unique
-    hash_val = hashlib.sha256(str(value).encode()).hexdigest()
-    numeric_id = int(hash_val[:8], 16) % 100000
-    
-    # Générer un pseudonyme selon le type de colonne
-    if 'name' in column_name.lower() or 'nom' in column_name.lower():
-        return f"User_{numeric_id}"
-    elif 'email' in column_name.lower():
-        return f"user{numeric_id}@example.com"
-    elif 'id' in column_name.lower():
-        return f"ID_{numeric_id}"
-    else:
-        return f"Anon_{numeric_id}"
+    token = PseudonymHasher(key, namespace).digest(value)[:PSEUDONYM_TOKEN_LENGTH]
+    return pseudonym_template(column_name).format(token)
 
 
 def anonymize_suppression(value: str) -> str:
@@ -85,11 +170,94 @@ def anonymize_generalization(value: Any, column_type: str) -> str:
     return str(value)
 
 
+def _map_uniques(series: pd.Series, transform: Callable[[pd.Index], Any]) -> pd.Series:
+    """
+    Transforme les valeurs distinctes de la colonne puis redistribue le
+    résultat sur toutes les lignes ; les valeurs manquantes deviennent ''
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    values = np.empty(len(uniques) + 1, dtype=object)
+    values[:-1] = transform(uniques)
+    values[-1] = ''  # code -1 : valeur manquante
+    return pd.Series(values[codes], index=series.index, name=series.name)
+
+
+def _digests(uniques: pd.Index) -> List[Optional[str]]:
+    """SHA-256 (hex) de chaque valeur distincte, None pour ''"""
+    return [
+        None if value == '' else hashlib.sha256(str(value).encode()).hexdigest()
+        for value in uniques
+    ]
+
+
+def _hash_uniques(uniques: pd.Index) -> List[str]:
+    return ['' if digest is None else digest[:16] for digest in _digests(uniques)]
+
+
+def _pseudonym_uniques(uniques: pd.Index, column_name: str, namespace: str) -> List[str]:
+    template = pseudonym_template(column_name)
+    return [
+        '' if digest is None else template.format(digest[:PSEUDONYM_TOKEN_LENGTH])
+        for digest in PseudonymHasher(namespace=namespace).digests(uniques)
+    ]
+
+
+def _age_band_uniques(uniques: pd.Index) -> np.ndarray:
+    """Tranches de 10 ans ('20-29'), calculées en bloc pour les valeurs numériques"""
+    result = np.empty(len(uniques), dtype=object)
+    if not (pd.api.types.is_numeric_dtype(uniques.dtype) or pd.api.types.is_bool_dtype(uniques.dtype)):
+        result[:] = [anonymize_generalization(value, 'age') for value in uniques]
+        return result
+    
+    values = np.asarray(uniques, dtype=float)
+    vectorized = np.isfinite(values) & (np.abs(values) < _MAX_VECTORIZED_AGE)
+    # int(age) tronque vers zéro, puis // 10 arrondit vers -inf
+    lower = (np.trunc(values[vectorized]).astype(np.int64) // 10) * 10
+    bands = pd.Series(lower).astype(str) + '-' + pd.Series(lower + 9).astype(str)
+    result[vectorized] = bands.to_numpy(dtype=object)
+    result[~vectorized] = [anonymize_generalization(value, 'age') for value in uniques[~vectorized]]
+    return result
+
+
+def _year_uniques(uniques: pd.Index) -> np.ndarray:
+    """Année seule (4 premiers caractères), via l'accesseur date pour les colonnes datetime"""
+    if isinstance(uniques, pd.DatetimeIndex):
+        return uniques.year.astype(str).str.zfill(4).to_numpy(dtype=object)
+    return pd.Index(uniques).astype(str).str[:4].to_numpy(dtype=object)
+
+
+def _generalize_uniques(uniques: pd.Index, column_type: str) -> Any:
+    # Mêmes règles (et même ordre) que anonymize_generalization
+    type_name = str(column_type).lower()
+    if column_type == 'age' or 'age' in type_name:
+        return _age_band_uniques(uniques)
+    elif 'date' in type_name:
+        return _year_uniques(uniques)
+    elif 'postal' in type_name or 'zip' in type_name:
+        return [str(value)[:2] + 'XXX' for value in uniques]
+    return [str(value) for value in uniques]
+
+
+def _anonymize_column(series: pd.Series, method: str, column_type: str, namespace: str = '') -> pd.Series:
+    if method == 'hash':
+        return _map_uniques(series, _hash_uniques)
+    elif method == 'pseudonym':
+        return _map_uniques(series, lambda uniques: _pseudonym_uniques(uniques, str(series.name), namespace))
+    elif method == 'suppression':
+        masked = series.isna() | (series == '')
+        return pd.Series(np.where(masked, '', '***'), index=series.index, name=series.name)
+    elif method == 'generalization':
+        return _map_uniques(series, lambda uniques: _generalize_uniques(uniques, column_type))
+    return series
+
+
 def apply_anonymization(
     df: pd.DataFrame,
     sensitive_columns: List[str],
     method: str = 'hash',
-    column_types: Dict[str, str] = None
+    column_types: Dict[str, str] = None,
+    max_workers: Optional[int] = None,
+    namespace: str = ''
 ) -> pd.DataFrame:
     """
     Applique l'anonymisation sur un DataFrame
@@ -99,32 +267,32 @@ def apply_anonymization(
         sensitive_columns: Liste des colonnes sensibles à anonymiser
         method: Méthode d'anonymisation ('hash', 'pseudonym', 'suppression', 'generalization')
         column_types: Types des colonnes pour la généralisation
+        max_workers: Nombre de colonnes traitées en parallèle (défaut : nombre de CPU)
+        namespace: Espace de noms des pseudonymes (ex. organisation) ; les mêmes
+            valeurs ont les mêmes pseudonymes dans tous les datasets de l'espace
     
     Returns:
-        DataFrame anonymisé (copie)
+        DataFrame anonymisé (copie ; les colonnes non sensibles sont partagées
+        avec l'original en copy-on-write)
     """
-    df_anonymized = df.copy()
+    columns = [col for col in dict.fromkeys(sensitive_columns) if col in df.columns]
+    df_anonymized = df.copy(deep=False)
+    if not columns:
+        return df_anonymized
+    
+    def anonymize(col: str) -> pd.Series:
+        col_type = column_types.get(col, '') if column_types else ''
+        return _anonymize_column(df[col], method, col_type, namespace)
+    
+    workers = min(len(columns), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(anonymize, columns))
+    else:
+        results = [anonymize(col) for col in columns]
     
-    for col in sensitive_columns:
-        if col not in df_anonymized.columns:
-            continue
-        
-        if method == 'hash':
-            df_anonymized[col] = df_anonymized[col].apply(anonymize_hash)
-        
-        elif method == 'pseudonym':
-            df_anonymized[col] = df_anonymized[col].apply(
-                lambda x: anonymize_pseudonym(x, col)
-            )
-        
-        elif method == 'suppression':
-            df_anonymized[col] = df_anonymized[col].apply(anonymize_suppression)
-        
-        elif method == 'generalization':
-            col_type = column_types.get(col, '') if column_types else ''
-            df_anonymized[col] = df_anonymized[col].apply(
-                lambda x: anonymize_generalization(x, col_type)
-            )
+    for col, values in zip(columns, results):
+        df_anonymized[col] = values
     
     return df_anonymized
 
@@ -142,7 +310,7 @@ def get_anonymization_methods() -> Dict[str, Dict[str, str]]:
         },
         'pseudonym': {
             'name': 'Pseudonymisation',
-            'description': 'Remplacement par des pseudonymes cohérents',
+            'description': 'Remplacement par des pseudonymes cohérents (HMAC à clé)',
             'reversible': False,
             'use_case': 'Identifiants, noms, emails - maintient la cohérence'
         },
@@ -1,14 +1,57 @@
 import pandas as pd
 import chardet
+import codecs
 import hashlib
-from typing import Dict, List, Any
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
 import io
 
-def detect_encoding(file_content: bytes) -> str:
-    """Détecte l'encodage du fichier"""
-    result = chardet.detect(file_content)
-    encoding = result['encoding']
-    
+from utils.profiling import profile_dataframe, column_types
+
+# Taille de chaque échantillon (début / milieu / fin) pour la détection statistique
+ENCODING_SAMPLE_SIZE = 64 * 1024
+_UTF8_CHECK_CHUNK_SIZE = 1024 * 1024
+MIN_DETECTION_CONFIDENCE = 0.5
+
+# BOM -> encodage (UTF-32 avant UTF-16 : le BOM UTF-32 LE commence par celui d'UTF-16 LE)
+_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Cache hash du fichier -> encodage détecté (LRU borné)
+_ENCODING_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_ENCODING_CACHE_SIZE = 1024
+_encoding_cache_lock = threading.Lock()
+
+
+def sniff_bom(head: bytes) -> Optional[str]:
+    """Retourne l'encodage annoncé par un BOM, ou None"""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def is_valid_utf8(data: bytes) -> bool:
+    """
+    Décodage UTF-8 strict (en C, très rapide).
+    Un caractère multi-octets tronqué en fin de buffer est toléré,
+    le buffer pouvant être un préfixe du fichier.
+    """
+    try:
+        codecs.getincrementaldecoder('utf-8')('strict').decode(data, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _normalize_encoding(encoding: Optional[str]) -> str:
     # Normaliser les encodages communs
     if encoding and encoding.lower() in ['ascii', 'utf-8', 'utf8']:
         return 'utf-8'
@@ -18,71 +61,120 @@ def detect_encoding(file_content: bytes) -> str:
     return encoding or 'utf-8'
 
 
-def calculate_file_hash(content: bytes) -> str:
-    """Calcule le hash SHA256 du fichier"""
-    return hashlib.sha256(content).hexdigest()
+def _statistical_encoding(sample: bytes) -> str:
+    """
+    Détection statistique (chardet) sur un échantillon borné.
+    Un résultat peu fiable retombe sur iso-8859-1 (le contenu n'est pas
+    de l'UTF-8 valide, et ce codec décode n'importe quel octet).
+    """
+    result = chardet.detect(sample)
+    if (result.get('confidence') or 0) < MIN_DETECTION_CONFIDENCE:
+        return 'iso-8859-1'
+    return _normalize_encoding(result['encoding'])
 
 
-def detect_column_types(df: pd.DataFrame) -> Dict[str, str]:
-    """Détecte automatiquement les types de colonnes"""
-    column_types = {}
+def _sample_bytes(data: bytes, sample_size: int = ENCODING_SAMPLE_SIZE) -> bytes:
+    """Début + milieu + fin du contenu, au plus 3 * sample_size octets"""
+    if len(data) <= 3 * sample_size:
+        return data
+    middle = len(data) // 2 - sample_size // 2
+    return data[:sample_size] + data[middle:middle + sample_size] + data[-sample_size:]
+
+
+def detect_encoding(file_content: bytes) -> str:
+    """
+    Détecte l'encodage d'un contenu (fichier complet ou préfixe)
+
+    1. BOM éventuel
+    2. Décodage UTF-8 strict (cas le plus courant, quasi instantané)
+    3. Sinon détection statistique sur un échantillon début/milieu/fin
+    """
+    bom_encoding = sniff_bom(file_content[:4])
+    if bom_encoding:
+        return bom_encoding
     
-    for col in df.columns:
-        dtype = df[col].dtype
-        
-        # Essayer de détecter les dates
-        if dtype == 'object':
-            try:
-                pd.to_datetime(df[col].dropna().head(100))
-                column_types[col] = 'date'
-                continue
-            except:
-                pass
-        
-        # Classification par type pandas
-        if pd.api.types.is_numeric_dtype(dtype):
-            if pd.api.types.is_integer_dtype(dtype):
-                column_types[col] = 'numeric_integer'
-            else:
-                column_types[col] = 'numeric_float'
-        elif pd.api.types.is_bool_dtype(dtype):
-            column_types[col] = 'boolean'
-        elif pd.api.types.is_categorical_dtype(dtype) or df[col].nunique() < 20:
-            column_types[col] = 'categorical'
-        else:
-            column_types[col] = 'text'
+    if is_valid_utf8(file_content):
+        return 'utf-8'
     
-    return column_types
+    return _statistical_encoding(_sample_bytes(file_content))
 
 
-def get_column_info(df: pd.DataFrame) -> List[Dict[str, Any]]:
-    """Extrait les informations détaillées sur chaque colonne"""
-    columns_info = []
-    column_types = detect_column_types(df)
+def detect_file_encoding(file_path: str, file_hash: Optional[str] = None) -> str:
+    """
+    Détecte l'encodage d'un fichier sur disque sans le charger en mémoire
+
+    Le fichier est validé en UTF-8 strict par blocs ; en cas d'échec, seule
+    la détection statistique porte sur un échantillon début/milieu/fin.
+    Le résultat est mis en cache par hash de fichier lorsqu'il est fourni.
+    """
+    if file_hash:
+        with _encoding_cache_lock:
+            if file_hash in _ENCODING_CACHE:
+                _ENCODING_CACHE.move_to_end(file_hash)
+                return _ENCODING_CACHE[file_hash]
     
-    for col in df.columns:
-        null_count = df[col].isnull().sum()
-        unique_count = df[col].nunique()
+    encoding = _detect_file_encoding(file_path)
+    
+    if file_hash:
+        with _encoding_cache_lock:
+            _ENCODING_CACHE[file_hash] = encoding
+            if len(_ENCODING_CACHE) > _ENCODING_CACHE_SIZE:
+                _ENCODING_CACHE.popitem(last=False)
+    
+    return encoding
+
+
+def _detect_file_encoding(file_path: str) -> str:
+    file_size = os.path.getsize(file_path)
+    
+    with open(file_path, 'rb') as f:
+        head = f.read(ENCODING_SAMPLE_SIZE)
+        bom_encoding = sniff_bom(head)
+        if bom_encoding:
+            return bom_encoding
         
-        info = {
-            'name': col,
-            'type': column_types[col],
-            'null_count': int(null_count),
-            'null_percentage': float(null_count / len(df) * 100),
-            'unique_count': int(unique_count),
-            'sample_values': df[col].dropna().head(5).tolist() if unique_count < 100 else []
-        }
+        # UTF-8 strict, bloc par bloc (s'arrête à la première séquence invalide)
+        decoder = codecs.getincrementaldecoder('utf-8')('strict')
+        f.seek(0)
+        try:
+            for chunk in iter(lambda: f.read(_UTF8_CHECK_CHUNK_SIZE), b''):
+                decoder.decode(chunk, final=False)
+            decoder.decode(b'', final=True)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
         
-        # Ajouter des stats pour les colonnes numériques
-        if column_types[col] in ['numeric_integer', 'numeric_float']:
-            try:
-                info['min'] = float(df[col].min()) if not pd.isna(df[col].min()) else None
-                info['max'] = float(df[col].max()) if not pd.isna(df[col].max()) else None
-                info['mean'] = float(df[col].mean()) if not pd.isna(df[col].mean()) else None
-                info['median'] = float(df[col].median()) if not pd.isna(df[col].median()) else None
-            except:
-                pass
+        if file_size <= 3 * ENCODING_SAMPLE_SIZE:
+            f.seek(0)
+            return _statistical_encoding(f.read())
         
-        columns_info.append(info)
+        f.seek(file_size // 2 - ENCODING_SAMPLE_SIZE // 2)
+        middle = f.read(ENCODING_SAMPLE_SIZE)
+        f.seek(file_size - ENCODING_SAMPLE_SIZE)
+        tail = f.read(ENCODING_SAMPLE_SIZE)
     
-    return columns_info
+    return _statistical_encoding(head + middle + tail)
+
+
+def calculate_file_hash(content: bytes) -> str:
+    """Calcule le hash SHA256 du fichier"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def calculate_path_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Calcule le hash SHA256 d'un fichier sur disque, par blocs"""
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def detect_column_types(df: pd.DataFrame) -> Dict[str, str]:
+    """Détecte automatiquement les types de colonnes"""
+    return column_types(profile_dataframe(df)['columns'])
+
+
+def get_column_info(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Extrait les informations détaillées sur chaque colonne (voir utils.profiling)"""
+    return profile_dataframe(df)['columns']
@@ -0,0 +1,226 @@
+"""
+Imputation par modèle des valeurs manquantes (KNN, itérative / MICE)
+
+Le modèle est ajusté sur un échantillon de lignes (KNN : les voisins sont
+cherchés parmi KNN_REFERENCE_SIZE lignes de référence ; itérative : les
+régressions sont apprises sur ITERATIVE_SAMPLE_SIZE lignes), puis appliqué
+aux seules lignes incomplètes par lots de IMPUTATION_BATCH_SIZE. Pour KNN
+(recherche des voisins coûteuse), les lots sont répartis dans un pool de
+processus quand il y en a plusieurs. Le pool est partagé entre les requêtes :
+créé au premier usage, arrêté avec l'application (shutdown_process_pool).
+
+L'imputation peut elle-même introduire un biais (moyennes de groupe
+rapprochées ou écartées) : imputation_group_report compare les distributions
+par groupe (attribut sensible) avant et après traitement.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional
+
+try:
+    from sklearn.experimental import enable_iterative_imputer  # noqa: F401
+    from sklearn.impute import IterativeImputer, KNNImputer
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+MODEL_BASED_STRATEGIES = ('knn', 'iterative')
+KNN_NEIGHBORS = 5
+KNN_REFERENCE_SIZE = 5_000
+ITERATIVE_SAMPLE_SIZE = 20_000
+ITERATIVE_MAX_ITER = 10
+IMPUTATION_BATCH_SIZE = 10_000
+MAX_IMPUTATION_WORKERS = 4
+
+# Écart de moyenne standardisé au-delà duquel un groupe est signalé
+GROUP_SHIFT_THRESHOLD = 0.1
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Pool de processus partagé, créé au premier usage"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn : pas de fork d'un processus qui a des threads (serveur, BLAS)
+            _process_pool = ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, MAX_IMPUTATION_WORKERS),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _process_pool
+
+
+def shutdown_process_pool():
+    """Arrête le pool de processus partagé (arrêt de l'application)"""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _feature_columns(df: pd.DataFrame) -> List[str]:
+    """Colonnes numériques utilisables comme variables explicatives"""
+    return [
+        col for col in df.columns
+        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+        and df[col].notna().any()
+    ]
+
+
+def _transform_batch(imputer, batch: np.ndarray) -> np.ndarray:
+    return imputer.transform(batch)
+
+
+def impute_columns(
+    df: pd.DataFrame,
+    columns: List[str],
+    method: str = 'knn',
+    sample_size: Optional[int] = None,
+    batch_size: int = IMPUTATION_BATCH_SIZE,
+    max_workers: Optional[int] = None,
+    random_state: int = 0
+) -> pd.DataFrame:
+    """
+    Impute les colonnes numériques demandées à partir de toutes les colonnes numériques
+
+    Args:
+        df: DataFrame (non modifié)
+        columns: Colonnes à imputer (les colonnes non numériques sont ignorées)
+        method: 'knn' ou 'iterative'
+        sample_size: Lignes utilisées pour ajuster le modèle (défaut selon la méthode)
+        batch_size: Lignes incomplètes traitées par lot
+        max_workers: Processus pour les lots (1 = dans le processus courant)
+
+    Returns:
+        DataFrame des colonnes imputées (même index que df)
+    """
+    if not SKLEARN_AVAILABLE:
+        raise ImportError("scikit-learn is required for model-based imputation")
+    if method not in MODEL_BASED_STRATEGIES:
+        raise ValueError(f"Unknown imputation method: {method}")
+
+    features = _feature_columns(df)
+    targets = [col for col in dict.fromkeys(columns) if col in features]
+    result = pd.DataFrame(index=df.index)
+    if not targets:
+        return result
+
+    X = df[features].to_numpy(dtype=np.float64)
+    target_positions = [features.index(col) for col in targets]
+    incomplete = np.flatnonzero(np.isnan(X[:, target_positions]).any(axis=1))
+
+    if len(incomplete):
+        rng = np.random.default_rng(random_state)
+        default_size = KNN_REFERENCE_SIZE if method == 'knn' else ITERATIVE_SAMPLE_SIZE
+        size = min(sample_size or default_size, len(X))
+        sample = X[np.sort(rng.choice(len(X), size, replace=False))]
+
+        # KNN : distances sur variables standardisées (statistiques de l'échantillon)
+        center = np.nanmean(sample, axis=0)
+        scale = np.nanstd(sample, axis=0)
+        center = np.where(np.isnan(center), 0.0, center)
+        scale = np.where(np.isnan(scale) | (scale == 0), 1.0, scale)
+
+        if method == 'knn':
+            imputer = KNNImputer(n_neighbors=KNN_NEIGHBORS, keep_empty_features=True)
+        else:
+            imputer = IterativeImputer(
+                max_iter=ITERATIVE_MAX_ITER, random_state=random_state, keep_empty_features=True
+            )
+        imputer.fit((sample - center) / scale)
+
+        rows = (X[incomplete] - center) / scale
+        batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+        workers = min(len(batches), max_workers or min(os.cpu_count() or 1, MAX_IMPUTATION_WORKERS))
+        if method == 'iterative':
+            # Appliquer les régressions est linéaire : le coût de démarrage du pool dominerait
+            workers = 1
+        imputed = None
+        if workers > 1:
+            try:
+                imputed = list(_get_process_pool().map(_transform_batch, [imputer] * len(batches), batches))
+            except BrokenProcessPool:
+                # Processus tué (mémoire...) : pool recréé à la prochaine requête, lots traités ici
+                shutdown_process_pool()
+        if imputed is None:
+            imputed = [_transform_batch(imputer, batch) for batch in batches]
+
+        X[incomplete] = np.vstack(imputed) * scale + center
+
+    for col, position in zip(targets, target_positions):
+        values = X[:, position]
+        if pd.api.types.is_integer_dtype(df[col]):
+            values = np.round(values)
+        result[col] = values
+    return result
+
+
+def imputation_group_report(
+    before: pd.DataFrame,
+    after: pd.DataFrame,
+    columns: List[str],
+    group_columns: List[str]
+) -> Dict[str, Any]:
+    """
+    Effet du traitement sur la distribution de chaque colonne par groupe
+
+    Compare, pour chaque groupe d'un attribut sensible, la moyenne et
+    l'écart-type des valeurs observées (avant) à ceux de la colonne traitée
+    (après, lignes conservées). L'écart de moyenne est standardisé par
+    l'écart-type global observé ; gap = écart entre la plus haute et la plus
+    basse moyenne de groupe.
+
+    Returns:
+        {group_column: {column: {'groups': {...}, 'gap_before', 'gap_after', 'flagged_groups'}}}
+    """
+    before = before.loc[after.index]
+    columns = [
+        col for col in columns
+        if col in after.columns and pd.api.types.is_numeric_dtype(after[col])
+        and pd.api.types.is_numeric_dtype(before[col])
+    ]
+    report: Dict[str, Any] = {}
+    for group_col in group_columns:
+        if group_col not in before.columns or not columns:
+            continue
+        groups = before[group_col]
+        stats_before = before[columns].groupby(groups, dropna=False).agg(['mean', 'std', 'count'])
+        stats_after = after[columns].groupby(groups, dropna=False).agg(['mean', 'std', 'count'])
+
+        report[group_col] = {}
+        for col in columns:
+            overall_std = before[col].std()
+            scale = overall_std if overall_std and not pd.isna(overall_std) else 1.0
+            col_before, col_after = stats_before[col], stats_after[col]
+            shift = (col_after['mean'] - col_before['mean']) / scale
+            imputed = col_after['count'] - col_before['count']
+
+            report[group_col][col] = {
+                'groups': {
+                    str(group): {
+                        'imputed': int(imputed[group]),
+                        'mean_before': _native(col_before['mean'][group]),
+                        'mean_after': _native(col_after['mean'][group]),
+                        'std_before': _native(col_before['std'][group]),
+                        'std_after': _native(col_after['std'][group]),
+                        'standardized_shift': _native(shift[group])
+                    }
+                    for group in col_after.index
+                },
+                'gap_before': _native(col_before['mean'].max() - col_before['mean'].min()),
+                'gap_after': _native(col_after['mean'].max() - col_after['mean'].min()),
+                'flagged_groups': [str(group) for group in shift.index if abs(shift[group]) > GROUP_SHIFT_THRESHOLD]
+            }
+    return report
+
+
+def _native(value: Any) -> Optional[float]:
+    return None if pd.isna(value) else round(float(value), 4)
@@ -0,0 +1,332 @@
+"""
+Détection de fuite multivariée des attributs sensibles
+
+La détection par paires (utils/proxy_detection.py) ne voit pas les
+combinaisons de variables qui, ensemble, encodent un attribut sensible
+(code postal + type de contrat + ancienneté → origine). Ici, deux modèles
+légers apprennent à prédire chaque attribut sensible à partir de toutes les
+autres colonnes, sur un échantillon stratifié :
+- gradient boosting par histogrammes (interactions, catégories natives)
+- régression logistique L1 (sélection parcimonieuse des variables)
+
+L'AUC obtenue sur la partie de validation mesure la fuite ; la contribution
+de chaque colonne est son poids dans la régression L1 (somme des
+|coefficients| à l'échelle d'un écart-type) et la perte d'AUC du boosting
+quand ses valeurs sont permutées. Le tout s'arrête à l'expiration d'un
+budget de temps (les étapes restantes sont sautées et signalées). Le budget
+est indicatif : il est vérifié entre deux ajustements, un ajustement commencé
+va à son terme. Un attribut non évalué (budget épuisé, une seule classe, pas
+de variable explicative) a le niveau de risque 'unknown', jamais 'low'.
+"""
+import time
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    from scipy import sparse
+    from sklearn import __version__ as SKLEARN_VERSION
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import balanced_accuracy_score, roc_auc_score
+    from sklearn.model_selection import train_test_split
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+LEAKAGE_SAMPLE_SIZE = 20_000
+LEAKAGE_TIME_BUDGET = 30.0
+VALIDATION_FRACTION = 0.3
+# Classes prédites au plus (les suivantes sont regroupées) ; quantiles pour un attribut numérique continu
+MAX_TARGET_CLASSES = 10
+NUMERIC_TARGET_QUANTILES = 4
+# Catégories par colonne : natives pour le boosting (max_bins), indicatrices pour la logistique
+MAX_TREE_CATEGORIES = 254
+MAX_LINEAR_CATEGORIES = 30
+TOP_FEATURES = 20
+
+# Pénalité L1 : l1_ratio seul à partir de scikit-learn 1.8 (penalty y est déprécié) ;
+# avant, l1_ratio est ignoré sans penalty='elasticnet' et le modèle serait L2
+if SKLEARN_AVAILABLE and tuple(int(part) for part in SKLEARN_VERSION.split('.')[:2]) >= (1, 8):
+    L1_PENALTY = {'l1_ratio': 1.0}
+else:
+    L1_PENALTY = {'penalty': 'l1'}
+
+# Seuils d'AUC (même graduation que les proxies : medium / high)
+AUC_MEDIUM_RISK = 0.7
+AUC_HIGH_RISK = 0.8
+
+
+def _encode_target(series: pd.Series) -> Tuple[np.ndarray, List[str], str]:
+    """Codes de classes de l'attribut sensible (-1 : manquant), libellés et encodage utilisé"""
+    if (pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            and series.nunique() > MAX_TARGET_CLASSES):
+        binned = pd.qcut(series, NUMERIC_TARGET_QUANTILES, duplicates='drop')
+        codes = binned.cat.codes.to_numpy(dtype=np.int64)
+        return codes, [str(label) for label in binned.cat.categories], 'quantiles'
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    labels = [str(value) for value in uniques]
+    if len(uniques) > MAX_TARGET_CLASSES:
+        # Classes les moins fréquentes regroupées dans 'other'
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        kept = np.argsort(-counts, kind='stable')[:MAX_TARGET_CLASSES - 1]
+        remap = np.full(len(uniques), MAX_TARGET_CLASSES - 1)
+        remap[kept] = np.arange(len(kept))
+        codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+        labels = [labels[i] for i in kept] + ['other']
+    return codes.astype(np.int64), labels, 'categories'
+
+
+def _stratified_sample(codes: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    """Positions d'un échantillon aléatoire respectant la répartition des classes (valeurs présentes)"""
+    present = np.flatnonzero(codes >= 0)
+    if len(present) <= size:
+        return present
+    shuffled = present[rng.permutation(len(present))]
+    classes = codes[shuffled]
+    counts = np.bincount(classes)
+    quotas = np.maximum(np.round(counts * size / len(present)), np.minimum(counts, 2)).astype(np.int64)
+    # Rang de chaque ligne dans sa classe (ordre aléatoire) : garder les quota premiers
+    order = np.argsort(classes, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.empty(len(classes), dtype=np.int64)
+    rank[order] = np.arange(len(classes)) - np.repeat(starts, counts)
+    return np.sort(shuffled[rank < quotas[classes]])
+
+
+def _tree_matrix(df: pd.DataFrame, columns: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Matrice float pour le boosting : numériques telles quelles, catégories en codes (NaN : manquant)"""
+    matrix = np.empty((len(df), len(columns)), dtype=np.float64)
+    categorical = np.zeros(len(columns), dtype=bool)
+    for j, col in enumerate(columns):
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            matrix[:, j] = np.where(series.isna(), np.nan, series.to_numpy(dtype='datetime64[ns]').astype(np.int64))
+        elif pd.api.types.is_numeric_dtype(series):
+            matrix[:, j] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            if len(uniques) > MAX_TREE_CATEGORIES:
+                # Catégories rares regroupées sur le dernier code
+                counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+                remap = np.full(len(uniques), MAX_TREE_CATEGORIES)
+                remap[np.argsort(-counts, kind='stable')[:MAX_TREE_CATEGORIES]] = np.arange(MAX_TREE_CATEGORIES)
+                codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+            matrix[:, j] = np.where(codes >= 0, codes, np.nan)
+            categorical[j] = True
+    return matrix, categorical
+
+
+def _linear_matrix(tree_matrix: np.ndarray, categorical: np.ndarray):
+    """
+    Matrice creuse pour la logistique : numériques standardisées (manquant = 0),
+    indicatrices des catégories les plus fréquentes
+
+    Returns:
+        (matrice, colonne d'origine de chaque variable, écart-type de chaque variable)
+    """
+    blocks, owners, scales = [], [], []
+    for j in range(tree_matrix.shape[1]):
+        values = tree_matrix[:, j]
+        present = ~np.isnan(values)
+        if not present.any():
+            continue
+        if categorical[j]:
+            codes = np.where(present, values, -1).astype(np.int64)
+            counts = np.bincount(codes[present])
+            top = np.argsort(-counts, kind='stable')[:MAX_LINEAR_CATEGORIES]
+            top = top[counts[top] > 0]
+            position = np.full(len(counts), -1)
+            position[top] = np.arange(len(top))
+            rows = np.flatnonzero(present & (position[np.maximum(codes, 0)] >= 0))
+            block = sparse.csr_matrix(
+                (np.ones(len(rows)), (rows, position[codes[rows]])), shape=(len(values), len(top))
+            )
+            shares = counts[top] / len(values)
+            blocks.append(block)
+            owners.extend([j] * len(top))
+            scales.extend(np.sqrt(shares * (1 - shares)))
+        else:
+            mean, std = values[present].mean(), values[present].std()
+            standardized = np.where(present, (values - mean) / (std if std > 0 else 1.0), 0.0)
+            blocks.append(sparse.csr_matrix(standardized[:, None]))
+            owners.append(j)
+            scales.append(1.0)
+    if not blocks:
+        return None, np.array([], dtype=np.int64), np.array([])
+    return sparse.hstack(blocks, format='csr'), np.asarray(owners), np.asarray(scales)
+
+
+def _auc(y: np.ndarray, proba: np.ndarray, n_classes: int) -> Optional[float]:
+    try:
+        if n_classes == 2:
+            return round(float(roc_auc_score(y, proba[:, 1])), 4)
+        return round(float(roc_auc_score(y, proba, multi_class='ovr', average='macro', labels=np.arange(n_classes))), 4)
+    except ValueError:
+        return None
+
+
+def _risk_level(auc: Optional[float]) -> str:
+    # Non évalué : ne pas présenter l'absence de mesure comme une absence de fuite
+    if auc is None:
+        return 'unknown'
+    if auc < AUC_MEDIUM_RISK:
+        return 'low'
+    return 'high' if auc >= AUC_HIGH_RISK else 'medium'
+
+
+def _attribute_leakage(
+    df: pd.DataFrame,
+    attribute: str,
+    features: List[str],
+    sample_size: int,
+    deadline: float,
+    rng: np.random.Generator,
+    random_state: int
+) -> Dict[str, Any]:
+    """Modèles de fuite pour un attribut sensible"""
+    target, labels, encoding = _encode_target(df[attribute])
+    sample = _stratified_sample(target, sample_size, rng)
+    y_sample = target[sample]
+    classes = np.unique(y_sample)
+    report: Dict[str, Any] = {
+        'target_encoding': encoding,
+        'classes': [labels[c] for c in classes],
+        'sample_size': int(len(sample)),
+        'models': {},
+        'features': [],
+        'budget_exhausted': False
+    }
+    if len(classes) < 2 or not features:
+        report.update(leakage_auc=None, risk_level=_risk_level(None))
+        return report
+    # Classes renumérotées 0..k-1 (classes absentes de l'échantillon retirées)
+    y_sample = np.searchsorted(classes, y_sample)
+
+    X_tree, categorical = _tree_matrix(df.iloc[sample], features)
+    stratify = y_sample if np.bincount(y_sample).min() >= 2 else None
+    train, valid = train_test_split(
+        np.arange(len(sample)), test_size=VALIDATION_FRACTION, stratify=stratify, random_state=random_state
+    )
+    y_train, y_valid = y_sample[train], y_sample[valid]
+    n_classes = len(classes)
+
+    # Régression logistique L1 (rapide) : poids par colonne d'origine
+    weights = np.zeros(len(features))
+    X_linear, owners, scales = _linear_matrix(X_tree, categorical)
+    if X_linear is not None and time.monotonic() < deadline:
+        linear = LogisticRegression(**L1_PENALTY, solver='saga', C=0.1, max_iter=200, tol=1e-3)
+        linear.fit(X_linear[train], y_train)
+        proba = linear.predict_proba(X_linear[valid])
+        report['models']['l1_logistic'] = {
+            'auc': _auc(y_valid, proba, n_classes),
+            'balanced_accuracy': round(float(balanced_accuracy_score(y_valid, proba.argmax(axis=1))), 4)
+        }
+        np.add.at(weights, owners, np.abs(linear.coef_).sum(axis=0) * scales)
+
+    # Gradient boosting par histogrammes : interactions entre colonnes
+    importance = np.full(len(features), np.nan)
+    if time.monotonic() < deadline:
+        boosting = HistGradientBoostingClassifier(
+            max_iter=100, categorical_features=categorical, early_stopping=True, random_state=random_state
+        )
+        boosting.fit(X_tree[train], y_train)
+        X_valid = X_tree[valid]
+        proba = boosting.predict_proba(X_valid)
+        baseline = _auc(y_valid, proba, n_classes)
+        report['models']['hist_gradient_boosting'] = {
+            'auc': baseline,
+            'balanced_accuracy': round(float(balanced_accuracy_score(y_valid, proba.argmax(axis=1))), 4)
+        }
+
+        # Importance par permutation, colonnes les plus lourdes pour la L1 d'abord
+        if baseline is not None:
+            for j in np.argsort(-weights, kind='stable'):
+                if time.monotonic() >= deadline:
+                    break
+                original = X_valid[:, j].copy()
+                X_valid[:, j] = original[rng.permutation(len(original))]
+                permuted = _auc(y_valid, boosting.predict_proba(X_valid), n_classes)
+                X_valid[:, j] = original
+                if permuted is not None:
+                    importance[j] = baseline - permuted
+
+    report['budget_exhausted'] = time.monotonic() >= deadline
+    aucs = [model['auc'] for model in report['models'].values() if model['auc'] is not None]
+    report['leakage_auc'] = max(aucs) if aucs else None
+    report['risk_level'] = _risk_level(report['leakage_auc'])
+
+    contributions = [
+        {
+            'column': col,
+            'permutation_importance': None if np.isnan(importance[j]) else round(float(importance[j]), 4),
+            'l1_weight': round(float(weights[j]), 4)
+        }
+        for j, col in enumerate(features)
+    ]
+    contributions.sort(key=lambda c: (c['permutation_importance'] or 0.0, c['l1_weight']), reverse=True)
+    report['features'] = [
+        c for c in contributions[:TOP_FEATURES]
+        if (c['permutation_importance'] or 0.0) > 0 or c['l1_weight'] > 0
+    ]
+    return report
+
+
+def detect_leakage(
+    df: pd.DataFrame,
+    sensitive_attributes: List[str],
+    exclude_columns: Optional[List[str]] = None,
+    sample_size: int = LEAKAGE_SAMPLE_SIZE,
+    time_budget: float = LEAKAGE_TIME_BUDGET,
+    random_state: int = 0
+) -> Dict[str, Any]:
+    """
+    Mesure dans quelle mesure chaque attribut sensible est prédictible à partir des autres colonnes
+
+    Args:
+        df: DataFrame contenant les données
+        sensitive_attributes: Colonnes sensibles (toutes exclues des variables explicatives)
+        exclude_columns: Autres colonnes à exclure (cible, prédictions...)
+        sample_size: Taille de l'échantillon stratifié par attribut
+        time_budget: Durée indicative en secondes pour l'ensemble des attributs (vérifiée
+            entre deux ajustements : un ajustement en cours n'est pas interrompu)
+
+    Returns:
+        {
+            'attributes': {
+                'gender': {
+                    'leakage_auc': 0.86, 'risk_level': 'high',  # 'unknown' si non évalué
+                    'models': {'l1_logistic': {...}, 'hist_gradient_boosting': {...}},
+                    'features': [{'column': 'code_postal', 'permutation_importance': 0.21, 'l1_weight': 0.4}, ...],
+                    ...
+                }
+            },
+            'elapsed_seconds': float,
+            'time_budget': float
+        }
+    """
+    if not SKLEARN_AVAILABLE:
+        raise ImportError("scikit-learn is required for leakage detection")
+
+    start = time.monotonic()
+    deadline = start + time_budget
+    rng = np.random.default_rng(random_state)
+    attributes = [attr for attr in dict.fromkeys(sensitive_attributes) if attr in df.columns]
+    excluded = set(attributes) | set(exclude_columns or [])
+    features = [col for col in df.columns if col not in excluded]
+
+    results = {}
+    for attribute in attributes:
+        if time.monotonic() >= deadline:
+            results[attribute] = {
+                'leakage_auc': None, 'risk_level': _risk_level(None), 'models': {}, 'features': [], 'budget_exhausted': True
+            }
+            continue
+        results[attribute] = _attribute_leakage(df, attribute, features, sample_size, deadline, rng, random_state)
+
+    return {
+        'attributes': results,
+        'elapsed_seconds': round(time.monotonic() - start, 2),
+        'time_budget': time_budget
+    }
@@ -1,9 +1,90 @@
 """
 Utilitaires pour le traitement des valeurs manquantes
 F2.1.7: Gestion valeurs manquantes (signalement + options traitement)
+
+L'analyse calcule un seul masque de valeurs manquantes pour tout le
+DataFrame, ou s'appuie directement sur le profil de colonnes stocké avec
+le dataset (utils/profiling.py) sans relire le fichier. Le traitement
+applique toutes les stratégies en une passe (une suppression de lignes,
+un fillna par dictionnaire) sans copie complète du DataFrame. Les
+imputations par modèle (KNN, itérative) sont dans utils/imputation.py.
 """
+from functools import cached_property
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from utils.imputation import MODEL_BASED_STRATEGIES, SKLEARN_AVAILABLE, impute_columns
+
+
+class _ColumnStats:
+    """Statistiques d'une colonne utilisées par les recommandations (calculées une fois)"""
+
+    def __init__(self, dtype: Any, null_count: int, total_rows: int):
+        self.dtype = dtype
+        self.null_count = int(null_count)
+        self.null_percentage = (null_count / total_rows) * 100 if total_rows else 0.0
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.dtype is not None and pd.api.types.is_numeric_dtype(self.dtype)
+
+    @property
+    def is_categorical(self) -> bool:
+        return isinstance(self.dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(self.dtype)
+
+    unique_count: int
+    distinct_values: Optional[List[Any]]  # Valeurs distinctes si au plus 2, sinon None
+    skewness: Optional[float]
+
+
+class _SeriesStats(_ColumnStats):
+    def __init__(self, series: pd.Series, null_count: int, total_rows: int):
+        super().__init__(series.dtype, null_count, total_rows)
+        self._series = series
+
+    @cached_property
+    def unique_count(self) -> int:
+        return int(self._series.nunique())
+
+    @cached_property
+    def distinct_values(self) -> Optional[List[Any]]:
+        if self.unique_count > 2:
+            return None
+        return list(self._series.dropna().unique())
+
+    @cached_property
+    def skewness(self) -> Optional[float]:
+        try:
+            return float(self._series.skew())
+        except Exception:
+            return None
+
+
+class _ProfileStats(_ColumnStats):
+    """Statistiques lues dans une colonne du profil stocké"""
+
+    def __init__(self, column: Dict[str, Any], total_rows: int):
+        try:
+            dtype = pd.api.types.pandas_dtype(column.get('dtype'))
+        except (TypeError, ValueError):
+            dtype = None
+        super().__init__(dtype, column.get('null_count', 0), total_rows)
+        self.unique_count = int(column.get('unique_count', 0))
+        self.skewness = column.get('skewness')
+        top_values = column.get('top_values') or []
+        exact = self.unique_count <= 2 and not column.get('unique_count_approximate')
+        self.distinct_values = [item['value'] for item in top_values] if exact else None
+
+
+def _missing_entry(stats: _ColumnStats) -> Dict[str, Any]:
+    return {
+        'count': stats.null_count,
+        'percentage': float(np.round(stats.null_percentage, 2)),
+        'severity': get_severity(stats.null_percentage),
+        'recommended_strategy': _recommend(stats),
+        'available_strategies': _available(stats)
+    }
 
 
 def analyze_missing_values(df: pd.DataFrame) -> Dict[str, Any]:
@@ -13,23 +94,34 @@ def analyze_missing_values(df: pd.DataFrame) -> Dict[str, Any]:
     Returns:
         Dict avec statistiques détaillées par colonne
     """
-    missing_analysis = {}
     total_rows = len(df)
+    # Un seul masque pour toutes les colonnes ; seules les colonnes incomplètes sont détaillées
+    null_counts = df.isna().sum()
     
-    for col in df.columns:
-        null_count = df[col].isnull().sum()
-        null_percentage = (null_count / total_rows) * 100
-        
-        if null_count > 0:
-            missing_analysis[col] = {
-                'count': int(null_count),
-                'percentage': round(null_percentage, 2),
-                'severity': get_severity(null_percentage),
-                'recommended_strategy': recommend_strategy(df[col]),
-                'available_strategies': get_available_strategies(df[col])
-            }
+    return {
+        col: _missing_entry(_SeriesStats(df[col], null_count, total_rows))
+        for col, null_count in null_counts.items()
+        if null_count > 0
+    }
+
+
+def analyze_missing_values_from_profile(
+    profile_columns: List[Dict[str, Any]],
+    total_rows: int
+) -> Dict[str, Any]:
+    """
+    Même analyse que analyze_missing_values à partir du profil stocké
+    (Dataset.columns_info), sans charger le fichier
     
-    return missing_analysis
+    Les asymétries viennent de l'échantillon du profil : la recommandation
+    mean/median peut différer de celle calculée sur toutes les lignes pour
+    une distribution à la limite.
+    """
+    return {
+        col['name']: _missing_entry(_ProfileStats(col, total_rows))
+        for col in profile_columns
+        if col.get('null_count', 0) > 0
+    }
 
 
 def get_severity(percentage: float) -> str:
@@ -53,43 +145,40 @@ def recommend_strategy(series: pd.Series) -> str:
     - Booléennes (0/1): mode
     - Numériques continues: mean ou median selon distribution
     """
-    dtype = series.dtype
-    null_percentage = (series.isnull().sum() / len(series)) * 100
-    
+    return _recommend(_SeriesStats(series, series.isnull().sum(), len(series)))
+
+
+def _recommend(stats: _ColumnStats) -> str:
     # Si trop de valeurs manquantes, recommander suppression colonne
-    if null_percentage > 50:
+    if stats.null_percentage > 50:
         return 'drop_column'
     
     # Si très peu, supprimer les lignes
-    if null_percentage < 5:
+    if stats.null_percentage < 5:
         return 'drop_rows'
     
     # Détecter variables booléennes (0/1 ou True/False)
-    unique_vals = series.dropna().unique()
-    if len(unique_vals) <= 2:
+    unique_vals = stats.distinct_values
+    if unique_vals is not None:
         # Booléenne ou binaire -> utiliser mode
         if set(unique_vals).issubset({0, 1, True, False, 0.0, 1.0}):
             return 'mode'
     
     # Variables catégorielles
-    if pd.api.types.is_categorical_dtype(dtype) or pd.api.types.is_object_dtype(dtype):
+    if stats.is_categorical:
         return 'mode'
     
     # Variables catégorielles numériques (peu de valeurs uniques)
-    if series.nunique() < 20:
+    if stats.unique_count < 20:
         return 'mode'
     
     # Variables numériques continues
-    if pd.api.types.is_numeric_dtype(dtype):
+    if stats.is_numeric:
         # Vérifier si distribution normale (skewness proche de 0)
-        try:
-            skewness = series.skew()
-            if abs(skewness) < 1:
-                return 'mean'  # Distribution symétrique
-            else:
-                return 'median'  # Distribution asymétrique ou avec outliers
-        except:
-            return 'median'  # Par défaut pour numérique
+        skewness = stats.skewness
+        if skewness is not None and abs(skewness) < 1:
+            return 'mean'  # Distribution symétrique
+        return 'median'  # Distribution asymétrique ou avec outliers
     
     # Par défaut
     return 'constant'
@@ -97,12 +186,17 @@ def recommend_strategy(series: pd.Series) -> str:
 
 def get_available_strategies(series: pd.Series) -> List[str]:
     """Retourne les stratégies disponibles selon le type de colonne"""
-    dtype = series.dtype
+    return _available(_SeriesStats(series, series.isnull().sum(), len(series)))
+
+
+def _available(stats: _ColumnStats) -> List[str]:
     strategies = ['drop_rows', 'drop_column']
     
-    if pd.api.types.is_numeric_dtype(dtype):
+    if stats.is_numeric:
         strategies.extend(['mean', 'median', 'forward_fill', 'constant'])
-    elif pd.api.types.is_categorical_dtype(dtype) or series.nunique() < 50:
+        if SKLEARN_AVAILABLE:
+            strategies.extend(MODEL_BASED_STRATEGIES)
+    elif isinstance(stats.dtype, pd.CategoricalDtype) or stats.unique_count < 50:
         strategies.extend(['mode', 'constant'])
     else:
         strategies.extend(['constant', 'forward_fill'])
@@ -128,53 +222,70 @@ def handle_missing_values(
                 - 'mode': Remplacer par mode (catégoriel)
                 - 'forward_fill': Propagation avant
                 - 'constant': Remplacer par valeur par défaut
+                - 'knn': K plus proches voisins (numérique)
+                - 'iterative': Imputation itérative / MICE (numérique)
+    
+    Les lignes sont supprimées d'abord (en une fois pour toutes les colonnes
+    'drop_rows') ; moyennes, médianes, modes et modèles d'imputation sont
+    calculés sur les lignes restantes.
     
     Returns:
-        DataFrame traité (copie)
+        DataFrame traité (nouvel objet ; les colonnes non modifiées sont
+        partagées avec l'original en copy-on-write)
     """
-    df_clean = df.copy()
-    columns_to_drop = []
-    
+    strategy = {col: strat for col, strat in strategy.items() if col in df.columns}
+    by_strategy: Dict[str, List[str]] = {}
     for col, strat in strategy.items():
-        if col not in df_clean.columns:
-            continue
-        
-        if strat == 'drop_column':
-            columns_to_drop.append(col)
-        
-        elif strat == 'drop_rows':
-            df_clean = df_clean.dropna(subset=[col])
-        
-        elif strat == 'mean':
-            if pd.api.types.is_numeric_dtype(df_clean[col]):
-                df_clean[col].fillna(df_clean[col].mean(), inplace=True)
-        
-        elif strat == 'median':
-            if pd.api.types.is_numeric_dtype(df_clean[col]):
-                df_clean[col].fillna(df_clean[col].median(), inplace=True)
-        
-        elif strat == 'mode':
-            mode_val = df_clean[col].mode()
-            if len(mode_val) > 0:
-                df_clean[col].fillna(mode_val[0], inplace=True)
-        
-        elif strat == 'forward_fill':
-            df_clean[col].fillna(method='ffill', inplace=True)
-            # Si encore des NaN au début, backfill
-            df_clean[col].fillna(method='bfill', inplace=True)
-        
-        elif strat == 'constant':
-            # Valeur par défaut selon le type
-            if pd.api.types.is_numeric_dtype(df_clean[col]):
-                df_clean[col].fillna(0, inplace=True)
-            else:
-                df_clean[col].fillna('Unknown', inplace=True)
+        by_strategy.setdefault(strat, []).append(col)
+    
+    df_clean = df
+    drop_rows = by_strategy.get('drop_rows', [])
+    if drop_rows:
+        keep = df_clean[drop_rows].notna().all(axis=1)
+        if not keep.all():
+            df_clean = df_clean.loc[keep]
+    
+    # Valeurs de remplacement de toutes les colonnes, puis un seul fillna
+    fill_values: Dict[str, Any] = {}
+    for strat, stat in (('mean', 'mean'), ('median', 'median')):
+        numeric = [col for col in by_strategy.get(strat, []) if pd.api.types.is_numeric_dtype(df_clean[col])]
+        if numeric:
+            fill_values.update(getattr(df_clean[numeric], stat)().items())
+    
+    for method in MODEL_BASED_STRATEGIES:
+        numeric = [col for col in by_strategy.get(method, []) if pd.api.types.is_numeric_dtype(df_clean[col])]
+        if numeric:
+            fill_values.update(impute_columns(df_clean, numeric, method=method).items())
+    
+    for col in by_strategy.get('mode', []):
+        mode_val = df_clean[col].mode()
+        if len(mode_val) > 0:
+            fill_values[col] = mode_val.iloc[0]
+    
+    for col in by_strategy.get('constant', []):
+        # Valeur par défaut selon le type
+        fill_values[col] = 0 if pd.api.types.is_numeric_dtype(df_clean[col]) else 'Unknown'
+    
+    fill_values = {
+        col: value for col, value in fill_values.items()
+        if isinstance(value, pd.Series) or not pd.isna(value)
+    }
+    if fill_values:
+        df_clean = df_clean.fillna(fill_values)
+    
+    forward_fill = by_strategy.get('forward_fill', [])
+    if forward_fill:
+        # Si encore des NaN au début, backfill
+        filled = df_clean[forward_fill].ffill().bfill()
+        df_clean = df_clean.copy(deep=False) if df_clean is df else df_clean
+        df_clean[forward_fill] = filled
     
     # Supprimer colonnes marquées
-    if columns_to_drop:
-        df_clean = df_clean.drop(columns=columns_to_drop)
+    drop_columns = by_strategy.get('drop_column', [])
+    if drop_columns:
+        df_clean = df_clean.drop(columns=drop_columns)
     
-    return df_clean
+    return df_clean if df_clean is not df else df.copy(deep=False)
 
 
 def get_strategy_description(strategy: str) -> Dict[str, str]:
@@ -228,6 +339,20 @@ def get_strategy_description(strategy: str) -> Dict[str, str]:
             'use_case': 'Quand manque signifie "non applicable"',
             'pros': 'Simple, explicite',
             'cons': 'Peut créer des patterns artificiels'
+        },
+        'knn': {
+            'name': 'K plus proches voisins',
+            'description': 'Remplace par la moyenne des 5 lignes les plus proches (colonnes numériques), cherchées dans un échantillon de référence',
+            'use_case': 'Données numériques corrélées entre elles',
+            'pros': 'Respecte les relations entre variables',
+            'cons': 'Plus lent ; peut propager les écarts entre groupes'
+        },
+        'iterative': {
+            'name': 'Imputation itérative',
+            'description': 'Prédit chaque colonne à partir des autres par régressions successives (MICE), apprises sur un échantillon',
+            'use_case': 'Données numériques avec dépendances linéaires',
+            'pros': 'Conserve mieux la variance et les corrélations',
+            'cons': 'Plus lent ; suppose des relations linéaires'
         }
     }
     return descriptions.get(strategy, {})
@@ -237,6 +362,6 @@ def get_all_strategies_info() -> Dict[str, Dict[str, str]]:
     """Retourne toutes les stratégies disponibles avec descriptions"""
     strategies = [
         'drop_rows', 'drop_column', 'mean', 'median',
-        'mode', 'forward_fill', 'constant'
+        'mode', 'forward_fill', 'constant', 'knn', 'iterative'
     ]
     return {s: get_strategy_description(s) for s in strategies}
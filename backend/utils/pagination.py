@@ -0,0 +1,82 @@
+"""
+Pagination par curseur (keyset) sur (created_at, id)
+
+Les listes sont triées par created_at DESC NULLS FIRST, id DESC ; le
+curseur encode la dernière ligne renvoyée et la page suivante reprend
+strictement après, sans OFFSET (coût constant quelle que soit la
+profondeur de la page).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import Select
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode la position (created_at, id) en jeton opaque URL-safe"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """
+    Décode un jeton produit par encode_cursor
+
+    Raises:
+        ValueError: si le curseur est invalide
+    """
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def apply_keyset(stmt: Select, created_col: Any, id_col: Any, cursor: Optional[str], limit: int) -> Select:
+    """
+    Ajoute le tri, la condition de reprise et la limite à une requête
+
+    Une ligne de plus que la page est demandée pour savoir s'il existe
+    une page suivante (voir split_page).
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            # Les lignes sans date viennent en premier : toutes les lignes datées suivent
+            stmt = stmt.where(or_(
+                and_(created_col.is_(None), id_col < row_id),
+                created_col.isnot(None)
+            ))
+        else:
+            stmt = stmt.where(or_(
+                created_col < created_at,
+                and_(created_col == created_at, id_col < row_id)
+            ))
+    # NULLS FIRST explicite : ordre identique sur PostgreSQL et SQLite
+    return stmt.order_by(created_col.desc().nulls_first(), id_col.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Sépare la page renvoyée de la ligne sentinelle et calcule le curseur suivant
+
+    Les lignes doivent exposer les attributs created_at et id.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,332 @@
+"""
+Risque de ré-identification : k-anonymat et l-diversité
+
+Une classe d'équivalence regroupe les lignes qui ont les mêmes valeurs de
+quasi-identifiants (âge, code postal, date...). Le dataset est k-anonyme si
+chaque classe contient au moins k lignes, l-divers si chaque classe contient
+au moins l valeurs distinctes de l'attribut sensible.
+
+Chaque quasi-identifiant est factorisé une fois ; les codes des colonnes sont
+combinés en un identifiant de classe entier, et les tailles de classes sont
+comptées par np.bincount. La généralisation (tranches d'âge, préfixes de code
+postal, mois/année) est appliquée aux valeurs distinctes puis redistribuée
+par les codes, ce qui permet d'évaluer de nombreux niveaux de généralisation
+en quelques dizaines de millisecondes sur 1M de lignes.
+"""
+import pandas as pd
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+# Hiérarchies de généralisation : niveau 0 = valeur exacte, dernier niveau = suppression ('*')
+NUMERIC_BAND_WIDTHS = [5, 10, 20, 50]
+POSTAL_PREFIX_LENGTHS = [4, 3, 2, 1]
+DATE_GRANULARITIES = ['month', 'year', 'decade']
+
+# Au-delà de max(4 x lignes, 2^20) identifiants possibles, les codes combinés
+# sont re-factorisés au lieu d'être comptés par bincount direct
+_MIN_DIRECT_BINCOUNT = 1 << 20
+
+
+def hierarchy_kind(column: str, column_type: str = '', dtype: Any = None) -> str:
+    """Hiérarchie de généralisation d'une colonne : numeric, postal, date ou categorical"""
+    type_name = str(column_type).lower()
+    name = str(column).lower()
+    if 'postal' in type_name or 'zip' in type_name or 'postal' in name or 'zip' in name:
+        return 'postal'
+    if 'date' in type_name or (dtype is not None and pd.api.types.is_datetime64_any_dtype(dtype)):
+        return 'date'
+    if 'numeric' in type_name or 'age' in type_name:
+        return 'numeric'
+    if not type_name and dtype is not None and pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return 'numeric'
+    return 'categorical'
+
+
+def hierarchy_levels(kind: str) -> List[str]:
+    """Description de chaque niveau de généralisation"""
+    if kind == 'numeric':
+        steps = [f"bands of {width}" for width in NUMERIC_BAND_WIDTHS]
+    elif kind == 'postal':
+        steps = [f"prefix of {length}" for length in POSTAL_PREFIX_LENGTHS]
+    elif kind == 'date':
+        steps = list(DATE_GRANULARITIES)
+    else:
+        steps = []
+    return ['exact'] + steps + ['suppressed']
+
+
+def generalize_values(values: pd.Index, kind: str, level: int) -> np.ndarray:
+    """
+    Valeurs généralisées (libellés lisibles) au niveau demandé
+
+    Appliqué aux valeurs distinctes d'une colonne ; les valeurs manquantes
+    restent manquantes tant que la colonne n'est pas supprimée.
+    """
+    values = pd.Index(values)
+    n_levels = len(hierarchy_levels(kind))
+    if level <= 0:
+        return values.to_numpy(dtype=object)
+    if level >= n_levels - 1:
+        return np.full(len(values), '*', dtype=object)
+
+    missing = np.asarray(values.isna())
+    present = values[~missing]
+    labels = np.full(len(values), np.nan, dtype=object)
+    if kind == 'numeric':
+        width = NUMERIC_BAND_WIDTHS[level - 1]
+        numbers = pd.to_numeric(pd.Series(present), errors='coerce').to_numpy(dtype=float)
+        lower = np.floor(numbers / width) * width
+        valid = np.isfinite(lower)
+        low = pd.Series(lower[valid].astype(np.int64))
+        bands = np.full(len(present), np.nan, dtype=object)
+        bands[valid] = (low.astype(str) + '-' + (low + width - 1).astype(str)).to_numpy(dtype=object)
+        labels[~missing] = bands
+        return labels
+
+    if kind == 'date' and isinstance(present, pd.DatetimeIndex):
+        granularity = DATE_GRANULARITIES[level - 1]
+        if granularity == 'month':
+            generalized = present.strftime('%Y-%m')
+        elif granularity == 'year':
+            generalized = present.year.astype(str).str.zfill(4)
+        else:
+            generalized = (present.year // 10 * 10).astype(str).str.zfill(4) + 's'
+    else:
+        text = present.astype(str)
+        if kind == 'postal':
+            generalized = text.str[:POSTAL_PREFIX_LENGTHS[level - 1]] + '*'
+        else:
+            # Dates en texte (ISO) : 'YYYY-MM', 'YYYY', 'YYY0s'
+            granularity = DATE_GRANULARITIES[level - 1]
+            if granularity == 'month':
+                generalized = text.str[:7]
+            elif granularity == 'year':
+                generalized = text.str[:4]
+            else:
+                generalized = text.str[:3] + '0s'
+    labels[~missing] = np.asarray(generalized, dtype=object)
+    return labels
+
+
+class _ColumnHierarchy:
+    """Codes d'une colonne à chaque niveau de généralisation (calculés à la demande)"""
+
+    def __init__(self, series: pd.Series, kind: str):
+        self.kind = kind
+        self.levels = hierarchy_levels(kind)
+        # Valeurs manquantes : une catégorie à part entière
+        self._codes, self._uniques = pd.factorize(series, use_na_sentinel=False)
+        self._by_level: Dict[int, Tuple[np.ndarray, int]] = {0: (self._codes, len(self._uniques))}
+
+    @property
+    def max_level(self) -> int:
+        return len(self.levels) - 1
+
+    def codes(self, level: int) -> Tuple[np.ndarray, int]:
+        """(code de chaque ligne, nombre de codes) au niveau demandé"""
+        if level not in self._by_level:
+            generalized = generalize_values(self._uniques, self.kind, level)
+            unique_codes, labels = pd.factorize(generalized, use_na_sentinel=False)
+            self._by_level[level] = (unique_codes[self._codes], len(labels))
+        return self._by_level[level]
+
+
+def _combine_codes(columns: List[Tuple[np.ndarray, int]], n_rows: int) -> Tuple[np.ndarray, int]:
+    """
+    Identifiant de classe de chaque ligne à partir des codes de chaque colonne
+
+    Les codes sont combinés en base mixte (code1 * card2 + code2 ...), des
+    colonnes les moins variées aux plus variées ; si le produit des
+    cardinalités devient trop grand pour bincount, la combinaison partielle
+    est re-factorisée. Retourne (identifiants, borne supérieure des identifiants).
+    """
+    max_radix = max(4 * n_rows, _MIN_DIRECT_BINCOUNT)
+    combined = np.zeros(n_rows, dtype=np.int64)
+    radix = 1
+    for codes, cardinality in sorted(columns, key=lambda column: column[1]):
+        cardinality = max(cardinality, 1)
+        if radix * cardinality > max_radix and radix > 1:
+            combined, uniques = pd.factorize(combined)
+            radix = len(uniques)
+        combined = combined * cardinality + codes
+        radix *= cardinality
+    if radix > max_radix:
+        combined, uniques = pd.factorize(combined)
+        radix = len(uniques)
+    return combined, radix
+
+
+def _risk_from_codes(
+    columns: List[Tuple[np.ndarray, int]],
+    n_rows: int,
+    target_k: int,
+    sensitive: Optional[Tuple[np.ndarray, int]] = None
+) -> Dict[str, Any]:
+    group_ids, n_groups = _combine_codes(columns, n_rows)
+    counts = np.bincount(group_ids, minlength=n_groups)
+    sizes = counts[counts > 0]
+
+    risk = {
+        'k': int(sizes.min()) if len(sizes) else 0,
+        'equivalence_classes': int(len(sizes)),
+        'average_class_size': round(float(sizes.mean()), 2) if len(sizes) else 0.0,
+        'unique_records': int((sizes == 1).sum()),
+        'records_at_risk': int(sizes[sizes < target_k].sum()),
+        'at_risk_ratio': round(float(sizes[sizes < target_k].sum()) / n_rows, 4) if n_rows else 0.0,
+        'target_k': target_k
+    }
+
+    if sensitive is not None:
+        # Nombre de valeurs sensibles distinctes par classe : paires (classe, valeur) distinctes
+        sensitive_codes, n_sensitive = sensitive
+        pairs = pd.unique(group_ids.astype(np.int64) * max(n_sensitive, 1) + sensitive_codes)
+        diversity = np.bincount(pairs // max(n_sensitive, 1), minlength=n_groups)[counts > 0]
+        risk['l'] = int(diversity.min()) if len(diversity) else 0
+        risk['classes_without_diversity'] = int((diversity < 2).sum())
+
+    return risk
+
+
+def _prepare(
+    df: pd.DataFrame,
+    quasi_identifiers: List[str],
+    column_types: Optional[Dict[str, str]]
+) -> Dict[str, _ColumnHierarchy]:
+    column_types = column_types or {}
+    return {
+        col: _ColumnHierarchy(df[col], hierarchy_kind(col, column_types.get(col, ''), df[col].dtype))
+        for col in dict.fromkeys(quasi_identifiers) if col in df.columns
+    }
+
+
+def _sensitive_codes(df: pd.DataFrame, sensitive_column: Optional[str]) -> Optional[Tuple[np.ndarray, int]]:
+    if not sensitive_column or sensitive_column not in df.columns:
+        return None
+    codes, uniques = pd.factorize(df[sensitive_column], use_na_sentinel=False)
+    return codes, len(uniques)
+
+
+def compute_privacy_risk(
+    df: pd.DataFrame,
+    quasi_identifiers: List[str],
+    sensitive_column: Optional[str] = None,
+    target_k: int = 5,
+    column_types: Optional[Dict[str, str]] = None,
+    levels: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    Mesure le risque de ré-identification pour un ensemble de quasi-identifiants
+
+    Args:
+        df: DataFrame à analyser
+        quasi_identifiers: Colonnes quasi-identifiantes (les colonnes absentes sont ignorées)
+        sensitive_column: Attribut sensible pour la l-diversité (optionnel)
+        target_k: Taille minimale de classe visée ; les lignes des classes plus
+            petites sont comptées comme à risque
+        column_types: Types des colonnes (choix de la hiérarchie de généralisation)
+        levels: Niveau de généralisation par colonne (0 = valeurs exactes)
+
+    Returns:
+        Dict avec k, l (si sensitive_column), nombre de classes, lignes uniques
+        et lignes à risque
+    """
+    hierarchies = _prepare(df, quasi_identifiers, column_types)
+    levels = levels or {}
+    columns = [
+        hierarchy.codes(min(levels.get(col, 0), hierarchy.max_level))
+        for col, hierarchy in hierarchies.items()
+    ]
+    risk = _risk_from_codes(columns, len(df), target_k, _sensitive_codes(df, sensitive_column))
+    risk['quasi_identifiers'] = list(hierarchies)
+    return risk
+
+
+def search_generalization(
+    df: pd.DataFrame,
+    quasi_identifiers: List[str],
+    target_k: int = 5,
+    sensitive_column: Optional[str] = None,
+    column_types: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Recherche gloutonne des niveaux de généralisation atteignant k >= target_k
+
+    À chaque étape, chaque quasi-identifiant est généralisé d'un niveau à
+    l'essai ; on retient celui qui laisse le moins de lignes à risque (à
+    égalité, celui qui conserve le plus de classes, donc d'information). Si
+    aucun essai ne réduit les lignes à risque (toutes les classes encore de
+    taille 1), on généralise la colonne la plus variée (heuristique Datafly).
+    S'arrête quand k >= target_k ou quand toutes les colonnes sont supprimées.
+    
+    Returns:
+        Dict avec les niveaux retenus par colonne, le risque final (k et l),
+        le risque initial et le détail des étapes
+    """
+    hierarchies = _prepare(df, quasi_identifiers, column_types)
+    sensitive = _sensitive_codes(df, sensitive_column)
+    n_rows = len(df)
+    levels = {col: 0 for col in hierarchies}
+    
+    def evaluate(candidate: Dict[str, int], with_diversity: bool = False) -> Dict[str, Any]:
+        # l-diversité calculée seulement pour les résultats retournés
+        columns = [hierarchies[col].codes(level) for col, level in candidate.items()]
+        return _risk_from_codes(columns, n_rows, target_k, sensitive if with_diversity else None)
+    
+    initial = evaluate(levels, with_diversity=True)
+    risk = initial
+    steps = []
+    while risk['k'] < target_k:
+        trials = {}
+        for col, hierarchy in hierarchies.items():
+            if levels[col] < hierarchy.max_level:
+                trials[col] = evaluate({**levels, col: levels[col] + 1})
+        if not trials:
+            break
+        
+        col = min(trials, key=lambda c: (trials[c]['records_at_risk'], -trials[c]['equivalence_classes']))
+        if trials[col]['records_at_risk'] >= risk['records_at_risk']:
+            col = max(trials, key=lambda c: hierarchies[c].codes(levels[c])[1])
+        levels = {**levels, col: levels[col] + 1}
+        risk = trials[col]
+        steps.append({
+            'column': col,
+            'generalization': hierarchies[col].levels[levels[col]],
+            'k': risk['k'],
+            'records_at_risk': risk['records_at_risk']
+        })
+    
+    if sensitive is not None:
+        risk = evaluate(levels, with_diversity=True)
+    
+    return {
+        'achieved': risk['k'] >= target_k,
+        'target_k': target_k,
+        'levels': {
+            col: {
+                'level': level,
+                'generalization': hierarchies[col].levels[level],
+                'hierarchy': hierarchies[col].kind
+            }
+            for col, level in levels.items()
+        },
+        'initial_risk': initial,
+        'risk': risk,
+        'steps': steps
+    }
+
+
+def apply_generalization(
+    df: pd.DataFrame,
+    levels: Dict[str, int],
+    column_types: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """Applique des niveaux de généralisation (ex. résultat de search_generalization) ; retourne une copie"""
+    column_types = column_types or {}
+    result = df.copy(deep=False)
+    for col, level in levels.items():
+        if col not in df.columns or level <= 0:
+            continue
+        kind = hierarchy_kind(col, column_types.get(col, ''), df[col].dtype)
+        codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+        result[col] = pd.Series(generalize_values(uniques, kind, level)[codes], index=df.index, name=col)
+    return result
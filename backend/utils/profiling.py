@@ -0,0 +1,387 @@
+"""
+Profilage des colonnes en une seule passe
+
+Calcule pour toutes les colonnes, bloc par bloc (un fichier n'a jamais
+besoin d'être chargé en entier) :
+- nombre de valeurs manquantes
+- nombre de valeurs distinctes (exact tant que le compteur reste borné,
+  HyperLogLog au-delà)
+- min / max / moyenne / écart-type (fusion de Chan entre blocs)
+- quantiles approximatifs (échantillon uniforme borné)
+- valeurs les plus fréquentes
+- type inféré sur l'échantillon
+
+Le profil est stocké avec le dataset (columns_info) et sert la
+prévisualisation, l'EDA, l'analyse des valeurs manquantes et la liste des
+colonnes pour la configuration.
+"""
+import warnings
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Incrémenté quand le format du profil change (les profils stockés plus anciens sont recalculés)
+PROFILE_VERSION = 1
+
+DEFAULT_SAMPLE_SIZE = 10_000
+DEFAULT_TOP_K = 10
+DEFAULT_CHUNK_SIZE = 100_000
+HLL_PRECISION = 14
+# Au-delà de ce nombre de valeurs distinctes, le compteur exact est élagué
+# (heavy hitters approximatifs) et le nombre de distincts vient du HyperLogLog
+MAX_TRACKED_VALUES = 5_000
+CATEGORICAL_MAX_UNIQUE = 20
+SAMPLE_VALUES_MAX_UNIQUE = 100
+DATE_DETECTION_SAMPLE = 100
+
+
+class HyperLogLog:
+    """Estimateur HyperLogLog vectorisé (registres numpy, hash 64 bits)"""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, idx, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Correction petites cardinalités (linear counting)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * np.log(self.m / zeros)
+        return int(round(estimate))
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """bit_length exact d'entiers uint64 (frexp est exact sur chaque moitié 32 bits)"""
+    hi = (values >> np.uint64(32)).astype(np.float64)
+    lo = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1]).astype(np.int64)
+
+
+class _ColumnAccumulator:
+    """État de profilage d'une colonne, fusionné bloc après bloc"""
+
+    def __init__(self, name: Any, sample_size: int):
+        self.name = name
+        self.sample_size = sample_size
+        self.count = 0
+        self.null_count = 0
+        self.kinds = set()
+        self.dtype = None
+        self.hll = HyperLogLog()
+        self.value_counts: Optional[pd.Series] = None  # compteur exact tant que borné
+        self.counts_pruned = False
+        self.head_values: List[Any] = []
+        # Statistiques numériques (n, moyenne, M2) fusionnées par la formule de Chan
+        self.num_n = 0
+        self.num_mean = 0.0
+        self.num_m2 = 0.0
+        self.num_min = None
+        self.num_max = None
+        # Échantillon uniforme : les sample_size plus petites clés aléatoires
+        self.sample_keys = np.empty(0)
+        self.sample_values = np.empty(0, dtype=object)
+
+    def update(self, series: pd.Series, null_count: int, rng: np.random.Generator):
+        self.kinds.add(series.dtype.kind)
+        self.dtype = _merge_dtypes(self.dtype, series.dtype)
+        self.null_count += null_count
+        values = series.dropna()
+        self.count += len(values)
+        if values.empty:
+            return
+
+        if len(self.head_values) < 5:
+            self.head_values.extend(values.iloc[:5 - len(self.head_values)].tolist())
+
+        if not self.counts_pruned:
+            # Mode exact : factorisation (une passe de hash) + bincount
+            codes, uniques = pd.factorize(values)
+            counts = pd.Series(np.bincount(codes, minlength=len(uniques)), index=uniques)
+            self.value_counts = counts if self.value_counts is None else self.value_counts.add(counts, fill_value=0)
+            if len(self.value_counts) > MAX_TRACKED_VALUES:
+                # Bascule en mode approché : le HLL reprend toutes les valeurs vues
+                self.hll.add_hashes(_hash_values(pd.Series(self.value_counts.index)))
+                self.value_counts = None
+                self.counts_pruned = True
+        else:
+            self.hll.add_hashes(_hash_values(values))
+
+        self._update_sample(values, rng)
+
+    def update_numeric(self, n: int, mean: float, m2: float, vmin: float, vmax: float):
+        if n == 0:
+            return
+        total = self.num_n + n
+        delta = mean - self.num_mean
+        self.num_mean += delta * n / total
+        self.num_m2 += m2 + delta * delta * self.num_n * n / total
+        self.num_n = total
+        self.num_min = vmin if self.num_min is None else min(self.num_min, vmin)
+        self.num_max = vmax if self.num_max is None else max(self.num_max, vmax)
+
+    def _update_sample(self, values: pd.Series, rng: np.random.Generator):
+        keys = rng.random(len(values))
+        positions = np.arange(len(values))
+        if len(self.sample_keys) >= self.sample_size:
+            # Seules les clés plus petites que la plus grande conservée peuvent entrer
+            positions = np.flatnonzero(keys < self.sample_keys.max())
+            if not len(positions):
+                return
+        elif len(values) > self.sample_size:
+            positions = np.argpartition(keys, self.sample_size - 1)[:self.sample_size]
+        # Conversion en objets Python limitée aux candidats retenus
+        candidates = values.iloc[positions].to_numpy(dtype=object)
+        all_keys = np.concatenate([self.sample_keys, keys[positions]])
+        all_values = np.concatenate([self.sample_values, candidates])
+        if len(all_keys) > self.sample_size:
+            selected = np.argpartition(all_keys, self.sample_size - 1)[:self.sample_size]
+            all_keys, all_values = all_keys[selected], all_values[selected]
+        self.sample_keys, self.sample_values = all_keys, all_values
+
+    def finalize(self, row_count: int, top_k: int) -> Dict[str, Any]:
+        column_type = self._infer_type()
+        exact_distinct = self.value_counts is not None and not self.counts_pruned
+        unique_count = len(self.value_counts) if exact_distinct else (self.hll.count() if self.count else 0)
+        # Le HLL peut dépasser le nombre de valeurs non nulles sur de petits volumes
+        unique_count = min(unique_count, self.count)
+        if column_type == 'object':
+            column_type = 'categorical' if unique_count < CATEGORICAL_MAX_UNIQUE else 'text'
+
+        info = {
+            'name': _to_native(self.name),
+            'type': column_type,
+            'dtype': str(self.dtype),
+            'count': self.count,
+            'null_count': self.null_count,
+            'null_percentage': float(self.null_count / row_count * 100) if row_count else 0.0,
+            'unique_count': int(unique_count),
+            'unique_count_approximate': not exact_distinct,
+            'sample_values': [_to_native(v) for v in self.head_values] if unique_count < SAMPLE_VALUES_MAX_UNIQUE else [],
+            'top_values': []
+        }
+
+        if self.value_counts is not None and len(self.value_counts):
+            top = self.value_counts.nlargest(top_k)
+            info['top_values'] = [
+                {'value': _to_native(value), 'count': int(count)}
+                for value, count in top.items()
+            ]
+        elif len(self.sample_values):
+            # Forte cardinalité : fréquences estimées sur l'échantillon
+            top = pd.Series(self.sample_values).value_counts().nlargest(top_k)
+            top = top[top > 1]  # une seule occurrence dans l'échantillon n'est pas significative
+            scale = self.count / len(self.sample_values)
+            info['top_values'] = [
+                {'value': _to_native(value), 'count': int(round(count * scale)), 'approximate': True}
+                for value, count in top.items()
+            ]
+
+        if column_type in ('numeric_integer', 'numeric_float'):
+            info.update(self._numeric_stats())
+
+        return info
+
+    def _numeric_stats(self) -> Dict[str, Optional[float]]:
+        if self.num_n == 0:
+            return {'min': None, 'max': None, 'mean': None, 'std': None,
+                    'q25': None, 'median': None, 'q75': None, 'skewness': None}
+        sample = pd.to_numeric(pd.Series(self.sample_values), errors='coerce').dropna().to_numpy(dtype=np.float64)
+        q25, median, q75 = np.quantile(sample, [0.25, 0.5, 0.75]) if len(sample) else (None, None, None)
+        # Écart-type échantillon (ddof=1), comme pandas
+        std = float(np.sqrt(self.num_m2 / (self.num_n - 1))) if self.num_n > 1 else None
+        skewness = pd.Series(sample).skew() if len(sample) > 2 else None
+        return {
+            'min': _to_native(float(self.num_min)),
+            'max': _to_native(float(self.num_max)),
+            'mean': _to_native(float(self.num_mean)),
+            'std': _to_native(std),
+            'q25': _to_native(q25),
+            'median': _to_native(median),
+            'q75': _to_native(q75),
+            'skewness': _to_native(skewness)
+        }
+
+    def _infer_type(self) -> str:
+        kinds = self.kinds
+        if kinds <= {'i', 'u'}:
+            return 'numeric_integer'
+        if kinds <= {'i', 'u', 'f'}:
+            return 'numeric_float'
+        if kinds == {'b'}:
+            return 'boolean'
+        if kinds == {'M'}:
+            return 'date'
+        if _looks_like_dates(self.sample_values[:DATE_DETECTION_SAMPLE]):
+            return 'date'
+        return 'object'
+
+
+def _hash_values(values: pd.Series) -> np.ndarray:
+    """Hash 64 bits par valeur ; les numériques sont hashés en float64 (5 et 5.0 identiques)"""
+    if values.dtype.kind in 'iuf':
+        return pd.util.hash_array(values.to_numpy(dtype=np.float64))
+    # categorize=False : inutile de factoriser des valeurs majoritairement distinctes
+    return pd.util.hash_pandas_object(values, index=False, categorize=False).to_numpy()
+
+
+def _merge_dtypes(current: Optional[np.dtype], new: np.dtype) -> np.dtype:
+    """dtype qu'aurait la colonne lue en une fois (int + float -> float, sinon object)"""
+    if current is None or current == new:
+        return new
+    if current.kind in 'iuf' and new.kind in 'iuf':
+        return np.promote_types(current, new)
+    return np.dtype(object)
+
+
+def _looks_like_dates(values: np.ndarray) -> bool:
+    """Toutes les valeurs échantillonnées sont des chaînes interprétables comme dates"""
+    if not len(values) or not all(isinstance(v, str) for v in values):
+        return False
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(pd.Series(values), errors='coerce')
+    return bool(parsed.notna().all())
+
+
+def _to_native(value: Any) -> Any:
+    """Convertit une valeur numpy/pandas en type JSON natif"""
+    if value is None:
+        return None
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+class DatasetProfiler:
+    """
+    Profileur incrémental : appeler update() sur chaque bloc puis finalize()
+
+    Les agrégats sans état par valeur (nulls, min/max, moyenne, variance)
+    sont calculés pour toutes les colonnes d'un bloc en une opération
+    vectorisée ; les structures par colonne (HLL, compteurs, échantillon)
+    sont fusionnées bloc après bloc.
+    """
+
+    def __init__(
+        self,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        top_k: int = DEFAULT_TOP_K,
+        seed: int = 42
+    ):
+        self.sample_size = sample_size
+        self.top_k = top_k
+        self.rng = np.random.default_rng(seed)
+        self.row_count = 0
+        self.columns: Dict[Any, _ColumnAccumulator] = {}
+
+    def update(self, chunk: pd.DataFrame):
+        self.row_count += len(chunk)
+        for name in chunk.columns:
+            if name not in self.columns:
+                self.columns[name] = _ColumnAccumulator(name, self.sample_size)
+
+        null_counts = chunk.isna().sum()
+
+        numeric = chunk.select_dtypes(include=[np.number])
+        if not numeric.empty:
+            n = numeric.count()
+            means = numeric.mean()
+            m2 = numeric.var(ddof=0) * n
+            mins = numeric.min()
+            maxs = numeric.max()
+            for name in numeric.columns:
+                if n[name]:
+                    self.columns[name].update_numeric(
+                        int(n[name]), float(means[name]), float(m2[name]),
+                        float(mins[name]), float(maxs[name])
+                    )
+
+        for name in chunk.columns:
+            self.columns[name].update(chunk[name], int(null_counts[name]), self.rng)
+
+    def finalize(self) -> Dict[str, Any]:
+        return {
+            'version': PROFILE_VERSION,
+            'row_count': self.row_count,
+            'column_count': len(self.columns),
+            'columns': [
+                acc.finalize(self.row_count, self.top_k)
+                for acc in self.columns.values()
+            ]
+        }
+
+
+def profile_dataframe(df: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE, **kwargs) -> Dict[str, Any]:
+    """Profile un DataFrame déjà en mémoire (par tranches de chunk_size lignes)"""
+    profiler = DatasetProfiler(**kwargs)
+    if df.empty:
+        profiler.update(df)
+    for start in range(0, len(df), chunk_size):
+        profiler.update(df.iloc[start:start + chunk_size])
+    return profiler.finalize()
+
+
+def iter_dataset_chunks(
+    file_path: str,
+    encoding: str = 'utf-8',
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Itère sur un fichier CSV, Parquet ou Excel par blocs de lignes"""
+    path = str(file_path).lower()
+    if path.endswith('.parquet'):
+        if not PYARROW_AVAILABLE:
+            raise ValueError("Parquet support requires pyarrow")
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif path.endswith(('.xls', '.xlsx')):
+        # Pas de lecture par blocs pour Excel
+        yield pd.read_excel(file_path)
+    else:
+        yield from pd.read_csv(file_path, encoding=encoding, chunksize=chunk_size)
+
+
+def profile_file(
+    file_path: str,
+    encoding: str = 'utf-8',
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **kwargs
+) -> Dict[str, Any]:
+    """Profile un fichier sur disque sans le charger en mémoire"""
+    profiler = DatasetProfiler(**kwargs)
+    for chunk in iter_dataset_chunks(file_path, encoding, chunk_size):
+        profiler.update(chunk)
+    return profiler.finalize()
+
+
+def column_types(profile_columns: List[Dict[str, Any]]) -> Dict[str, str]:
+    """{colonne: type} à partir des colonnes d'un profil"""
+    return {col['name']: col['type'] for col in profile_columns}
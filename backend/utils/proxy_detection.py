@@ -1,16 +1,212 @@
 """
 Détection automatique des variables proxy
 F2.3.3: Détecte les variables corrélées aux attributs sensibles (corrélation > 0.7)
+
+Chaque colonne est encodée une seule fois : valeurs float pour les colonnes
+numériques, codes entiers (pd.factorize) pour les autres. Les associations
+sont ensuite calculées sur ces tableaux, sans crosstab ni masque par
+catégorie :
+- Pearson : un produit matriciel entre attributs sensibles et colonnes
+  numériques, sur les lignes complètes de chaque paire
+- V de Cramér : table de contingence par np.bincount des codes combinés
+  (correction de Yates pour les tables 2x2, comme chi2_contingency)
+- Rapport de corrélation (eta) : sommes par groupe par np.bincount
+Les colonnes sont traitées par blocs répartis sur plusieurs threads.
+
+Ces trois mesures ne sont pas comparables entre elles :
+mutual_information_scores donne une échelle unique (information mutuelle
+normalisée) pour toutes les paires, avec un test de permutation.
 """
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+# Nombre minimum de lignes complètes pour calculer une association
+MIN_PAIR_ROWS = 10
+# Valeurs (lignes x colonnes) par bloc de colonnes : borne la mémoire des matrices float
+PROXY_BLOCK_CELLS = 1 << 23
+MAX_BLOCK_COLUMNS = 64
+# Au-delà, la table de contingence n'est pas matérialisée (cellules non nulles seulement)
+_MIN_DENSE_CELLS = 1 << 20
+
+# Information mutuelle : intervalles de quantiles des numériques, catégories conservées au plus
+NMI_BINS = 10
+# Valeurs utilisées pour calculer les bornes des intervalles (le comptage porte sur toutes les lignes)
+NMI_QUANTILE_SAMPLE = 100_000
+MAX_NMI_CATEGORIES = 256
+NMI_PERMUTATIONS = 20
+NMI_ALPHA = 0.05
+NMI_MEDIUM_RISK = 0.1
+NMI_HIGH_RISK = 0.3
+
+
+class _EncodedColumn:
+    """Colonne encodée une fois : float (numérique) ou codes de catégories"""
+
+    def __init__(self, series: pd.Series):
+        self.numeric = pd.api.types.is_numeric_dtype(series)
+        if self.numeric:
+            self.values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            present = ~np.isnan(self.values)
+            self.categories = 0
+        else:
+            self.values, uniques = pd.factorize(series, use_na_sentinel=True)
+            present = self.values >= 0
+            self.categories = len(uniques)
+        # None : aucune valeur manquante
+        self.present = None if present.all() else present
+
+
+def _joint_rows(first: _EncodedColumn, second: _EncodedColumn) -> Optional[np.ndarray]:
+    if first.present is None:
+        return second.present
+    if second.present is None:
+        return first.present
+    return first.present & second.present
+
+
+def _compact_codes(codes: np.ndarray, categories: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Renumérote les codes sans les catégories absentes ; retourne (codes, effectifs)"""
+    counts = np.bincount(codes, minlength=categories)
+    observed = counts > 0
+    if observed.all():
+        return codes, counts
+    rank = np.cumsum(observed) - 1
+    return rank[codes], counts[observed]
+
+
+def _cramers_v_codes(a: np.ndarray, ka: int, b: np.ndarray, kb: int) -> float:
+    """V de Cramér de deux colonnes de codes (sans valeur manquante)"""
+    n = len(a)
+    a, rows = _compact_codes(a, ka)
+    b, cols = _compact_codes(b, kb)
+    r, c = len(rows), len(cols)
+    min_dim = min(r, c) - 1
+    if min_dim == 0:
+        return 0.0
+    
+    cells = a.astype(np.int64) * c + b
+    if r * c <= max(4 * n, _MIN_DENSE_CELLS):
+        observed = np.bincount(cells, minlength=r * c).reshape(r, c).astype(np.float64)
+        expected = np.outer(rows, cols) / n
+        if r == 2 and c == 2:
+            # Correction de Yates (un degré de liberté), comme scipy.stats.chi2_contingency
+            diff = expected - observed
+            observed = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+        chi2 = float(((observed - expected) ** 2 / expected).sum())
+    else:
+        # chi2 = n * (somme des O^2 / (ligne * colonne) - 1) sur les cellules non nulles
+        occupied, counts = np.unique(cells, return_counts=True)
+        marginals = rows[occupied // c].astype(np.float64) * cols[occupied % c]
+        chi2 = max(float(n * ((counts.astype(np.float64) ** 2 / marginals).sum() - 1)), 0.0)
+    
+    return float(np.sqrt(chi2 / (n * min_dim)))
+
+
+def _correlation_ratio_codes(values: np.ndarray, codes: np.ndarray, categories: int) -> float:
+    """Eta d'une colonne numérique et de codes de catégories (sans valeur manquante)"""
+    deviations = values - values.mean()
+    ss_total = float(deviations @ deviations)
+    if ss_total == 0:
+        return 0.0
+    
+    # Variance inter-groupes : n_g * moyenne_g^2 = somme_g^2 / n_g (écarts à la moyenne globale)
+    counts = np.bincount(codes, minlength=categories)
+    sums = np.bincount(codes, weights=deviations, minlength=categories)
+    observed = counts > 0
+    ss_between = float((sums[observed] ** 2 / counts[observed]).sum())
+    return float(np.sqrt(ss_between / ss_total))
+
+
+def _pair_association(first: _EncodedColumn, second: _EncodedColumn) -> Tuple[Optional[float], Optional[str]]:
+    """Association entre deux colonnes encodées, sur leurs lignes complètes"""
+    rows = _joint_rows(first, second)
+    n = len(first.values) if rows is None else int(rows.sum())
+    if n < MIN_PAIR_ROWS:
+        return None, None
+    
+    def take(column: _EncodedColumn) -> np.ndarray:
+        return column.values if rows is None else column.values[rows]
+    
+    if first.numeric and second.numeric:
+        x, y = take(first), take(second)
+        dx, dy = x - x.mean(), y - y.mean()
+        denominator = np.sqrt((dx @ dx) * (dy @ dy))
+        return (float(dx @ dy / denominator) if denominator > 0 else np.nan), 'pearson'
+    if not first.numeric and not second.numeric:
+        return _cramers_v_codes(take(first), first.categories, take(second), second.categories), 'cramers_v'
+    numerical, categorical = (first, second) if first.numeric else (second, first)
+    return _correlation_ratio_codes(take(numerical), take(categorical), categorical.categories), 'correlation_ratio'
+
+
+def _pearson_matrix(sensitive: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """
+    Corrélations de Pearson (sensibles x autres) sur les lignes complètes de chaque paire
+    
+    Les sommes restreintes à chaque paire sont obtenues par produits
+    matriciels des valeurs centrées (moyenne de colonne) et des masques de
+    présence.
+    """
+    present_s, present_o = ~np.isnan(sensitive), ~np.isnan(others)
+    s = np.where(present_s, sensitive - np.nanmean(sensitive, axis=0), 0.0)
+    o = np.where(present_o, others - np.nanmean(others, axis=0), 0.0)
+    mask_s, mask_o = present_s.astype(np.float64), present_o.astype(np.float64)
+    
+    n = mask_s.T @ mask_o
+    sum_s, sum_o = s.T @ mask_o, mask_s.T @ o
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ss_s = (s * s).T @ mask_o
+        ss_o = mask_s.T @ (o * o)
+        var_s = ss_s - sum_s ** 2 / n
+        var_o = ss_o - sum_o ** 2 / n
+        covariance = s.T @ o - sum_s * sum_o / n
+        corr = covariance / np.sqrt(var_s * var_o)
+    # Variance nulle sur les lignes communes (aux erreurs d'arrondi près) : corrélation indéfinie
+    constant = (var_s <= 1e-12 * ss_s) | (var_o <= 1e-12 * ss_o)
+    corr[constant | (n < MIN_PAIR_ROWS)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _block_associations(
+    df: pd.DataFrame,
+    sensitive: Dict[str, _EncodedColumn],
+    columns: List[str]
+) -> List[Tuple[str, str, Optional[float], Optional[str]]]:
+    """Associations entre les attributs sensibles et un bloc de colonnes"""
+    encoded = {col: sensitive.get(col) or _EncodedColumn(df[col]) for col in columns}
+    numeric_sensitive = [attr for attr, column in sensitive.items() if column.numeric]
+    numeric_columns = [col for col, column in encoded.items() if column.numeric]
+    
+    pearson = {}
+    if numeric_sensitive and numeric_columns:
+        matrix = _pearson_matrix(
+            np.column_stack([sensitive[attr].values for attr in numeric_sensitive]),
+            np.column_stack([encoded[col].values for col in numeric_columns])
+        )
+        for i, attr in enumerate(numeric_sensitive):
+            for j, col in enumerate(numeric_columns):
+                pearson[(attr, col)] = matrix[i, j]
+    
+    results = []
+    for attr, column in sensitive.items():
+        for col in columns:
+            if col == attr:
+                continue
+            if (attr, col) in pearson:
+                value = pearson[(attr, col)]
+                results.append((attr, col, None if np.isnan(value) else float(value), 'pearson'))
+            else:
+                results.append((attr, col, *_pair_association(column, encoded[col])))
+    return results
 
 
 def detect_proxy_variables(
     df: pd.DataFrame,
     sensitive_attributes: List[str],
-    correlation_threshold: float = 0.7
+    correlation_threshold: float = 0.7,
+    max_workers: Optional[int] = None
 ) -> Dict[str, List[Dict[str, any]]]:
     """
     Détecte les variables proxy pour chaque attribut sensible
@@ -19,6 +215,7 @@ def detect_proxy_variables(
         df: DataFrame contenant les données
         sensitive_attributes: Liste des colonnes sensibles
         correlation_threshold: Seuil de corrélation (défaut: 0.7)
+        max_workers: Nombre de blocs de colonnes traités en parallèle (défaut : nombre de CPU)
     
     Returns:
         Dict avec pour chaque attribut sensible, la liste des proxies détectées
@@ -29,33 +226,34 @@ def detect_proxy_variables(
             ]
         }
     """
-    results = {}
+    sensitive_attributes = [attr for attr in dict.fromkeys(sensitive_attributes) if attr in df.columns]
+    sensitive = {attr: _EncodedColumn(df[attr]) for attr in sensitive_attributes}
     
-    for sensitive_attr in sensitive_attributes:
-        if sensitive_attr not in df.columns:
-            continue
-        
-        proxies = []
-        
-        # Pour chaque autre colonne
-        for col in df.columns:
-            if col == sensitive_attr:
-                continue
-            
-            # Calculer la corrélation appropriée selon les types
-            correlation, method = calculate_correlation(df, sensitive_attr, col)
-            
+    columns = list(df.columns)
+    block_size = max(1, min(MAX_BLOCK_COLUMNS, PROXY_BLOCK_CELLS // max(len(df), 1)))
+    blocks = [columns[start:start + block_size] for start in range(0, len(columns), block_size)]
+    
+    workers = min(len(blocks), max_workers or os.cpu_count() or 1)
+    if sensitive and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            block_results = list(executor.map(lambda block: _block_associations(df, sensitive, block), blocks))
+    else:
+        block_results = [_block_associations(df, sensitive, block) for block in blocks] if sensitive else []
+    
+    results = {attr: [] for attr in sensitive_attributes}
+    for block in block_results:
+        for attr, col, correlation, method in block:
             if correlation is not None and abs(correlation) >= correlation_threshold:
-                proxies.append({
+                results[attr].append({
                     'column': col,
                     'correlation': round(float(correlation), 3),
                     'method': method,
                     'risk_level': 'high' if abs(correlation) >= 0.85 else 'medium'
                 })
-        
-        # Trier par corrélation décroissante
+    
+    # Trier par corrélation décroissante
+    for proxies in results.values():
         proxies.sort(key=lambda x: abs(x['correlation']), reverse=True)
-        results[sensitive_attr] = proxies
     
     return results
 
@@ -67,39 +265,13 @@ def calculate_correlation(
 ) -> Tuple[float, str]:
     """
     Calcule la corrélation entre deux colonnes avec la méthode appropriée
+    (lignes où les deux valeurs sont présentes)
     
     Returns:
         Tuple (correlation_value, method_name)
     """
-    # Supprimer les valeurs manquantes pour le calcul
-    data = df[[col1, col2]].dropna()
-    
-    if len(data) < 10:  # Pas assez de données
-        return None, None
-    
-    # Déterminer les types de colonnes
-    is_col1_numeric = pd.api.types.is_numeric_dtype(data[col1])
-    is_col2_numeric = pd.api.types.is_numeric_dtype(data[col2])
-    
     try:
-        # Cas 1: Deux variables numériques -> Corrélation de Pearson
-        if is_col1_numeric and is_col2_numeric:
-            corr = data[col1].corr(data[col2], method='pearson')
-            return corr, 'pearson'
-        
-        # Cas 2: Deux variables catégorielles -> Cramér's V
-        elif not is_col1_numeric and not is_col2_numeric:
-            corr = cramers_v(data[col1], data[col2])
-            return corr, 'cramers_v'
-        
-        # Cas 3: Une numérique et une catégorielle -> Correlation ratio (eta)
-        else:
-            if is_col1_numeric:
-                corr = correlation_ratio(data[col1], data[col2])
-            else:
-                corr = correlation_ratio(data[col2], data[col1])
-            return corr, 'correlation_ratio'
-    
+        return _pair_association(_EncodedColumn(df[col1]), _EncodedColumn(df[col2]))
     except Exception:
         return None, None
 
@@ -109,47 +281,269 @@ def cramers_v(x: pd.Series, y: pd.Series) -> float:
     Calcule le V de Cramér entre deux variables catégorielles
     Mesure d'association entre 0 (indépendance) et 1 (dépendance totale)
     """
-    from scipy.stats import chi2_contingency
+    a, a_uniques = pd.factorize(x, use_na_sentinel=True)
+    b, b_uniques = pd.factorize(y, use_na_sentinel=True)
+    rows = (a >= 0) & (b >= 0)
+    if not rows.all():
+        a, b = a[rows], b[rows]
+    return _cramers_v_codes(a, len(a_uniques), b, len(b_uniques))
+
+
+def correlation_ratio(numerical: pd.Series, categorical: pd.Series) -> float:
+    """
+    Calcule le rapport de corrélation (eta) entre une variable numérique et catégorielle
+    Mesure la force de l'association entre 0 (aucune) et 1 (parfaite)
+    """
+    values = numerical.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, uniques = pd.factorize(categorical, use_na_sentinel=True)
+    rows = ~np.isnan(values) & (codes >= 0)
+    if not rows.all():
+        values, codes = values[rows], codes[rows]
+    return _correlation_ratio_codes(values, codes, len(uniques))
+
+
+def _binned_codes(series: pd.Series, bins: int) -> Tuple[np.ndarray, int]:
+    """
+    Codes 0..k-1 d'une colonne pour les histogrammes ; les valeurs manquantes
+    forment leur propre code (le dernier)
     
-    # Créer la table de contingence
-    confusion_matrix = pd.crosstab(x, y)
+    Numériques et dates : intervalles de quantiles (bornes calculées sur au
+    plus NMI_QUANTILE_SAMPLE valeurs), ou une valeur par code s'il y en a au
+    plus bins. Catégories au-delà de MAX_NMI_CATEGORIES : les plus rares sont
+    regroupées.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        present = series.notna().to_numpy()
+        values = series.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(values)
+    else:
+        values = None
     
-    # Test du chi2
-    chi2 = chi2_contingency(confusion_matrix)[0]
-    n = confusion_matrix.sum().sum()
+    if values is not None:
+        observed = values[present]
+        if len(observed) > NMI_QUANTILE_SAMPLE:
+            observed = observed[np.random.default_rng(0).integers(0, len(observed), NMI_QUANTILE_SAMPLE)]
+        distinct = np.unique(observed)
+        if len(distinct) <= bins:
+            edges = distinct[1:]
+        else:
+            edges = np.unique(np.quantile(observed, np.linspace(0, 1, bins + 1)[1:-1]))
+        # Code = nombre de bornes <= valeur (une comparaison vectorisée par borne)
+        codes = np.zeros(len(values), dtype=np.int64)
+        for edge in edges:
+            codes += values >= edge
+        categories = len(edges) + 1
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        categories = len(uniques)
+        present = codes >= 0
+        if categories > MAX_NMI_CATEGORIES:
+            counts = np.bincount(codes[present], minlength=categories)
+            remap = np.full(categories, MAX_NMI_CATEGORIES - 1)
+            kept = np.argsort(-counts, kind='stable')[:MAX_NMI_CATEGORIES - 1]
+            remap[kept] = np.arange(len(kept))
+            codes = remap[codes]
+            categories = MAX_NMI_CATEGORIES
     
-    # Calcul du V de Cramér
-    min_dim = min(confusion_matrix.shape) - 1
-    if min_dim == 0:
-        return 0.0
+    if not present.all():
+        codes = np.where(present, codes, categories)
+        categories += 1
+    return codes.astype(np.int64), categories
+
+
+def _entropy(counts: np.ndarray, n: int) -> np.ndarray:
+    """Entropie (bits) le long du dernier axe"""
+    p = counts / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=-1)
+
+
+def _mutual_information(joint: np.ndarray, n: int) -> np.ndarray:
+    """Information mutuelle (bits) de chaque histogramme joint (colonnes, classes sensibles, codes)"""
+    sensitive = joint.sum(axis=2, keepdims=True)
+    feature = joint.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(joint > 0, joint * np.log2(joint * n / (sensitive * feature)), 0.0)
+    return np.maximum(terms.sum(axis=(1, 2)) / n, 0.0)
+
+
+def _permuted_tables(
+    sensitive_margins: np.ndarray,
+    feature_margins: np.ndarray,
+    permutations: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Tables de contingence obtenues en mélangeant les codes sensibles
+    
+    Mélanger les codes d'une colonne conserve les deux marges : la table
+    suit alors une loi hypergéométrique multivariée. On la tire classe par
+    classe (les lignes de la classe c sont prises sans remise parmi les
+    codes restants), sans repasser sur les données. Chaque tirage est
+    décomposé en lois hypergéométriques univariées code par code, tirées
+    pour toutes les permutations en un appel : le coût en Python est
+    classes x codes, indépendant du nombre de permutations.
     
-    v = np.sqrt(chi2 / (n * min_dim))
-    return v
+    Returns:
+        Tableau (permutations, classes sensibles, codes)
+    """
+    tables = np.zeros((permutations, len(sensitive_margins), len(feature_margins)), dtype=np.int64)
+    # Codes absents : toujours 0, inutile de les tirer
+    present = np.flatnonzero(feature_margins)
+    remaining = np.broadcast_to(feature_margins[present], (permutations, len(present))).copy()
+    for c, size in enumerate(sensitive_margins[:-1]):
+        if size == 0:
+            continue
+        left = np.full(permutations, size, dtype=np.int64)
+        pool = remaining.sum(axis=1)
+        for k in range(len(present) - 1):
+            pool -= remaining[:, k]
+            drawn = rng.hypergeometric(remaining[:, k], pool, left)
+            tables[:, c, present[k]] = drawn
+            left -= drawn
+        tables[:, c, present[-1]] = left
+        remaining -= tables[:, c, present]
+    tables[:, -1, present] = remaining
+    return tables
 
 
-def correlation_ratio(numerical: pd.Series, categorical: pd.Series) -> float:
+def _block_mutual_information(
+    df: pd.DataFrame,
+    sensitive_codes: np.ndarray,
+    sensitive_categories: int,
+    columns: List[str],
+    offset: int,
+    bins: int,
+    permutations: int,
+    random_state: int
+) -> Dict[str, np.ndarray]:
     """
-    Calcule le rapport de corrélation (eta) entre une variable numérique et catégorielle
-    Mesure la force de l'association entre 0 (aucune) et 1 (parfaite)
+    Information mutuelle entre un attribut sensible et un bloc de colonnes
+    
+    Tous les histogrammes joints du bloc sont construits par un seul
+    np.bincount (index combiné colonne x classe sensible x code) ; le test
+    de permutation ne travaille que sur leurs marges (_permuted_tables).
     """
-    # Variance totale
-    mean_total = numerical.mean()
-    ss_total = ((numerical - mean_total) ** 2).sum()
+    n = len(sensitive_codes)
+    encoded = [_binned_codes(df[col], bins) for col in columns]
+    width = max(categories for _, categories in encoded)
+    cells = sensitive_categories * width
+    # Index combiné (une ligne contiguë par colonne) : décalage j * cells, classe sensible, code
+    combined = np.empty((len(columns), n), dtype=np.int64)
+    sensitive_offsets = sensitive_codes * width
+    for j, (codes, _) in enumerate(encoded):
+        np.add(codes, sensitive_offsets, out=combined[j])
+        combined[j] += j * cells
+    counts = np.bincount(combined.ravel(), minlength=len(columns) * cells)
+    del combined
+    joint = counts.reshape(len(columns), sensitive_categories, width)
     
-    if ss_total == 0:
-        return 0.0
+    sensitive_margins = joint[0].sum(axis=1)
+    feature_margins = joint.sum(axis=1)
+    mi = _mutual_information(joint.astype(np.float64), n)
+    # NMI : moyenne arithmétique des entropies (comme sklearn normalized_mutual_info_score)
+    denominator = (_entropy(sensitive_margins, n) + _entropy(feature_margins, n)) / 2
+    
+    def normalize(values: np.ndarray, j=slice(None)) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.clip(np.where(denominator[j] > 0, values / denominator[j], 0.0), 0.0, 1.0)
     
-    # Variance inter-groupes
-    ss_between = 0
-    for category in categorical.unique():
-        group = numerical[categorical == category]
-        if len(group) > 0:
-            mean_group = group.mean()
-            ss_between += len(group) * ((mean_group - mean_total) ** 2)
+    null = np.empty((permutations, len(columns)))
+    for j in range(len(columns)):
+        # Graine par colonne : résultat indépendant du découpage en blocs
+        rng = np.random.default_rng([random_state, offset + j])
+        tables = _permuted_tables(sensitive_margins, feature_margins[j], permutations, rng)
+        null[:, j] = normalize(_mutual_information(tables.astype(np.float64), n), j)
     
-    # Rapport de corrélation
-    eta_squared = ss_between / ss_total
-    return np.sqrt(eta_squared)
+    return {'mi': mi, 'nmi': normalize(mi), 'null': null}
+
+
+def mutual_information_scores(
+    df: pd.DataFrame,
+    sensitive_attributes: List[str],
+    bins: int = NMI_BINS,
+    permutations: int = NMI_PERMUTATIONS,
+    alpha: float = NMI_ALPHA,
+    max_workers: Optional[int] = None,
+    random_state: int = 0
+) -> Dict[str, List[Dict[str, any]]]:
+    """
+    Information mutuelle normalisée (NMI) entre chaque colonne et chaque attribut sensible
+    
+    Une seule échelle (0 : indépendance, 1 : dépendance totale) quels que
+    soient les types de colonnes. Les valeurs manquantes sont une catégorie.
+    La p-valeur vient de permutations des codes de l'attribut sensible
+    (tables tirées de leur loi exacte, voir _permuted_tables) ; elle écarte
+    les NMI élevées dues au seul nombre de catégories (identifiants).
+    
+    Args:
+        df: DataFrame contenant les données
+        sensitive_attributes: Liste des colonnes sensibles
+        bins: Nombre d'intervalles de quantiles pour les numériques
+        permutations: Nombre de permutations du test (0 : pas de test)
+        alpha: Seuil de significativité
+        max_workers: Nombre de blocs de colonnes traités en parallèle (défaut : nombre de CPU)
+    
+    Returns:
+        {
+            'gender': [
+                {'column': 'job_title', 'nmi': 0.42, 'mutual_information': 0.41,
+                 'null_nmi': 0.0003, 'p_value': 0.048, 'significant': True, 'risk_level': 'medium'},
+                ...
+            ]
+        }
+        (toutes les colonnes, par NMI décroissante)
+    """
+    results = {}
+    for attr in dict.fromkeys(sensitive_attributes):
+        if attr not in df.columns:
+            continue
+        sensitive_codes, sensitive_categories = _binned_codes(df[attr], bins)
+        columns = [col for col in df.columns if col != attr]
+        block_size = max(1, min(MAX_BLOCK_COLUMNS, PROXY_BLOCK_CELLS // max(len(df), 1)))
+        offsets = range(0, len(columns), block_size)
+        blocks = [columns[start:start + block_size] for start in offsets]
+        
+        def score(offset: int) -> Dict[str, np.ndarray]:
+            return _block_mutual_information(
+                df, sensitive_codes, sensitive_categories, columns[offset:offset + block_size], offset,
+                bins, permutations, random_state
+            )
+        
+        workers = min(len(blocks), max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                block_scores = list(executor.map(score, offsets))
+        else:
+            block_scores = [score(offset) for offset in offsets]
+        
+        scores = []
+        for block, block_score in zip(blocks, block_scores):
+            for j, col in enumerate(block):
+                nmi = float(block_score['nmi'][j])
+                null = block_score['null'][:, j]
+                p_value = float((1 + (null >= nmi - 1e-12).sum()) / (1 + permutations)) if permutations else None
+                significant = p_value is None or p_value <= alpha
+                if not significant or nmi < NMI_MEDIUM_RISK:
+                    risk_level = 'low'
+                else:
+                    risk_level = 'high' if nmi >= NMI_HIGH_RISK else 'medium'
+                scores.append({
+                    'column': col,
+                    'nmi': round(nmi, 4),
+                    'mutual_information': round(float(block_score['mi'][j]), 4),
+                    'null_nmi': round(float(null.mean()), 4) if permutations else None,
+                    'p_value': None if p_value is None else round(p_value, 4),
+                    'significant': significant,
+                    'risk_level': risk_level
+                })
+        
+        scores.sort(key=lambda x: x['nmi'], reverse=True)
+        results[attr] = scores
+    
+    return results
 
 
 def get_proxy_explanation(method: str) -> str:
@@ -157,7 +551,8 @@ def get_proxy_explanation(method: str) -> str:
     explanations = {
         'pearson': 'Corrélation linéaire entre deux variables numériques',
         'cramers_v': "V de Cramér : mesure d'association entre deux variables catégorielles",
-        'correlation_ratio': 'Rapport de corrélation (eta) entre variable numérique et catégorielle'
+        'correlation_ratio': 'Rapport de corrélation (eta) entre variable numérique et catégorielle',
+        'mutual_information': "Information mutuelle normalisée : part d'information partagée, quel que soit le type des variables"
     }
     return explanations.get(method, 'Méthode inconnue')
 
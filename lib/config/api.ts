@@ -40,3 +40,35 @@ export const API_ENDPOINTS = {
 
 // For backward compatibility - export API_URL
 export const API_URL = API_CONFIG.baseUrl
+
+// Listes paginées par curseur (audits, connexions, datasets)
+export const NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+export const MAX_PAGE_SIZE = 200
+
+/**
+ * Récupère tous les éléments d'une liste paginée en suivant l'en-tête X-Next-Cursor
+ *
+ * Renvoie la dernière réponse (à tester avec response.ok / response.status)
+ * et les éléments de toutes les pages lues.
+ */
+export async function fetchAllPages<T>(
+  url: string,
+  init: RequestInit = {}
+): Promise<{ response: Response; items: T[] }> {
+  const items: T[] = []
+  let cursor: string | null = null
+
+  while (true) {
+    const params = new URLSearchParams({ limit: String(MAX_PAGE_SIZE) })
+    if (cursor) params.set('cursor', cursor)
+    const response = await fetch(`${url}${url.includes('?') ? '&' : '?'}${params}`, {
+      credentials: 'include',
+      ...init
+    })
+    if (!response.ok) return { response, items }
+
+    items.push(...(await response.json()))
+    cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    if (!cursor) return { response, items }
+  }
+}
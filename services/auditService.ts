@@ -1,4 +1,4 @@
-import { API_URL, API_ENDPOINTS } from '@/lib/config/api'
+import { API_URL, API_ENDPOINTS, fetchAllPages } from '@/lib/config/api'
 
 export interface Audit {
   id: number
@@ -12,11 +12,9 @@ export interface Audit {
 
 export const auditService = {
   getAll: async (): Promise<Audit[]> => {
-    const response = await fetch(API_ENDPOINTS.audits, {
-      credentials: 'include'
-    })
+    const { response, items } = await fetchAllPages<Audit>(API_ENDPOINTS.audits)
     if (!response.ok) throw new Error('Failed to fetch audits')
-    return response.json()
+    return items
   },
 
   getById: async (id: number): Promise<Audit> => {